@@ -1,26 +1,97 @@
 """Agent definitions for the research crew."""
 from textwrap import dedent
+from typing import Iterable, Optional
 from crewai import Agent
 from langchain_openai import ChatOpenAI
+from cancellation import CancellationCallbackHandler, CancellationToken
 from config import (
+    AGENT_MODELS,
     DEFAULT_LLM, 
     DEFAULT_TEMPERATURE,
     DEFAULT_VERBOSE,
-    DEFAULT_ALLOW_DELEGATION
+    DEFAULT_ALLOW_DELEGATION,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_DISABLED_AGENTS
 )
+from ingest import get_research_tools
+from llm_cache import get_response_cache
+from llm_pool import get_llm_pool
+from routing import ModelRouter
+from streaming import StreamingCallbackHandler, TokenStream
+from telemetry import RunTelemetry, TelemetryCallbackHandler
+
+# Task name produced by each agent
+AGENT_STAGES = {
+    'researcher': 'research',
+    'fact_checker': 'fact_check',
+    'writer': 'writing'
+}
 
 class ResearchAgents:
     """Class to manage all research agents."""
     
-    def __init__(self):
-        """Initialize the LLM for the agents."""
-        self.llm = ChatOpenAI(
-            model_name=DEFAULT_LLM,
+    def __init__(
+        self,
+        use_cache: bool = LLM_CACHE_ENABLED,
+        uncached_agents: Optional[Iterable[str]] = None,
+        stream: Optional[TokenStream] = None,
+        telemetry: Optional[RunTelemetry] = None,
+        router: Optional[ModelRouter] = None,
+        cancellation: Optional[CancellationToken] = None
+    ):
+        """Initialize the LLM settings for the agents.
+        
+        Args:
+            use_cache: Whether LLM responses are served from the on-disk cache
+            uncached_agents: Agent names ('researcher', 'fact_checker', 'writer')
+                that always call the LLM even when caching is enabled
+            stream: Optional token stream receiving the output of the agents
+                whose task is in `stream.stages`
+            telemetry: Optional run telemetry recording every LLM call
+            router: Optional router choosing the model of every LLM call,
+                starting from the agent's model in `AGENT_MODELS`
+            cancellation: Optional token of the run; once it is cancelled the
+                agents stop and their in-flight requests are aborted
+        """
+        self.cache = get_response_cache() if use_cache else None
+        self.uncached_agents = set(
+            LLM_CACHE_DISABLED_AGENTS if uncached_agents is None else uncached_agents
+        )
+        self.stream = stream
+        self.telemetry = telemetry
+        self.router = router
+        self.cancellation = cancellation
+    
+    def _llm_for(self, agent_name: str) -> ChatOpenAI:
+        """Create the LLM for an agent, honouring its model, the cache opt-out, token streaming and telemetry."""
+        use_cache = self.cache is not None and agent_name not in self.uncached_agents
+        stage = AGENT_STAGES[agent_name]
+        model = AGENT_MODELS.get(agent_name, DEFAULT_LLM)
+        streaming = self.stream is not None and stage in self.stream.stages
+        
+        callbacks = []
+        if self.cancellation is not None:
+            callbacks.append(CancellationCallbackHandler(self.cancellation))
+        if streaming:
+            callbacks.append(StreamingCallbackHandler(self.stream, stage))
+        if self.telemetry is not None:
+            callbacks.append(TelemetryCallbackHandler(
+                self.telemetry, stage, model, cache=self.cache if use_cache else None
+            ))
+        
+        return get_llm_pool().create_llm(
+            model_name=model,
             temperature=DEFAULT_TEMPERATURE,
+            cache=self.cache if use_cache else False,
+            streaming=streaming,
+            callbacks=callbacks or None,
+            router=self.router,
+            route_stage=stage,
+            cancellation=self.cancellation,
         )
     
     def create_researcher(self) -> Agent:
-        """Create a researcher agent."""
+        """Create a researcher agent, with a search tool over the ingested local documents if any."""
         return Agent(
             role='Senior Research Analyst',
             goal='Find and analyze interesting information on given topics',
@@ -32,7 +103,8 @@ class ResearchAgents:
             """),
             verbose=DEFAULT_VERBOSE,
             allow_delegation=DEFAULT_ALLOW_DELEGATION,
-            llm=self.llm
+            tools=get_research_tools(),
+            llm=self._llm_for('researcher')
         )
     
     def create_fact_checker(self) -> Agent:
@@ -48,7 +120,7 @@ class ResearchAgents:
             """),
             verbose=DEFAULT_VERBOSE,
             allow_delegation=DEFAULT_ALLOW_DELEGATION,
-            llm=self.llm
+            llm=self._llm_for('fact_checker')
         )
     
     def create_writer(self) -> Agent:
@@ -64,5 +136,5 @@ class ResearchAgents:
             """),
             verbose=DEFAULT_VERBOSE,
             allow_delegation=DEFAULT_ALLOW_DELEGATION,
-            llm=self.llm
+            llm=self._llm_for('writer')
         )
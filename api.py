@@ -0,0 +1,540 @@
+"""HTTP API for research runs, with progress streamed as Server-Sent Events.
+
+Endpoints:
+    POST   /research              Start a run: 202 with its ID. A request identical
+                                  to a run in flight (same normalized topic and
+                                  settings) joins that run instead: 200 with its ID.
+                                  429 when every worker is busy and the queue is full.
+    GET    /research/{id}         Status, task progress and, once finished, the result
+    GET    /research/{id}/events  Server-Sent Events: task progress and streamed tokens
+    DELETE /research/{id}         Withdraw the request; the last one cancels the run
+    GET    /health                Liveness and load
+    GET    /metrics               Prometheus metrics of the service and of every run
+
+Runs execute in this process, at most `API_WORKERS` at a time, and up to
+`API_MAX_QUEUED` more wait for a worker. An event stream starts with every
+event of the run so far, so clients can connect late, or reconnect and skip
+what they saw with the `Last-Event-ID` header.
+
+Run with:
+    python api.py --port 8000 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from config import (
+    API_HOST,
+    API_MAX_QUEUED,
+    API_PORT,
+    API_RESULT_TTL_SECONDS,
+    API_RETRY_AFTER_SECONDS,
+    API_SSE_KEEPALIVE_SECONDS,
+    API_WORKERS,
+)
+from progress import TOKEN
+from singleflight import research_key
+from telemetry import get_telemetry_sink
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+STAGES = ('research', 'fact_check', 'writing')
+
+
+class ResearchRequest(BaseModel):
+    """Body of `POST /research`; every field but `topic` is a `ResearchCrew` option."""
+
+    topic: str = Field(..., min_length=1)
+    pipelined: bool = False
+    fact_check_fan_out: bool = False
+    fact_check_concurrency: Optional[int] = Field(None, ge=1)
+    deadline_seconds: Optional[float] = Field(None, gt=0)
+    refresh: bool = False
+    # Stages whose tokens are sent as `token` events
+    stream_stages: List[str] = Field(default_factory=lambda: ['writing'])
+
+    def crew_options(self) -> Dict[str, Any]:
+        """Get the `ResearchCrew` keyword arguments of the request (unset ones use the defaults)."""
+        return self.model_dump(exclude={'topic'}, exclude_none=True)
+
+
+class ServiceSaturated(Exception):
+    """Raised when every worker is busy and the queue is full."""
+
+
+def _jsonable(value: Any) -> Any:
+    """Convert a result or event to plain JSON types (paths and other objects become strings)."""
+    return json.loads(json.dumps(value, default=str))
+
+
+class ResearchRun:
+    """A research run accepted by the service, shared by every request that joined it."""
+
+    def __init__(self, topic: str, options: Dict[str, Any], key: str):
+        self.id = uuid.uuid4().hex
+        self.topic = topic
+        self.options = options
+        self.key = key
+        self.crew: Any = None
+        # Kept once the run finished and its crew was released
+        self.progress: Optional[Dict[str, Any]] = None
+        self.history: List[Dict[str, Any]] = []
+        self.status = QUEUED
+        self.requests = 1
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+        # Set once the crew exists (or could not be created)
+        self.ready = asyncio.Event()
+        self.cancel_requested = asyncio.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the run's status, progress and, once finished, its result."""
+        return _jsonable({
+            'id': self.id,
+            'topic': self.topic,
+            'options': self.options,
+            'status': self.status,
+            'coalesced': self.requests - 1,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'progress': self.crew.get_progress() if self.crew is not None else self.progress,
+            'result': self.result,
+        })
+
+
+class ResearchService:
+    """Runs research crews for the API with bounded concurrency and a bounded queue."""
+
+    def __init__(
+        self,
+        crew_factory: Optional[Callable[..., Any]] = None,
+        workers: int = API_WORKERS,
+        max_queued: int = API_MAX_QUEUED,
+        result_ttl_seconds: float = API_RESULT_TTL_SECONDS,
+        keepalive_seconds: float = API_SSE_KEEPALIVE_SECONDS
+    ):
+        """Initialize the service.
+
+        Args:
+            crew_factory: Callable creating a crew from the topic and options;
+                defaults to `crew.ResearchCrew`, imported by `start()`
+            workers: Maximum number of runs executed at once
+            max_queued: Maximum number of accepted runs waiting for a worker
+            result_ttl_seconds: How long finished runs are kept
+            keepalive_seconds: Seconds between keep-alive comments on idle event streams
+        """
+        if workers < 1:
+            raise ValueError("Workers must be at least 1")
+        if max_queued < 0:
+            raise ValueError("The queue size cannot be negative")
+
+        self.crew_factory = crew_factory
+        self.workers = workers
+        self.max_queued = max_queued
+        self.result_ttl_seconds = result_ttl_seconds
+        self.keepalive_seconds = keepalive_seconds
+
+        self.runs: Dict[str, ResearchRun] = {}
+        self._in_flight: Dict[str, ResearchRun] = {}
+        # Created by `start()` on the serving loop; before Python 3.10 a semaphore
+        # binds to the loop current when it is created
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.accepted = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    async def start(self) -> None:
+        """Create the worker slots on the serving loop and import the research stack."""
+        self._slots = asyncio.Semaphore(self.workers)
+        if self.crew_factory is None:
+            def load():
+                from crew import ResearchCrew
+                return ResearchCrew
+            self.crew_factory = await asyncio.to_thread(load)
+
+    def _count(self, status: str) -> int:
+        """Number of runs with a status."""
+        return sum(1 for run in self.runs.values() if run.status == status)
+
+    def _prune(self) -> None:
+        """Forget finished runs older than the result TTL."""
+        cutoff = time.time() - self.result_ttl_seconds
+        for run_id in [run.id for run in self.runs.values()
+                       if run.finished_at is not None and run.finished_at < cutoff]:
+            del self.runs[run_id]
+
+    def get(self, run_id: str) -> Optional[ResearchRun]:
+        """Get a run by ID, or None if it does not exist (or was pruned)."""
+        return self.runs.get(run_id)
+
+    async def submit(self, request: ResearchRequest) -> Tuple[ResearchRun, bool]:
+        """Start a run, or join the identical run in flight.
+
+        Args:
+            request: The research request
+
+        Returns:
+            Tuple[ResearchRun, bool]: The run, and whether the request joined
+            a run in flight
+
+        Raises:
+            ServiceSaturated: When every worker is busy and the queue is full
+            ValueError: When the crew rejects the request's options
+        """
+        self._prune()
+        options = request.crew_options()
+        unknown = set(options['stream_stages']) - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+        key = research_key(request.topic, options)
+        run = self._in_flight.get(key)
+        if run is not None:
+            run.requests += 1
+            self.coalesced += 1
+            await run.ready.wait()
+            if run.error is not None:
+                raise ValueError(run.error)
+            return run, True
+
+        active = self._count(QUEUED) + self._count(RUNNING)
+        if active >= self.workers + self.max_queued:
+            self.rejected += 1
+            raise ServiceSaturated(f"{active} runs are running or queued")
+
+        run = ResearchRun(request.topic.strip(), options, key)
+        self.runs[run.id] = run
+        self._in_flight[key] = run
+        try:
+            # Creating the agents takes a while; keep the event loop responsive
+            run.crew = await asyncio.to_thread(self.crew_factory, request.topic, **options)
+        except Exception as e:
+            run.error = str(e)
+            del self.runs[run.id]
+            self._in_flight.pop(key, None)
+            raise ValueError(run.error) from e
+        finally:
+            run.ready.set()
+
+        if run.cancel_requested.is_set():
+            run.crew.cancel("Cancelled by client")
+        self.accepted += 1
+        run.task = asyncio.create_task(self._execute(run))
+        return run, False
+
+    async def _wait_for_slot(self, run: ResearchRun) -> bool:
+        """Wait for a free worker.
+
+        Returns:
+            bool: True holding a worker slot, False when the run was cancelled while queued
+        """
+        if run.cancel_requested.is_set():
+            return False
+        acquire = asyncio.ensure_future(self._slots.acquire())
+        cancelled = asyncio.ensure_future(run.cancel_requested.wait())
+        try:
+            await asyncio.wait({acquire, cancelled}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            cancelled.cancel()
+            if not acquire.done():
+                acquire.cancel()
+        if acquire.done() and not acquire.cancelled():
+            if not run.cancel_requested.is_set():
+                return True
+            self._slots.release()
+        return False
+
+    async def _execute(self, run: ResearchRun) -> None:
+        """Run a crew once a worker is free and record its result."""
+        try:
+            if await self._wait_for_slot(run):
+                try:
+                    run.status = RUNNING
+                    run.started_at = time.time()
+                    result = await run.crew.run_async()
+                finally:
+                    self._slots.release()
+            else:
+                # Cancelled while queued: the crew stops before its first LLM call
+                result = await run.crew.run_async()
+        except asyncio.CancelledError:
+            self._finish(run, {'success': False, 'cancelled': True, 'error': 'Service shut down'})
+            raise
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        self._finish(run, result)
+
+    def _finish(self, run: ResearchRun, result: Dict[str, Any]) -> None:
+        """Record a finished run's result and let identical requests start a new run."""
+        run.result = _jsonable(result)
+        if result.get('success'):
+            run.status = COMPLETED
+        elif result.get('cancelled'):
+            run.status = CANCELLED
+        else:
+            run.status = FAILED
+        run.error = result.get('error')
+        run.finished_at = time.time()
+        if self._in_flight.get(run.key) is run:
+            del self._in_flight[run.key]
+
+        # Finished runs are kept for the result TTL; keep their progress events,
+        # not the crew with its agents and streamed tokens (the report is in the result)
+        if run.crew is not None:
+            run.progress = _jsonable(run.crew.get_progress())
+            run.history = run.crew.events.history(tokens=False)
+            run.crew = None
+
+    def leave(self, run_id: str) -> Optional[bool]:
+        """Withdraw one of the requests of a run; the last one cancels it.
+
+        Returns:
+            Optional[bool]: Whether the run was cancelled; None if it does not exist
+        """
+        run = self.runs.get(run_id)
+        if run is None:
+            return None
+        if run.status not in ACTIVE_STATUSES or run.cancel_requested.is_set():
+            return False
+        if run.requests > 1:
+            run.requests -= 1
+            return False
+
+        run.cancel_requested.set()
+        if run.crew is not None:
+            run.crew.cancel("Cancelled by client")
+        # Identical requests from now on start a new run
+        if self._in_flight.get(run.key) is run:
+            del self._in_flight[run.key]
+        return True
+
+    async def events(self, run: ResearchRun, after: int = 0, tokens: bool = True) -> AsyncIterator[str]:
+        """Stream a run's events in the Server-Sent Events format.
+
+        The SSE ID of an event is its sequence number on the crew's progress
+        bus. Tokens streamed before the client connected arrive coalesced into
+        one `token` event; once the run finished, only its progress events are
+        replayed (the report is in the run's result).
+
+        Args:
+            run: The run
+            after: ID of the last event the client received (`Last-Event-ID`)
+            tokens: Whether to include `token` events
+
+        Yields:
+            str: SSE messages, ending with an `end` event once the run finished
+        """
+        def message(event: Dict[str, Any]) -> str:
+            return f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+        await run.ready.wait()
+        crew = run.crew
+        if crew is None:
+            if run.finished_at is None:
+                # The crew could not be created
+                return
+            for event in run.history:
+                if event['seq'] > after:
+                    yield message(event)
+        else:
+            events = crew.events.aevents(after=after)
+            next_event = asyncio.ensure_future(events.__anext__())
+            try:
+                while True:
+                    done, _ = await asyncio.wait({next_event}, timeout=self.keepalive_seconds)
+                    if not done:
+                        # Comments keep proxies from closing an idle stream
+                        yield ': keep-alive\n\n'
+                        continue
+                    try:
+                        event = next_event.result()
+                    except StopAsyncIteration:
+                        break
+                    next_event = asyncio.ensure_future(events.__anext__())
+
+                    if tokens or event['type'] != TOKEN:
+                        yield message(event)
+            finally:
+                next_event.cancel()
+
+        # The bus closes just before the run's result is recorded
+        if run.task is not None:
+            await asyncio.wait({run.task})
+        end = {'id': run.id, 'status': run.status, 'error': run.error}
+        yield f"event: end\ndata: {json.dumps(end)}\n\n"
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the load of the service and its request counters."""
+        return {
+            'workers': self.workers,
+            'max_queued': self.max_queued,
+            'running': self._count(RUNNING),
+            'queued': self._count(QUEUED),
+            'accepted': self.accepted,
+            'coalesced': self.coalesced,
+            'rejected': self.rejected,
+        }
+
+    def render_metrics(self) -> str:
+        """Render the service metrics and the cumulative run metrics in the Prometheus text format."""
+        stats = self.stats()
+        lines = [
+            '# HELP research_api_runs Runs of the API service by status.',
+            '# TYPE research_api_runs gauge',
+            f'research_api_runs{{status="running"}} {stats["running"]}',
+            f'research_api_runs{{status="queued"}} {stats["queued"]}',
+            '# HELP research_api_workers Runs the API service executes at once.',
+            '# TYPE research_api_workers gauge',
+            f'research_api_workers {self.workers}',
+            '# HELP research_api_requests_total Research requests by outcome.',
+            '# TYPE research_api_requests_total counter',
+        ]
+        lines.extend(
+            f'research_api_requests_total{{outcome="{outcome}"}} {stats[outcome]}'
+            for outcome in ('accepted', 'coalesced', 'rejected')
+        )
+        return '\n'.join(lines) + '\n' + get_telemetry_sink().render_prometheus()
+
+    async def shutdown(self, timeout: float = 10.0) -> None:
+        """Cancel the active runs and wait briefly for their crews to stop."""
+        tasks = []
+        for run in self.runs.values():
+            if run.status in ACTIVE_STATUSES:
+                run.cancel_requested.set()
+                if run.crew is not None:
+                    run.crew.cancel("Service shutting down")
+                if run.task is not None:
+                    tasks.append(run.task)
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+
+
+def create_app(service: Optional[ResearchService] = None) -> FastAPI:
+    """Create the ASGI application.
+
+    Args:
+        service: The service running the research; a default one when not given
+
+    Returns:
+        FastAPI: The application
+    """
+    service = service or ResearchService()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # Crews run on the default executor (asyncio.to_thread); size it for the workers
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=service.workers + 8, thread_name_prefix='research')
+        )
+        await service.start()
+        yield
+        await service.shutdown()
+
+    app = FastAPI(title='Research Assistant API', lifespan=lifespan)
+    app.state.service = service
+
+    def find(run_id: str) -> ResearchRun:
+        run = service.get(run_id)
+        if run is None:
+            raise HTTPException(status_code=404, detail=f"Research run {run_id} not found")
+        return run
+
+    @app.post('/research')
+    async def start_research(request: ResearchRequest):
+        try:
+            run, joined = await service.submit(request)
+        except ServiceSaturated as e:
+            return JSONResponse(
+                {'detail': f"Too many research runs: {e}"},
+                status_code=429,
+                headers={'Retry-After': str(API_RETRY_AFTER_SECONDS)}
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return JSONResponse(
+            {
+                'id': run.id,
+                'status': run.status,
+                'coalesced': joined,
+                'result_url': f'/research/{run.id}',
+                'events_url': f'/research/{run.id}/events',
+            },
+            status_code=200 if joined else 202,
+            headers={'Location': f'/research/{run.id}'}
+        )
+
+    @app.get('/research/{run_id}')
+    async def get_research(run_id: str):
+        return find(run_id).to_dict()
+
+    @app.get('/research/{run_id}/events')
+    async def research_events(run_id: str, request: Request, tokens: bool = True):
+        run = find(run_id)
+        last_event_id = request.headers.get('last-event-id', '')
+        after = int(last_event_id) if last_event_id.isdigit() else 0
+        return StreamingResponse(
+            service.events(run, after=after, tokens=tokens),
+            media_type='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+    @app.delete('/research/{run_id}')
+    async def cancel_research(run_id: str):
+        cancelled = service.leave(run_id)
+        if cancelled is None:
+            raise HTTPException(status_code=404, detail=f"Research run {run_id} not found")
+        return {'id': run_id, 'cancelled': cancelled, 'status': find(run_id).status}
+
+    @app.get('/health')
+    async def health():
+        stats = service.stats()
+        saturated = stats['running'] + stats['queued'] >= service.workers + service.max_queued
+        return {'status': 'saturated' if saturated else 'ok', **stats}
+
+    @app.get('/metrics', response_class=PlainTextResponse)
+    async def metrics():
+        return PlainTextResponse(service.render_metrics(), media_type='text/plain; version=0.0.4')
+
+    return app
+
+
+app = create_app()
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='HTTP API for research runs')
+    parser.add_argument('--host', type=str, default=API_HOST, help=f'Interface to listen on (default: {API_HOST})')
+    parser.add_argument('--port', type=int, default=API_PORT, help=f'Port to listen on (default: {API_PORT})')
+    parser.add_argument('--workers', type=int, default=API_WORKERS,
+                        help=f'Research runs executed at once (default: {API_WORKERS})')
+    parser.add_argument('--max-queued', type=int, default=API_MAX_QUEUED,
+                        help=f'Runs waiting for a worker before requests get 429 (default: {API_MAX_QUEUED})')
+    args = parser.parse_args()
+
+    service = ResearchService(workers=args.workers, max_queued=args.max_queued)
+    uvicorn.run(create_app(service), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
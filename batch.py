@@ -0,0 +1,166 @@
+"""Batch execution of many research topics with a bounded worker pool."""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+from config import BATCH_DEFAULT_CONCURRENCY
+from singleflight import SingleFlight, research_key
+
+
+def iter_topics(path) -> Iterator[str]:
+    """Stream topics from a JSONL or plain text file.
+
+    Each non-empty line is either a JSON object with a `topic` (or `title`)
+    field, a JSON string, or a plain text topic. Lines starting with `#` are
+    treated as comments. A line that looks like JSON but does not parse is
+    read as plain text; JSON records without a usable topic are skipped with
+    a warning.
+
+    Args:
+        path: Path to the topics file
+
+    Yields:
+        str: One research topic per line
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+
+            topic = line
+            if line[0] in '{"':
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    record = line
+                if isinstance(record, dict):
+                    record = record.get('topic') or record.get('title')
+                if not isinstance(record, str):
+                    print(f"⚠️ Warning: Skipping line {line_number} of {path}: no topic or title")
+                    continue
+                topic = record
+
+            if topic.strip():
+                yield topic.strip()
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    """Get the nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(percent / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_batch(
+    topics: Iterable[str],
+    results_file,
+    run_topic: Callable[[str], Dict[str, Any]],
+    concurrency: int = BATCH_DEFAULT_CONCURRENCY
+) -> Dict[str, Any]:
+    """Run research on many topics concurrently.
+
+    Topics are pulled from `topics` lazily, so at most `2 * concurrency` runs are
+    queued or in flight at any time. A result record is appended to
+    `results_file` as soon as each topic finishes. A topic that is already
+    being researched (after normalization) is not run again; it shares the
+    result of the run in flight.
+
+    Args:
+        topics: Iterable of research topics
+        results_file: Path of the JSONL file receiving one record per topic
+        run_topic: Function running the research for one topic and returning
+            a result dict shaped like `ResearchCrew.run()`
+        concurrency: Maximum number of topics researched at the same time
+
+    Returns:
+        Dict[str, Any]: Throughput and latency summary of the batch
+    """
+    if concurrency < 1:
+        raise ValueError("Concurrency must be at least 1")
+
+    results_file = Path(results_file)
+    results_file.parent.mkdir(exist_ok=True, parents=True)
+
+    write_lock = threading.Lock()
+    slots = threading.BoundedSemaphore(2 * concurrency)
+    latencies: List[float] = []
+    counts = {'succeeded': 0, 'failed': 0}
+    flights = SingleFlight()
+    batch_start = time.time()
+
+    def run_one(topic: str, out) -> None:
+        start = time.time()
+        coalesced = False
+        try:
+            result, coalesced = flights.call(research_key(topic), lambda: run_topic(topic))
+        except Exception as e:
+            result = {'topic': topic, 'error': str(e), 'success': False}
+        latency = time.time() - start
+
+        record = {
+            'topic': topic,
+            'success': bool(result.get('success')),
+            'output_file': str(result['output_file']) if result.get('output_file') else None,
+            'error': result.get('error'),
+            'latency_seconds': round(latency, 3),
+            'coalesced': coalesced,
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+        }
+
+        with write_lock:
+            out.write(json.dumps(record) + '\n')
+            out.flush()
+            latencies.append(latency)
+            counts['succeeded' if record['success'] else 'failed'] += 1
+            done = counts['succeeded'] + counts['failed']
+            status = '✅' if record['success'] else '❌'
+            shared = ', shared with a run in flight' if coalesced else ''
+            print(f"{status} [{done}] {topic} ({latency:.1f}s{shared})")
+
+    with open(results_file, 'a', encoding='utf-8') as out, \
+            ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for topic in topics:
+            slots.acquire()
+            future = executor.submit(run_one, topic, out)
+            future.add_done_callback(lambda _: slots.release())
+
+    wall_time = time.time() - batch_start
+    total = len(latencies)
+    return {
+        'total': total,
+        'succeeded': counts['succeeded'],
+        'failed': counts['failed'],
+        'concurrency': concurrency,
+        'coalesced': flights.coalesced,
+        'wall_time_seconds': wall_time,
+        'throughput_per_minute': (total / wall_time * 60) if wall_time > 0 else 0.0,
+        'latency_mean_seconds': (sum(latencies) / total) if total else 0.0,
+        'latency_p50_seconds': _percentile(latencies, 50),
+        'latency_p95_seconds': _percentile(latencies, 95),
+        'latency_max_seconds': max(latencies) if latencies else 0.0,
+        'results_file': str(results_file),
+    }
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    """Print a human readable batch summary."""
+    print("\n" + "="*80)
+    print(f"📊 Batch complete: {summary['succeeded']}/{summary['total']} succeeded, "
+          f"{summary['failed']} failed (concurrency {summary['concurrency']})")
+    print(f"⏱️  Wall time: {summary['wall_time_seconds']:.1f}s, "
+          f"throughput: {summary['throughput_per_minute']:.2f} topics/min")
+    print(f"📈 Latency: mean {summary['latency_mean_seconds']:.1f}s, "
+          f"p50 {summary['latency_p50_seconds']:.1f}s, "
+          f"p95 {summary['latency_p95_seconds']:.1f}s, "
+          f"max {summary['latency_max_seconds']:.1f}s")
+    if summary.get('coalesced'):
+        print(f"♻️  Coalesced {summary['coalesced']} duplicate topic(s) into runs already in flight")
+    print(f"📄 Results file: {summary['results_file']}")
+    print("="*80 + "\n")
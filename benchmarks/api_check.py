@@ -0,0 +1,190 @@
+"""End-to-end check of the HTTP API (api.py) against the stub LLM.
+
+Starts the stub LLM server and the API service (one worker, one queue slot)
+in their own processes, then checks, with no network access or API key:
+    - a new request is accepted (202) and an identical one joins it (200)
+    - a request beyond the worker and the queue slot is rejected (429)
+    - the event stream delivers task progress, tokens and the end of the run
+    - the finished run's result and coalesced count, health and metrics
+    - a queued run can be cancelled
+
+Prints one line per check and a JSON summary with the time to first event
+and run latency; the exit status is 1 if any check failed.
+
+Usage:
+    python benchmarks/api_check.py
+"""
+import argparse
+import json
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+from suite import _child_env
+
+ROOT = Path(__file__).resolve().parent.parent
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+
+
+def _free_port() -> int:
+    """Get a port nothing is listening on."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _start_stub(args: argparse.Namespace) -> Tuple[subprocess.Popen, str]:
+    """Start the stub LLM server and return it with its URL."""
+    process = subprocess.Popen(
+        [
+            sys.executable, str(BENCHMARKS_DIR / 'stub_llm.py'),
+            '--latency', str(args.latency),
+            '--tokens-per-second', str(args.tokens_per_second),
+            '--response-tokens', str(args.response_tokens),
+        ],
+        stdout=subprocess.PIPE,
+        text=True
+    )
+    return process, process.stdout.readline().strip()
+
+
+def _start_api(base_url: str, port: int, timeout: float = 120.0) -> subprocess.Popen:
+    """Start the API service with one worker and one queue slot, and wait until it is healthy."""
+    process = subprocess.Popen(
+        [sys.executable, str(ROOT / 'api.py'), '--port', str(port), '--workers', '1', '--max-queued', '1'],
+        cwd=ROOT,
+        env=_child_env(base_url),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API service exited with status {process.returncode}")
+        try:
+            if httpx.get(f'http://127.0.0.1:{port}/health', timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("API service did not become healthy")
+
+
+def _read_events(client: httpx.Client, run_id: str) -> Tuple[List[Dict[str, Any]], float]:
+    """Read a run's event stream to its end.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], float]: The events (`event` and `data`),
+        and the seconds until the first one
+    """
+    events: List[Dict[str, Any]] = []
+    start = time.time()
+    first_event = None
+    current: Dict[str, Any] = {}
+    with client.stream('GET', f'/research/{run_id}/events', timeout=None) as response:
+        for line in response.iter_lines():
+            if line.startswith('event: '):
+                current['event'] = line[len('event: '):]
+            elif line.startswith('data: '):
+                current['data'] = json.loads(line[len('data: '):])
+            elif not line and current:
+                if first_event is None:
+                    first_event = time.time() - start
+                events.append(current)
+                if current['event'] == 'end':
+                    break
+                current = {}
+    return events, first_event or 0.0
+
+
+def run_checks(client: httpx.Client) -> Tuple[List[Tuple[str, bool]], Dict[str, Any]]:
+    """Exercise the API; returns the named check outcomes and measurements."""
+    checks: List[Tuple[str, bool]] = []
+    topic = f"api check {uuid.uuid4().hex[:8]}"
+
+    first = client.post('/research', json={'topic': topic})
+    duplicate = client.post('/research', json={'topic': f"  {topic.upper()}!"})
+    checks.append(('new request accepted (202)', first.status_code == 202))
+    checks.append(('identical request joined (200, same ID)',
+                   duplicate.status_code == 200 and duplicate.json()['id'] == first.json()['id']))
+
+    queued = client.post('/research', json={'topic': f"{topic} queued"})
+    rejected = client.post('/research', json={'topic': f"{topic} rejected"})
+    checks.append(('request beyond capacity queued (202)', queued.status_code == 202))
+    checks.append(('saturated service rejects with 429 and Retry-After',
+                   rejected.status_code == 429 and 'retry-after' in rejected.headers))
+    health = client.get('/health').json()
+    checks.append(('health reports saturation', health['status'] == 'saturated'))
+
+    cancel = client.delete(f"/research/{queued.json()['id']}")
+    checks.append(('queued run cancelled', cancel.status_code == 200 and cancel.json()['cancelled']))
+
+    started = time.time()
+    events, first_event = _read_events(client, first.json()['id'])
+    latency = time.time() - started
+    types = [event['event'] for event in events]
+    checks.append(('events include task progress', 'task_started' in types and 'task_finished' in types))
+    checks.append(('events include tokens', 'token' in types))
+    checks.append(('event stream ends with the run', types[-1:] == ['end']
+                   and events[-1]['data']['status'] == 'completed'))
+
+    run = client.get(f"/research/{first.json()['id']}").json()
+    checks.append(('result available', run['status'] == 'completed' and bool(run['result']['result'])))
+    checks.append(('coalesced request counted', run['coalesced'] == 1))
+
+    cancelled = client.get(f"/research/{queued.json()['id']}").json()
+    checks.append(('cancelled run made no progress', cancelled['status'] == 'cancelled'))
+
+    metrics = client.get('/metrics').text
+    checks.append(('metrics exported', 'research_api_requests_total{outcome="coalesced"} 1' in metrics
+                   and 'research_runs_total' in metrics))
+    checks.append(('missing run is 404', client.get('/research/missing').status_code == 404))
+
+    for finished in (run, cancelled):
+        output_file = (finished.get('result') or {}).get('output_file')
+        if output_file:
+            Path(output_file).unlink(missing_ok=True)
+    return checks, {
+        'first_event_seconds': round(first_event, 3),
+        'run_seconds': round(latency, 3),
+        'events': len(events),
+        'token_events': types.count('token'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end check of the HTTP API against a stub LLM')
+    parser.add_argument('--latency', type=float, default=0.2, help='Stub time to first token (default: 0.2)')
+    parser.add_argument('--tokens-per-second', type=float, default=200.0, help='Stub token rate (default: 200)')
+    parser.add_argument('--response-tokens', type=int, default=100, help='Stub answer length (default: 100)')
+    args = parser.parse_args()
+
+    stub, base_url = _start_stub(args)
+    port = _free_port()
+    api = None
+    try:
+        api = _start_api(base_url, port)
+        with httpx.Client(base_url=f'http://127.0.0.1:{port}', timeout=60) as client:
+            checks, measurements = run_checks(client)
+    finally:
+        for process in (api, stub):
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=30)
+
+    for name, passed in checks:
+        print(f"{'✅' if passed else '❌'} {name}")
+    print(json.dumps(measurements, indent=2))
+    if not all(passed for _, passed in checks):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+"""Startup benchmark for the research assistant entry points.
+
+Reports the import time and the first-render time of `crew_enhanced.py`,
+`main.py` and `crew.py`. Every sample runs in a fresh interpreter so the
+cold-start cost is not hidden by modules imported by an earlier sample.
+
+"First render" means:
+    crew_enhanced.py  the first run of the Streamlit script (via AppTest),
+                      followed by a rerun in the same session
+    main.py           `python main.py --help`, until the CLI has parsed its arguments
+    crew.py           importing the module and constructing a ResearchCrew
+
+Usage:
+    python benchmarks/startup.py --repeat 5 --json startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Each snippet prints one JSON object with the timings it measured
+IMPORT_SNIPPET = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import {module}
+print(json.dumps({{'import_seconds': time.perf_counter() - start}}))
+"""
+
+CREW_RENDER_SNIPPET = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+from crew import ResearchCrew
+ResearchCrew('startup benchmark')
+print(json.dumps({{'first_render_seconds': time.perf_counter() - start}}))
+"""
+
+APP_RENDER_SNIPPET = """
+import json, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({script!r}, default_timeout=300)
+start = time.perf_counter()
+app.run()
+first_render = time.perf_counter() - start
+start = time.perf_counter()
+app.run()
+rerun = time.perf_counter() - start
+print(json.dumps({{
+    'first_render_seconds': first_render,
+    'rerun_seconds': rerun,
+    'exceptions': [str(e.value) for e in app.exception],
+}}))
+"""
+
+
+def _child_env() -> Dict[str, str]:
+    """Environment for the measured interpreters; config.py requires an API key."""
+    env = dict(os.environ)
+    env.setdefault('OPENAI_API_KEY', 'sk-startup-benchmark')
+    return env
+
+
+def _run_snippet(snippet: str) -> Dict[str, Any]:
+    """Run a snippet in a fresh interpreter and return the timings it printed."""
+    completed = subprocess.run(
+        [sys.executable, '-c', snippet],
+        cwd=ROOT,
+        env=_child_env(),
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr else 'failed')
+    # Modules may print while importing; the timings are on the last line
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _run_cli(args: List[str]) -> float:
+    """Time a CLI invocation end to end, interpreter start-up included."""
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT,
+        env=_child_env(),
+        capture_output=True,
+        text=True
+    )
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr else 'failed')
+    return elapsed
+
+
+def _sample(target: str) -> Dict[str, Any]:
+    """Take one sample of every timing of a target."""
+    module = target[:-len('.py')]
+    sample = _run_snippet(IMPORT_SNIPPET.format(root=str(ROOT), module=module))
+
+    if target == 'crew_enhanced.py':
+        sample.update(_run_snippet(APP_RENDER_SNIPPET.format(script=str(ROOT / target))))
+    elif target == 'main.py':
+        sample['first_render_seconds'] = _run_cli([str(ROOT / target), '--help'])
+    else:
+        sample.update(_run_snippet(CREW_RENDER_SNIPPET.format(root=str(ROOT))))
+    return sample
+
+
+def benchmark(targets: List[str], repeat: int) -> Dict[str, Any]:
+    """Benchmark the start-up of each target.
+
+    Args:
+        targets: Entry point file names, relative to the repository root
+        repeat: Number of samples per target; the median is reported
+
+    Returns:
+        Dict[str, Any]: Median timings and raw samples per target
+    """
+    results = {}
+    for target in targets:
+        print(f"⏱️  Measuring {target} ({repeat} runs)...")
+        samples = []
+        error: Optional[str] = None
+        for _ in range(repeat):
+            try:
+                samples.append(_sample(target))
+            except Exception as e:
+                error = str(e)
+                break
+
+        medians = {
+            key: round(statistics.median(sample[key] for sample in samples), 4)
+            for key in ('import_seconds', 'first_render_seconds', 'rerun_seconds')
+            if samples and all(key in sample for sample in samples)
+        }
+        results[target] = {**medians, 'samples': samples, 'error': error}
+
+    return {
+        'benchmark': 'startup',
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Print the median timings as a table."""
+    print(f"\n{'Entry point':<20}{'import (s)':>12}{'first render (s)':>18}{'rerun (s)':>12}")
+    for target, result in report['results'].items():
+        if result['error']:
+            print(f"{target:<20}  ❌ {result['error']}")
+            continue
+        rerun = result.get('rerun_seconds')
+        print(
+            f"{target:<20}{result['import_seconds']:>12.3f}"
+            f"{result['first_render_seconds']:>18.3f}"
+            f"{(f'{rerun:.3f}' if rerun is not None else '-'):>12}"
+        )
+        for exception in (result['samples'][0].get('exceptions') or []):
+            print(f"  ⚠️  Script raised: {exception}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure start-up time of the entry points')
+    parser.add_argument(
+        '--targets',
+        nargs='+',
+        default=['crew_enhanced.py', 'main.py', 'crew.py'],
+        help='Entry points to measure (default: crew_enhanced.py main.py crew.py)'
+    )
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per entry point (default: 3)')
+    parser.add_argument('--json', type=str, help='Also write the results as JSON to this file')
+    args = parser.parse_args()
+
+    report = benchmark(args.targets, max(args.repeat, 1))
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Results written to: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+"""Local OpenAI-compatible stub LLM server for offline benchmarks.
+
+Serves `POST /v1/chat/completions` (plain and SSE streaming) with answers in
+the "Thought: ... Final Answer: ..." shape crewai agents expect, after a
+configurable time to first token and at a configurable token rate.
+`GET /stats` reports the number of requests served and the total time spent
+serving them, which benchmarks subtract from wall time to get framework
+overhead.
+
+Usage:
+    python benchmarks/stub_llm.py --port 8001 --latency 0.2 --tokens-per-second 100
+    OPENAI_API_BASE=http://127.0.0.1:8001/v1 python main.py --topic "anything"
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+# Sentences the answers are built from; each is a checkable claim for fact-check fan-out
+FILLER_SENTENCES = [
+    "Researchers measured the effect across several independent studies.",
+    "The results were consistent with earlier published observations.",
+    "Historical records show the practice dates back many centuries.",
+    "Experts continue to debate the most accurate interpretation today.",
+    "Recent surveys found the trend is growing in most regions.",
+]
+
+ANSWER_PREFIX = "Thought: I now can give a great answer\nFinal Answer: "
+
+
+def build_answer(response_tokens: int) -> List[str]:
+    """Build an answer of roughly `response_tokens` tokens, as a list of tokens."""
+    tokens = ANSWER_PREFIX.replace(' ', ' \x00').split('\x00')
+    index = 0
+    while len(tokens) < response_tokens:
+        sentence = FILLER_SENTENCES[index % len(FILLER_SENTENCES)]
+        tokens.extend(word + ' ' for word in sentence.split())
+        index += 1
+    return tokens
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP server accepting bursts of connections from many concurrent crews."""
+
+    daemon_threads = True
+    # The default backlog of 5 drops connections at high concurrency, and the
+    # resulting TCP retransmits would show up as a second of fake latency
+    request_queue_size = 256
+
+
+class StubLLMServer:
+    """OpenAI-compatible chat completions server with simulated latency."""
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        tokens_per_second: float = 500.0,
+        response_tokens: int = 200,
+        host: str = '127.0.0.1',
+        port: int = 0
+    ):
+        """Initialize the server (not yet listening).
+
+        Args:
+            latency: Seconds before the first token of every response
+            tokens_per_second: Generation rate after the first token; 0 for instant
+            response_tokens: Approximate length of every answer in tokens
+            host: Interface to listen on
+            port: Port to listen on; 0 picks a free port
+        """
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.answer = build_answer(response_tokens)
+
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'streamed_requests': 0, 'busy_seconds': 0.0, 'completion_tokens': 0}
+        self._server = _StubHTTPServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as `OPENAI_API_BASE`."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _token_delay(self) -> float:
+        """Seconds between two generated tokens."""
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _record(self, started: float, streamed: bool) -> None:
+        """Count a served request."""
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['streamed_requests'] += int(streamed)
+            self._stats['busy_seconds'] += time.perf_counter() - started
+            self._stats['completion_tokens'] += len(self.answer)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the counters of served requests."""
+        with self._lock:
+            return dict(self._stats)
+
+    def _handler_class(self):
+        """Build the request handler bound to this server."""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                if self.path.rstrip('/') == '/stats':
+                    self._send_json(200, stub.stats())
+                elif self.path.rstrip('/') in ('/health', '/v1/models'):
+                    self._send_json(200, {'object': 'list', 'data': [{'id': 'stub', 'object': 'model'}]})
+                else:
+                    self._send_json(404, {'error': {'message': 'Not found'}})
+
+            def do_POST(self) -> None:
+                started = time.perf_counter()
+                length = int(self.headers.get('Content-Length') or 0)
+                request = json.loads(self.rfile.read(length) or b'{}')
+                if not self.path.rstrip('/').endswith('/chat/completions'):
+                    self._send_json(404, {'error': {'message': 'Not found'}})
+                    return
+
+                model = request.get('model', 'stub')
+                prompt_chars = sum(len(str(m.get('content', ''))) for m in request.get('messages', []))
+                time.sleep(stub.latency)
+
+                if request.get('stream'):
+                    self._stream(model, started)
+                    return
+
+                time.sleep(stub._token_delay() * len(stub.answer))
+                self._send_json(200, {
+                    'id': 'chatcmpl-stub',
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': model,
+                    'choices': [{
+                        'index': 0,
+                        'message': {'role': 'assistant', 'content': ''.join(stub.answer)},
+                        'finish_reason': 'stop',
+                    }],
+                    'usage': {
+                        'prompt_tokens': prompt_chars // 4,
+                        'completion_tokens': len(stub.answer),
+                        'total_tokens': prompt_chars // 4 + len(stub.answer),
+                    },
+                })
+                stub._record(started, streamed=False)
+
+            def _stream(self, model: str, started: float) -> None:
+                """Send the answer as server-sent events, one token per event."""
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                delay = stub._token_delay()
+                for token in stub.answer:
+                    chunk = {
+                        'id': 'chatcmpl-stub',
+                        'object': 'chat.completion.chunk',
+                        'created': int(time.time()),
+                        'model': model,
+                        'choices': [{'index': 0, 'delta': {'content': token}, 'finish_reason': None}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+                    self.wfile.flush()
+                    if delay:
+                        time.sleep(delay)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+                stub._record(started, streamed=True)
+
+        return Handler
+
+    def start(self) -> 'StubLLMServer':
+        """Serve requests on a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name='stub-llm', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='OpenAI-compatible stub LLM server')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=0, help='Port to listen on (default: a free port)')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds to first token (default: 0.05)')
+    parser.add_argument('--tokens-per-second', type=float, default=500.0,
+                        help='Generation rate, 0 for instant (default: 500)')
+    parser.add_argument('--response-tokens', type=int, default=200,
+                        help='Approximate answer length in tokens (default: 200)')
+    args = parser.parse_args()
+
+    server = StubLLMServer(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        response_tokens=args.response_tokens,
+        host=args.host,
+        port=args.port
+    ).start()
+    # The first line is read by the benchmark suite to find the server
+    print(server.url, flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,365 @@
+"""Offline benchmark suite running the full ResearchCrew against a stub LLM.
+
+Measures, with no network access required:
+    overhead    framework time per run: run wall time minus the time the stub
+                LLM spent serving the run's requests (sequential crews)
+    throughput  runs per second and run latency at 1, 8 and 32 concurrent crews
+    memory      peak RSS of every overhead/throughput phase
+    startup     import and first-render time of the entry points (startup.py)
+
+The stub server and every phase run in their own interpreter, so phases do
+not share warm caches or memory high-water marks. Results are written as
+JSON; with `--baseline` the run is compared against an earlier result file
+and the exit status is 1 if any metric regressed by more than `--tolerance`.
+
+crewai counts tokens with tiktoken, which downloads its encodings on first
+use. On a machine without network access, seed `TIKTOKEN_CACHE_DIR` once from
+a networked machine; otherwise every LLM call retries the download and the
+throughput numbers mostly measure that.
+
+Usage:
+    python benchmarks/suite.py --output bench.json
+    python benchmarks/suite.py --output new.json --baseline bench.json --tolerance 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+
+# ResearchCrew arguments of each execution mode
+MODES = {
+    'sequential': {},
+    'pipelined': {'pipelined': True},
+    'fan-out': {'fact_check_fan_out': True},
+}
+
+# (path in the results, whether higher is better) of the metrics compared against a baseline
+COMPARED_METRICS = [
+    (('overhead', 'mean_overhead_seconds'), False),
+    (('overhead', 'peak_rss_mb'), False),
+]
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB (ru_maxrss is KiB on Linux)."""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(percentile / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _stub_stats(base_url: str) -> Dict[str, Any]:
+    """Fetch the stub server's request counters."""
+    stats_url = base_url.rsplit('/v1', 1)[0] + '/stats'
+    with urllib.request.urlopen(stats_url, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def _run_crew(mode: str, label: str) -> Tuple[float, bool, int]:
+    """Run one crew on a unique topic and delete its report.
+
+    Returns:
+        Tuple[float, bool, int]: Wall time, success and number of LLM calls
+    """
+    from crew import ResearchCrew
+
+    # A unique topic per run keeps the LLM response cache from serving the prompts
+    crew = ResearchCrew(f"benchmark {label} {uuid.uuid4().hex[:8]}", **MODES[mode])
+    start = time.perf_counter()
+    result = crew.run()
+    elapsed = time.perf_counter() - start
+
+    output_file = result.get('output_file')
+    if output_file and os.path.exists(output_file):
+        os.remove(output_file)
+    return elapsed, bool(result.get('success')), result.get('telemetry', {}).get('llm_calls', 0)
+
+
+def phase_overhead(base_url: str, runs: int) -> Dict[str, Any]:
+    """Run sequential crews one at a time and measure the time not spent in the LLM."""
+    _run_crew('sequential', 'warmup')
+
+    samples = []
+    for index in range(runs):
+        before = _stub_stats(base_url)
+        elapsed, success, llm_calls = _run_crew('sequential', f'overhead {index}')
+        after = _stub_stats(base_url)
+        llm_seconds = after['busy_seconds'] - before['busy_seconds']
+        samples.append({
+            'wall_seconds': round(elapsed, 4),
+            'llm_seconds': round(llm_seconds, 4),
+            'overhead_seconds': round(elapsed - llm_seconds, 4),
+            'llm_calls': llm_calls,
+            'requests': after['requests'] - before['requests'],
+            'success': success,
+        })
+
+    overheads = [sample['overhead_seconds'] for sample in samples]
+    return {
+        'runs': runs,
+        'mean_overhead_seconds': round(statistics.mean(overheads), 4),
+        'median_overhead_seconds': round(statistics.median(overheads), 4),
+        'mean_wall_seconds': round(statistics.mean(s['wall_seconds'] for s in samples), 4),
+        'failures': sum(1 for sample in samples if not sample['success']),
+        'peak_rss_mb': _peak_rss_mb(),
+        'samples': samples,
+    }
+
+
+def phase_throughput(concurrency: int, runs: int, mode: str) -> Dict[str, Any]:
+    """Run `runs` crews with `concurrency` of them at a time."""
+    _run_crew(mode, 'warmup')
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda index: _run_crew(mode, f'throughput {index}'), range(runs)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, _, _ in results]
+    return {
+        'concurrency': concurrency,
+        'mode': mode,
+        'runs': runs,
+        'wall_seconds': round(elapsed, 4),
+        'runs_per_second': round(runs / elapsed, 4),
+        'latency_p50_seconds': round(_percentile(latencies, 50), 4),
+        'latency_p95_seconds': round(_percentile(latencies, 95), 4),
+        'latency_max_seconds': round(max(latencies), 4),
+        'failures': sum(1 for _, success, _ in results if not success),
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def _child_env(base_url: str) -> Dict[str, str]:
+    """Environment of the phase interpreters: stub endpoint, dummy key, no outbound telemetry."""
+    env = dict(os.environ)
+    env.update({
+        'OPENAI_API_BASE': base_url,
+        'OPENAI_API_KEY': env.get('OPENAI_API_KEY') or 'sk-benchmark',
+        'OTEL_SDK_DISABLED': 'true',
+        'NO_PROXY': '127.0.0.1,localhost',
+    })
+    return env
+
+
+def _run_phase(base_url: str, args: List[str]) -> Dict[str, Any]:
+    """Run a phase in a fresh interpreter and return the JSON it printed last."""
+    completed = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), '--base-url', base_url, *args],
+        cwd=ROOT,
+        env=_child_env(base_url),
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr else 'phase failed')
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _start_stub(args: argparse.Namespace) -> Tuple[subprocess.Popen, str]:
+    """Start the stub LLM server in its own process and return it with its URL."""
+    process = subprocess.Popen(
+        [
+            sys.executable, str(BENCHMARKS_DIR / 'stub_llm.py'),
+            '--latency', str(args.latency),
+            '--tokens-per-second', str(args.tokens_per_second),
+            '--response-tokens', str(args.response_tokens),
+        ],
+        stdout=subprocess.PIPE,
+        text=True
+    )
+    return process, process.stdout.readline().strip()
+
+
+def _tiktoken_encodings_available() -> bool:
+    """Whether tiktoken can load its encodings (cached, or downloadable)."""
+    try:
+        subprocess.run(
+            [sys.executable, '-c', "import tiktoken; tiktoken.get_encoding('cl100k_base')"],
+            capture_output=True, check=True, timeout=60
+        )
+        return True
+    except Exception:
+        return False
+
+
+def _git_commit() -> Optional[str]:
+    """Commit of the benchmarked tree, if it is a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run every phase and collect the results."""
+    tiktoken_available = _tiktoken_encodings_available()
+    if not tiktoken_available:
+        # crewai's token counter retries the download on every LLM call while
+        # holding tiktoken's global lock, which serializes concurrent crews
+        print("⚠️  tiktoken encodings are not cached and cannot be downloaded; throughput will be "
+              "limited by retried downloads. Seed TIKTOKEN_CACHE_DIR once on a networked machine.")
+
+    process, base_url = _start_stub(args)
+    report: Dict[str, Any] = {
+        'benchmark': 'suite',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'tiktoken_encodings_available': tiktoken_available,
+        'stub': {
+            'latency_seconds': args.latency,
+            'tokens_per_second': args.tokens_per_second,
+            'response_tokens': args.response_tokens,
+        },
+        'throughput': {},
+    }
+    try:
+        print(f"⏱️  Measuring overhead ({args.runs} sequential runs)...")
+        report['overhead'] = _run_phase(base_url, ['--phase', 'overhead', '--runs', str(args.runs)])
+
+        for concurrency in args.concurrency:
+            runs = max(concurrency, args.runs)
+            print(f"⏱️  Measuring throughput at concurrency {concurrency} ({runs} runs)...")
+            report['throughput'][str(concurrency)] = _run_phase(base_url, [
+                '--phase', 'throughput', '--concurrency', str(concurrency),
+                '--runs', str(runs), '--mode', args.mode
+            ])
+        report['stub']['stats'] = _stub_stats(base_url)
+    finally:
+        process.terminate()
+        process.wait()
+
+    if not args.skip_startup:
+        sys.path.insert(0, str(BENCHMARKS_DIR))
+        from startup import benchmark as startup_benchmark
+
+        report['startup'] = startup_benchmark(['crew_enhanced.py', 'main.py', 'crew.py'], args.startup_repeat)
+    return report
+
+
+def _metric(report: Dict[str, Any], path: Tuple[str, ...]) -> Optional[float]:
+    """Look up a nested metric, or None if the report does not have it."""
+    value: Any = report
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value if isinstance(value, (int, float)) else None
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """List the metrics that are worse than the baseline by more than `tolerance`."""
+    metrics = list(COMPARED_METRICS)
+    for concurrency in report.get('throughput', {}):
+        metrics.append((('throughput', concurrency, 'runs_per_second'), True))
+        metrics.append((('throughput', concurrency, 'latency_p95_seconds'), False))
+        metrics.append((('throughput', concurrency, 'peak_rss_mb'), False))
+    for target in report.get('startup', {}).get('results', {}):
+        metrics.append((('startup', 'results', target, 'import_seconds'), False))
+        metrics.append((('startup', 'results', target, 'first_render_seconds'), False))
+
+    regressions = []
+    for path, higher_is_better in metrics:
+        current, previous = _metric(report, path), _metric(baseline, path)
+        if current is None or not previous:
+            continue
+        change = (current - previous) / previous
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append(f"{'.'.join(path)}: {previous} -> {current} ({change:+.0%})")
+    return regressions
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Print the headline numbers."""
+    overhead = report['overhead']
+    print(f"\n📊 Overhead per run: {overhead['mean_overhead_seconds']:.3f}s "
+          f"(wall {overhead['mean_wall_seconds']:.3f}s, peak RSS {overhead['peak_rss_mb']} MiB)")
+    print(f"\n{'Concurrency':<13}{'runs/s':>9}{'p50 (s)':>10}{'p95 (s)':>10}{'failures':>10}{'RSS (MiB)':>11}")
+    for concurrency, result in report['throughput'].items():
+        print(
+            f"{concurrency:<13}{result['runs_per_second']:>9.2f}{result['latency_p50_seconds']:>10.3f}"
+            f"{result['latency_p95_seconds']:>10.3f}{result['failures']:>10}{result['peak_rss_mb']:>11}"
+        )
+    if 'startup' in report:
+        sys.path.insert(0, str(BENCHMARKS_DIR))
+        from startup import print_report as print_startup_report
+
+        print_startup_report(report['startup'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmark suite against a stub LLM')
+    parser.add_argument('--runs', type=int, default=3,
+                        help='Sequential runs for the overhead phase, and the minimum runs per '
+                             'throughput level (default: 3)')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32],
+                        help='Concurrent crews of the throughput phases (default: 1 8 32)')
+    parser.add_argument('--mode', choices=sorted(MODES), default='sequential',
+                        help='Execution mode of the throughput phases (default: sequential)')
+    parser.add_argument('--latency', type=float, default=0.05, help='Stub time to first token (default: 0.05)')
+    parser.add_argument('--tokens-per-second', type=float, default=500.0, help='Stub token rate (default: 500)')
+    parser.add_argument('--response-tokens', type=int, default=200, help='Stub answer length (default: 200)')
+    parser.add_argument('--skip-startup', action='store_true', help='Skip the startup benchmark')
+    parser.add_argument('--startup-repeat', type=int, default=3, help='Startup samples per entry point (default: 3)')
+    parser.add_argument('--output', type=str, help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', type=str, help='Earlier results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed relative regression against the baseline (default: 0.2)')
+    # Internal: run a single phase in this interpreter
+    parser.add_argument('--phase', choices=['overhead', 'throughput'], help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.phase:
+        sys.path.insert(0, str(ROOT))
+        if args.phase == 'overhead':
+            result = phase_overhead(args.base_url, args.runs)
+        else:
+            result = phase_throughput(args.concurrency[0], args.runs, args.mode)
+        print(json.dumps(result))
+        return
+
+    report = run_suite(args)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Results written to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("\n❌ Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print("\n✅ No regressions against the baseline")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+"""Deadlines and cancellation of research runs.
+
+Every run owns a `CancellationToken`. The token is cancelled when `cancel()`
+is called (e.g. by the Stop button) or when the run or one of its tasks
+outlives its deadline. Cancellation takes effect in three places:
+
+    - HTTP requests of the pooled LLM clients that are waiting for a response
+      are aborted by shutting down their socket
+    - `CancellationCallbackHandler` raises `RunCancelled` before the next LLM
+      call, token, chain or tool of the agents
+    - the crews check the token between stages
+"""
+import contextvars
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpcore
+from langchain_core.callbacks import BaseCallbackHandler
+
+from config import RUN_DEADLINE_SECONDS, TASK_DEADLINE_SECONDS
+
+# Token of the run whose LLM call is executing in the current thread (or task)
+current_cancellation: contextvars.ContextVar[Optional['CancellationToken']] = contextvars.ContextVar(
+    'current_cancellation', default=None
+)
+
+
+class RunCancelled(Exception):
+    """Raised inside a run that was cancelled."""
+
+
+class DeadlineExceeded(RunCancelled):
+    """Raised inside a run that outlived its deadline or a task deadline."""
+
+
+class CancellationToken:
+    """Cancellation state and deadlines of one run.
+
+    A watchdog thread cancels the token when the overall deadline or the
+    deadline of a running task passes, so runs stuck in a request are stopped
+    even when no agent step reaches a checkpoint.
+    """
+
+    def __init__(
+        self,
+        deadline_seconds: Optional[float] = RUN_DEADLINE_SECONDS,
+        task_deadlines: Optional[Dict[str, float]] = None
+    ):
+        """Initialize a token; deadlines start counting at `start()`.
+
+        Args:
+            deadline_seconds: Maximum seconds for the whole run; None for no limit
+            task_deadlines: Maximum seconds per task name; tasks without an
+                entry have no limit
+        """
+        self.deadline_seconds = deadline_seconds
+        self.task_deadlines = dict(TASK_DEADLINE_SECONDS if task_deadlines is None else task_deadlines)
+
+        self._condition = threading.Condition()
+        self._cancelled = threading.Event()
+        self._error: Optional[RunCancelled] = None
+        self._deadlines: Dict[str, float] = {}
+        self._callbacks: List[Callable[[], None]] = []
+        self._watchdog: Optional[threading.Thread] = None
+        self._closed = False
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the run was cancelled or ran out of time."""
+        return self._cancelled.is_set()
+
+    @property
+    def reason(self) -> Optional[str]:
+        """Why the run was cancelled, or None."""
+        return str(self._error) if self._error is not None else None
+
+    @property
+    def deadline_exceeded(self) -> bool:
+        """Whether the cancellation was caused by a deadline."""
+        return isinstance(self._error, DeadlineExceeded)
+
+    def start(self) -> 'CancellationToken':
+        """Start the overall deadline and the watchdog enforcing the deadlines."""
+        with self._condition:
+            if self.deadline_seconds is not None:
+                self._deadlines.setdefault('run', time.monotonic() + self.deadline_seconds)
+            if self._watchdog is None:
+                self._watchdog = threading.Thread(target=self._watch, name='run-deadline', daemon=True)
+                self._watchdog.start()
+            self._condition.notify_all()
+        return self
+
+    def start_task(self, task_name: str) -> None:
+        """Start the deadline of a task."""
+        seconds = self.task_deadlines.get(task_name)
+        if seconds is None:
+            return
+        with self._condition:
+            self._deadlines[task_name] = time.monotonic() + seconds
+            self._condition.notify_all()
+
+    def finish_task(self, task_name: str) -> None:
+        """Stop the deadline of a finished task."""
+        with self._condition:
+            self._deadlines.pop(task_name, None)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds until the nearest deadline, or None without deadlines."""
+        with self._condition:
+            if not self._deadlines:
+                return None
+            return max(min(self._deadlines.values()) - time.monotonic(), 0.0)
+
+    def _watch(self) -> None:
+        """Cancel the token when a deadline passes; ends when cancelled or closed."""
+        with self._condition:
+            while not self._closed and not self.cancelled:
+                now = time.monotonic()
+                expired = [name for name, deadline in self._deadlines.items() if deadline <= now]
+                if expired:
+                    break
+                timeout = min(self._deadlines.values()) - now if self._deadlines else None
+                self._condition.wait(timeout)
+            else:
+                return
+
+        name = expired[0]
+        if name == 'run':
+            message = f"Deadline exceeded: the run took longer than {self.deadline_seconds:g}s"
+        else:
+            message = f"Deadline exceeded: {name} took longer than {self.task_deadlines[name]:g}s"
+        self._cancel(DeadlineExceeded(message))
+
+    def cancel(self, reason: str = "Cancelled by user") -> bool:
+        """Cancel the run and abort its in-flight LLM requests.
+
+        Safe to call from any thread, any number of times.
+
+        Args:
+            reason: Error message of the cancelled run
+
+        Returns:
+            bool: Whether this call cancelled the run (False if it already was)
+        """
+        return self._cancel(RunCancelled(reason))
+
+    def _cancel(self, error: RunCancelled) -> bool:
+        """Record the cancellation and run the abort callbacks."""
+        with self._condition:
+            if self.cancelled:
+                return False
+            self._error = error
+            self._cancelled.set()
+            callbacks = list(self._callbacks)
+            self._condition.notify_all()
+
+        print(f"🛑 {error}")
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️ Warning: Could not abort a request: {str(e)}")
+        return True
+
+    def check(self) -> None:
+        """Raise `RunCancelled` (or `DeadlineExceeded`) if the run was cancelled."""
+        if self.cancelled:
+            # A fresh exception per raise, so tracebacks of concurrent agents do not pile up
+            raise type(self._error)(str(self._error))
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Call `callback` on cancellation (right away if already cancelled).
+
+        Returns:
+            Callable[[], None]: Function removing the callback again
+        """
+        with self._condition:
+            if not self.cancelled:
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        callback()
+        return lambda: None
+
+    def _remove_callback(self, callback: Callable[[], None]) -> None:
+        """Forget an abort callback."""
+        with self._condition:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def close(self) -> None:
+        """Stop the watchdog once the run has finished."""
+        with self._condition:
+            self._closed = True
+            self._deadlines.clear()
+            self._condition.notify_all()
+
+
+class CancellationCallbackHandler(BaseCallbackHandler):
+    """Stops an agent at its next LLM call, token, chain or tool once the run is cancelled."""
+
+    # LangChain only logs exceptions of handlers without this flag
+    raise_error = True
+
+    def __init__(self, cancellation: CancellationToken):
+        """Initialize the handler.
+
+        Args:
+            cancellation: Token of the run
+        """
+        self.cancellation = cancellation
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any) -> None:
+        self.cancellation.check()
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[Any], **kwargs: Any) -> None:
+        self.cancellation.check()
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self.cancellation.check()
+
+    def on_chain_start(self, serialized: Dict[str, Any], inputs: Dict[str, Any], **kwargs: Any) -> None:
+        self.cancellation.check()
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs: Any) -> None:
+        self.cancellation.check()
+
+
+class _AbortableStream(httpcore.NetworkStream):
+    """Network stream whose blocking reads are aborted when the calling run is cancelled."""
+
+    def __init__(self, stream: httpcore.NetworkStream):
+        self._stream = stream
+
+    def abort(self) -> None:
+        """Wake up a blocked read by shutting the socket down; the connection is then discarded."""
+        sock = self._stream.get_extra_info('socket')
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def read(self, max_bytes: int, timeout: Optional[float] = None) -> bytes:
+        cancellation = current_cancellation.get()
+        if cancellation is None:
+            return self._stream.read(max_bytes, timeout)
+
+        cancellation.check()
+        remove = cancellation.add_callback(self.abort)
+        try:
+            data = self._stream.read(max_bytes, timeout)
+        except Exception:
+            # Report the cancellation rather than the broken connection it caused
+            cancellation.check()
+            raise
+        finally:
+            remove()
+        # An aborted read returns end-of-stream, which would look like a server disconnect
+        cancellation.check()
+        return data
+
+    def write(self, buffer: bytes, timeout: Optional[float] = None) -> None:
+        cancellation = current_cancellation.get()
+        if cancellation is not None:
+            cancellation.check()
+        self._stream.write(buffer, timeout)
+
+    def close(self) -> None:
+        self._stream.close()
+
+    def start_tls(self, ssl_context: Any, server_hostname: Optional[str] = None,
+                  timeout: Optional[float] = None) -> '_AbortableStream':
+        return _AbortableStream(self._stream.start_tls(ssl_context, server_hostname, timeout))
+
+    def get_extra_info(self, info: str) -> Any:
+        return self._stream.get_extra_info(info)
+
+
+class AbortableNetworkBackend(httpcore.NetworkBackend):
+    """httpcore network backend whose connections can be aborted by `CancellationToken`.
+
+    Reads happen on the thread making the request, so the token of the run
+    is found through `current_cancellation`.
+    """
+
+    def __init__(self, backend: Optional[httpcore.NetworkBackend] = None):
+        """Wrap a network backend (by default the standard sync backend)."""
+        self._backend = backend or httpcore.SyncBackend()
+
+    def connect_tcp(self, host: str, port: int, timeout: Optional[float] = None,
+                    local_address: Optional[str] = None, socket_options: Any = None) -> _AbortableStream:
+        cancellation = current_cancellation.get()
+        if cancellation is not None:
+            cancellation.check()
+        return _AbortableStream(self._backend.connect_tcp(
+            host, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+        ))
+
+    def connect_unix_socket(self, path: str, timeout: Optional[float] = None,
+                            socket_options: Any = None) -> _AbortableStream:
+        return _AbortableStream(self._backend.connect_unix_socket(
+            path, timeout=timeout, socket_options=socket_options
+        ))
+
+    def sleep(self, seconds: float) -> None:
+        self._backend.sleep(seconds)
@@ -0,0 +1,212 @@
+"""Per-run checkpoints of the research stages.
+
+Every run has an ID and a directory under `CHECKPOINT_DIR` holding a manifest
+and the full output of each completed stage:
+
+    .checkpoints/<run_id>/manifest.json
+    .checkpoints/<run_id>/research.md
+    .checkpoints/<run_id>/fact_check.md
+    .checkpoints/<run_id>/writing.md
+
+A run that fails (or is cancelled) can be resumed from its ID: completed stages
+are loaded from their checkpoints and only the remaining stages call the LLM.
+Files are written to a temporary name and renamed, so a crash never leaves a
+half-written checkpoint behind.
+"""
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import CHECKPOINT_DIR, CHECKPOINT_TTL_SECONDS
+
+# Order in which the stages run; a stage is only reused if all stages before it are
+STAGES = ('research', 'fact_check', 'writing')
+
+_RUN_ID = re.compile(r'^[A-Za-z0-9_-]+$')
+
+
+class CheckpointStore:
+    """Stage artifacts of research runs, stored as files keyed by run ID."""
+
+    def __init__(self, root: Path = CHECKPOINT_DIR):
+        """Initialize the store.
+
+        Args:
+            root: Directory holding one subdirectory per run
+        """
+        self.root = Path(root)
+        self.root.mkdir(exist_ok=True, parents=True)
+        self._lock = threading.Lock()
+
+    def _run_dir(self, run_id: str) -> Path:
+        """Directory of a run; rejects IDs that could point outside the store."""
+        if not _RUN_ID.match(run_id or ''):
+            raise ValueError(f"Invalid run ID: {run_id!r}")
+        return self.root / run_id
+
+    @staticmethod
+    def _write_atomic(path: Path, text: str) -> None:
+        """Write a file under a temporary name and rename it into place."""
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(text, encoding='utf-8')
+        os.replace(tmp_path, path)
+
+    def _write_manifest(self, run_id: str, manifest: Dict[str, Any]) -> None:
+        """Store the manifest of a run."""
+        manifest['updated_at'] = time.time()
+        self._write_atomic(self._run_dir(run_id) / 'manifest.json', json.dumps(manifest, indent=2, default=str))
+
+    def create(self, topic: str, options: Optional[Dict[str, Any]] = None, run_id: Optional[str] = None,
+               output_file: Optional[str] = None) -> str:
+        """Start the checkpoints of a new run.
+
+        Args:
+            topic: The research topic
+            options: Crew options needed to resume the run (e.g. execution mode)
+            run_id: ID of the run; generated when not given
+            output_file: Report file of the run, reused when it is resumed
+
+        Returns:
+            str: The run ID
+        """
+        run_id = run_id or uuid.uuid4().hex
+        run_dir = self._run_dir(run_id)
+        with self._lock:
+            run_dir.mkdir(exist_ok=True, parents=True)
+            now = time.time()
+            self._write_manifest(run_id, {
+                'run_id': run_id,
+                'topic': topic,
+                'options': options or {},
+                'output_file': output_file,
+                'created_at': now,
+                'stages': {},
+            })
+        return run_id
+
+    def load(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Get the manifest of a run, or None if it has no checkpoints."""
+        try:
+            return json.loads((self._run_dir(run_id) / 'manifest.json').read_text(encoding='utf-8'))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def save(self, run_id: str, stage: str, text: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """Store the output of a completed stage.
+
+        Args:
+            run_id: ID of the run
+            stage: Task name ('research', 'fact_check' or 'writing')
+            text: Full output of the stage
+            data: Extra JSON-serializable results of the stage (e.g. claim verdicts)
+        """
+        run_dir = self._run_dir(run_id)
+        with self._lock:
+            manifest = self.load(run_id)
+            if manifest is None:
+                raise ValueError(f"No checkpoints for run {run_id}")
+            self._write_atomic(run_dir / f"{stage}.md", text)
+            manifest['stages'][stage] = {
+                'file': f"{stage}.md",
+                'chars': len(text),
+                'data': data,
+                'completed_at': time.time(),
+            }
+            self._write_manifest(run_id, manifest)
+
+    def completed_stages(self, run_id: str) -> Dict[str, str]:
+        """Load the outputs of the completed stages a run can resume from.
+
+        Only the leading stages that completed in order are returned: a stage
+        whose predecessor is missing was built on output that no longer
+        exists and is run again. A stage whose file is missing, unreadable or
+        not the length recorded in the manifest counts as not completed.
+
+        Returns:
+            Dict[str, str]: Output text by task name, in stage order
+        """
+        manifest = self.load(run_id)
+        if manifest is None:
+            return {}
+
+        outputs = {}
+        run_dir = self._run_dir(run_id)
+        for stage in STAGES:
+            entry = manifest.get('stages', {}).get(stage)
+            if not isinstance(entry, dict) or not entry.get('file'):
+                break
+            try:
+                text = (run_dir / entry['file']).read_text(encoding='utf-8')
+            except (OSError, UnicodeDecodeError):
+                break
+            if len(text) != entry.get('chars', len(text)):
+                # Truncated or overwritten since it was checkpointed
+                break
+            outputs[stage] = text
+        return outputs
+
+    def stage_data(self, run_id: str, stage: str) -> Optional[Dict[str, Any]]:
+        """Get the extra results stored with a stage, if any."""
+        manifest = self.load(run_id) or {'stages': {}}
+        entry = manifest['stages'].get(stage)
+        return entry.get('data') if entry else None
+
+    def list_runs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """List the most recently updated runs with their completed stages."""
+        manifests = []
+        for run_dir in self.root.iterdir():
+            if run_dir.is_dir():
+                manifest = self.load(run_dir.name)
+                if manifest is not None:
+                    manifests.append(manifest)
+        manifests.sort(key=lambda manifest: manifest.get('updated_at', 0), reverse=True)
+        return manifests[:limit]
+
+    def delete(self, run_id: str) -> None:
+        """Remove the checkpoints of a run."""
+        shutil.rmtree(self._run_dir(run_id), ignore_errors=True)
+
+    def prune(self, ttl_seconds: Optional[float] = CHECKPOINT_TTL_SECONDS) -> int:
+        """Remove runs not updated for `ttl_seconds`.
+
+        Returns:
+            int: Number of runs removed
+        """
+        if ttl_seconds is None:
+            return 0
+        cutoff = time.time() - ttl_seconds
+        removed = 0
+        for run_dir in self.root.iterdir():
+            if not run_dir.is_dir():
+                continue
+            manifest = self.load(run_dir.name)
+            updated_at = manifest.get('updated_at', 0) if manifest else run_dir.stat().st_mtime
+            if updated_at < cutoff:
+                shutil.rmtree(run_dir, ignore_errors=True)
+                removed += 1
+        if removed:
+            print(f"🧹 Removed checkpoints of {removed} old run(s)")
+        return removed
+
+
+_checkpoint_store: Optional[CheckpointStore] = None
+_checkpoint_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    """Get the process-wide checkpoint store, pruning expired runs on first use."""
+    global _checkpoint_store
+    with _checkpoint_store_lock:
+        if _checkpoint_store is None:
+            _checkpoint_store = CheckpointStore()
+            try:
+                _checkpoint_store.prune()
+            except Exception as e:
+                print(f"⚠️ Warning: Could not prune checkpoints: {e}")
+        return _checkpoint_store
@@ -0,0 +1,39 @@
+"""Process-wide ChromaDB client on the local Chroma store.
+
+The report cache, the claim cache and the document index keep their
+collections in the same `CHROMA_CACHE_DIR`. Opening one client per consumer
+(or the same directory under a relative and an absolute path) gives each its
+own in-process Chroma system over one SQLite database; they share this one
+instead.
+"""
+import threading
+from typing import Any, Optional
+
+from config import CHROMA_CACHE_DIR
+
+_chroma_client: Optional[Any] = None
+_chroma_client_lock = threading.Lock()
+
+
+def get_chroma_client() -> Any:
+    """Get the process-wide persistent ChromaDB client, creating it on first use.
+
+    Returns:
+        chromadb.PersistentClient: The client on `CHROMA_CACHE_DIR`
+
+    Raises:
+        ImportError: If ChromaDB is not installed
+        Exception: If the store cannot be opened; the next call tries again
+    """
+    global _chroma_client
+    with _chroma_client_lock:
+        if _chroma_client is None:
+            import chromadb
+
+            client = chromadb.PersistentClient(
+                path=str(CHROMA_CACHE_DIR),
+                settings=chromadb.Settings(anonymized_telemetry=False)
+            )
+            client.heartbeat()
+            _chroma_client = client
+        return _chroma_client
@@ -0,0 +1,250 @@
+"""Semantic cache of fact-checked claims backed by ChromaDB.
+
+The same facts recur across reports, so every claim verified by the
+fact-check fan-out is stored with its verdict, notes, sources and a
+timestamp. Before claims are sent to the fact-checker they are looked up in
+one batched query; a claim is answered from the cache when a stored claim is
+similar enough, states the same numbers and its verdict is still fresh.
+"""
+import hashlib
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config import (
+    CLAIM_CACHE_COLLECTION,
+    CLAIM_CACHE_ENABLED,
+    CLAIM_CACHE_MAX_ENTRIES,
+    CLAIM_CACHE_SIMILARITY_THRESHOLD,
+    CLAIM_CACHE_TTL_SECONDS,
+)
+from report_cache import normalize_topic
+
+# Verdicts worth reusing; UNCLEAR answers are always checked again
+CACHEABLE_VERDICTS = ('VERIFIED', 'INCORRECT', 'UNVERIFIABLE')
+
+# Candidates compared per claim; the nearest one may be stale or state other numbers
+CANDIDATES_PER_CLAIM = 3
+
+_NUMBER = re.compile(r'\d+(?:[.,]\d+)*')
+_URL = re.compile(r'https?://[^\s)\]>"\']+')
+
+
+def _numbers(text: str) -> List[str]:
+    """Numbers stated in a text, which near-identical claims must share."""
+    return sorted(set(_NUMBER.findall(text)))
+
+
+class ClaimCache:
+    """Look up verdicts of previously fact-checked, near-identical claims."""
+
+    def __init__(
+        self,
+        client,
+        collection_name: str = CLAIM_CACHE_COLLECTION,
+        similarity_threshold: float = CLAIM_CACHE_SIMILARITY_THRESHOLD,
+        ttl_seconds: Optional[Dict[str, float]] = None,
+        max_entries: int = CLAIM_CACHE_MAX_ENTRIES,
+        embedding_function=None,
+    ):
+        """Initialize the cache on top of an existing Chroma client.
+
+        Args:
+            client: A `chromadb` client (e.g. `chromadb.PersistentClient`)
+            collection_name: Name of the collection holding claim entries
+            similarity_threshold: Minimum cosine similarity for a cache hit
+            ttl_seconds: Maximum age of a reusable verdict, by verdict;
+                defaults to `CLAIM_CACHE_TTL_SECONDS`
+            max_entries: Maximum number of claims kept in the collection
+            embedding_function: Optional Chroma embedding function; defaults to
+                the shared embedding service
+        """
+        if embedding_function is None:
+            from embeddings import get_embedding_service
+            embedding_function = get_embedding_service().chroma_function()
+
+        self.collection = client.get_or_create_collection(
+            name=collection_name,
+            embedding_function=embedding_function,
+            metadata={'hnsw:space': 'cosine'}
+        )
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = dict(CLAIM_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds)
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _entry_id(claim: str) -> str:
+        """Build a stable entry ID from the normalized claim."""
+        return hashlib.sha1(normalize_topic(claim).encode('utf-8')).hexdigest()
+
+    def _record(self, hits: int, misses: int) -> None:
+        """Update the hit/miss counters."""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def _is_fresh(self, metadata: Dict[str, Any], now: float) -> bool:
+        """Whether a cached verdict is younger than the TTL of its verdict."""
+        ttl = self.ttl_seconds.get(metadata.get('verdict'))
+        return ttl is not None and metadata.get('created_at', 0) >= now - ttl
+
+    def lookup_many(self, claims: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Find cached verdicts for claims in one batched query.
+
+        Args:
+            claims: Claims about to be fact-checked
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: Per claim, a verdict dict like the
+            fact-checker's (`claim`, `verdict`, `notes`, `sources`) with `cached`,
+            `cached_claim`, `similarity` and `verified_at` set, or None on a miss
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(claims)
+        queries = [(index, normalize_topic(claim)) for index, claim in enumerate(claims)]
+        queries = [(index, normalized) for index, normalized in queries if normalized]
+        count = self.collection.count()
+        if not queries or count == 0:
+            self._record(0, len(claims))
+            return results
+
+        now = time.time()
+        matches = self.collection.query(
+            query_texts=[normalized for _, normalized in queries],
+            n_results=min(CANDIDATES_PER_CLAIM, count),
+            where={'created_at': {'$gte': now - max(self.ttl_seconds.values(), default=0)}},
+            include=['metadatas', 'distances']
+        )
+
+        for position, (index, _) in enumerate(queries):
+            claim_numbers = _numbers(claims[index])
+            candidates = zip(matches['metadatas'][position], matches['distances'][position])
+            for metadata, distance in candidates:
+                similarity = 1.0 - distance
+                if similarity < self.similarity_threshold:
+                    break
+                # "384,400 km" and "384,000 km" embed almost identically
+                if not self._is_fresh(metadata, now) or _numbers(metadata['claim']) != claim_numbers:
+                    continue
+                results[index] = {
+                    'claim': claims[index],
+                    'verdict': metadata['verdict'],
+                    'notes': metadata.get('notes', ''),
+                    'sources': [source for source in metadata.get('sources', '').split('\n') if source],
+                    'latency_seconds': 0.0,
+                    'cached': True,
+                    'cached_claim': metadata['claim'],
+                    'similarity': round(similarity, 4),
+                    'verified_at': metadata['created_at'],
+                }
+                break
+
+        hits = sum(1 for result in results if result is not None)
+        self._record(hits, len(claims) - hits)
+        return results
+
+    def store_many(self, verdicts: List[Dict[str, Any]], topic: Optional[str] = None) -> int:
+        """Add or replace the cached verdicts of freshly checked claims.
+
+        Args:
+            verdicts: Verdict dicts of the fact-checker (`claim`, `verdict`, `notes`)
+            topic: The research topic the claims came from
+
+        Returns:
+            int: Number of claims stored
+        """
+        entries = {}
+        now = time.time()
+        for verdict in verdicts:
+            normalized = normalize_topic(verdict['claim'])
+            # Cached verdicts are already stored; failed checks are retried next time
+            if (verdict.get('cached') or verdict.get('error')
+                    or verdict['verdict'] not in CACHEABLE_VERDICTS or not normalized):
+                continue
+            entries[self._entry_id(verdict['claim'])] = (normalized, {
+                'claim': verdict['claim'],
+                'verdict': verdict['verdict'],
+                'notes': verdict.get('notes', ''),
+                'sources': '\n'.join(dict.fromkeys(
+                    url.rstrip('.,;:') for url in _URL.findall(verdict.get('notes', ''))
+                )),
+                'topic': topic or '',
+                'created_at': now,
+            })
+        if not entries:
+            return 0
+
+        self.collection.upsert(
+            ids=list(entries),
+            documents=[document for document, _ in entries.values()],
+            metadatas=[metadata for _, metadata in entries.values()]
+        )
+        self.evict()
+        return len(entries)
+
+    def evict(self) -> int:
+        """Evict entries older than the longest TTL and trim the collection to `max_entries`.
+
+        Returns:
+            int: Number of entries removed
+        """
+        cutoff = time.time() - max(self.ttl_seconds.values(), default=0)
+        expired = self.collection.get(where={'created_at': {'$lt': cutoff}})['ids']
+        if expired:
+            self.collection.delete(ids=expired)
+
+        overflow = self.collection.count() - self.max_entries
+        if overflow <= 0:
+            return len(expired)
+
+        entries = self.collection.get(include=['metadatas'])
+        oldest = sorted(
+            zip(entries['ids'], entries['metadatas']),
+            key=lambda entry: entry[1]['created_at']
+        )[:overflow]
+        self.collection.delete(ids=[entry_id for entry_id, _ in oldest])
+        return len(expired) + len(oldest)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the current number of cached claims."""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': (hits / total) if total else 0.0,
+            'entries': self.collection.count(),
+        }
+
+
+_claim_cache: Optional[ClaimCache] = None
+_claim_cache_error: Optional[str] = None
+_claim_cache_lock = threading.Lock()
+
+
+def get_claim_cache() -> Optional[ClaimCache]:
+    """Get the process-wide claim cache in the local Chroma store.
+
+    Returns:
+        Optional[ClaimCache]: The cache, or None when it is disabled or
+        ChromaDB and its embedding model are unavailable
+    """
+    global _claim_cache, _claim_cache_error
+    if not CLAIM_CACHE_ENABLED:
+        return None
+    with _claim_cache_lock:
+        if _claim_cache is None and _claim_cache_error is None:
+            try:
+                from chroma_client import get_chroma_client
+
+                _claim_cache = ClaimCache(get_chroma_client())
+            except Exception as e:
+                # Remembered, so runs without ChromaDB do not retry (and warn) every time
+                _claim_cache_error = str(e)
+                print(f"⚠️ Warning: Claim cache unavailable, every claim is fact-checked: {e}")
+        return _claim_cache
@@ -0,0 +1,323 @@
+"""Token-budgeted compaction of the context handed from one stage to the next.
+
+The fact-checker receives the whole research output and the writer the whole
+fact-check output, so prompts grow with report length. Before a stage's output
+is handed forward it is cut down to the stage's token budget:
+
+    1. Text already within the budget is passed on unchanged.
+    2. Repeated sentences (exact or near duplicates) are dropped.
+    3. If still over budget, the most salient sentences are kept: sentences
+       whose words recur across the document, mention the topic, carry numbers
+       or dates, or record a verification verdict. Kept sentences stay in
+       their original order and markdown headings are preserved.
+
+Compaction is extractive, so every sentence handed forward was written by the
+previous stage; no extra LLM call is made.
+"""
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set
+
+from config import COMPACTION_BUDGETS, COMPACTION_ENABLED, DEFAULT_LLM
+from telemetry import count_tokens, encoding_for_model
+
+# Minimum word-set overlap (Jaccard) for a sentence to count as a repeat of an earlier one
+DUPLICATE_SIMILARITY = 0.8
+
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+(?=[\"\'(\[*_]?[A-Z0-9])')
+HEADING = re.compile(r'^\s*#{1,6}\s')
+WORD = re.compile(r'[a-z0-9]+')
+NUMBER = re.compile(r'\d')
+# Fact-check verdicts and sourcing, which the next stage needs to keep
+VERDICT = re.compile(
+    r'\b(verified|unverified|unverifiable|incorrect|inaccurate|false|misleading|'
+    r'correct(?:ed|ion)?|disputed|source[sd]?|cannot be verified)\b',
+    re.IGNORECASE
+)
+STOPWORDS = frozenset("""
+    a about above after again against all also an and any are as at be because been before
+    being between both but by can could did do does doing down during each few for from further
+    had has have having he her here hers him his how i if in into is it its itself just me more
+    most my no nor not now of off on once only or other our ours out over own same she should so
+    some such than that the their theirs them then there these they this those through to too
+    under until up very was we were what when where which while who whom why will with would you
+    your yours
+""".split())
+
+
+def _content_words(text: str) -> List[str]:
+    """Lowercase words of a text without stopwords and very short words."""
+    return [word for word in WORD.findall(text.lower()) if len(word) > 2 and word not in STOPWORDS]
+
+
+def _split_units(text: str) -> List[Dict[str, Any]]:
+    """Split a document into headings and sentences, remembering the line of each."""
+    units = []
+    for line_number, line in enumerate(text.splitlines()):
+        if not line.strip():
+            continue
+        if HEADING.match(line):
+            units.append({'line': line_number, 'text': line.strip(), 'heading': True})
+            continue
+        for sentence in SENTENCE_BOUNDARY.split(line.strip()):
+            if sentence.strip():
+                units.append({'line': line_number, 'text': sentence.strip(), 'heading': False})
+    return units
+
+
+def _join_units(units: List[Dict[str, Any]]) -> str:
+    """Rebuild a document from units, putting sentences of one line back on one line."""
+    lines: List[str] = []
+    previous_line = None
+    for unit in units:
+        if unit['line'] == previous_line and not unit['heading']:
+            lines[-1] += ' ' + unit['text']
+        else:
+            lines.append(unit['text'])
+        previous_line = unit['line']
+    return '\n'.join(lines)
+
+
+def _drop_empty_sections(units: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop headings left without any sentence (or kept subsection) under them."""
+    # has_content[level]: a sentence follows before the next heading of this level or higher
+    has_content = [False] * 7
+    kept = []
+    for unit in reversed(units):
+        if not unit['heading']:
+            has_content = [True] * 7
+            kept.append(unit)
+            continue
+        level = min(len(unit['text']) - len(unit['text'].lstrip('#')), 6)
+        if has_content[level]:
+            kept.append(unit)
+        for deeper in range(level, 7):
+            has_content[deeper] = False
+    return kept[::-1]
+
+
+def _drop_duplicates(units: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop sentences that repeat an earlier sentence exactly or almost exactly.
+
+    Candidates are found through the rarest words of each sentence, so the
+    cost grows with the number of sentences rather than its square.
+    """
+    document_frequency: Counter = Counter()
+    for unit in units:
+        unit['words'] = set(_content_words(unit['text']))
+        document_frequency.update(unit['words'])
+
+    kept: List[Dict[str, Any]] = []
+    seen_exact: Set[str] = set()
+    postings: Dict[str, List[int]] = {}
+
+    for unit in units:
+        if unit['heading']:
+            kept.append(unit)
+            continue
+
+        normalized = ' '.join(WORD.findall(unit['text'].lower()))
+        if normalized in seen_exact:
+            continue
+
+        words = unit['words']
+        duplicate = False
+        if len(words) >= 3:
+            rarest = sorted(words, key=lambda word: document_frequency[word])[:3]
+            candidates = {index for word in rarest for index in postings.get(word, ())}
+            for index in candidates:
+                other = kept[index]['words']
+                if len(words & other) / len(words | other) >= DUPLICATE_SIMILARITY:
+                    duplicate = True
+                    break
+        if duplicate:
+            continue
+
+        seen_exact.add(normalized)
+        for word in words:
+            postings.setdefault(word, []).append(len(kept))
+        kept.append(unit)
+    return kept
+
+
+def _select_salient(units: List[Dict[str, Any]], budget: int, model: str,
+                    query: Optional[str]) -> List[Dict[str, Any]]:
+    """Keep the highest-scoring units that fit in the budget, in document order."""
+    encoding = encoding_for_model(model)
+    texts = [unit['text'] for unit in units]
+    if encoding is not None:
+        token_counts = [len(tokens) for tokens in encoding.encode_batch(texts, disallowed_special=())]
+    else:
+        token_counts = [len(text) // 4 + 1 for text in texts]
+
+    term_frequency = Counter(word for unit in units for word in unit.get('words', ()))
+    query_words = set(_content_words(query or ''))
+
+    scored = []
+    for index, unit in enumerate(units):
+        words = unit.get('words') or set(_content_words(unit['text']))
+        if unit['heading']:
+            # Headings are cheap and keep the structure the writer builds on
+            score = float('inf')
+        elif not words:
+            score = 0.0
+        else:
+            score = sum(term_frequency[word] for word in words) / len(words) ** 0.5
+            score *= 1.0 + len(words & query_words)
+            if NUMBER.search(unit['text']):
+                score *= 1.5
+            if VERDICT.search(unit['text']):
+                score *= 2.0
+        scored.append((score, -index, index))
+
+    selected = set()
+    used = 0
+    for _, _, index in sorted(scored, reverse=True):
+        # Every kept unit costs about one extra token for the separator
+        cost = token_counts[index] + 1
+        if used + cost <= budget:
+            selected.add(index)
+            used += cost
+    return [unit for index, unit in enumerate(units) if index in selected]
+
+
+def _truncate(text: str, budget: int, model: str) -> str:
+    """Cut a text to its first `budget` tokens."""
+    encoding = encoding_for_model(model)
+    if encoding is None:
+        return text[:budget * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:budget])
+
+
+def compact_text(text: str, budget: int, model: str = DEFAULT_LLM,
+                 query: Optional[str] = None) -> Dict[str, Any]:
+    """Compact a text to at most `budget` tokens.
+
+    Args:
+        text: The text to compact
+        budget: Maximum number of tokens of the compacted text
+        model: Model whose tokenizer counts the tokens
+        query: Text whose words mark relevant sentences, e.g. the research topic
+
+    Returns:
+        Dict[str, Any]: The compacted `text`, `original_tokens`,
+        `compacted_tokens`, `tokens_saved`, `duplicates_dropped` and
+        `sentences_dropped`
+    """
+    original_tokens = count_tokens(text, model)
+    result = {
+        'text': text,
+        'original_tokens': original_tokens,
+        'compacted_tokens': original_tokens,
+        'tokens_saved': 0,
+        'duplicates_dropped': 0,
+        'sentences_dropped': 0,
+    }
+    if original_tokens <= budget:
+        return result
+
+    units = _split_units(text)
+    unique = _drop_duplicates(units)
+    result['duplicates_dropped'] = len(units) - len(unique)
+
+    compacted = _join_units(_drop_empty_sections(unique))
+    if count_tokens(compacted, model) > budget:
+        selected = _select_salient(unique, budget, model, query)
+        result['sentences_dropped'] = sum(1 for unit in unique if not unit['heading']) - sum(
+            1 for unit in selected if not unit['heading']
+        )
+        selected = _drop_empty_sections(selected)
+        compacted = _join_units(selected)
+        if not selected or count_tokens(compacted, model) > budget:
+            # Nothing fits (e.g. one huge sentence); fall back to the leading tokens
+            compacted = _truncate(compacted or text, budget, model)
+
+    result['text'] = compacted
+    result['compacted_tokens'] = count_tokens(compacted, model)
+    result['tokens_saved'] = original_tokens - result['compacted_tokens']
+    return result
+
+
+class ContextCompactor:
+    """Compacts each stage's output to its budget before the next stage reads it.
+
+    Keeps per-stage statistics, so a run can report how many tokens it saved.
+    """
+
+    def __init__(
+        self,
+        budgets: Optional[Dict[str, int]] = None,
+        model: str = DEFAULT_LLM,
+        topic: Optional[str] = None,
+        enabled: bool = COMPACTION_ENABLED
+    ):
+        """Initialize the compactor.
+
+        Args:
+            budgets: Maximum context tokens handed forward, by the stage that
+                produced the text; stages without a budget pass text through
+            model: Model whose tokenizer counts the tokens
+            topic: The research topic, used to rank sentences by relevance
+            enabled: Pass every text through unchanged when False
+        """
+        self.budgets = dict(COMPACTION_BUDGETS if budgets is None else budgets)
+        self.model = model
+        self.topic = topic
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    def compact(self, stage: str, text: str) -> str:
+        """Compact a stage's output to the stage's budget and record the savings.
+
+        Args:
+            stage: Task name that produced the text ('research', 'fact_check', ...)
+            text: The stage's output
+
+        Returns:
+            str: The text to hand to the next stage
+        """
+        budget = self.budgets.get(stage)
+        if not self.enabled or not budget or not text:
+            return text
+
+        result = compact_text(text, budget, model=self.model, query=self.topic)
+        stats = {key: value for key, value in result.items() if key != 'text'}
+        stats['budget'] = budget
+        with self._lock:
+            self.stages[stage] = stats
+
+        if result['tokens_saved']:
+            print(
+                f"✂️  Compacted {stage} context: {result['original_tokens']} -> "
+                f"{result['compacted_tokens']} tokens ({result['tokens_saved']} saved)"
+            )
+        return result['text']
+
+    def compact_output(self, stage: str, output: Any) -> None:
+        """Compact a crewai TaskOutput in place, so context tasks read the compacted text.
+
+        Args:
+            stage: Task name that produced the output
+            output: The TaskOutput passed to the crew's task callback
+        """
+        # crewai renamed `raw_output` to `raw` in later releases
+        attribute = 'raw_output' if getattr(output, 'raw_output', None) is not None else 'raw'
+        text = getattr(output, attribute, None)
+        if not isinstance(text, str):
+            return
+
+        compacted = self.compact(stage, text)
+        if compacted is not text:
+            setattr(output, attribute, compacted)
+
+    def summary(self) -> Dict[str, Any]:
+        """Get the per-stage statistics and the total number of tokens saved."""
+        with self._lock:
+            stages = {stage: dict(stats) for stage, stats in self.stages.items()}
+        return {
+            'stages': stages,
+            'tokens_saved': sum(stats['tokens_saved'] for stats in stages.values()),
+        }
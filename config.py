@@ -17,6 +17,51 @@ OUTPUT_DIR.mkdir(exist_ok=True, parents=True)
 DEFAULT_LLM = "gpt-3.5-turbo"
 DEFAULT_TEMPERATURE = 0.7
 
+# Model of each agent; the router may use another model for individual calls
+AGENT_MODELS = {
+    'researcher': DEFAULT_LLM,
+    'fact_checker': DEFAULT_LLM,
+    'writer': DEFAULT_LLM,
+}
+
+# Model Routing Configuration
+ROUTING_ENABLED = True
+# Per-call budgets; calls estimated to exceed them go to the cheapest model within budget
+ROUTING_LATENCY_BUDGET_SECONDS = 60.0
+ROUTING_COST_BUDGET_USD = 0.10
+# Answer length assumed when estimating latency and cost
+ROUTING_EXPECTED_COMPLETION_TOKENS = 1000
+# The writer switches to this model once the fact-checker flags this many problems
+ROUTING_ESCALATION_MODEL = "gpt-4o"
+ROUTING_ESCALATION_MIN_FLAGS = 1
+# Context window and typical speed of the models the router can choose from
+MODEL_PROFILES = {
+    'gpt-4o-mini': {'context_window': 128000, 'first_token_seconds': 0.4,
+                    'prompt_tokens_per_second': 5000, 'tokens_per_second': 90},
+    'gpt-4o': {'context_window': 128000, 'first_token_seconds': 0.5,
+               'prompt_tokens_per_second': 4000, 'tokens_per_second': 70},
+    'gpt-4-turbo': {'context_window': 128000, 'first_token_seconds': 0.8,
+                    'prompt_tokens_per_second': 2000, 'tokens_per_second': 35},
+    'gpt-4': {'context_window': 8192, 'first_token_seconds': 0.8,
+              'prompt_tokens_per_second': 1500, 'tokens_per_second': 25},
+    'gpt-3.5-turbo': {'context_window': 16385, 'first_token_seconds': 0.4,
+                      'prompt_tokens_per_second': 5000, 'tokens_per_second': 100},
+}
+
+# LLM Connection Pool Configuration
+LLM_POOL_MAX_CONNECTIONS = 64
+LLM_POOL_MAX_KEEPALIVE_CONNECTIONS = 32
+LLM_POOL_KEEPALIVE_EXPIRY = 60.0
+LLM_REQUEST_TIMEOUT = 600.0
+
+# LLM Response Cache Configuration
+LLM_CACHE_ENABLED = True
+LLM_CACHE_PATH = BASE_DIR / ".llm_cache" / "responses.sqlite3"
+LLM_CACHE_TTL_SECONDS = 24 * 60 * 60
+LLM_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Agents that always call the LLM, e.g. {'fact_checker'}
+LLM_CACHE_DISABLED_AGENTS = set()
+
 # Agent Configuration
 DEFAULT_VERBOSE = True
 DEFAULT_ALLOW_DELEGATION = False
@@ -24,6 +69,135 @@ DEFAULT_ALLOW_DELEGATION = False
 # Task Configuration
 DEFAULT_MAX_ITERATIONS = 3
 
+# Pipeline Configuration
+PIPELINE_MAX_SECTIONS = 5
+
+# Fact-Check Fan-Out Configuration
+FACT_CHECK_CONCURRENCY = 8
+FACT_CHECK_MAX_CLAIMS = 40
+
+# Deadline Configuration
+# Maximum seconds for a whole run and for each task; None for no limit
+RUN_DEADLINE_SECONDS = 900.0
+TASK_DEADLINE_SECONDS = {
+    'research': 300.0,
+    'fact_check': 300.0,
+    'writing': 300.0,
+}
+
+# Checkpoint Configuration
+CHECKPOINT_DIR = BASE_DIR / ".checkpoints"
+# Checkpoints of runs not updated for this long are removed
+CHECKPOINT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Refresh Configuration
+# Title of the section receiving changes the researcher did not attribute to a section
+REFRESH_FALLBACK_SECTION = "Recent Developments"
+
+# Context Compaction Configuration
+COMPACTION_ENABLED = True
+# Maximum tokens of a stage's output handed to the next stage as context
+COMPACTION_BUDGETS = {
+    'research': 3000,
+    'fact_check': 3000,
+    # Previous report shown to the researcher of an incremental refresh
+    'previous_report': 3000,
+}
+
+# Batch Configuration
+BATCH_DEFAULT_CONCURRENCY = 4
+
+# Process Pool Configuration
+# Worker processes running crews; None for one per CPU core
+CREW_PROCESS_WORKERS = None
+# Runs after which a worker process is replaced, bounding its memory growth
+CREW_PROCESS_MAX_RUNS = 20
+# 'forkserver' forks workers from a server that imported CREW_PROCESS_PRELOAD once
+CREW_PROCESS_START_METHOD = 'forkserver'
+CREW_PROCESS_PRELOAD = ('crew',)
+
+# API Service Configuration
+API_HOST = "127.0.0.1"
+API_PORT = 8000
+# Research runs executed at once by the service
+API_WORKERS = 4
+# Accepted runs waiting for a worker; further requests get 429 responses
+API_MAX_QUEUED = 16
+API_RETRY_AFTER_SECONDS = 10
+# Finished runs are kept (with their events) for this long
+API_RESULT_TTL_SECONDS = 3600
+# Seconds between keep-alive comments on idle event streams
+API_SSE_KEEPALIVE_SECONDS = 15.0
+
+# Job Queue Configuration
+JOB_QUEUE_PATH = BASE_DIR / ".jobs" / "jobs.sqlite3"
+JOB_QUEUE_CONCURRENCY = 2
+JOB_QUEUE_POLL_INTERVAL = 1.0
+# Running jobs without a heartbeat for this long are requeued (e.g. after a restart)
+JOB_HEARTBEAT_TIMEOUT = 120.0
+JOB_MAX_ATTEMPTS = 3
+
+# Telemetry Configuration
+TELEMETRY_ENABLED = True
+TELEMETRY_EVENTS_PATH = BASE_DIR / "telemetry" / "events.jsonl"
+TELEMETRY_PROMETHEUS_PATH = BASE_DIR / "telemetry" / "metrics.prom"
+# USD per 1K (prompt, completion) tokens; the longest matching model name prefix wins
+MODEL_PRICES = {
+    'gpt-4o-mini': (0.00015, 0.0006),
+    'gpt-4o': (0.005, 0.015),
+    'gpt-4-turbo': (0.01, 0.03),
+    'gpt-4': (0.03, 0.06),
+    'gpt-3.5-turbo': (0.0005, 0.0015),
+}
+
+# Embedding Configuration
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+CHROMA_CACHE_DIR = BASE_DIR / ".chroma_cache"
+# Vectors of every embedded text, keyed by content hash (float16, memory-mapped)
+EMBEDDING_CACHE_DIR = BASE_DIR / ".embeddings"
+EMBEDDING_BATCH_SIZE = 256
+# Seconds an encode request waits for concurrent requests to share its batch
+EMBEDDING_BATCH_WAIT_SECONDS = 0.005
+# Vectors the store has room for before its file first grows (it doubles when full)
+EMBEDDING_INITIAL_CAPACITY = 4096
+
+# Report Cache Configuration
+REPORT_CACHE_COLLECTION = "research_reports"
+REPORT_CACHE_SIMILARITY_THRESHOLD = 0.92
+REPORT_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+REPORT_CACHE_MAX_ENTRIES = 500
+
+# Claim Cache Configuration
+# Verdicts of fact-checked claims, reused by the fact-check fan-out for near-identical claims
+CLAIM_CACHE_ENABLED = True
+CLAIM_CACHE_COLLECTION = "verified_claims"
+# Minimum cosine similarity between a claim and a cached one for the verdict to be reused
+CLAIM_CACHE_SIMILARITY_THRESHOLD = 0.95
+# Maximum age of a reused verdict; unverifiable claims may be settled by new sources sooner
+CLAIM_CACHE_TTL_SECONDS = {
+    'VERIFIED': 14 * 24 * 60 * 60,
+    'INCORRECT': 14 * 24 * 60 * 60,
+    'UNVERIFIABLE': 24 * 60 * 60,
+}
+CLAIM_CACHE_MAX_ENTRIES = 20000
+
+# Document Ingestion Configuration
+# Local PDF and Markdown files the researcher can search
+CORPUS_DIR = BASE_DIR / "corpus"
+CORPUS_COLLECTION = "corpus_chunks"
+# Content hash and chunk count of every ingested file
+CORPUS_MANIFEST_PATH = BASE_DIR / ".corpus_index" / "manifest.json"
+INGEST_CHUNK_WORDS = 220
+INGEST_CHUNK_OVERLAP_WORDS = 40
+INGEST_EMBED_BATCH_SIZE = 512
+# Processes parsing and chunking files; None for one per CPU core
+INGEST_WORKERS = None
+RETRIEVAL_ENABLED = True
+RETRIEVAL_TOP_K = 5
+
+# Report Index Configuration
+REPORT_INDEX_PATH = BASE_DIR / ".report_index" / "reports.sqlite3"
+
 # API Keys
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
@@ -1,53 +1,317 @@
 """Crew orchestration for the research project."""
+import asyncio
 import time
-from typing import Dict, Any
+import uuid
+from typing import Dict, Any, Iterable, Optional
 from pathlib import Path
 from crewai import Crew, Process
 from agents import ResearchAgents
+from llm_pool import get_llm_pool
 from tasks import ResearchTasks
-from config import OUTPUT_DIR
+from pipeline import SectionPipeline, run_task
+from fact_check import ClaimFactChecker
+from claim_cache import get_claim_cache
+from streaming import TokenStream
+from progress import ProgressBus, TASK_STARTED, TASK_STEP, TASK_FINISHED, RUN_FINISHED
+from telemetry import RunTelemetry
+from compaction import ContextCompactor
+from routing import ModelRouter
+from cancellation import CancellationToken
+from checkpoints import STAGES, get_checkpoint_store
+from refresh import (
+    ReportRefresher, assemble_report, find_previous_report, load_report,
+    merge_sections, parse_changes, summarize_changes
+)
+from report_index import index_report
+from config import OUTPUT_DIR, FACT_CHECK_CONCURRENCY, RUN_DEADLINE_SECONDS
 
 class ResearchCrew:
     """Class to manage the research crew and its tasks."""
     
-    def __init__(self, topic: str):
-        """Initialize the research crew with a topic."""
+    def __init__(
+        self,
+        topic: str,
+        stream_stages: Optional[Iterable[str]] = None,
+        pipelined: bool = False,
+        fact_check_fan_out: bool = False,
+        fact_check_concurrency: int = FACT_CHECK_CONCURRENCY,
+        deadline_seconds: Optional[float] = RUN_DEADLINE_SECONDS,
+        task_deadlines: Optional[Dict[str, float]] = None,
+        run_id: Optional[str] = None,
+        output_file: Optional[Path] = None,
+        refresh: bool = False,
+        previous_report: Optional[Path] = None
+    ):
+        """Initialize the research crew with a topic.
+        
+        Args:
+            topic: The research topic
+            stream_stages: Task names ('research', 'fact_check', 'writing') whose
+                tokens are pushed to `self.stream` as they arrive
+            pipelined: Overlap the stages section by section instead of running
+                them strictly one after another
+            fact_check_fan_out: Split the research into claims and verify them
+                concurrently instead of in one long fact-checking call
+            fact_check_concurrency: Maximum number of claims verified at once
+            deadline_seconds: Maximum seconds for the whole run; None for no limit
+            task_deadlines: Maximum seconds per task name; defaults to
+                `TASK_DEADLINE_SECONDS`
+            run_id: ID under which the stage outputs are checkpointed;
+                generated when not given (see `resume()`)
+            output_file: Report file; a new timestamped file when not given
+            refresh: Update the latest report on the topic in `OUTPUT_DIR`
+                instead of researching from scratch; a full run when there is none
+            previous_report: Report to refresh; implies `refresh`
+        """
         self.topic = topic.strip()
         if not self.topic:
             raise ValueError("Research topic cannot be empty")
+        if pipelined and fact_check_fan_out:
+            raise ValueError("Pipelined execution and fact-check fan-out cannot be combined")
+        if (refresh or previous_report is not None) and (pipelined or fact_check_fan_out):
+            raise ValueError("Refresh cannot be combined with pipelined execution or fact-check fan-out")
+        self.pipelined = pipelined
+        self.fact_check_fan_out = fact_check_fan_out
+        self.fact_check_concurrency = fact_check_concurrency
+        self.fact_check_report: Optional[Dict[str, Any]] = None
+        self.run_id = run_id or uuid.uuid4().hex
             
-        # Initialize agents and tasks
-        self.agents = ResearchAgents()
-        self.tasks = ResearchTasks(self.topic)
+        # Progress events (task start/step/finish, tokens) for UIs and other consumers
+        self.events = ProgressBus()
+        
+        # Per-task latency, token, cost and cache metrics, fed by the events and the agents' LLMs
+        self.telemetry = RunTelemetry(self.topic, list(STAGES), run_id=self.run_id)
+        self.telemetry.attach(self.events)
+        
+        # Cancelled by `cancel()` or when a deadline passes; aborts the agents' in-flight requests
+        self.cancellation = CancellationToken(deadline_seconds, task_deadlines)
+        
+        # Initialize tasks, the optional token stream and agents
+        self.tasks = ResearchTasks(self.topic, output_file=output_file)
+        
+        # A refresh patches the previous report instead of rewriting it
+        self.previous_report: Optional[Dict[str, Any]] = None
+        if previous_report is None and refresh:
+            previous_report = find_previous_report(self.topic, exclude=self.tasks.output_file)
+            if previous_report is None:
+                print(f"⚠️ No previous report on {self.topic}; running full research")
+        if previous_report is not None:
+            self.previous_report = load_report(previous_report)
+        self.stream = (
+            TokenStream(stream_stages, output_file=self.tasks.output_file, bus=self.events)
+            if stream_stages else None
+        )
+        # Chooses the model of every LLM call; escalates the writer when the fact-checker flags problems
+        self.router = ModelRouter()
+        self.agents = ResearchAgents(
+            stream=self.stream,
+            telemetry=self.telemetry,
+            router=self.router,
+            cancellation=self.cancellation
+        )
+        
+        # Cuts each stage's output to its token budget before the next stage reads it
+        self.compactor = ContextCompactor(topic=self.topic)
         
-        # Initialize progress tracking
+        # Initialize progress tracking and the full output of each finished stage
         self.start_time = time.time()
+        self.stage_outputs: Dict[str, str] = {}
         self.task_progress = {
             'research': {'status': 'pending', 'start_time': None, 'end_time': None},
             'fact_check': {'status': 'pending', 'start_time': None, 'end_time': None},
             'writing': {'status': 'pending', 'start_time': None, 'end_time': None}
         }
+        
+        # Each completed stage is checkpointed, so a failed run can be resumed by its ID
+        self.checkpoints = get_checkpoint_store()
+        self.restored_outputs: Dict[str, str] = {}
+        if self.checkpoints.load(self.run_id) is None:
+            self.checkpoints.create(
+                self.topic,
+                options={
+                    'pipelined': pipelined,
+                    'fact_check_fan_out': fact_check_fan_out,
+                    'fact_check_concurrency': fact_check_concurrency,
+                    'previous_report': str(previous_report) if previous_report is not None else None,
+                },
+                run_id=self.run_id,
+                output_file=str(self.tasks.output_file)
+            )
+    
+    @classmethod
+    def from_checkpoint(cls, run_id: str, **kwargs: Any) -> 'ResearchCrew':
+        """Create a crew continuing a checkpointed run.
+        
+        Completed stages are loaded from their checkpoints and marked
+        completed; running the crew only executes the remaining stages.
+        
+        Args:
+            run_id: ID of the run to continue
+            **kwargs: Crew options overriding those of the original run
+            
+        Returns:
+            ResearchCrew: The crew, ready to `run()`
+        """
+        manifest = get_checkpoint_store().load(run_id)
+        if manifest is None:
+            raise ValueError(f"No checkpoints found for run {run_id}")
+        
+        options = {**manifest.get('options', {}), **kwargs}
+        crew = cls(manifest['topic'], run_id=run_id, output_file=manifest.get('output_file'), **options)
+        crew._restore()
+        return crew
+    
+    @classmethod
+    def resume(cls, run_id: str, **kwargs: Any) -> Dict[str, Any]:
+        """Continue a failed or cancelled run from its first incomplete stage.
+        
+        Args:
+            run_id: ID of the run (`run_id` in the result of the failed run)
+            **kwargs: Crew options overriding those of the original run
+            
+        Returns:
+            Dict[str, Any]: The same result dict as `run()`
+        """
+        return cls.from_checkpoint(run_id, **kwargs).run()
+    
+    def _restore(self) -> None:
+        """Load the completed stages of this run from its checkpoints."""
+        self.restored_outputs = self.checkpoints.completed_stages(self.run_id)
+        for stage, text in self.restored_outputs.items():
+            self.stage_outputs[stage] = text
+            self.task_progress[stage].update(status='completed', restored=True)
+        
+        if 'fact_check' in self.restored_outputs:
+            self.fact_check_report = self.checkpoints.stage_data(self.run_id, 'fact_check')
+            self.router.review_fact_check(self.restored_outputs['fact_check'])
+        if self.restored_outputs:
+            print(f"♻️  Resuming run {self.run_id} after: {', '.join(self.restored_outputs)}")
+    
+    def _save_checkpoint(self, stage: str) -> None:
+        """Checkpoint the full output of a completed stage."""
+        text = self.stage_outputs.get(stage)
+        if text is None or stage in self.restored_outputs:
+            return
+        try:
+            self.checkpoints.save(
+                self.run_id,
+                stage,
+                text,
+                data=self.fact_check_report if stage == 'fact_check' else None
+            )
+        except Exception as e:
+            print(f"⚠️ Warning: Could not checkpoint {stage}: {e}")
+    
+    def _handoff(self, stage: str) -> str:
+        """Get the restored output of a stage as compacted context for the next one."""
+        return self.compactor.compact(stage, self.restored_outputs[stage])
     
     def update_progress(self, task_name: str, status: str) -> None:
-        """Update the progress of a task."""
+        """Update the progress of a task and publish the change."""
         if task_name not in self.task_progress:
             return
             
         if status == 'start':
             self.task_progress[task_name]['status'] = 'in_progress'
             self.task_progress[task_name]['start_time'] = time.time()
-        elif status in ['completed', 'failed']:
+            self.cancellation.start_task(task_name)
+            self.events.publish(TASK_STARTED, task=task_name, status='in_progress')
+        elif status in ['completed', 'failed', 'cancelled']:
+            self.cancellation.finish_task(task_name)
+            if status == 'completed':
+                self._save_checkpoint(task_name)
             self.task_progress[task_name]['status'] = status
             self.task_progress[task_name]['end_time'] = time.time()
+            self.events.publish(TASK_FINISHED, task=task_name, status=status)
+    
+    def _current_task(self) -> Optional[str]:
+        """Get the name of the task currently in progress."""
+        return next(
+            (name for name, task in self.task_progress.items() if task['status'] == 'in_progress'),
+            None
+        )
+    
+    def _start_next_task(self) -> None:
+        """Mark the first pending task as started."""
+        for task_name, task in self.task_progress.items():
+            if task['status'] == 'pending':
+                self.update_progress(task_name, 'start')
+                return
+    
+    def _on_task_output(self, output) -> None:
+        """Crew task callback: complete the running task and start the next one."""
+        task_name = self._current_task()
+        if task_name is not None:
+            self.stage_outputs[task_name] = (
+                getattr(output, 'raw_output', None) or getattr(output, 'raw', None) or str(output)
+            )
+            if task_name == 'fact_check':
+                self.router.review_fact_check(self.stage_outputs[task_name])
+            # Context tasks read the output object, so the next stage sees the compacted text
+            self.compactor.compact_output(task_name, output)
+            self.update_progress(task_name, 'completed')
+        # Raising here stops the crew before the next task starts
+        self.cancellation.check()
+        self._start_next_task()
+    
+    def _on_pipeline_stage(self, stage: str, status: str, section: Optional[str] = None,
+                           output: Optional[str] = None) -> None:
+        """Pipeline callback: track stages that run concurrently."""
+        if status == 'start':
+            self.update_progress(stage, 'start')
+        elif status == 'section':
+            if stage == 'fact_check':
+                self.router.review_fact_check(output or '')
+            self.events.publish(TASK_STEP, task=stage, step='section', detail=section)
+        elif status == 'completed':
+            self.stage_outputs[stage] = output or ''
+            self.update_progress(stage, 'completed')
+    
+    def _on_agent_step(self, step) -> None:
+        """Crew step callback: publish an agent step of the running task."""
+        detail = getattr(step, 'log', None) or str(step)
+        self.events.publish(
+            TASK_STEP,
+            task=self._current_task(),
+            step=type(step).__name__,
+            detail=detail[:200]
+        )
+    
+    def fail_running_task(self) -> None:
+        """Mark the tasks in progress as failed."""
+        for task_name, task in self.task_progress.items():
+            if task['status'] == 'in_progress':
+                self.update_progress(task_name, 'failed')
+    
+    def cancel_pending_tasks(self) -> None:
+        """Mark every task that has not completed as cancelled."""
+        for task_name, task in self.task_progress.items():
+            if task['status'] != 'completed':
+                self.update_progress(task_name, 'cancelled')
+    
+    def cancel(self, reason: str = "Cancelled by user") -> bool:
+        """Stop the run: abort the agents' in-flight LLM requests and skip the remaining tasks.
+        
+        Safe to call from any thread; `run()` then returns a result with
+        `cancelled` set.
+        
+        Args:
+            reason: Error message of the cancelled run
+            
+        Returns:
+            bool: Whether the run was cancelled by this call
+        """
+        return self.cancellation.cancel(reason)
     
     def get_progress(self) -> Dict[str, Dict[str, Any]]:
-        """Get the current progress of all tasks."""
+        """Get the current progress and performance metrics of all tasks."""
         return {
             'overall': {
                 'status': self._get_overall_status(),
                 'elapsed_time': time.time() - self.start_time
             },
-            'tasks': self.task_progress
+            'tasks': self.task_progress,
+            'metrics': self.telemetry.summary()['tasks']
         }
     
     def _get_overall_status(self) -> str:
@@ -60,51 +324,320 @@ class ResearchCrew:
             return 'completed'
         if 'failed' in statuses:
             return 'failed'
+        if 'cancelled' in statuses:
+            return 'cancelled'
         return 'pending'
     
-    def run(self) -> Dict[str, Any]:
-        """Run the research crew and return results."""
-        try:
-            # Initialize agents
+    def _build_crew(self) -> Crew:
+        """Create the agents, tasks and crew for the stages that have not completed yet."""
+        agents = []
+        tasks = []
+        
+        # Create tasks with dependencies; a stage restored from a checkpoint
+        # hands its output to the next task directly
+        if 'research' not in self.restored_outputs:
             researcher = self.agents.create_researcher()
+            agents.append(researcher)
+            tasks.append(self.tasks.research_task(researcher))
+        if 'fact_check' not in self.restored_outputs:
             fact_checker = self.agents.create_fact_checker()
-            writer = self.agents.create_writer()
-            
-            # Create tasks with dependencies
-            research_task = self.tasks.research_task(researcher)
-            fact_check_task = self.tasks.fact_check_task(fact_checker, [research_task])
-            write_task = self.tasks.writing_task(writer, [fact_check_task])
-            
-            # Set up progress tracking callbacks
-            for task, task_name in zip(
-                [research_task, fact_check_task, write_task],
-                ['research', 'fact_check', 'writing']
-            ):
-                task.callback = lambda status, name=task_name: self.update_progress(name, status)
-            
-            # Create and run the crew
-            crew = Crew(
-                agents=[researcher, fact_checker, writer],
-                tasks=[research_task, fact_check_task, write_task],
-                verbose=True,
-                process='sequential'
+            agents.append(fact_checker)
+            tasks.append(self.tasks.fact_check_task(
+                fact_checker,
+                tasks[-1:],
+                research=None if tasks else self._handoff('research')
+            ))
+        writer = self.agents.create_writer()
+        agents.append(writer)
+        tasks.append(self.tasks.writing_task(
+            writer,
+            tasks[-1:],
+            verified_research=None if tasks else self._handoff('fact_check')
+        ))
+        
+        # Progress tracking: tasks run in order, so each task output completes
+        # the running task and starts the next one
+        return Crew(
+            agents=agents,
+            tasks=tasks,
+            verbose=True,
+            process='sequential',
+            task_callback=self._on_task_output,
+            step_callback=self._on_agent_step
+        )
+    
+    def _run_pipelined(self) -> str:
+        """Run the stages as a section pipeline and write the assembled report."""
+        pipeline = SectionPipeline(
+            self.tasks,
+            self.agents.create_researcher(),
+            self.agents.create_fact_checker(),
+            self.agents.create_writer(),
+            on_stage=self._on_pipeline_stage
+        )
+        result = pipeline.run()
+        Path(self.tasks.output_file).write_text(result, encoding='utf-8')
+        return result
+    
+    def _run_stage(self, stage: str, agent, task) -> str:
+        """Run one stage as a single-task crew, tracking its progress."""
+        self.update_progress(stage, 'start')
+        output = run_task(agent, task)
+        self.stage_outputs[stage] = output
+        self.update_progress(stage, 'completed')
+        return output
+    
+    def _on_claim_verified(self, verdict: Dict[str, Any]) -> None:
+        """Fan-out callback: publish each claim verdict as a fact-check step."""
+        self.events.publish(
+            TASK_STEP,
+            task='fact_check',
+            step='claim',
+            detail=verdict['claim'][:200],
+            verdict=verdict['verdict'],
+            latency_seconds=verdict['latency_seconds'],
+            cached=verdict.get('cached', False)
+        )
+    
+    def _run_fan_out(self) -> str:
+        """Research, fact-check claims concurrently, then write from the merged verdicts."""
+        if 'research' in self.restored_outputs:
+            research = self.restored_outputs['research']
+        else:
+            researcher = self.agents.create_researcher()
+            research = self._run_stage('research', researcher, self.tasks.research_task(researcher))
+        
+        if 'fact_check' in self.restored_outputs:
+            document = self.restored_outputs['fact_check']
+        else:
+            self.update_progress('fact_check', 'start')
+            checker = ClaimFactChecker(
+                self.tasks,
+                self.agents.create_fact_checker,
+                concurrency=self.fact_check_concurrency,
+                on_claim=self._on_claim_verified,
+                cache=get_claim_cache()
             )
-            
-            # Execute the crew
-            result = crew.kickoff()
-            
-            return {
-                'topic': self.topic,
-                'result': str(result),
-                'output_file': self.tasks.output_file,
-                'success': True,
-                'progress': self.get_progress()
-            }
-            
+            self.fact_check_report = checker.verify(research)
+            document = self.fact_check_report['document']
+            self.stage_outputs['fact_check'] = document
+            self.router.review_fact_check(document)
+            self.update_progress('fact_check', 'completed')
+            self.cancellation.check()
+        
+        writer = self.agents.create_writer()
+        return self._run_stage(
+            'writing',
+            writer,
+            self.tasks.writing_task(
+                writer,
+                verified_research=self.compactor.compact('fact_check', document)
+            )
+        )
+    
+    def _run_refresh(self) -> str:
+        """Research what changed since the previous report, verify it and patch the affected sections."""
+        previous = self.previous_report
+        titles = [section['title'] for section in previous['sections']]
+        print(f"♻️  Refreshing {previous['path']} ({len(titles)} sections)")
+        
+        if 'research' in self.restored_outputs:
+            delta = self.restored_outputs['research']
+        else:
+            researcher = self.agents.create_researcher()
+            delta = self._run_stage(
+                'research',
+                researcher,
+                self.tasks.refresh_research_task(
+                    researcher,
+                    titles,
+                    previous['since'],
+                    self.compactor.compact('previous_report', previous['text'])
+                )
+            )
+            self.cancellation.check()
+        changes = parse_changes(delta, titles)
+        
+        # Unchanged sections are neither fact-checked nor rewritten
+        refresher = ReportRefresher(
+            self.tasks,
+            self.agents.create_fact_checker,
+            self.agents.create_writer,
+            concurrency=self.fact_check_concurrency,
+            on_section=self._on_pipeline_stage
+        )
+        if 'fact_check' in self.restored_outputs:
+            verified = (self.fact_check_report or {}).get('sections') or {}
+        else:
+            self.update_progress('fact_check', 'start')
+            verified = refresher.verify(changes)
+            document = merge_sections(verified)
+            self.fact_check_report = {'document': document, 'sections': verified}
+            self.stage_outputs['fact_check'] = document
+            self.update_progress('fact_check', 'completed')
+            self.cancellation.check()
+        
+        self.update_progress('writing', 'start')
+        patched = refresher.patch(previous['sections'], verified)
+        report = assemble_report(previous['preamble'], previous['sections'], patched)
+        Path(self.tasks.output_file).write_text(report, encoding='utf-8')
+        self.stage_outputs['writing'] = report
+        self.update_progress('writing', 'completed')
+        return report
+    
+    def _refresh_summary(self) -> Optional[Dict[str, Any]]:
+        """Get the changed-sections summary of a refresh, or None for a full run."""
+        if self.previous_report is None:
+            return None
+        previous = self.previous_report
+        changes = parse_changes(
+            self.stage_outputs.get('research', ''),
+            [section['title'] for section in previous['sections']]
+        )
+        return {
+            'previous_report': str(previous['path']),
+            'since': previous['since'],
+            **summarize_changes(previous['sections'], self.stage_outputs.get('writing', ''), changes)
+        }
+    
+    def _execute(self) -> str:
+        """Run the stages in the configured mode, blocking until the report is written."""
+        self.cancellation.check()
+        if 'writing' in self.restored_outputs:
+            # Every stage completed before; make sure the report file exists
+            report = self.restored_outputs['writing']
+            if not Path(self.tasks.output_file).exists():
+                Path(self.tasks.output_file).write_text(report, encoding='utf-8')
+            return report
+        if self.previous_report is not None:
+            return self._run_refresh()
+        if self.pipelined and not self.restored_outputs:
+            # Resumed pipelined runs continue stage by stage from the checkpoints
+            return self._run_pipelined()
+        if self.fact_check_fan_out:
+            return self._run_fan_out()
+        
+        crew = self._build_crew()
+        self._start_next_task()
+        return crew.kickoff()
+    
+    def _success_result(self, result) -> Dict[str, Any]:
+        """Build the result dict for a completed run."""
+        return {
+            'topic': self.topic,
+            'run_id': self.run_id,
+            'result': str(result),
+            'output_file': self.tasks.output_file,
+            'success': True,
+            'resumed_stages': list(self.restored_outputs),
+            'progress': self.get_progress(),
+            'llm_cache': self.agents.cache.stats() if self.agents.cache else None,
+            'llm_pool': get_llm_pool().stats(),
+            'fact_check': self.fact_check_report,
+            'compaction': self.compactor.summary(),
+            'routing': self.router.summary(),
+            'refresh': self._refresh_summary()
+        }
+    
+    def _error_result(self, error: Exception) -> Dict[str, Any]:
+        """Build the result dict for a failed run."""
+        self.fail_running_task()
+        return {
+            'topic': self.topic,
+            'run_id': self.run_id,
+            'error': str(error),
+            'success': False,
+            'progress': self.get_progress()
+        }
+    
+    def _cancelled_result(self) -> Dict[str, Any]:
+        """Build the result dict for a run stopped by `cancel()` or a deadline."""
+        self.cancel_pending_tasks()
+        return {
+            'topic': self.topic,
+            'run_id': self.run_id,
+            'error': self.cancellation.reason,
+            'success': False,
+            'cancelled': True,
+            'deadline_exceeded': self.cancellation.deadline_exceeded,
+            'progress': self.get_progress()
+        }
+    
+    def _failed_result(self, error: Exception) -> Dict[str, Any]:
+        """Build the result dict for a run that raised, telling cancellations from errors."""
+        if self.cancellation.cancelled:
+            # Aborted requests surface as connection or agent errors
+            return self._cancelled_result()
+        return self._error_result(error)
+    
+    def _index_result(self, result: Dict[str, Any]) -> None:
+        """Add a successfully written report to the report index."""
+        if result.get('success') and result.get('output_file'):
+            index_report(result['output_file'], self.topic, result['telemetry'])
+    
+    def _finish_run(self) -> None:
+        """Stop the deadlines, flush and close the token stream, then publish the end of the run."""
+        self.cancellation.close()
+        if self.stream is not None:
+            for task_name, text in self.stage_outputs.items():
+                self.stream.complete_stage(task_name, text)
+            self.stream.close()
+        
+        self.events.publish(RUN_FINISHED, status=self._get_overall_status())
+        self.events.close()
+    
+    def run(self) -> Dict[str, Any]:
+        """Run the research crew and return results.
+        
+        The run is stopped when `cancel()` is called or a deadline passes; the
+        result then has `success` False and `cancelled` True.
+        """
+        self.cancellation.start()
+        try:
+            result = self._success_result(self._execute())
         except Exception as e:
-            return {
-                'topic': self.topic,
-                'error': str(e),
-                'success': False,
-                'progress': self.get_progress()
-            }
+            result = self._failed_result(e)
+        finally:
+            self._finish_run()
+        
+        # Collected after the run has finished, so the totals are final
+        result['telemetry'] = self.telemetry.summary()
+        self._index_result(result)
+        return result
+    
+    async def run_async(self) -> Dict[str, Any]:
+        """Run the research crew without blocking the event loop.
+        
+        Returns the same result dict as `run()`. If the awaiting task is
+        cancelled, unfinished tasks are marked `cancelled` and
+        `asyncio.CancelledError` is re-raised; the crew's thread is stopped
+        with `cancel()`.
+        """
+        self.cancellation.start()
+        try:
+            if (self.pipelined or self.fact_check_fan_out or self.previous_report is not None
+                    or 'writing' in self.restored_outputs):
+                result = await asyncio.to_thread(self._execute)
+            else:
+                # A run cancelled before it started (e.g. while queued) makes no LLM calls
+                self.cancellation.check()
+                crew = self._build_crew()
+                self._start_next_task()
+                if hasattr(crew, 'kickoff_async'):
+                    result = await crew.kickoff_async()
+                else:
+                    # Older crewai releases only provide the blocking kickoff
+                    result = await asyncio.to_thread(crew.kickoff)
+            result = self._success_result(result)
+        except asyncio.CancelledError:
+            self.cancel("Run was cancelled")
+            self.cancel_pending_tasks()
+            raise
+        except Exception as e:
+            result = self._failed_result(e)
+        finally:
+            self._finish_run()
+        
+        result['telemetry'] = self.telemetry.summary()
+        self._index_result(result)
+        return result
@@ -1,8 +1,11 @@
 import os
+import asyncio
+import codecs
+import threading
 import streamlit as st
 import time
-from typing import Dict, List, Optional, Any
-from crewai.process import Process
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 # Set page config first (must be the first Streamlit command after import)
 st.set_page_config(
@@ -14,14 +17,20 @@ st.set_page_config(
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
-from crewai import Agent, Task, Crew
-from typing import Dict, List, Optional, Any
-import json
-import time
-from streamlit_chat import message as st_message
+from progress import ProgressBus, TASK_STARTED, TASK_STEP, TASK_FINISHED, RUN_FINISHED
+
+# crewai, langchain and chromadb take seconds to import, so they are imported
+# where they are first used instead of at the top of every script run
+if TYPE_CHECKING:
+    from crewai import Crew, Task
 
-# Custom CSS for chat interface
-st.markdown("""
+# Seconds between job status polls while watching a job run by another process;
+# jobs run by this process push their progress events instead
+JOB_WATCH_INTERVAL = 0.5
+
+# Custom CSS for chat interface. Streamlit drops elements that a rerun does not
+# emit again, so this is re-sent on every run; it is a single cheap message.
+CHAT_CSS = """
 <style>
 .chat-message {
     padding: 1.5rem;
@@ -45,44 +54,115 @@ st.markdown("""
     width: 100%;
 }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(CHAT_CSS, unsafe_allow_html=True)
 
 # Load environment variables
 load_dotenv()
 
+def _secret_api_key() -> Optional[str]:
+    """Get the OpenAI API key from Streamlit secrets, if a secrets file exists"""
+    try:
+        return st.secrets.get('OPENAI_API_KEY')
+    except FileNotFoundError:
+        return None
+
 # Set OpenAI API key from Streamlit secrets or environment
-if 'OPENAI_API_KEY' in st.secrets:
-    os.environ['OPENAI_API_KEY'] = st.secrets['OPENAI_API_KEY']
+secret_api_key = _secret_api_key()
+if secret_api_key:
+    os.environ['OPENAI_API_KEY'] = secret_api_key
 elif 'OPENAI_API_KEY' in os.environ:
     pass  # Use the environment variable if it exists
 else:
     st.error('Please set OPENAI_API_KEY in Streamlit secrets or environment variables')
     st.stop()
 
-# Configure ChromaDB with the new client API
-try:
-    import chromadb
-    
-    # Initialize the new Chroma client
-    chroma_client = chromadb.PersistentClient(
-        path=".chroma_cache",  # Directory to store the database
-        settings=chromadb.Settings(
-            anonymized_telemetry=False  # Disable telemetry
-        )
-    )
+@st.cache_resource(show_spinner=False)
+def get_chroma_client():
+    """Get the process-wide ChromaDB client, shared with the claim cache and document search
+    
+    Returns:
+        Tuple of the client (or None) and a warning to show when it is unavailable
+    """
+    try:
+        import chroma_client
+        
+        return chroma_client.get_chroma_client(), None
+    except ImportError:
+        return None, "ChromaDB not installed. Some features may be limited."
+    except Exception as e:
+        return None, f"Failed to initialize ChromaDB: {str(e)}. Some features may be limited."
+
+@st.cache_resource(show_spinner=False)
+def get_report_cache():
+    """Get the semantic cache of past reports, backfilled once per process
     
-    # Test the connection
-    chroma_client.heartbeat()
+    Repeated topics are served from this cache instead of running the crew.
     
-except ImportError:
-    st.warning("ChromaDB not installed. Some features may be limited.")
-    chroma_client = None
-except Exception as e:
-    st.warning(f"Failed to initialize ChromaDB: {str(e)}. Some features may be limited.")
-    chroma_client = None
+    Returns:
+        Tuple of the ReportCache (or None) and a warning to show when it is unavailable
+    """
+    client, warning = get_chroma_client()
+    if client is None:
+        return None, warning
+    try:
+        from report_cache import ReportCache
+        
+        cache = ReportCache(client)
+        cache.backfill()
+        return cache, None
+    except Exception as e:
+        return None, f"Failed to initialize report cache: {str(e)}. Reports will not be reused."
+
+@st.cache_resource
+def get_agent_templates() -> Dict[str, Dict[str, str]]:
+    """Get the agent definitions shared by every run, keyed by task name
+    
+    The goals are format strings taking the research `topic`.
+    """
+    return {
+        'research': {
+            'role': 'Senior Research Analyst',
+            'goal': 'Find and analyze interesting information about {topic}',
+            'backstory': (
+                'You are an expert researcher with a talent for finding '
+                'fascinating and accurate information on any topic. You have '
+                'a keen eye for detail and a passion for sharing knowledge.'
+            ),
+        },
+        'fact_check': {
+            'role': 'Fact Checker',
+            'goal': 'Verify the accuracy of research findings',
+            'backstory': (
+                'You are a meticulous fact-checker with a background in '
+                'journalism and research. You ensure all information is '
+                'accurate, up-to-date, and properly sourced.'
+            ),
+        },
+        'writing': {
+            'role': 'Content Writer',
+            'goal': 'Create engaging and well-structured content',
+            'backstory': (
+                'You are a talented writer who specializes in making complex '
+                'information accessible and engaging for a broad audience.'
+            ),
+        },
+    }
 
 class ResearchCrew:
-    def __init__(self, topic: str):
+    def __init__(self, topic: str, stream_stages: Optional[List[str]] = None,
+                 deadline_seconds: Optional[float] = None, task_deadlines: Optional[Dict[str, float]] = None,
+                 run_id: Optional[str] = None, output_file: Optional[str] = None):
+        """Set up a research run
+        
+        Args:
+            topic: The research topic
+            stream_stages: Task names whose tokens are streamed to the output file
+            deadline_seconds: Maximum seconds for the whole run; defaults to `RUN_DEADLINE_SECONDS`
+            task_deadlines: Maximum seconds per task name; defaults to `TASK_DEADLINE_SECONDS`
+            run_id: ID under which the stage outputs are checkpointed; generated when not given
+            output_file: Report file; a new timestamped file when not given
+        """
         print(f"\n{'='*50}\nInitializing ResearchCrew with topic: {topic}\n{'='*50}")
         self.topic = topic.strip()
         if not self.topic:
@@ -91,6 +171,44 @@ class ResearchCrew:
         self.output_dir = Path('output')
         self.output_dir.mkdir(exist_ok=True, parents=True)
         self.timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.output_file = (
+            Path(output_file) if output_file
+            else self.output_dir / f"{self.topic.lower().replace(' ', '_')}_{self.timestamp}.md"
+        )
+        self.run_id = run_id or uuid.uuid4().hex
+        
+        # Progress events (task start/step/finish, tokens) that the UI blocks on
+        self.events = ProgressBus()
+        
+        # Per-task latency, token and cost metrics, fed by the events and the agents' LLMs
+        from telemetry import RunTelemetry
+        self.telemetry = RunTelemetry(self.topic, ['research', 'fact_check', 'writing'], run_id=self.run_id)
+        self.telemetry.attach(self.events)
+        
+        # Tokens of the streamed stages are pushed here (and appended to the output file) as they arrive
+        from streaming import TokenStream
+        self.stream = (
+            TokenStream(stream_stages, output_file=self.output_file, bus=self.events)
+            if stream_stages else None
+        )
+        
+        # Each stage's output is cut to its token budget before the next stage reads it;
+        # the full outputs are kept for the token stream
+        from compaction import ContextCompactor
+        self.compactor = ContextCompactor(topic=self.topic)
+        self.stage_outputs: Dict[str, str] = {}
+        
+        # Chooses the model of every LLM call; escalates the writer when the fact-checker flags problems
+        from routing import ModelRouter
+        self.router = ModelRouter()
+        
+        # Cancelled by cancel() (the Stop button) or when a deadline passes; aborts in-flight requests
+        from cancellation import CancellationToken
+        from config import RUN_DEADLINE_SECONDS
+        self.cancellation = CancellationToken(
+            RUN_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds,
+            task_deadlines
+        )
         self.start_time = time.time()
         self.task_progress = {
             'research': {'status': 'pending', 'start_time': None, 'end_time': None},
@@ -99,10 +217,56 @@ class ResearchCrew:
         }
         self.current_task = None
         
+        # Each completed stage is checkpointed, so a failed run can be resumed by its ID
+        from checkpoints import get_checkpoint_store
+        self.checkpoints = get_checkpoint_store()
+        self.restored_outputs: Dict[str, str] = {}
+        self.task_stages: List[str] = []
+        if self.checkpoints.load(self.run_id) is None:
+            self.checkpoints.create(self.topic, run_id=self.run_id, output_file=str(self.output_file))
+        
         print("\n🔧 Initializing agents...")
         self._initialize_agents()
         print("✅ Agents initialized successfully")
         
+    @classmethod
+    def from_checkpoint(cls, run_id: str, **kwargs) -> 'ResearchCrew':
+        """Create a crew continuing a checkpointed run; completed stages are not run again"""
+        from checkpoints import get_checkpoint_store
+        
+        manifest = get_checkpoint_store().load(run_id)
+        if manifest is None:
+            raise ValueError(f"No checkpoints found for run {run_id}")
+        crew = cls(manifest['topic'], run_id=run_id, output_file=manifest.get('output_file'), **kwargs)
+        crew._restore()
+        return crew
+    
+    @classmethod
+    def resume(cls, run_id: str, **kwargs) -> Dict:
+        """Continue a failed or cancelled run from its first incomplete stage and return results"""
+        return cls.from_checkpoint(run_id, **kwargs).run()
+    
+    def _restore(self):
+        """Load the completed stages of this run from its checkpoints"""
+        self.restored_outputs = self.checkpoints.completed_stages(self.run_id)
+        for stage, text in self.restored_outputs.items():
+            self.stage_outputs[stage] = text
+            self.task_progress[stage].update(status='completed', restored=True)
+        if 'fact_check' in self.restored_outputs:
+            self.router.review_fact_check(self.restored_outputs['fact_check'])
+        if self.restored_outputs:
+            print(f"♻️  Resuming run {self.run_id} after: {', '.join(self.restored_outputs)}")
+    
+    def _save_checkpoint(self, stage: str):
+        """Checkpoint the full output of a completed stage"""
+        text = self.stage_outputs.get(stage)
+        if text is None or stage in self.restored_outputs:
+            return
+        try:
+            self.checkpoints.save(self.run_id, stage, text)
+        except Exception as e:
+            print(f"⚠️ Warning: Could not checkpoint {stage}: {e}")
+    
     def _initialize_agents(self):
         """Initialize all agents with error handling"""
         try:
@@ -113,63 +277,150 @@ class ResearchCrew:
             print(f"❌ Error initializing agents: {str(e)}")
             raise
         
+    def _llm_kwargs(self, stage: str) -> Dict:
+        """Get the Agent LLM arguments: a routed, pooled, cancellable LLM with telemetry, streaming if the stage is streamed"""
+        from agents import AGENT_STAGES
+        from cancellation import CancellationCallbackHandler
+        from config import AGENT_MODELS, DEFAULT_LLM
+        from llm_pool import get_llm_pool
+        from streaming import StreamingCallbackHandler
+        from telemetry import TelemetryCallbackHandler
+        
+        agent_name = next(name for name, agent_stage in AGENT_STAGES.items() if agent_stage == stage)
+        model_name = AGENT_MODELS.get(agent_name, DEFAULT_LLM)
+        streaming = self.stream is not None and stage in self.stream.stages
+        callbacks = [
+            CancellationCallbackHandler(self.cancellation),
+            TelemetryCallbackHandler(self.telemetry, stage, model_name)
+        ]
+        if streaming:
+            callbacks.append(StreamingCallbackHandler(self.stream, stage))
+        return {
+            'llm': get_llm_pool().create_llm(
+                model_name=model_name,
+                streaming=streaming,
+                callbacks=callbacks,
+                router=self.router,
+                route_stage=stage,
+                cancellation=self.cancellation
+            )
+        }
+    
+    def _create_agent(self, stage: str):
+        """Create the agent of a task from its cached template"""
+        from crewai import Agent
+        from ingest import get_research_tools
+        
+        template = get_agent_templates()[stage]
+        return Agent(
+            role=template['role'],
+            goal=template['goal'].format(topic=self.topic),
+            backstory=template['backstory'],
+            verbose=True,
+            allow_delegation=False,
+            # The researcher searches the ingested local documents when there are any
+            tools=get_research_tools() if stage == 'research' else [],
+            **self._llm_kwargs(stage)
+        )
+    
     def _initialize_researcher(self):
         """Initialize the researcher agent"""
         print("  - Initializing Researcher agent...")
-        self.researcher = Agent(
-            role='Senior Research Analyst',
-            goal=f'Find and analyze interesting information about {self.topic}',
-            backstory=(
-                'You are an expert researcher with a talent for finding '
-                'fascinating and accurate information on any topic. You have '
-                'a keen eye for detail and a passion for sharing knowledge.'
-            ),
-            verbose=True,
-            allow_delegation=False
-        )
+        self.researcher = self._create_agent('research')
         print("    ✅ Researcher agent ready")
     
     def _initialize_fact_checker(self):
         """Initialize the fact checker agent"""
         print("  - Initializing Fact Checker agent...")
-        self.fact_checker = Agent(
-            role='Fact Checker',
-            goal='Verify the accuracy of research findings',
-            backstory=(
-                'You are a meticulous fact-checker with a background in '
-                'journalism and research. You ensure all information is '
-                'accurate, up-to-date, and properly sourced.'
-            ),
-            verbose=True,
-            allow_delegation=False
-        )
+        self.fact_checker = self._create_agent('fact_check')
         print("    ✅ Fact Checker agent ready")
     
     def _initialize_writer(self):
         """Initialize the writer agent"""
         print("  - Initializing Writer agent...")
-        self.writer = Agent(
-            role='Content Writer',
-            goal='Create engaging and well-structured content',
-            backstory=(
-                'You are a talented writer who specializes in making complex '
-                'information accessible and engaging for a broad audience.'
-            ),
-            verbose=True,
-            allow_delegation=False
-        )
+        self.writer = self._create_agent('writing')
         print("    ✅ Writer agent ready")
     
     def update_progress(self, task_name: str, status: str):
-        """Update the progress of a task"""
+        """Update the progress of a task and publish the change"""
         if task_name in self.task_progress:
             self.task_progress[task_name]['status'] = status
             if status == 'in_progress':
                 self.task_progress[task_name]['start_time'] = time.time()
                 self.current_task = task_name
-            elif status == 'completed':
+                self.cancellation.start_task(task_name)
+                self.events.publish(TASK_STARTED, task=task_name, status=status)
+            elif status in ('completed', 'failed', 'cancelled'):
                 self.task_progress[task_name]['end_time'] = time.time()
+                self.cancellation.finish_task(task_name)
+                if status == 'completed':
+                    self._save_checkpoint(task_name)
                 self.current_task = None
+                self.events.publish(TASK_FINISHED, task=task_name, status=status)
+    
+    def _start_next_task(self):
+        """Mark the first pending task as in progress"""
+        next_task = next((k for k, v in self.task_progress.items() if v['status'] == 'pending'), None)
+        if next_task:
+            print(f"\n📡 Starting {next_task} task")
+            self.update_progress(next_task, 'in_progress')
+    
+    def _on_task_output(self, output):
+        """Crew task callback: complete the running task and start the next one"""
+        if self.current_task:
+            print(f"\n📡 Completed {self.current_task} task")
+            text = getattr(output, 'raw_output', None) or getattr(output, 'raw', None)
+            if text:
+                self.stage_outputs[self.current_task] = text
+                if self.current_task == 'fact_check':
+                    self.router.review_fact_check(text)
+            self.compactor.compact_output(self.current_task, output)
+            self.update_progress(self.current_task, 'completed')
+        # Raising here stops the crew before the next task starts
+        self.cancellation.check()
+        self._start_next_task()
+    
+    def _on_agent_step(self, step):
+        """Crew step callback: publish an agent step of the running task"""
+        detail = getattr(step, 'log', None) or str(step)
+        self.events.publish(
+            TASK_STEP,
+            task=self.current_task,
+            step=type(step).__name__,
+            detail=detail[:200]
+        )
+    
+    def fail_running_task(self):
+        """Mark the task in progress as failed"""
+        if self.current_task:
+            self.update_progress(self.current_task, 'failed')
+    
+    def cancel_pending_tasks(self):
+        """Mark every task that has not completed as cancelled"""
+        for task_name, task in self.task_progress.items():
+            if task['status'] != 'completed':
+                self.update_progress(task_name, 'cancelled')
+    
+    def cancel(self, reason: str = "Cancelled by user") -> bool:
+        """Stop the run from any thread: abort in-flight LLM requests and skip the remaining tasks
+        
+        Returns:
+            bool: Whether the run was cancelled by this call
+        """
+        return self.cancellation.cancel(reason)
+    
+    def _cancelled_result(self) -> Dict:
+        """Build the result of a run stopped by cancel() or a deadline"""
+        print(f"🛑 Research on {self.topic} stopped: {self.cancellation.reason}")
+        self.cancel_pending_tasks()
+        return {
+            'topic': self.topic,
+            'run_id': self.run_id,
+            'error': self.cancellation.reason,
+            'success': False,
+            'cancelled': True,
+            'deadline_exceeded': self.cancellation.deadline_exceeded
+        }
     
     def get_progress(self) -> Dict:
         """Get current progress information"""
@@ -185,13 +436,47 @@ class ResearchCrew:
             'completed': completed,
             'total': total,
             'current_task': current_task,
-            'task_details': self.task_progress
+            'task_details': self.task_progress,
+            'metrics': self.telemetry.summary()['tasks']
         }
     
-    def create_tasks(self) -> List[Task]:
-        """Create tasks for the research crew"""
-        print("\n🛠️  Creating research task...")
-        research_task = Task(
+    def create_tasks(self) -> List['Task']:
+        """Create the tasks of the stages that have not completed yet
+        
+        A stage restored from a checkpoint is not run again; its output is
+        handed to the next task in the task description instead.
+        """
+        tasks = []
+        self.task_stages = []
+        
+        if 'research' in self.restored_outputs:
+            print("♻️  Research restored from checkpoint")
+        else:
+            print("\n🛠️  Creating research task...")
+            tasks.append(self._research_task())
+            self.task_stages.append('research')
+            print("✅ Research task created")
+        
+        if 'fact_check' in self.restored_outputs:
+            print("♻️  Fact-checking restored from checkpoint")
+        else:
+            print("\n🛠️  Creating fact-checking task...")
+            tasks.append(self._fact_check_task(tasks[-1:]))
+            self.task_stages.append('fact_check')
+            print("✅ Fact-checking task created")
+        
+        print("\n🛠️  Creating writing task...")
+        tasks.append(self._write_task(tasks[-1:]))
+        self.task_stages.append('writing')
+        print(f"✅ Writing task created. Output will be saved to: {self.output_file}")
+        
+        return tasks
+    
+    def _research_task(self) -> 'Task':
+        """Create the research task"""
+        from crewai import Task
+        
+        return Task(
             description=(
                 f'Research and gather detailed information about {self.topic}.\n'
                 'Focus on finding unique, interesting, and lesser-known facts.\n'
@@ -205,150 +490,342 @@ class ResearchCrew:
                 'The document should be well-structured and informative.'
             )
         )
-        print("✅ Research task created")
+    
+    def _fact_check_task(self, context: List['Task']) -> 'Task':
+        """Create the fact-checking task, reading restored research when there is no research task"""
+        from crewai import Task
+        from routing import FLAGGED_SECTION_INSTRUCTIONS
         
-        print("\n🛠️  Creating fact-checking task...")
-        fact_check_task = Task(
-            description=(
-                'Review the research findings and verify their accuracy.\n'
-                'Check facts against reliable sources and ensure all information is up-to-date.\n'
-                'Flag any information that cannot be verified.\n'
-                'Provide sources for your verifications when possible.'
-            ),
+        description = (
+            'Review the research findings and verify their accuracy.\n'
+            'Check facts against reliable sources and ensure all information is up-to-date.\n'
+            'Flag any information that cannot be verified.\n'
+            'Provide sources for your verifications when possible.'
+        )
+        if not context:
+            research = self.compactor.compact('research', self.restored_outputs['research'])
+            description += f"\n\nResearch findings:\n{research}"
+        return Task(
+            description=description,
             agent=self.fact_checker,
             expected_output=(
                 'A verified version of the research document with fact-checked '
                 'information and notes on verification status.\n'
-                'Include any corrections or additional context needed.'
+                'Include any corrections or additional context needed.\n'
+                + FLAGGED_SECTION_INSTRUCTIONS
             ),
-            context=[research_task]
+            context=context
         )
-        print("✅ Fact-checking task created")
+    
+    def _write_task(self, context: List['Task']) -> 'Task':
+        """Create the writing task, reading the restored fact-check when there is no fact-checking task"""
+        from crewai import Task
         
-        print("\n🛠️  Creating writing task...")
-        output_path = f'output/{self.topic.lower().replace(" ", "_")}_{self.timestamp}.md'
-        write_task = Task(
-            description=(
-                'Transform the verified research into a well-structured, '
-                'engaging article.\n'
-                'Use markdown formatting with clear headings and sections.\n'
-                'Ensure the content is accessible to a general audience.\n'
-                'Include an introduction, main content with subsections, and a conclusion.'
-            ),
+        description = (
+            'Transform the verified research into a well-structured, '
+            'engaging article.\n'
+            'Use markdown formatting with clear headings and sections.\n'
+            'Ensure the content is accessible to a general audience.\n'
+            'Include an introduction, main content with subsections, and a conclusion.'
+        )
+        if not context:
+            verified = self.compactor.compact('fact_check', self.restored_outputs['fact_check'])
+            description += f"\n\nVerified research:\n{verified}"
+        return Task(
+            description=description,
             agent=self.writer,
             expected_output=(
                 'A well-written article about the topic, formatted in markdown, '
                 'with proper sections, headings, and clear explanations.\n'
                 'The article should be informative, engaging, and well-structured.'
             ),
-            context=[fact_check_task],
-            output_file=output_path
+            context=context,
+            output_file=str(self.output_file)
         )
-        print(f"✅ Writing task created. Output will be saved to: {output_path}")
+    
+    def _prepare_crew(self) -> 'Crew':
+        """Create the tasks, progress callbacks and crew for a run"""
+        from crewai import Crew
         
-        return [research_task, fact_check_task, write_task]
+        # Create tasks with error handling
+        print("\n🛠️  Creating tasks...")
+        try:
+            tasks = self.create_tasks()
+            if not tasks or len(tasks) == 0:
+                raise ValueError("No tasks were created")
+            print(f"✅ Created {len(tasks)} tasks")
+        except Exception as e:
+            print(f"❌ Error creating tasks: {str(e)}")
+            raise
+        
+        # Initialize crew
+        print("\n🤖 Initializing crew...")
+        try:
+            # Tasks run in order, so each task output completes the running
+            # task and starts the next one
+            crew = Crew(
+                agents=[task.agent for task in tasks],
+                tasks=tasks,
+                verbose=True,
+                process='sequential',  # Changed from Process.SEQUENTIAL to string 'sequential'
+                task_callback=self._on_task_output,
+                step_callback=self._on_agent_step
+            )
+            print("✅ Crew initialized successfully")
+        except Exception as e:
+            print(f"❌ Error initializing crew: {str(e)}")
+            raise
+        
+        return crew
+    
+    def _log_kickoff_result(self, result) -> None:
+        """Log a summary of the raw crew output"""
+        print(f"\n✅ Research execution completed")
+        print(f"Result type: {type(result)}")
+        if result:
+            print(f"First 200 chars: {str(result)[:200]}...")
+        else:
+            print("⚠️ Warning: Empty result from crew.kickoff()")
+    
+    def _log_kickoff_error(self, crew: 'Crew', error: Exception) -> None:
+        """Log a crew execution error and any partial results"""
+        print(f"❌ Error during crew execution: {str(error)}")
+        # Try to get partial results if available
+        if hasattr(crew, 'intermediate_steps'):
+            print("\n🔍 Intermediate steps:")
+            for i, step in enumerate(crew.intermediate_steps or []):
+                print(f"  Step {i+1}: {str(step)[:200]}...")
+    
+    def _finalize(self, result) -> Dict:
+        """Write the crew output to the report file and build the result dict"""
+        # Ensure output directory exists
+        self.output_dir.mkdir(exist_ok=True)
+        
+        # Create output file
+        output_file = self.output_file
+        output_file_str = ""
+        
+        if not result:
+            print("⚠️ Warning: Empty result from crew.kickoff()")
+            result = "No content was generated. This might be due to an issue with the agents or task setup."
+        
+        try:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                f.write(str(result))
+            output_file_str = str(output_file)
+            print(f"📄 Output written to: {output_file}")
+        except Exception as e:
+            print(f"⚠️ Warning: Could not write to output file: {e}")
+            output_file_str = ""
+        
+        return {
+            'topic': self.topic,
+            'run_id': self.run_id,
+            'timestamp': self.timestamp,
+            'result': result,
+            'resumed_stages': list(self.restored_outputs),
+            'output_file': output_file_str,
+            'progress': self.get_progress(),
+            'compaction': self.compactor.summary(),
+            'routing': self.router.summary(),
+            'success': True
+        }
+    
+    def _finish_run(self, crew: Optional['Crew']):
+        """Stop the deadlines, flush and close the token stream, then publish the end of the run"""
+        self.cancellation.close()
+        if self.stream is not None:
+            # Outputs were compacted for the next stage; the stream gets the full text
+            outputs = dict(self.stage_outputs)
+            if crew is not None:
+                for task, task_name in zip(crew.tasks, self.task_stages):
+                    output = getattr(task, 'output', None)
+                    text = getattr(output, 'raw_output', None) or getattr(output, 'raw', None)
+                    if text:
+                        outputs.setdefault(task_name, text)
+            for task_name, text in outputs.items():
+                if text:
+                    self.stream.complete_stage(task_name, text)
+            self.stream.close()
+        
+        statuses = [task['status'] for task in self.task_progress.values()]
+        if all(status == 'completed' for status in statuses):
+            run_status = 'completed'
+        elif 'failed' in statuses:
+            run_status = 'failed'
+        elif 'cancelled' in statuses:
+            run_status = 'cancelled'
+        else:
+            run_status = 'pending'
+        self.events.publish(RUN_FINISHED, status=run_status)
+        self.events.close()
+    
+    def _index_result(self, result: Dict) -> None:
+        """Add a successfully written report to the report index"""
+        if result.get('success') and result.get('output_file'):
+            from report_index import index_report
+            
+            index_report(result['output_file'], self.topic, result['telemetry'])
     
     def run(self) -> Dict:
-        """Run the research crew and return results"""
+        """Run the research crew and return results
+        
+        Stops when cancel() is called or a deadline passes; the result then has
+        `success` False and `cancelled` True.
+        """
         print(f"\n{'='*50}\nStarting research on: {self.topic}\n{'='*50}")
+        crew = None
+        self.cancellation.start()
         try:
-            # Create tasks with error handling
-            print("\n🛠️  Creating tasks...")
-            try:
-                tasks = self.create_tasks()
-                if not tasks or len(tasks) == 0:
-                    raise ValueError("No tasks were created")
-                print(f"✅ Created {len(tasks)} tasks")
-            except Exception as e:
-                print(f"❌ Error creating tasks: {str(e)}")
-                raise
+            if 'writing' in self.restored_outputs:
+                # Every stage completed before; only the report file is rewritten
+                result = self.restored_outputs['writing']
+            else:
+                crew = self._prepare_crew()
+                
+                # Execute crew
+                print(f"\n🚀 Starting research execution...")
+                self._start_next_task()
+                try:
+                    result = crew.kickoff()
+                    self._log_kickoff_result(result)
+                except Exception as e:
+                    self._log_kickoff_error(crew, e)
+                    raise
             
-            # Set up task progress callbacks
-            print("\n🔄 Setting up task callbacks...")
-            try:
-                for i, task in enumerate(tasks):
-                    task_name = ['research', 'fact_check', 'writing'][i]
-                    print(f"  - Setting up callback for {task_name} task")
-                    task.callback = lambda status, task_name=task_name, i=i: [
-                        print(f"\n📡 Callback for {task_name} task: {status}"),
-                        self.update_progress(
-                            task_name,
-                            'in_progress' if status == 'start' else 'completed'
-                        )
-                    ][-1]
-            except Exception as e:
-                print(f"❌ Error setting up task callbacks: {str(e)}")
-                raise
+            result = self._finalize(result)
             
-            # Initialize crew
-            print("\n🤖 Initializing crew...")
-            try:
-                crew = Crew(
-                    agents=[self.researcher, self.fact_checker, self.writer],
-                    tasks=tasks,
-                    verbose=True,
-                    process='sequential'  # Changed from Process.SEQUENTIAL to string 'sequential'
-                )
-                print("✅ Crew initialized successfully")
-            except Exception as e:
-                print(f"❌ Error initializing crew: {str(e)}")
-                raise
-            
-            # Execute crew
-            print(f"\n🚀 Starting research execution...")
-            try:
-                result = crew.kickoff()
-                print(f"\n✅ Research execution completed")
-                print(f"Result type: {type(result)}")
-                if result:
-                    print(f"First 200 chars: {str(result)[:200]}...")
-                else:
-                    print("⚠️ Warning: Empty result from crew.kickoff()")
-            except Exception as e:
-                print(f"❌ Error during crew execution: {str(e)}")
-                # Try to get partial results if available
-                if hasattr(crew, 'intermediate_steps'):
-                    print("\n🔍 Intermediate steps:")
-                    for i, step in enumerate(crew.intermediate_steps or []):
-                        print(f"  Step {i+1}: {str(step)[:200]}...")
-                raise
-            
-            # Ensure output directory exists
-            self.output_dir.mkdir(exist_ok=True)
-            
-            # Create output file
-            output_file = self.output_dir / f"{self.topic.lower().replace(' ', '_')}_{self.timestamp}.md"
-            output_file_str = ""
+        except Exception as e:
+            if self.cancellation.cancelled:
+                # Aborted requests surface as connection or agent errors
+                result = self._cancelled_result()
+            else:
+                print(f"❌ Error in ResearchCrew.run(): {str(e)}")
+                self.fail_running_task()
+                result = {
+                    'topic': self.topic,
+                    'run_id': self.run_id,
+                    'error': str(e),
+                    'success': False
+                }
+        finally:
+            self._finish_run(crew)
+        
+        # Collected after the run has finished, so the totals are final
+        result['telemetry'] = self.telemetry.summary()
+        self._index_result(result)
+        return result
+    
+    async def run_async(self) -> Dict:
+        """Run the research crew on the event loop and return the same results as run()
+        
+        Cancelling the awaiting task marks unfinished tasks as cancelled and
+        re-raises asyncio.CancelledError.
+        """
+        print(f"\n{'='*50}\nStarting async research on: {self.topic}\n{'='*50}")
+        crew = None
+        self.cancellation.start()
+        try:
+            if 'writing' in self.restored_outputs:
+                # Every stage completed before; only the report file is rewritten
+                result = self.restored_outputs['writing']
+            else:
+                crew = self._prepare_crew()
+                
+                # Execute crew
+                print(f"\n🚀 Starting research execution...")
+                self._start_next_task()
+                try:
+                    if hasattr(crew, 'kickoff_async'):
+                        result = await crew.kickoff_async()
+                    else:
+                        # Older crewai releases only provide the blocking kickoff
+                        result = await asyncio.to_thread(crew.kickoff)
+                    self._log_kickoff_result(result)
+                except asyncio.CancelledError:
+                    print(f"🛑 Research on {self.topic} was cancelled")
+                    # Stops the crew's thread as well
+                    self.cancel("Run was cancelled")
+                    self.cancel_pending_tasks()
+                    raise
+                except Exception as e:
+                    self._log_kickoff_error(crew, e)
+                    raise
             
-            if not result:
-                print("⚠️ Warning: Empty result from crew.kickoff()")
-                result = "No content was generated. This might be due to an issue with the agents or task setup."
+            result = self._finalize(result)
             
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if self.cancellation.cancelled:
+                result = self._cancelled_result()
+            else:
+                print(f"❌ Error in ResearchCrew.run_async(): {str(e)}")
+                self.fail_running_task()
+                result = {
+                    'topic': self.topic,
+                    'run_id': self.run_id,
+                    'error': str(e),
+                    'success': False
+                }
+        finally:
+            self._finish_run(crew)
+        
+        result['telemetry'] = self.telemetry.summary()
+        self._index_result(result)
+        return result
+
+@st.cache_resource(show_spinner=False)
+def get_job_queue():
+    """Get the durable research job queue and start this process's worker, once per process
+    
+    Jobs run on the worker's threads rather than the script run, so they carry
+    on through reruns and reconnects. Jobs interrupted by a server restart are
+    requeued once their heartbeat times out.
+    
+    Returns:
+        Tuple of the JobQueue and the JobWorker
+    """
+    from config import JOB_QUEUE_CONCURRENCY
+    from job_queue import JobQueue, JobWorker, run_research_job
+    
+    def run_job(job, on_progress):
+        """Run a job with the app's crew and cache its report, whether or not anyone is watching"""
+        result = run_research_job(job, on_progress, crew_factory=ResearchCrew)
+        report_cache, _ = get_report_cache()
+        if report_cache is not None and result.get('success') and result.get('output_file'):
             try:
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    f.write(str(result))
-                output_file_str = str(output_file)
-                print(f"📄 Output written to: {output_file}")
+                report_cache.store(job['topic'], result['output_file'])
             except Exception as e:
-                print(f"⚠️ Warning: Could not write to output file: {e}")
-                output_file_str = ""
-            
-            return {
-                'topic': self.topic,
-                'timestamp': self.timestamp,
-                'result': result,
-                'output_file': output_file_str,
-                'progress': self.get_progress(),
-                'success': True
-            }
-            
+                print(f"⚠️ Warning: Could not cache report: {e}")
+        return result
+    
+    job_queue = JobQueue()
+    worker = JobWorker(job_queue, run_job=run_job, concurrency=JOB_QUEUE_CONCURRENCY)
+    return job_queue, worker.start()
+
+@st.cache_resource(show_spinner=False)
+def preload_research_dependencies() -> threading.Thread:
+    """Import the research stack in the background, once per process
+    
+    The page renders without crewai, langchain and chromadb; loading them
+    (and backfilling the report cache and index) while the user types keeps the first
+    research request from paying for it.
+    """
+    def preload():
+        try:
+            import crewai
+            import llm_pool
+            import streaming
+            from report_index import get_report_index
+            get_report_cache()
+            get_report_index()
         except Exception as e:
-            print(f"❌ Error in ResearchCrew.run(): {str(e)}")
-            return {
-                'topic': self.topic,
-                'error': str(e),
-                'success': False
-            }
+            print(f"⚠️ Warning: Could not preload research dependencies: {e}")
+    
+    thread = threading.Thread(target=preload, name='preload-research', daemon=True)
+    thread.start()
+    return thread
 
 def initialize_session_state():
     """Initialize session state variables"""
@@ -360,6 +837,24 @@ def initialize_session_state():
         st.session_state.research_in_progress = False
     if 'research_result' not in st.session_state:
         st.session_state.research_result = None
+    if 'active_jobs' not in st.session_state:
+        # Research jobs this session is waiting for, kept in the URL so a reconnect can reattach
+        st.session_state.active_jobs = st.query_params.get_all('job')
+
+def track_job(job_id: str):
+    """Remember a research job the session waits for"""
+    if job_id not in st.session_state.active_jobs:
+        st.session_state.active_jobs.append(job_id)
+    st.query_params['job'] = st.session_state.active_jobs
+
+def untrack_job(job_id: str):
+    """Forget a research job once its result has been shown"""
+    if job_id in st.session_state.active_jobs:
+        st.session_state.active_jobs.remove(job_id)
+    if st.session_state.active_jobs:
+        st.query_params['job'] = st.session_state.active_jobs
+    elif 'job' in st.query_params:
+        del st.query_params['job']
 
 def display_chat():
     """Display chat messages"""
@@ -373,67 +868,189 @@ def display_chat():
 def process_research(topic: str):
     """Process research request"""
     try:
-        # Initialize progress bar and status
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        def update_ui(progress_data):
-            """Update the UI with current progress"""
-            progress = progress_data.get('progress', 0)
-            current_task = progress_data.get('current_task', 'Starting...')
+        # Serve a previously generated report for the same (or a very similar) topic
+        report_cache, cache_warning = get_report_cache()
+        if cache_warning:
+            st.warning(cache_warning)
+        if report_cache is not None:
+            cached = report_cache.lookup(topic)
+            if cached:
+                st.session_state.research_result = cached
+                return f"# Research Complete: {topic}\n\n{cached['result']}"
+        
+        # Queue the research; the job keeps running whatever happens to this script run.
+        # An identical request already queued or running (e.g. another session clicking
+        # the same example) is joined instead of starting a second crew.
+        job_queue, worker = get_job_queue()
+        job_id = job_queue.submit(topic)
+        worker.wake()
+        track_job(job_id)
+        
+        return watch_job(job_id)
+    except Exception as e:
+        return f"❌ An error occurred during research: {str(e)}"
+
+def watch_job(job_id: str):
+    """Show a research job's progress and partial report until it finishes
+    
+    Works for jobs submitted by an earlier script run or session, so a
+    reconnecting browser picks up where it left off.
+    """
+    from job_queue import COMPLETED, CANCELLED, FINISHED_STATUSES
+    
+    job_queue, worker = get_job_queue()
+    job = job_queue.get(job_id)
+    if job is None:
+        untrack_job(job_id)
+        return f"❌ Research job {job_id} was not found"
+    topic = job['topic']
+    
+    # Clicking reruns the script, which reattaches here with the button set
+    if job['status'] not in FINISHED_STATUSES and st.button("🛑 Stop", key=f"stop_{job_id}"):
+        if job_queue.leave(job_id):
+            # The worker stops the crew and aborts its requests on its next poll
+            worker.wake()
+            job = job_queue.get(job_id)
+        else:
+            # Other requests share the job; it keeps running for them
+            untrack_job(job_id)
+            return f"🛑 Stopped following research on {topic}; it continues for other requests"
+    
+    if job['coalesced'] and job['status'] not in FINISHED_STATUSES:
+        st.caption(f"♻️ Joined research already in progress, shared by {job['coalesced'] + 1} requests")
+    
+    # Initialize progress bar and status
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    
+    def update_ui(progress_data):
+        """Update the UI with current progress"""
+        progress = progress_data.get('progress', 0)
+        current_task = progress_data.get('current_task', 'Starting...')
+        
+        # Update progress bar
+        progress_bar.progress(int(progress))
+        
+        # Update status text
+        task_descriptions = {
+            'research': '🔍 Researching information...',
+            'fact_check': '✅ Verifying facts...',
+            'writing': '✍️  Writing report...'
+        }
+        
+        if job['cancel_requested_at']:
+            status = '🛑 Stopping...'
+        else:
+            status = task_descriptions.get(
+                current_task, 'Waiting for a free worker...' if job['status'] == 'queued' else 'Starting research...'
+            )
+        status_text.markdown(f"""
+        **Progress:** {int(progress)}%  
+        **Status:** {status}
+        """)
+    
+    def job_progress(job_progress_data):
+        """Convert a job's task statuses to the progress shown in the UI"""
+        tasks = job_progress_data.get('tasks') or {}
+        completed = sum(1 for status in tasks.values() if status == 'completed')
+        return {
+            'progress': (completed / len(tasks) * 100) if tasks else 0,
+            'current_task': job_progress_data.get('current_task')
+        }
+    
+    def stream_report():
+        """Yield the partial report as the worker appends to it, redrawing the progress UI on changes
+        
+        Jobs run by this process are followed on their crew's event bus, waking
+        up only when a task or token arrives; jobs run by another process are
+        polled from the queue.
+        """
+        nonlocal job
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        offset = 0
+        last_progress = None
+        
+        def read_report(output_file):
+            """Decode what was appended to the partial report since the last read"""
+            nonlocal offset
+            if not output_file or not os.path.exists(output_file):
+                return ''
+            with open(output_file, 'rb') as f:
+                f.seek(offset)
+                chunk = f.read()
+            offset += len(chunk)
+            return decoder.decode(chunk) if chunk else ''
+        
+        while True:
+            job = job_queue.get(job_id)
+            progress = job['progress'] or {}
+            if progress != last_progress:
+                update_ui(job_progress(progress))
+                last_progress = progress
             
-            # Update progress bar
-            progress_bar.progress(int(progress))
+            text = read_report(progress.get('output_file'))
+            if text:
+                yield text
             
-            # Update status text
-            task_descriptions = {
-                'research': '🔍 Researching information...',
-                'fact_check': '✅ Verifying facts...',
-                'writing': '✍️  Writing report...'
-            }
+            if job['status'] in FINISHED_STATUSES:
+                return
             
-            status_text.markdown(f"""
-            **Progress:** {int(progress)}%  
-            **Status:** {task_descriptions.get(current_task, 'Starting research...')}
-            """)
-        
-        # Initialize crew and get initial progress
-        crew = ResearchCrew(topic)
-        update_ui(crew.get_progress())
-        
-        # Start research in a background thread
-        import threading
-        result = {}
-        
-        def run_crew():
-            nonlocal result
-            result = crew.run()
-            st.session_state.research_result = result
-        
-        thread = threading.Thread(target=run_crew)
-        thread.start()
-        
-        # Update UI while research is in progress
-        while thread.is_alive():
-            update_ui(crew.get_progress())
-            time.sleep(0.5)
-        
-        # Final update
-        update_ui({'progress': 100, 'current_task': 'completed'})
-        
-        # Read and return the research result
-        output_file = result.get('output_file', '')
-        if output_file and os.path.exists(output_file):
-            try:
-                with open(output_file, 'r', encoding='utf-8') as f:
-                    return f"# Research Complete: {topic}\n\n{f.read()}"
-            except Exception as e:
-                return f"❌ Error reading research results: {str(e)}"
-        else:
-            # If no file was created, return the result directly
-            return f"# Research Complete: {topic}\n\n{result.get('result', 'No content was generated.')}"
-    except Exception as e:
-        return f"❌ An error occurred during research: {str(e)}"
+            events = worker.events(job_id, timeout=JOB_WATCH_INTERVAL)
+            if events is None:
+                continue
+            
+            # The job's first progress is recorded before its crew is handed out
+            progress = job_queue.get(job_id)['progress'] or {}
+            tasks = dict(progress.get('tasks') or {})
+            current_task = progress.get('current_task')
+            output_file = progress.get('output_file')
+            for event in events.events():
+                if event['type'] == TASK_STARTED:
+                    tasks[event['task']] = 'in_progress'
+                    current_task = event['task']
+                elif event['type'] == TASK_FINISHED:
+                    tasks[event['task']] = event['status']
+                    if current_task == event['task']:
+                        current_task = None
+                if event['type'] in (TASK_STARTED, TASK_FINISHED):
+                    update_ui(job_progress({'tasks': tasks, 'current_task': current_task}))
+                
+                # Streamed tokens are appended to the report file before they are published
+                text = read_report(output_file)
+                if text:
+                    yield text
+            
+            # The bus closes when the crew finishes; the worker records the outcome right after
+            worker.wait(job_id, timeout=JOB_WATCH_INTERVAL)
+    
+    # Render the report incrementally while research is in progress
+    with st.chat_message("assistant"):
+        st.write_stream(stream_report())
+    
+    untrack_job(job_id)
+    
+    if job['status'] == CANCELLED:
+        return f"🛑 Research on {topic} was stopped: {job['error'] or 'Cancelled'}"
+    if job['status'] != COMPLETED:
+        return f"❌ An error occurred during research: {job['error']}"
+    
+    result = job['result']
+    st.session_state.research_result = result
+    
+    # Final update
+    update_ui({'progress': 100, 'current_task': 'completed'})
+    
+    # Read and return the research result
+    output_file = result.get('output_file', '')
+    if output_file and os.path.exists(output_file):
+        try:
+            with open(output_file, 'r', encoding='utf-8') as f:
+                return f"# Research Complete: {topic}\n\n{f.read()}"
+        except Exception as e:
+            return f"❌ Error reading research results: {str(e)}"
+    else:
+        # If no file was created, return the result directly
+        return f"# Research Complete: {topic}\n\n{result.get('result', 'No content was generated.')}"
 
 def main():
     """Main function to run the enhanced Crew AI application"""
@@ -483,6 +1100,15 @@ def main():
                 response = process_research(example)
                 st.session_state.messages.append({"role": "assistant", "content": response})
                 st.rerun()
+    
+    # Reattach to jobs left running by an interrupted script run, a reconnect or a restart
+    if st.session_state.active_jobs:
+        response = watch_job(st.session_state.active_jobs[0])
+        st.session_state.messages.append({"role": "assistant", "content": response})
+        st.rerun()
+    
+    # The page is on screen; warm up the imports the first research run needs
+    preload_research_dependencies()
 
 if __name__ == '__main__':
     if not st.session_state.get('show_results', False):
@@ -0,0 +1,382 @@
+"""Shared embedding service with a persistent, content-addressed vector cache.
+
+Everything the app embeds (report topics, claims, document chunks) goes
+through `EmbeddingService.embed()`:
+
+    1. Texts are hashed; duplicates within a request are embedded once.
+    2. Hashes are looked up in the `EmbeddingStore`: a SQLite index from hash
+       to row, and a memory-mapped float16 array holding the vectors. Only
+       the rows that are read are paged in, never the whole store.
+    3. Misses from concurrent callers are merged into shared batches of
+       `EMBEDDING_BATCH_SIZE` texts, encoded with the sentence-transformers
+       model (loaded on the first miss only) and appended to the store.
+
+Vectors are returned as float32 after a round trip through float16, so a
+cached vector is identical to a freshly encoded one.
+
+Usage:
+    python embeddings.py    # print the cache statistics
+"""
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import (
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_BATCH_WAIT_SECONDS,
+    EMBEDDING_CACHE_DIR,
+    EMBEDDING_INITIAL_CAPACITY,
+    EMBEDDING_MODEL,
+)
+
+# SQLite's default limit on the number of parameters of one statement
+_MAX_SQL_PARAMETERS = 900
+
+
+def content_hash(text: str) -> bytes:
+    """Key of a text in the store (128 bits of its SHA-256)."""
+    return hashlib.sha256(text.encode('utf-8')).digest()[:16]
+
+
+class EmbeddingStore:
+    """Vectors keyed by content hash, in a memory-mapped float16 file with a SQLite hash index.
+
+    Several processes can share a store: rows are allocated inside a SQLite
+    write transaction, and a process remaps the file when another one grew it.
+    """
+
+    def __init__(self, directory: Path, initial_capacity: int = EMBEDDING_INITIAL_CAPACITY):
+        """Open (or create) a store.
+
+        Args:
+            directory: Directory holding `index.sqlite3` and `vectors.f16`
+            initial_capacity: Number of vectors the file is first sized for
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(exist_ok=True, parents=True)
+        self.vectors_path = self.directory / 'vectors.f16'
+        self.initial_capacity = initial_capacity
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.directory / 'index.sqlite3'), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS vectors (hash BLOB PRIMARY KEY, row INTEGER NOT NULL) WITHOUT ROWID'
+        )
+        self._vectors: Optional[np.memmap] = None
+
+    def _meta(self) -> Dict[str, int]:
+        """Get the dimension, row count and capacity of the store."""
+        return dict(self._conn.execute('SELECT key, value FROM meta').fetchall())
+
+    def _mapped(self, dim: int, capacity: int) -> np.memmap:
+        """Get the vector file mapped with at least `capacity` rows."""
+        if self._vectors is None or self._vectors.shape != (capacity, dim):
+            if self._vectors is not None:
+                self._vectors.flush()
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float16, mode='r+', shape=(capacity, dim))
+        return self._vectors
+
+    @property
+    def dim(self) -> Optional[int]:
+        """Dimension of the stored vectors; None while the store is empty."""
+        with self._lock:
+            return self._meta().get('dim')
+
+    def get_many(self, hashes: Sequence[bytes]) -> Dict[bytes, np.ndarray]:
+        """Look up vectors by content hash.
+
+        Args:
+            hashes: Content hashes (`content_hash()`)
+
+        Returns:
+            Dict[bytes, np.ndarray]: float32 vectors of the hashes found
+        """
+        if not hashes:
+            return {}
+        with self._lock:
+            rows: List[Tuple[bytes, int]] = []
+            for start in range(0, len(hashes), _MAX_SQL_PARAMETERS):
+                part = list(hashes[start:start + _MAX_SQL_PARAMETERS])
+                rows.extend(self._conn.execute(
+                    f"SELECT hash, row FROM vectors WHERE hash IN ({','.join('?' * len(part))})", part
+                ).fetchall())
+            if not rows:
+                return {}
+            meta = self._meta()
+            vectors = self._mapped(meta['dim'], meta['capacity'])
+            # Reading rows in file order touches each page once
+            rows.sort(key=lambda entry: entry[1])
+            found = np.asarray(vectors[[row for _, row in rows]], dtype=np.float32)
+        return {bytes(key): vector for (key, _), vector in zip(rows, found)}
+
+    def put_many(self, items: Dict[bytes, np.ndarray]) -> int:
+        """Append vectors that are not stored yet.
+
+        Args:
+            items: Vectors by content hash; all must have the same dimension
+
+        Returns:
+            int: Number of vectors added
+        """
+        if not items:
+            return 0
+        dim = len(next(iter(items.values())))
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so concurrent writers never get the same rows
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                meta = self._meta()
+                if meta.get('dim', dim) != dim:
+                    raise ValueError(f"Store holds {meta['dim']}-dimensional vectors, got {dim}")
+                keys = list(items)
+                existing = set()
+                for start in range(0, len(keys), _MAX_SQL_PARAMETERS):
+                    part = keys[start:start + _MAX_SQL_PARAMETERS]
+                    existing.update(bytes(row[0]) for row in self._conn.execute(
+                        f"SELECT hash FROM vectors WHERE hash IN ({','.join('?' * len(part))})", part
+                    ))
+                new = [key for key in keys if key not in existing]
+                if not new:
+                    self._conn.execute('COMMIT')
+                    return 0
+
+                rows = meta.get('rows', 0)
+                capacity = meta.get('capacity', 0)
+                if rows + len(new) > capacity:
+                    capacity = max(capacity * 2, self.initial_capacity, rows + len(new))
+                    with open(self.vectors_path, 'ab') as f:
+                        f.truncate(capacity * dim * 2)
+                vectors = self._mapped(dim, capacity)
+                vectors[rows:rows + len(new)] = np.stack([items[key] for key in new]).astype(np.float16)
+                vectors.flush()
+
+                self._conn.executemany(
+                    'INSERT INTO vectors (hash, row) VALUES (?, ?)',
+                    [(key, rows + offset) for offset, key in enumerate(new)]
+                )
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                    [('dim', dim), ('rows', rows + len(new)), ('capacity', capacity)]
+                )
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+        return len(new)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the number of vectors and the store's size on disk and in memory."""
+        with self._lock:
+            meta = self._meta()
+        dim, rows, capacity = meta.get('dim', 0), meta.get('rows', 0), meta.get('capacity', 0)
+        return {
+            'vectors': rows,
+            'dim': dim,
+            'bytes': rows * dim * 2,
+            'float32_bytes': rows * dim * 4,
+            'file_bytes': self.vectors_path.stat().st_size if self.vectors_path.exists() else 0,
+            'mapped_bytes': capacity * dim * 2 if self._vectors is not None else 0,
+        }
+
+
+def _sentence_transformer_encoder(model_name: str) -> Callable[[List[str]], np.ndarray]:
+    """Load a sentence-transformers model and return its encode function."""
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name)
+
+    def encode(texts: List[str]) -> np.ndarray:
+        return model.encode(texts, batch_size=len(texts), normalize_embeddings=True, convert_to_numpy=True)
+
+    return encode
+
+
+class EmbeddingService:
+    """Embeds texts through a content-hash cache, batching the misses of concurrent callers."""
+
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_MODEL,
+        store: Optional[EmbeddingStore] = None,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        batch_wait_seconds: float = EMBEDDING_BATCH_WAIT_SECONDS,
+        encoder: Optional[Callable[[List[str]], np.ndarray]] = None
+    ):
+        """Initialize the service.
+
+        Args:
+            model_name: sentence-transformers model; each model has its own store
+            store: Vector store; defaults to one under `EMBEDDING_CACHE_DIR`
+            batch_size: Maximum number of texts per encode call
+            batch_wait_seconds: How long a miss waits for concurrent misses
+                to join its batch
+            encoder: Function encoding a batch of texts; defaults to the
+                sentence-transformers model, loaded on the first miss
+        """
+        self.model_name = model_name
+        self.store = store or EmbeddingStore(EMBEDDING_CACHE_DIR / re.sub(r'[^\w.-]+', '_', model_name))
+        self.batch_size = batch_size
+        self.batch_wait_seconds = batch_wait_seconds
+        self._encoder = encoder
+
+        self._condition = threading.Condition()
+        self._pending: List[Tuple[Dict[bytes, str], Future]] = []
+        self._worker: Optional[threading.Thread] = None
+
+        self._stats_lock = threading.Lock()
+        self.requested = 0
+        self.hits = 0
+        self.encoded = 0
+        self.encode_batches = 0
+        self.encode_seconds = 0.0
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts, encoding only those not embedded before.
+
+        Args:
+            texts: The texts to embed
+
+        Returns:
+            np.ndarray: float32 array of shape (len(texts), dim)
+        """
+        hashes = [content_hash(text) for text in texts]
+        unique = dict(zip(hashes, texts))
+        vectors = self.store.get_many(list(unique))
+        missing = {key: text for key, text in unique.items() if key not in vectors}
+        if missing:
+            vectors.update(self._encode(missing))
+
+        with self._stats_lock:
+            self.requested += len(texts)
+            self.hits += len(texts) - len(missing)
+        if not texts:
+            return np.zeros((0, self.store.dim or 0), dtype=np.float32)
+        return np.stack([vectors[key] for key in hashes])
+
+    def _encode(self, texts: Dict[bytes, str]) -> Dict[bytes, np.ndarray]:
+        """Queue texts for the batch encoder and wait for their vectors."""
+        future: Future = Future()
+        with self._condition:
+            self._pending.append((texts, future))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='embedding-batcher', daemon=True)
+                self._worker.start()
+            self._condition.notify()
+        return future.result()
+
+    def _run(self) -> None:
+        """Batch encoder: merges pending requests, encodes them and stores the vectors."""
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+            # Give concurrent callers a moment to add their texts to this batch
+            time.sleep(self.batch_wait_seconds)
+            with self._condition:
+                requests, self._pending = self._pending, []
+
+            try:
+                texts: Dict[bytes, str] = {}
+                for request, _ in requests:
+                    texts.update(request)
+                vectors = self._encode_batches(texts)
+                self.store.put_many(vectors)
+            except Exception as e:
+                for _, future in requests:
+                    future.set_exception(e)
+                continue
+            for request, future in requests:
+                future.set_result({key: vectors[key] for key in request})
+
+    def _encode_batches(self, texts: Dict[bytes, str]) -> Dict[bytes, np.ndarray]:
+        """Encode texts in batches of `batch_size`, rounded to the stored float16 precision."""
+        if self._encoder is None:
+            self._encoder = _sentence_transformer_encoder(self.model_name)
+
+        keys = list(texts)
+        vectors: Dict[bytes, np.ndarray] = {}
+        for start in range(0, len(keys), self.batch_size):
+            batch = keys[start:start + self.batch_size]
+            began = time.perf_counter()
+            encoded = np.asarray(self._encoder([texts[key] for key in batch]), dtype=np.float32)
+            elapsed = time.perf_counter() - began
+            for key, vector in zip(batch, encoded.astype(np.float16).astype(np.float32)):
+                vectors[key] = vector
+            with self._stats_lock:
+                self.encoded += len(batch)
+                self.encode_batches += 1
+                self.encode_seconds += elapsed
+        return vectors
+
+    def require_encoder(self) -> None:
+        """Raise ImportError now, rather than at the first miss, when sentence-transformers is missing."""
+        if self._encoder is None:
+            import sentence_transformers  # noqa: F401
+
+    def chroma_function(self) -> 'ChromaEmbeddingFunction':
+        """Get a ChromaDB embedding function backed by this service."""
+        self.require_encoder()
+        return ChromaEmbeddingFunction(self)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the encode batch sizes, cache hit rate and memory footprint of the service."""
+        with self._stats_lock:
+            requested, hits = self.requested, self.hits
+            encoded, batches, seconds = self.encoded, self.encode_batches, self.encode_seconds
+        return {
+            'model': self.model_name,
+            'batch_size': self.batch_size,
+            'requested': requested,
+            'hits': hits,
+            'hit_rate': hits / requested if requested else 0.0,
+            'encoded': encoded,
+            'encode_batches': batches,
+            'mean_encode_batch': encoded / batches if batches else 0.0,
+            'encode_seconds': round(seconds, 3),
+            'store': self.store.stats(),
+        }
+
+
+class ChromaEmbeddingFunction:
+    """ChromaDB embedding function delegating to an `EmbeddingService`."""
+
+    def __init__(self, service: EmbeddingService):
+        self.service = service
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        return self.service.embed(list(input)).tolist()
+
+
+_embedding_service: Optional[EmbeddingService] = None
+_embedding_service_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Get the process-wide embedding service for `EMBEDDING_MODEL`."""
+    global _embedding_service
+    with _embedding_service_lock:
+        if _embedding_service is None:
+            _embedding_service = EmbeddingService()
+        return _embedding_service
+
+
+def main():
+    service = EmbeddingService()
+    print(json.dumps(service.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
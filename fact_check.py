@@ -0,0 +1,201 @@
+"""Claim-level fact-checking fanned out over a bounded pool of fact-checker calls."""
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from cancellation import RunCancelled
+from config import FACT_CHECK_CONCURRENCY, FACT_CHECK_MAX_CLAIMS
+from pipeline import run_task
+from tasks import ResearchTasks
+
+# Claims shorter than this are headings, labels or fragments rather than facts
+MIN_CLAIM_WORDS = 6
+
+VERDICTS = ('VERIFIED', 'INCORRECT', 'UNVERIFIABLE')
+
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+(?=["“(\[]?[A-Z0-9])')
+_LIST_PREFIX = re.compile(r'^\s*(?:\d+[.)]|[-*•>])\s*')
+_VERDICT = re.compile(r'VERDICT:\s*\**\s*(VERIFIED|INCORRECT|UNVERIFIABLE)', re.IGNORECASE)
+_NOTES = re.compile(r'NOTES:\s*(.+)', re.IGNORECASE | re.DOTALL)
+
+
+def split_claims(text: str, max_claims: int = FACT_CHECK_MAX_CLAIMS) -> List[str]:
+    """Split a research document into discrete, checkable claims.
+
+    Args:
+        text: The research document
+        max_claims: Maximum number of claims to return
+
+    Returns:
+        List[str]: Unique claims in document order
+    """
+    claims = []
+    for line in text.splitlines():
+        line = _LIST_PREFIX.sub('', line).strip()
+        if not line or line.startswith('#') or line.endswith(':'):
+            continue
+
+        for sentence in _SENTENCE_BOUNDARY.split(line):
+            sentence = sentence.strip().strip('*').strip()
+            if len(sentence.split()) >= MIN_CLAIM_WORDS and sentence not in claims:
+                claims.append(sentence)
+                if len(claims) >= max_claims:
+                    return claims
+    return claims
+
+
+def parse_verdict(text: str) -> Dict[str, str]:
+    """Parse a fact-checker answer into a verdict and notes.
+
+    Args:
+        text: The fact-checker's answer
+
+    Returns:
+        Dict[str, str]: `verdict` (one of VERDICTS, or UNCLEAR) and `notes`
+    """
+    verdict = _VERDICT.search(text)
+    notes = _NOTES.search(text)
+    return {
+        'verdict': verdict.group(1).upper() if verdict else 'UNCLEAR',
+        'notes': (notes.group(1) if notes else text).strip(),
+    }
+
+
+def merge_verdicts(verdicts: List[Dict[str, Any]]) -> str:
+    """Merge per-claim verdicts into one annotated research document."""
+    lines = []
+    for verdict in verdicts:
+        lines.append(f"- {verdict['claim']}")
+        lines.append(f"  - Verdict: {verdict['verdict']}")
+        if verdict['notes']:
+            lines.append(f"  - Notes: {verdict['notes']}")
+    return '\n'.join(lines)
+
+
+class ClaimFactChecker:
+    """Verify research claim by claim with concurrent fact-checker calls."""
+
+    def __init__(
+        self,
+        tasks: ResearchTasks,
+        create_fact_checker: Callable[[], Any],
+        concurrency: int = FACT_CHECK_CONCURRENCY,
+        max_claims: int = FACT_CHECK_MAX_CLAIMS,
+        on_claim: Optional[Callable[[Dict[str, Any]], None]] = None,
+        cache: Optional[Any] = None
+    ):
+        """Initialize the fact checker.
+
+        Args:
+            tasks: Task factory for the research topic
+            create_fact_checker: Factory returning a fresh fact-checker agent;
+                each concurrent call gets its own agent because crewai agents
+                keep per-execution state
+            concurrency: Maximum number of claims verified at the same time
+            max_claims: Maximum number of claims extracted from the research
+            on_claim: Optional callback receiving each verdict as it completes
+            cache: Optional `ClaimCache`; claims with a fresh cached verdict
+                are not sent to the fact-checker, and new verdicts are stored
+        """
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+
+        self.tasks = tasks
+        self.create_fact_checker = create_fact_checker
+        self.concurrency = concurrency
+        self.max_claims = max_claims
+        self.on_claim = on_claim or (lambda verdict: None)
+        self.cache = cache
+
+    def _verify_claim(self, claim: str) -> Dict[str, Any]:
+        """Verify one claim and time the call.
+
+        A failing call does not fail the other claims: the claim is marked
+        UNVERIFIABLE with the error, which keeps it out of the claim cache.
+        """
+        start = time.time()
+        try:
+            agent = self.create_fact_checker()
+            answer = run_task(agent, self.tasks.claim_fact_check_task(agent, claim))
+            verdict = {'claim': claim, **parse_verdict(answer)}
+        except RunCancelled:
+            raise
+        except Exception as e:
+            print(f"⚠️ Warning: Could not fact-check claim '{claim[:60]}': {e}")
+            verdict = {
+                'claim': claim,
+                'verdict': 'UNVERIFIABLE',
+                'notes': f"Fact check failed: {e}",
+                'error': str(e),
+            }
+        verdict['latency_seconds'] = round(time.time() - start, 3)
+        self.on_claim(verdict)
+        return verdict
+
+    def verify(self, research: str) -> Dict[str, Any]:
+        """Fact-check a research document claim by claim.
+
+        Args:
+            research: The research document to verify
+
+        Returns:
+            Dict[str, Any]: The annotated `document` for the writer, the per-claim
+            `claims` verdicts with latencies, summary counts (including the
+            claims whose check `failed`) and the claim `cache` hits and
+            misses of this run
+        """
+        start = time.time()
+        claims = split_claims(research, self.max_claims)
+
+        cached = self._lookup(claims)
+        for verdict in cached:
+            if verdict is not None:
+                self.on_claim(verdict)
+        unchecked = [claim for claim, verdict in zip(claims, cached) if verdict is None]
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            checked = iter(list(executor.map(self._verify_claim, unchecked)))
+        verdicts = [verdict if verdict is not None else next(checked) for verdict in cached]
+        self._store(verdicts)
+
+        latencies = [verdict['latency_seconds'] for verdict in verdicts if not verdict.get('cached')]
+        hits = len(claims) - len(unchecked)
+        return {
+            # Without checkable claims the writer falls back to the unannotated research
+            'document': merge_verdicts(verdicts) if verdicts else research,
+            'claims': verdicts,
+            'verdict_counts': {
+                verdict: sum(1 for v in verdicts if v['verdict'] == verdict)
+                for verdict in VERDICTS + ('UNCLEAR',)
+            },
+            'failed': sum(1 for verdict in verdicts if verdict.get('error')),
+            'concurrency': self.concurrency,
+            'wall_time_seconds': round(time.time() - start, 3),
+            'latency_max_seconds': max(latencies) if latencies else 0.0,
+            'cache': {
+                'hits': hits,
+                'misses': len(unchecked),
+                'hit_rate': hits / len(claims) if claims else 0.0,
+                'totals': self.cache.stats() if self.cache is not None else None,
+            },
+        }
+
+    def _lookup(self, claims: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Find cached verdicts of the claims; a failing cache only costs the LLM calls it would save."""
+        if self.cache is None or not claims:
+            return [None] * len(claims)
+        try:
+            return self.cache.lookup_many(claims)
+        except Exception as e:
+            print(f"⚠️ Warning: Claim cache lookup failed: {e}")
+            return [None] * len(claims)
+
+    def _store(self, verdicts: List[Dict[str, Any]]) -> None:
+        """Store the fresh verdicts in the cache."""
+        if self.cache is None:
+            return
+        try:
+            self.cache.store_many(verdicts, topic=self.tasks.topic)
+        except Exception as e:
+            print(f"⚠️ Warning: Could not store verdicts in the claim cache: {e}")
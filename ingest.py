@@ -0,0 +1,463 @@
+"""Ingestion of local PDF and Markdown documents into a searchable vector index.
+
+Files are parsed and split into overlapping chunks in a pool of worker
+processes, the chunks are embedded in large batches and written to a ChromaDB
+collection in the local store. A manifest keeps the content hash of every
+ingested file, so re-running the ingestion only re-reads files that changed
+and drops the chunks of files that were deleted.
+
+The researcher gets a `search_local_documents` tool over the index once it
+holds any chunks; its HNSW index answers queries in milliseconds even for
+hundreds of thousands of chunks.
+
+Usage:
+    python ingest.py ingest                 # everything under CORPUS_DIR
+    python ingest.py ingest papers/ notes.md
+    python ingest.py search "battery recycling rates"
+    python ingest.py stats
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from config import (
+    CORPUS_COLLECTION,
+    CORPUS_DIR,
+    CORPUS_MANIFEST_PATH,
+    INGEST_CHUNK_OVERLAP_WORDS,
+    INGEST_CHUNK_WORDS,
+    INGEST_EMBED_BATCH_SIZE,
+    INGEST_WORKERS,
+    RETRIEVAL_ENABLED,
+    RETRIEVAL_TOP_K,
+)
+
+DOCUMENT_SUFFIXES = ('.pdf', '.md', '.markdown')
+
+_HEADING = re.compile(r'^\s*#{1,6}\s+(.+?)\s*#*\s*$')
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+
+def file_hash(path: Path) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_text(text: str, chunk_words: int = INGEST_CHUNK_WORDS,
+               overlap_words: int = INGEST_CHUNK_OVERLAP_WORDS) -> List[str]:
+    """Split text into chunks of about `chunk_words` words along paragraph boundaries.
+
+    Consecutive chunks share their last `overlap_words` words, so a passage cut
+    by a boundary is still found whole in one of them.
+
+    Args:
+        text: The text to split
+        chunk_words: Target number of words per chunk
+        overlap_words: Words repeated at the start of the next chunk
+
+    Returns:
+        List[str]: The chunks, in document order
+    """
+    if not 0 <= overlap_words < chunk_words:
+        raise ValueError("The overlap must be smaller than the chunk size")
+
+    chunks: List[str] = []
+    current: List[str] = []
+    fresh = 0  # words of `current` not yet part of an emitted chunk
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        words = paragraph.split()
+        while words:
+            room = chunk_words - len(current)
+            # Start a new chunk rather than splitting a paragraph that fits in one
+            if fresh and (room <= 0 or room < len(words) <= chunk_words - overlap_words):
+                chunks.append(' '.join(current))
+                current = current[-overlap_words:] if overlap_words else []
+                fresh = 0
+                continue
+            current.extend(words[:room])
+            fresh += len(words[:room])
+            words = words[room:]
+    if fresh:
+        chunks.append(' '.join(current))
+    return chunks
+
+
+def _read_sections(path: Path) -> List[Dict[str, Any]]:
+    """Read a document as sections: one per PDF page, or per Markdown heading."""
+    if path.suffix.lower() == '.pdf':
+        from pypdf import PdfReader
+
+        reader = PdfReader(str(path))
+        return [
+            {'text': page.extract_text() or '', 'page': number, 'heading': ''}
+            for number, page in enumerate(reader.pages, start=1)
+        ]
+
+    sections = [{'text': '', 'page': 0, 'heading': ''}]
+    for line in path.read_text(encoding='utf-8', errors='replace').splitlines():
+        heading = _HEADING.match(line)
+        if heading:
+            sections.append({'text': '', 'page': 0, 'heading': heading.group(1)})
+        else:
+            sections[-1]['text'] += line + '\n'
+    return [section for section in sections if section['text'].strip()]
+
+
+def load_document(path: str, chunk_words: int = INGEST_CHUNK_WORDS,
+                  overlap_words: int = INGEST_CHUNK_OVERLAP_WORDS) -> Dict[str, Any]:
+    """Parse and chunk one file; runs in the worker processes.
+
+    Args:
+        path: The file
+        chunk_words: Target number of words per chunk
+        overlap_words: Words shared by consecutive chunks
+
+    Returns:
+        Dict[str, Any]: `path`, the `chunks` (each with `text`, `page` and
+        `heading`) and the `error` if the file could not be read
+    """
+    result: Dict[str, Any] = {'path': path, 'chunks': [], 'error': None}
+    try:
+        for section in _read_sections(Path(path)):
+            for text in chunk_text(section['text'], chunk_words, overlap_words):
+                result['chunks'].append({'text': text, 'page': section['page'], 'heading': section['heading']})
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def find_documents(paths: Iterable[Path]) -> List[Path]:
+    """Expand files and directories into the PDF and Markdown files under them."""
+    documents = set()
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            documents.update(
+                file for file in path.rglob('*')
+                if file.is_file() and file.suffix.lower() in DOCUMENT_SUFFIXES
+            )
+        elif path.is_file() and path.suffix.lower() in DOCUMENT_SUFFIXES:
+            documents.add(path)
+    return sorted(file.resolve() for file in documents)
+
+
+class CorpusIndex:
+    """Vector index of chunks of local documents, kept in sync with the files incrementally."""
+
+    def __init__(
+        self,
+        client,
+        collection_name: str = CORPUS_COLLECTION,
+        manifest_path: Path = CORPUS_MANIFEST_PATH,
+        embed: Optional[Callable[[List[str]], List[List[float]]]] = None,
+        batch_size: int = INGEST_EMBED_BATCH_SIZE,
+    ):
+        """Initialize the index on top of an existing Chroma client.
+
+        Args:
+            client: A `chromadb` client (e.g. `chromadb.PersistentClient`)
+            collection_name: Name of the collection holding the chunks
+            manifest_path: JSON file recording the hash of every ingested file
+            embed: Function embedding a batch of texts; defaults to the
+                shared embedding service, so unchanged chunks are not encoded again
+            batch_size: Number of chunks embedded and written at once
+        """
+        self.collection = client.get_or_create_collection(
+            name=collection_name,
+            metadata={'hnsw:space': 'cosine'}
+        )
+        self.manifest_path = Path(manifest_path)
+        self.batch_size = batch_size
+        self._embed = embed
+        # Chroma rejects writes larger than the client's maximum batch size
+        self._write_batch_size = min(batch_size, getattr(client, 'max_batch_size', batch_size) or batch_size)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts."""
+        if self._embed is None:
+            from embeddings import get_embedding_service
+            return get_embedding_service().embed(texts).tolist()
+        return self._embed(texts)
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Get the recorded hash and chunk count of every ingested file."""
+        try:
+            return json.loads(self.manifest_path.read_text(encoding='utf-8'))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_manifest(self, manifest: Dict[str, Dict[str, Any]]) -> None:
+        """Store the manifest under a temporary name and rename it into place."""
+        self.manifest_path.parent.mkdir(exist_ok=True, parents=True)
+        tmp_path = self.manifest_path.with_name(f".{self.manifest_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+        os.replace(tmp_path, self.manifest_path)
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        """Embed a batch of chunks and add them to the collection."""
+        embeddings = self.embed([chunk['text'] for chunk in batch])
+        for start in range(0, len(batch), self._write_batch_size):
+            part = slice(start, start + self._write_batch_size)
+            self.collection.upsert(
+                ids=[chunk['id'] for chunk in batch[part]],
+                embeddings=embeddings[part],
+                documents=[chunk['text'] for chunk in batch[part]],
+                metadatas=[chunk['metadata'] for chunk in batch[part]]
+            )
+
+    def ingest(self, paths: Optional[Iterable[Path]] = None, workers: Optional[int] = INGEST_WORKERS) -> Dict[str, Any]:
+        """Bring the index up to date with the documents under `paths`.
+
+        Unchanged files (same content hash) are skipped; changed files have
+        their chunks replaced; files that disappeared from under the given
+        directories have their chunks removed.
+
+        Args:
+            paths: Files and directories to ingest; defaults to `CORPUS_DIR`
+            workers: Processes parsing files; None for one per CPU core
+
+        Returns:
+            Dict[str, Any]: Counts of `added`, `updated`, `unchanged`,
+            `removed` and `failed` files, `chunks` written and `seconds` taken
+        """
+        start = time.perf_counter()
+        roots = [Path(path).resolve() for path in (paths or [CORPUS_DIR])]
+        documents = find_documents(roots)
+        manifest = self._load_manifest()
+        stats = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0, 'failed': 0, 'chunks': 0, 'errors': {}}
+
+        present = {str(document) for document in documents}
+        for path in list(manifest):
+            under_root = any(Path(path) == root or root in Path(path).parents for root in roots)
+            if under_root and path not in present:
+                self.collection.delete(where={'source': path})
+                del manifest[path]
+                stats['removed'] += 1
+
+        # Hashing is cheap next to parsing, so only changed files are sent to the workers
+        hashes = {}
+        for document in documents:
+            path = str(document)
+            try:
+                hashes[path] = file_hash(document)
+            except OSError as e:
+                stats['failed'] += 1
+                stats['errors'][path] = f"{type(e).__name__}: {e}"
+                continue
+            if manifest.get(path, {}).get('sha256') == hashes[path]:
+                stats['unchanged'] += 1
+        changed = [path for path, sha256 in hashes.items() if manifest.get(path, {}).get('sha256') != sha256]
+
+        workers = workers or os.cpu_count() or 1
+        batch: List[Dict[str, Any]] = []
+
+        def handle(result: Dict[str, Any]) -> None:
+            path = result['path']
+            if result['error']:
+                stats['failed'] += 1
+                stats['errors'][path] = result['error']
+                return
+
+            stats['updated' if path in manifest else 'added'] += 1
+            if path in manifest:
+                self.collection.delete(where={'source': path})
+            source_id = hashlib.sha1(path.encode('utf-8')).hexdigest()[:16]
+            for index, chunk in enumerate(result['chunks']):
+                batch.append({
+                    'id': f"{source_id}:{index}",
+                    'text': chunk['text'],
+                    'metadata': {'source': path, 'page': chunk['page'], 'heading': chunk['heading'], 'chunk': index},
+                })
+            manifest[path] = {
+                'sha256': hashes[path],
+                'chunks': len(result['chunks']),
+                'ingested_at': time.time(),
+            }
+            while len(batch) >= self.batch_size:
+                self._write(batch[:self.batch_size])
+                del batch[:self.batch_size]
+            stats['chunks'] += len(result['chunks'])
+
+        if workers > 1 and len(changed) > 1:
+            # Spawned workers only import the parser, not the embedding model or ChromaDB
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=min(workers, len(changed)), mp_context=context) as executor:
+                for result in executor.map(load_document, changed, chunksize=4):
+                    handle(result)
+        else:
+            for path in changed:
+                handle(load_document(path))
+        if batch:
+            self._write(batch)
+        self._save_manifest(manifest)
+
+        stats['seconds'] = round(time.perf_counter() - start, 3)
+        return stats
+
+    def search(self, query: str, k: int = RETRIEVAL_TOP_K) -> List[Dict[str, Any]]:
+        """Find the chunks most similar to a query.
+
+        Args:
+            query: The search query
+            k: Maximum number of chunks to return
+
+        Returns:
+            List[Dict[str, Any]]: Chunks with `text`, `source`, `page`,
+            `heading` and cosine `score`, best first
+        """
+        if not query.strip():
+            return []
+        # Chroma returns fewer results for smaller collections; counting first
+        # would cost more than the query itself on large ones
+        matches = self.collection.query(
+            query_embeddings=self.embed([query]),
+            n_results=k,
+            include=['documents', 'metadatas', 'distances']
+        )
+        return [
+            {
+                'text': text,
+                'source': metadata['source'],
+                'page': metadata.get('page', 0),
+                'heading': metadata.get('heading', ''),
+                'score': round(1.0 - distance, 4),
+            }
+            for text, metadata, distance in zip(
+                matches['documents'][0], matches['metadatas'][0], matches['distances'][0]
+            )
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the number of ingested files and chunks."""
+        manifest = self._load_manifest()
+        return {'files': len(manifest), 'chunks': self.collection.count()}
+
+
+def format_passages(results: List[Dict[str, Any]]) -> str:
+    """Format search results as numbered passages citing their source."""
+    if not results:
+        return "No matching passages in the local documents."
+    passages = []
+    for number, result in enumerate(results, start=1):
+        location = Path(result['source']).name
+        if result['page']:
+            location += f", page {result['page']}"
+        if result['heading']:
+            location += f", section '{result['heading']}'"
+        passages.append(f"[{number}] {location}\n{result['text']}")
+    return '\n\n'.join(passages)
+
+
+def create_search_tool(index: CorpusIndex, k: int = RETRIEVAL_TOP_K):
+    """Create the researcher's tool searching the local documents.
+
+    Args:
+        index: The corpus index to search
+        k: Number of passages returned per search
+
+    Returns:
+        A LangChain tool usable by crewai agents
+    """
+    from langchain_core.tools import Tool
+
+    return Tool(
+        name='search_local_documents',
+        func=lambda query: format_passages(index.search(query, k)),
+        description=(
+            "Search the local document collection (ingested PDF and Markdown files) "
+            "for passages relevant to a query. Input is a short search query; returns "
+            "the best matching passages with their source file. Prefer these passages "
+            "over memory and cite their source."
+        )
+    )
+
+
+_corpus_index: Optional[CorpusIndex] = None
+_corpus_index_error: Optional[str] = None
+_corpus_index_lock = threading.Lock()
+
+
+def _create_index(embed: Optional[Callable[[List[str]], List[List[float]]]] = None) -> CorpusIndex:
+    """Create a corpus index in the local Chroma store."""
+    from chroma_client import get_chroma_client
+
+    return CorpusIndex(get_chroma_client(), embed=embed)
+
+
+def get_corpus_index() -> Optional[CorpusIndex]:
+    """Get the process-wide corpus index, or None when ChromaDB or the embedding model is unavailable."""
+    global _corpus_index, _corpus_index_error
+    with _corpus_index_lock:
+        if _corpus_index is None and _corpus_index_error is None:
+            try:
+                from embeddings import get_embedding_service
+
+                # Fail here rather than at the first search
+                get_embedding_service().require_encoder()
+                _corpus_index = _create_index()
+            except Exception as e:
+                _corpus_index_error = str(e)
+                print(f"⚠️ Warning: Local document search unavailable: {e}")
+        return _corpus_index
+
+
+def get_research_tools() -> List[Any]:
+    """Get the researcher's tools: local document search once documents were ingested."""
+    # Without an ingestion manifest there is nothing to search; skip importing ChromaDB
+    if not RETRIEVAL_ENABLED or not CORPUS_MANIFEST_PATH.exists():
+        return []
+    index = get_corpus_index()
+    if index is None or index.collection.count() == 0:
+        return []
+    return [create_search_tool(index)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingest and search local documents for the researcher')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest_parser = subparsers.add_parser('ingest', help='Ingest new and changed PDF and Markdown files')
+    ingest_parser.add_argument('paths', nargs='*', type=Path, help=f'Files or directories (default: {CORPUS_DIR})')
+    ingest_parser.add_argument('--workers', type=int, default=INGEST_WORKERS,
+                               help='Processes parsing files (default: one per CPU core)')
+
+    search_parser = subparsers.add_parser('search', help='Search the ingested documents')
+    search_parser.add_argument('query', type=str, help='The search query')
+    search_parser.add_argument('--limit', type=int, default=RETRIEVAL_TOP_K,
+                               help=f'Maximum results (default: {RETRIEVAL_TOP_K})')
+
+    subparsers.add_parser('stats', help='Print the number of ingested files and chunks')
+    args = parser.parse_args()
+
+    index = _create_index()
+    if args.command == 'ingest':
+        stats = index.ingest(args.paths or None, workers=args.workers)
+        print(f"✅ Ingested {stats['chunks']} chunks in {stats['seconds']:.1f}s: "
+              f"{stats['added']} added, {stats['updated']} updated, {stats['unchanged']} unchanged, "
+              f"{stats['removed']} removed, {stats['failed']} failed")
+        for path, error in stats['errors'].items():
+            print(f"❌ {path}: {error}")
+    elif args.command == 'search':
+        start = time.perf_counter()
+        results = index.search(args.query, k=args.limit)
+        elapsed = time.perf_counter() - start
+        print(format_passages(results))
+        print(f"\n⏱️  {len(results)} results in {elapsed * 1000:.1f} ms")
+    else:
+        print(json.dumps(index.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,683 @@
+"""Durable research job queue backed by SQLite, with a bounded worker loop.
+
+Jobs outlive the process that submitted them: a Streamlit session submits a
+topic, keeps only the job ID, and can reattach to it after a rerun, a browser
+reconnect or a server restart. Workers claim queued jobs, heartbeat while
+they run them, and jobs whose worker disappeared are requeued. Cancelling a
+running job is recorded in the database; the worker running it stops its
+crew on its next poll.
+
+Identical requests (same normalized topic and options) submitted while a job
+for them is queued or running are coalesced into that job: they get its ID,
+follow its progress and share its result. The job counts the requests
+attached to it, and is only cancelled once every one of them has left.
+
+Run a standalone worker with:
+    python job_queue.py worker --concurrency 2
+"""
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from config import (
+    JOB_HEARTBEAT_TIMEOUT,
+    JOB_MAX_ATTEMPTS,
+    JOB_QUEUE_CONCURRENCY,
+    JOB_QUEUE_PATH,
+    JOB_QUEUE_POLL_INTERVAL,
+)
+from checkpoints import get_checkpoint_store
+from progress import TASK_FINISHED, TASK_STARTED, ProgressBus
+from report_cache import normalize_topic
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATUSES = (COMPLETED, FAILED, CANCELLED)
+
+_JSON_COLUMNS = ('options', 'progress', 'result')
+
+
+class JobQueue:
+    """Persistent queue of research jobs stored in a local SQLite database.
+
+    Every method opens its own short transaction, so several processes (the
+    Streamlit app and standalone workers) can share one database file.
+    """
+
+    def __init__(self, path: Path = JOB_QUEUE_PATH, max_attempts: int = JOB_MAX_ATTEMPTS):
+        """Open (or create) the job database.
+
+        Args:
+            path: Location of the SQLite database file
+            max_attempts: Number of times a job is started before an interrupted
+                job is marked failed instead of being requeued
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        self.max_attempts = max_attempts
+
+        self._lock = threading.Lock()
+        # Autocommit mode; transactions that must be atomic use BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(
+            str(self.path), check_same_thread=False, timeout=30, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            ' id TEXT PRIMARY KEY,'
+            ' topic TEXT NOT NULL,'
+            ' topic_key TEXT NOT NULL,'
+            ' options TEXT NOT NULL,'
+            ' status TEXT NOT NULL,'
+            ' attempts INTEGER NOT NULL DEFAULT 0,'
+            ' worker_id TEXT,'
+            ' progress TEXT,'
+            ' result TEXT,'
+            ' error TEXT,'
+            ' created_at REAL NOT NULL,'
+            ' started_at REAL,'
+            ' finished_at REAL,'
+            ' heartbeat_at REAL,'
+            ' cancel_requested_at REAL,'
+            ' requests INTEGER NOT NULL DEFAULT 1)'
+        )
+        columns = {row['name'] for row in self._conn.execute('PRAGMA table_info(jobs)')}
+        if 'cancel_requested_at' not in columns:
+            # Databases created before running jobs could be cancelled
+            self._conn.execute('ALTER TABLE jobs ADD COLUMN cancel_requested_at REAL')
+        if 'requests' not in columns:
+            # Databases created before duplicate requests were counted
+            self._conn.execute('ALTER TABLE jobs ADD COLUMN requests INTEGER NOT NULL DEFAULT 1')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)')
+
+    @staticmethod
+    def _to_dict(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        """Convert a row to a job dict, decoding the JSON columns."""
+        if row is None:
+            return None
+        job = dict(row)
+        for column in _JSON_COLUMNS:
+            job[column] = json.loads(job[column]) if job[column] else None
+        del job['topic_key']
+        # Requests that joined the job instead of queueing the same work again
+        job['coalesced'] = job['requests'] - 1
+        return job
+
+    def submit(self, topic: str, options: Optional[Dict[str, Any]] = None, dedupe: bool = True) -> str:
+        """Queue a research job.
+
+        Args:
+            topic: The research topic
+            options: Keyword arguments for the crew running the job
+            dedupe: Coalesce the request into a queued or running job with the
+                same topic and options, returning that job's ID instead of
+                queueing the work twice
+
+        Returns:
+            str: The job ID
+        """
+        topic = topic.strip()
+        if not topic:
+            raise ValueError("Research topic cannot be empty")
+
+        topic_key = normalize_topic(topic)
+        options_json = json.dumps(options or {}, sort_keys=True)
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                if dedupe:
+                    row = self._conn.execute(
+                        'SELECT id FROM jobs WHERE topic_key = ? AND options = ? AND status IN (?, ?) '
+                        'AND cancel_requested_at IS NULL',
+                        (topic_key, options_json, QUEUED, RUNNING)
+                    ).fetchone()
+                    if row is not None:
+                        self._conn.execute('UPDATE jobs SET requests = requests + 1 WHERE id = ?', (row['id'],))
+                        self._conn.execute('COMMIT')
+                        print(f"♻️  Coalesced duplicate request into job {row['id'][:8]}: {topic}")
+                        return row['id']
+
+                job_id = uuid.uuid4().hex
+                self._conn.execute(
+                    'INSERT INTO jobs (id, topic, topic_key, options, status, created_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (job_id, topic, topic_key, options_json, QUEUED, time.time())
+                )
+                self._conn.execute('COMMIT')
+                return job_id
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job by ID, or None if it does not exist."""
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._to_dict(row)
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """List the most recent jobs, optionally only those with a given status."""
+        with self._lock:
+            if status is None:
+                rows = self._conn.execute(
+                    'SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?', (limit,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    'SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?',
+                    (status, limit)
+                ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest queued job and mark it running.
+
+        Args:
+            worker_id: ID of the worker that will run the job
+
+        Returns:
+            Optional[Dict[str, Any]]: The claimed job, or None if the queue is empty
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._conn.execute(
+                    'SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1', (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute('COMMIT')
+                    return None
+
+                self._conn.execute(
+                    'UPDATE jobs SET status = ?, worker_id = ?, attempts = attempts + 1, '
+                    'started_at = ?, heartbeat_at = ?, error = NULL WHERE id = ?',
+                    (RUNNING, worker_id, now, now, row['id'])
+                )
+                job = self._conn.execute('SELECT * FROM jobs WHERE id = ?', (row['id'],)).fetchone()
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return self._to_dict(job)
+
+    def heartbeat(self, job_ids: List[str]) -> None:
+        """Record that the given running jobs are still being worked on."""
+        if not job_ids:
+            return
+        with self._lock:
+            self._conn.executemany(
+                'UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = ?',
+                [(time.time(), job_id, RUNNING) for job_id in job_ids]
+            )
+
+    def update_progress(self, job_id: str, progress: Dict[str, Any]) -> None:
+        """Store the latest progress of a running job (also counts as a heartbeat)."""
+        with self._lock:
+            self._conn.execute(
+                'UPDATE jobs SET progress = ?, heartbeat_at = ? WHERE id = ?',
+                (json.dumps(progress, default=str), time.time(), job_id)
+            )
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]], error: Optional[str]) -> None:
+        """Move a running job to a final status."""
+        with self._lock:
+            self._conn.execute(
+                'UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? '
+                'WHERE id = ? AND status = ?',
+                (
+                    status,
+                    json.dumps(result, default=str) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                    RUNNING
+                )
+            )
+
+    def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        """Mark a running job completed with its result."""
+        self._finish(job_id, COMPLETED, result, None)
+
+    def fail(self, job_id: str, error: str, result: Optional[Dict[str, Any]] = None) -> None:
+        """Mark a running job failed."""
+        self._finish(job_id, FAILED, result, error)
+
+    def mark_cancelled(self, job_id: str, result: Optional[Dict[str, Any]] = None) -> None:
+        """Mark a running job cancelled once its crew has stopped."""
+        self._finish(job_id, CANCELLED, result, (result or {}).get('error') or 'Cancelled')
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job.
+
+        Queued jobs are cancelled right away. For running jobs a cancel request
+        is recorded; the worker running the job stops its crew and marks the
+        job cancelled.
+
+        Returns:
+            bool: Whether the job was cancelled or a cancel request was recorded
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                'UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?',
+                (CANCELLED, now, job_id, QUEUED)
+            )
+            if cursor.rowcount == 0:
+                cursor = self._conn.execute(
+                    'UPDATE jobs SET cancel_requested_at = ? '
+                    'WHERE id = ? AND status = ? AND cancel_requested_at IS NULL',
+                    (now, job_id, RUNNING)
+                )
+        return cursor.rowcount > 0
+
+    def leave(self, job_id: str) -> bool:
+        """Withdraw one of the requests attached to a job.
+
+        The job keeps running while other requests still wait for it; the
+        last request to leave cancels it.
+
+        Returns:
+            bool: Whether the job was cancelled or a cancel request was recorded
+        """
+        with self._lock:
+            detached = self._conn.execute(
+                'UPDATE jobs SET requests = requests - 1 WHERE id = ? AND requests > 1 AND status IN (?, ?)',
+                (job_id, QUEUED, RUNNING)
+            ).rowcount
+        if detached:
+            return False
+        return self.cancel(job_id)
+
+    def cancel_requests(self, job_ids: List[str]) -> List[str]:
+        """Get the running jobs among `job_ids` whose cancellation was requested."""
+        if not job_ids:
+            return []
+        placeholders = ', '.join('?' for _ in job_ids)
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT id FROM jobs WHERE id IN ({placeholders}) AND status = ? '
+                'AND cancel_requested_at IS NOT NULL',
+                (*job_ids, RUNNING)
+            ).fetchall()
+        return [row['id'] for row in rows]
+
+    def requeue_stale(self, timeout: float = JOB_HEARTBEAT_TIMEOUT) -> int:
+        """Requeue running jobs whose worker stopped sending heartbeats.
+
+        Jobs that already used up `max_attempts` are marked failed instead, and
+        jobs with a cancel request are marked cancelled.
+
+        Args:
+            timeout: Seconds without a heartbeat after which a job is stale
+
+        Returns:
+            int: Number of jobs requeued or failed
+        """
+        cutoff = time.time() - timeout
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                cancelled = self._conn.execute(
+                    'UPDATE jobs SET status = ?, error = ?, finished_at = ? '
+                    'WHERE status = ? AND heartbeat_at < ? AND cancel_requested_at IS NOT NULL',
+                    (CANCELLED, 'Cancelled', time.time(), RUNNING, cutoff)
+                ).rowcount
+                failed = self._conn.execute(
+                    'UPDATE jobs SET status = ?, error = ?, finished_at = ? '
+                    'WHERE status = ? AND heartbeat_at < ? AND attempts >= ?',
+                    (FAILED, 'Worker stopped responding', time.time(), RUNNING, cutoff, self.max_attempts)
+                ).rowcount
+                requeued = self._conn.execute(
+                    'UPDATE jobs SET status = ?, worker_id = NULL WHERE status = ? AND heartbeat_at < ?',
+                    (QUEUED, RUNNING, cutoff)
+                ).rowcount
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+        if failed or requeued or cancelled:
+            print(f"♻️  Requeued {requeued}, failed {failed} and cancelled {cancelled} interrupted job(s)")
+        return failed + requeued + cancelled
+
+    def stats(self) -> Dict[str, int]:
+        """Count the jobs in each status, and the requests coalesced into existing jobs."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT status, COUNT(*), SUM(requests - 1) FROM jobs GROUP BY status'
+            ).fetchall()
+        counts = {status: 0 for status in (QUEUED, RUNNING) + FINISHED_STATUSES}
+        counts.update({row[0]: row[1] for row in rows})
+        counts['coalesced'] = sum(row[2] or 0 for row in rows)
+        return counts
+
+
+# Crews of the jobs running in this process, so cancel requests can reach them
+# and watchers can follow their progress events
+_running_crews: Dict[str, Any] = {}
+_running_crews_lock = threading.Lock()
+_running_crews_changed = threading.Condition(_running_crews_lock)
+
+
+def cancel_running_job(job_id: str, reason: str = "Cancelled by user") -> bool:
+    """Stop the crew of a job running in this process.
+
+    Args:
+        job_id: ID of the running job
+        reason: Error message of the cancelled run
+
+    Returns:
+        bool: Whether a crew was found and cancelled
+    """
+    with _running_crews_lock:
+        crew = _running_crews.get(job_id)
+    return crew is not None and crew.cancel(reason)
+
+
+def running_job_events(job_id: str, timeout: Optional[float] = None) -> Optional[ProgressBus]:
+    """Get the progress bus of a job's crew running in this process.
+
+    Args:
+        job_id: ID of the job
+        timeout: Seconds to wait for the job's crew to start; None waits
+            indefinitely, 0 does not wait
+
+    Returns:
+        Optional[ProgressBus]: The crew's event bus, or None if the job's crew
+        is not running in this process (yet)
+    """
+    with _running_crews_changed:
+        _running_crews_changed.wait_for(lambda: job_id in _running_crews, timeout)
+        crew = _running_crews.get(job_id)
+    return getattr(crew, 'events', None)
+
+
+def run_research_job(
+    job: Dict[str, Any],
+    on_progress: Callable[[Dict[str, Any]], None],
+    crew_factory: Optional[Callable[..., Any]] = None
+) -> Dict[str, Any]:
+    """Run one research job and report task progress while it runs.
+
+    A job interrupted on an earlier attempt (e.g. by a restart) continues
+    from the checkpoints of that attempt's run when the crew supports it.
+
+    Args:
+        job: The claimed job
+        on_progress: Called with the job progress whenever a task starts or finishes
+        crew_factory: Callable creating the crew from the topic and the job
+            options; defaults to `crew.ResearchCrew`
+
+    Returns:
+        Dict[str, Any]: The crew's result dict
+    """
+    if crew_factory is None:
+        from crew import ResearchCrew
+        crew_factory = ResearchCrew
+
+    options = {'stream_stages': ['writing'], **(job['options'] or {})}
+    run_id = (job.get('progress') or {}).get('run_id')
+    if run_id and hasattr(crew_factory, 'from_checkpoint') and get_checkpoint_store().load(run_id) is not None:
+        crew = crew_factory.from_checkpoint(run_id, **options)
+    else:
+        crew = crew_factory(job['topic'], **options)
+
+    # The streamed writer output is appended to this file, so watchers can show a partial report
+    output_file = getattr(crew, 'output_file', None) or crew.tasks.output_file
+    progress = {
+        'output_file': str(output_file),
+        'run_id': getattr(crew, 'run_id', None),
+        'current_task': None,
+        'tasks': {task_name: task['status'] for task_name, task in crew.task_progress.items()},
+    }
+    on_progress(dict(progress))
+
+    def watch() -> None:
+        for event in crew.events.events():
+            if event['type'] == TASK_STARTED:
+                progress['tasks'][event['task']] = 'in_progress'
+                progress['current_task'] = event['task']
+            elif event['type'] == TASK_FINISHED:
+                progress['tasks'][event['task']] = event['status']
+                if progress['current_task'] == event['task']:
+                    progress['current_task'] = None
+            else:
+                continue
+            on_progress(dict(progress, tasks=dict(progress['tasks'])))
+
+    watcher = threading.Thread(target=watch, name=f"job-{job['id'][:8]}-progress", daemon=True)
+    watcher.start()
+    with _running_crews_changed:
+        _running_crews[job['id']] = crew
+        _running_crews_changed.notify_all()
+    try:
+        return crew.run()
+    finally:
+        with _running_crews_lock:
+            _running_crews.pop(job['id'], None)
+        # run() closes the event bus, which ends the watcher
+        watcher.join(timeout=5)
+
+
+class JobWorker:
+    """Run queued jobs on a bounded pool of threads.
+
+    The worker polls the queue, claims jobs while fewer than `concurrency` are
+    running, heartbeats its running jobs, stops the ones whose cancellation
+    was requested and requeues jobs of workers that died. Several workers (in one or more processes) can share a queue; the
+    global concurrency is the sum of theirs.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        run_job: Callable[[Dict[str, Any], Callable[[Dict[str, Any]], None]], Dict[str, Any]] = run_research_job,
+        concurrency: int = JOB_QUEUE_CONCURRENCY,
+        poll_interval: float = JOB_QUEUE_POLL_INTERVAL,
+        heartbeat_timeout: float = JOB_HEARTBEAT_TIMEOUT
+    ):
+        """Initialize a stopped worker.
+
+        Args:
+            queue: The queue to take jobs from
+            run_job: Callable `run_job(job, on_progress)` returning the result dict
+            concurrency: Maximum number of jobs this worker runs at once
+            poll_interval: Seconds between queue polls when idle
+            heartbeat_timeout: Seconds without a heartbeat after which another
+                worker's running job is requeued
+        """
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+
+        self.queue = queue
+        self.run_job = run_job
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._lock = threading.Lock()
+        self._active: Dict[str, Any] = {}
+        self._job_finished = threading.Condition(self._lock)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _run(self, job: Dict[str, Any]) -> None:
+        """Run a claimed job and record its outcome."""
+        job_id = job['id']
+        print(f"\n🚀 Job {job_id[:8]} started: {job['topic']}")
+        try:
+            result = self.run_job(job, lambda progress: self.queue.update_progress(job_id, progress))
+            if result.get('success'):
+                self.queue.complete(job_id, result)
+                print(f"✅ Job {job_id[:8]} completed")
+            elif result.get('cancelled'):
+                self.queue.mark_cancelled(job_id, result)
+                print(f"🛑 Job {job_id[:8]} cancelled: {result.get('error')}")
+            else:
+                self.queue.fail(job_id, result.get('error', 'Unknown error'), result)
+                print(f"❌ Job {job_id[:8]} failed: {result.get('error')}")
+        except Exception as e:
+            self.queue.fail(job_id, str(e))
+            print(f"❌ Job {job_id[:8]} failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._active.pop(job_id, None)
+                self._job_finished.notify_all()
+            self._wake.set()
+
+    def poll(self) -> int:
+        """Heartbeat running jobs, stop cancelled ones, requeue stale ones and start queued jobs.
+
+        Returns:
+            int: Number of jobs started
+        """
+        with self._lock:
+            active = list(self._active)
+        self.queue.heartbeat(active)
+        for job_id in self.queue.cancel_requests(active):
+            if cancel_running_job(job_id):
+                print(f"🛑 Stopping job {job_id[:8]}")
+        self.queue.requeue_stale(self.heartbeat_timeout)
+
+        started = 0
+        while len(active) + started < self.concurrency:
+            job = self.queue.claim(self.worker_id)
+            if job is None:
+                break
+            with self._lock:
+                self._active[job['id']] = job
+            self._executor.submit(self._run, job)
+            started += 1
+        return started
+
+    def events(self, job_id: str, timeout: Optional[float] = None) -> Optional[ProgressBus]:
+        """Get the progress bus of a job once its crew runs in this process.
+
+        Watchers block on the bus instead of polling the queue. A job run by
+        another process never gets one here, so `timeout` bounds the wait
+        before they fall back to polling.
+
+        Args:
+            job_id: ID of the job
+            timeout: Seconds to wait for the job's crew to start
+
+        Returns:
+            Optional[ProgressBus]: The crew's event bus, or None
+        """
+        return running_job_events(job_id, timeout)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> bool:
+        """Wait until the outcome of a job this worker runs has been recorded in the queue.
+
+        Returns:
+            bool: False if the job was still running when `timeout` expired
+        """
+        with self._job_finished:
+            return self._job_finished.wait_for(lambda: job_id not in self._active, timeout)
+
+    def wake(self) -> None:
+        """Poll the queue right away, e.g. after submitting a job in this process."""
+        self._wake.set()
+
+    def run_forever(self) -> None:
+        """Poll the queue until `stop` is called."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='job')
+        print(f"👷 Job worker {self.worker_id} running with concurrency {self.concurrency}")
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"⚠️ Warning: Job queue poll failed: {str(e)}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def start(self) -> 'JobWorker':
+        """Run the worker loop on a daemon thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run_forever, name='job-worker', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop claiming jobs; with `wait`, also wait for the running jobs to finish."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+    @property
+    def active_jobs(self) -> List[str]:
+        """IDs of the jobs this worker is running."""
+        with self._lock:
+            return list(self._active)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Research job queue')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    worker_parser = subparsers.add_parser('worker', help='Run queued research jobs')
+    worker_parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=JOB_QUEUE_CONCURRENCY,
+        help=f'Maximum jobs run at once by this worker (default: {JOB_QUEUE_CONCURRENCY})'
+    )
+
+    submit_parser = subparsers.add_parser('submit', help='Queue a research topic')
+    submit_parser.add_argument('topic', type=str, help='Research topic')
+
+    cancel_parser = subparsers.add_parser('cancel', help='Cancel a queued or running job')
+    cancel_parser.add_argument('job_id', type=str, help='Job ID')
+
+    status_parser = subparsers.add_parser('status', help='Show a job, or the most recent jobs')
+    status_parser.add_argument('job_id', type=str, nargs='?', help='Job ID')
+
+    args = parser.parse_args()
+    queue = JobQueue()
+
+    if args.command == 'worker':
+        worker = JobWorker(queue, concurrency=args.concurrency)
+        try:
+            worker.run_forever()
+        except KeyboardInterrupt:
+            print("\n🛑 Stopping worker; waiting for running jobs...")
+            worker.stop()
+    elif args.command == 'submit':
+        print(queue.submit(args.topic))
+    elif args.command == 'cancel':
+        if queue.cancel(args.job_id):
+            print(f"🛑 Cancelled job {args.job_id}")
+        else:
+            print(f"❌ Job {args.job_id} is not queued or running")
+    elif args.job_id:
+        job = queue.get(args.job_id)
+        print(json.dumps(job, indent=2) if job else f"❌ Job {args.job_id} not found")
+    else:
+        for job in queue.list_jobs():
+            coalesced = f"  (+{job['coalesced']} coalesced)" if job['coalesced'] else ''
+            print(f"{job['id']}  {job['status']:<10} {job['topic']}{coalesced}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""Persistent exact-match cache for LLM responses."""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from config import LLM_CACHE_MAX_BYTES, LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS
+
+
+class SQLiteResponseCache(BaseCache):
+    """LangChain cache storing responses in a local SQLite database.
+
+    Entries are keyed by the LLM configuration string (model, temperature and
+    other invocation parameters) and a hash of the serialized message list.
+    Stale entries are dropped after `ttl_seconds` and the least recently used
+    entries are evicted once the stored responses exceed `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        path: Path = LLM_CACHE_PATH,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+    ):
+        """Open (or create) the cache database.
+
+        Args:
+            path: Location of the SQLite database file
+            ttl_seconds: Maximum age of a cached response
+            max_bytes: Maximum total size of the stored responses
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' key TEXT PRIMARY KEY,'
+            ' response TEXT NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' created_at REAL NOT NULL,'
+            ' last_access REAL NOT NULL)'
+        )
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)'
+        )
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        # LLM calls look the cache up on their own thread, so per-thread hit
+        # counts tell a caller whether its own call was served from the cache
+        self._thread_hits = threading.local()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        """Hash the LLM configuration and the serialized messages into a key."""
+        llm_hash = hashlib.sha256(llm_string.encode('utf-8')).hexdigest()
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        return f"{llm_hash}:{prompt_hash}"
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Return the cached generations for a prompt, or None on a miss."""
+        key = self._key(prompt, llm_string)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT response, created_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                'UPDATE responses SET last_access = ? WHERE key = ?', (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        self._thread_hits.count = self.thread_hits() + 1
+
+        return [loads(generation) for generation in json.loads(row[0])]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Store the generations returned for a prompt."""
+        response = json.dumps([dumps(generation) for generation in return_val])
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, response, size, created_at, last_access) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (self._key(prompt, llm_string), response, len(response), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop expired entries, then least recently used ones until under `max_bytes`."""
+        self._conn.execute(
+            'DELETE FROM responses WHERE created_at < ?', (time.time() - self.ttl_seconds,)
+        )
+
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = []
+        for key, size in self._conn.execute(
+            'SELECT key, size FROM responses ORDER BY last_access ASC'
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany('DELETE FROM responses WHERE key = ?', evicted)
+
+    def thread_hits(self) -> int:
+        """Get the number of cache hits of lookups made on the calling thread."""
+        return getattr(self._thread_hits, 'count', 0)
+
+    def clear(self, **kwargs: Any) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit-rate counters and the current size of the cache."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses'
+            ).fetchone()
+            hits, misses = self.hits, self.misses
+
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': (hits / total) if total else 0.0,
+            'entries': entries,
+            'size_bytes': size,
+        }
+
+
+_response_cache: Optional[SQLiteResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> SQLiteResponseCache:
+    """Get the process-wide response cache, creating it on first use."""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = SQLiteResponseCache()
+        return _response_cache
@@ -0,0 +1,261 @@
+"""Process-wide pool of keep-alive HTTP clients shared by every LLM instance."""
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any, Dict, Iterator, Optional, Union
+
+import httpx
+import httpcore
+from langchain_core.messages import BaseMessage, BaseMessageChunk
+from langchain_core.pydantic_v1 import Field
+from langchain_openai import ChatOpenAI
+
+from config import (
+    LLM_POOL_KEEPALIVE_EXPIRY,
+    LLM_POOL_MAX_CONNECTIONS,
+    LLM_POOL_MAX_KEEPALIVE_CONNECTIONS,
+    LLM_REQUEST_TIMEOUT,
+)
+from cancellation import AbortableNetworkBackend, current_cancellation
+from telemetry import count_tokens
+
+DEFAULT_API_BASE = 'https://api.openai.com/v1'
+
+
+class PooledChatOpenAI(ChatOpenAI):
+    """ChatOpenAI whose `stream` is served by `invoke`, with optional per-call routing.
+
+    LangChain's agent executor (and therefore every crewai agent) calls
+    `stream`, which skips the LLM response cache and the API's token usage
+    report. Going through `invoke` keeps both; with `streaming=True` the
+    tokens still reach the callbacks as they arrive.
+
+    With a `router`, the model of every call is chosen by
+    `router.route(route_stage, model_name, prompt_tokens)`; the configured
+    `model_name` is what the router starts from.
+
+    With a `cancellation` token, cancelling the run aborts the call's
+    request while it waits for the response.
+    """
+
+    # Excluded from `dumps(self)`, which LangChain builds the response cache key
+    # from; their reprs hold addresses, so every run (and for the pooled
+    # clients, every process) would get new keys
+    http_client: Union[Any, None] = Field(default=None, exclude=True)
+    http_async_client: Union[Any, None] = Field(default=None, exclude=True)
+    router: Any = Field(default=None, exclude=True)
+    route_stage: Optional[str] = None
+    cancellation: Any = Field(default=None, exclude=True)
+
+    def _routed_kwargs(self, input: Any, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the routed model to a call's arguments."""
+        if self.router is None or 'model' in kwargs:
+            return kwargs
+
+        prompt = self._convert_input(input).to_string()
+        decision = self.router.route(self.route_stage, self.model_name, count_tokens(prompt, self.model_name))
+        if decision['model'] != self.model_name:
+            # Passed per call, so it also becomes part of the response cache key
+            kwargs = {**kwargs, 'model': decision['model']}
+        return kwargs
+
+    def invoke(self, input: Any, config: Any = None, *, stop: Optional[list] = None,
+               **kwargs: Any) -> BaseMessage:
+        """Call the LLM with the routed model."""
+        if self.cancellation is None:
+            return super().invoke(input, config=config, stop=stop, **self._routed_kwargs(input, kwargs))
+
+        self.cancellation.check()
+        # Read by the pooled connections, which abort the request if the run is cancelled
+        reset = current_cancellation.set(self.cancellation)
+        try:
+            return super().invoke(input, config=config, stop=stop, **self._routed_kwargs(input, kwargs))
+        finally:
+            current_cancellation.reset(reset)
+
+    async def ainvoke(self, input: Any, config: Any = None, *, stop: Optional[list] = None,
+                      **kwargs: Any) -> BaseMessage:
+        """Call the LLM with the routed model; cancelling the awaiting task aborts the request."""
+        if self.cancellation is not None:
+            self.cancellation.check()
+        return await super().ainvoke(input, config=config, stop=stop, **self._routed_kwargs(input, kwargs))
+
+    def stream(self, input: Any, config: Any = None, *, stop: Optional[list] = None,
+               **kwargs: Any) -> Iterator[BaseMessageChunk]:
+        """Yield the whole response as a single chunk."""
+        yield self.invoke(input, config=config, stop=stop, **kwargs)
+
+
+class LLMClientPool:
+    """Registry of pooled HTTP clients keyed by API endpoint.
+
+    `ChatOpenAI` instances are cheap, but each one normally creates its own
+    HTTP client and therefore its own connection pool, paying a TCP/TLS
+    handshake on every run. LLMs created through this registry share one
+    keep-alive `httpx.Client` per endpoint (plus one `httpx.AsyncClient` per
+    endpoint and event loop), so connections are reused across agents,
+    `ResearchCrew` instances and threads.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = LLM_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections: int = LLM_POOL_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = LLM_POOL_KEEPALIVE_EXPIRY,
+        timeout: float = LLM_REQUEST_TIMEOUT
+    ):
+        """Initialize an empty registry.
+
+        Args:
+            max_connections: Maximum concurrent connections per endpoint
+            max_keepalive_connections: Maximum idle connections kept open per endpoint
+            keepalive_expiry: Seconds an idle connection is kept open
+            timeout: Default request timeout in seconds
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(timeout, connect=5.0)
+
+        self._lock = threading.Lock()
+        self._clients: Dict[str, httpx.Client] = {}
+        # Keyed by event loop, so clients of finished loops are dropped with them
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._stats = {'requests': 0, 'new_connections': 0}
+
+    def _count(self, counter: str) -> None:
+        """Increment a stats counter."""
+        with self._lock:
+            self._stats[counter] += 1
+
+    def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        """httpcore trace hook; TCP connects only happen for new connections."""
+        if event_name == 'connection.connect_tcp.complete':
+            self._count('new_connections')
+
+    async def _async_trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        """Async variant of the trace hook."""
+        self._trace(event_name, info)
+
+    def _on_request(self, request: httpx.Request) -> None:
+        """Request hook counting requests and attaching the connection trace."""
+        self._count('requests')
+        request.extensions['trace'] = self._trace
+
+    async def _on_async_request(self, request: httpx.Request) -> None:
+        """Async variant of the request hook."""
+        self._count('requests')
+        request.extensions['trace'] = self._async_trace
+
+    def _transport(self) -> httpx.HTTPTransport:
+        """Create a sync transport whose connections can be aborted by a run's cancellation."""
+        transport = httpx.HTTPTransport(limits=self.limits)
+        pool = getattr(transport, '_pool', None)
+        # httpx has no public hook for the network backend of its connection pool
+        if isinstance(pool, httpcore.ConnectionPool) and hasattr(pool, '_network_backend'):
+            pool._network_backend = AbortableNetworkBackend(pool._network_backend)
+        return transport
+
+    @staticmethod
+    def _endpoint(base_url: Optional[str]) -> str:
+        """Resolve the API endpoint the same way ChatOpenAI does."""
+        return base_url or os.getenv('OPENAI_API_BASE') or DEFAULT_API_BASE
+
+    def get_client(self, base_url: Optional[str] = None) -> httpx.Client:
+        """Get the shared sync client for an endpoint, creating it on first use."""
+        endpoint = self._endpoint(base_url)
+        with self._lock:
+            client = self._clients.get(endpoint)
+            if client is None:
+                client = httpx.Client(
+                    transport=self._transport(),
+                    timeout=self.timeout,
+                    follow_redirects=True,
+                    event_hooks={'request': [self._on_request]}
+                )
+                self._clients[endpoint] = client
+            return client
+
+    def get_async_client(self, base_url: Optional[str] = None) -> Optional[httpx.AsyncClient]:
+        """Get the shared async client for an endpoint and the running event loop.
+
+        Async connections cannot be shared between event loops, so there is one
+        client per loop. Returns None when called outside an event loop.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+
+        endpoint = self._endpoint(base_url)
+        with self._lock:
+            loop_clients = self._async_clients.setdefault(loop, {})
+            client = loop_clients.get(endpoint)
+            if client is None:
+                client = httpx.AsyncClient(
+                    limits=self.limits,
+                    timeout=self.timeout,
+                    follow_redirects=True,
+                    event_hooks={'request': [self._on_async_request]}
+                )
+                loop_clients[endpoint] = client
+            return client
+
+    def create_llm(self, base_url: Optional[str] = None, **kwargs: Any) -> PooledChatOpenAI:
+        """Create a ChatOpenAI that sends its requests through the pooled clients.
+
+        Args:
+            base_url: Optional API endpoint; defaults to `OPENAI_API_BASE` or OpenAI
+            **kwargs: Any other ChatOpenAI arguments (model_name, temperature, ...)
+
+        Returns:
+            PooledChatOpenAI: A new LLM instance sharing the pooled connections
+        """
+        if base_url:
+            kwargs['base_url'] = base_url
+        async_client = self.get_async_client(base_url)
+        if async_client is not None:
+            kwargs['http_async_client'] = async_client
+        return PooledChatOpenAI(http_client=self.get_client(base_url), **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get request and connection reuse counters."""
+        with self._lock:
+            requests = self._stats['requests']
+            new_connections = self._stats['new_connections']
+            clients = len(self._clients) + sum(len(c) for c in self._async_clients.values())
+
+        reused = max(requests - new_connections, 0)
+        return {
+            'requests': requests,
+            'new_connections': new_connections,
+            'reused_connections': reused,
+            'reuse_rate': (reused / requests) if requests else 0.0,
+            'clients': clients,
+            'max_connections': self.limits.max_connections,
+        }
+
+    def close(self) -> None:
+        """Close every pooled sync client; async clients close with their loop."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._async_clients.clear()
+        for client in clients:
+            client.close()
+
+
+_llm_pool: Optional[LLMClientPool] = None
+_llm_pool_lock = threading.Lock()
+
+
+def get_llm_pool() -> LLMClientPool:
+    """Get the process-wide client pool, creating it on first use."""
+    global _llm_pool
+    with _llm_pool_lock:
+        if _llm_pool is None:
+            _llm_pool = LLMClientPool()
+        return _llm_pool
@@ -2,6 +2,7 @@
 import os
 import sys
 import argparse
+from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -12,7 +13,8 @@ sys.path.append(str(Path(__file__).parent))
 load_dotenv()
 
 from crew import ResearchCrew
-from config import OUTPUT_DIR
+from batch import iter_topics, run_batch, print_summary
+from config import OUTPUT_DIR, BATCH_DEFAULT_CONCURRENCY, FACT_CHECK_CONCURRENCY, RUN_DEADLINE_SECONDS
 
 
 def parse_arguments():
@@ -30,20 +32,146 @@ def parse_arguments():
         default=OUTPUT_DIR,
         help=f'Output directory (default: {OUTPUT_DIR})'
     )
+    parser.add_argument(
+        '--pipelined',
+        action='store_true',
+        help='Overlap research, fact-checking and writing section by section '
+             '(default: run the stages strictly in sequence)'
+    )
+    parser.add_argument(
+        '--fact-check-fan-out',
+        action='store_true',
+        help='Split the research into claims and fact-check them concurrently'
+    )
+    parser.add_argument(
+        '--fact-check-concurrency',
+        type=int,
+        default=FACT_CHECK_CONCURRENCY,
+        help=f'Claims fact-checked at once with --fact-check-fan-out (default: {FACT_CHECK_CONCURRENCY})'
+    )
+    parser.add_argument(
+        '--deadline',
+        type=float,
+        default=RUN_DEADLINE_SECONDS,
+        help=f'Seconds after which a run is stopped (default: {RUN_DEADLINE_SECONDS:g})'
+    )
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Update the latest report on the topic with what changed since it was written'
+    )
+    parser.add_argument(
+        '--resume',
+        type=str,
+        default=None,
+        metavar='RUN_ID',
+        help='Continue a failed run from its first incomplete stage'
+    )
+    parser.add_argument(
+        '--topics-file',
+        type=str,
+        default=None,
+        help='JSONL or plain text file with one topic per line (enables batch mode)'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=BATCH_DEFAULT_CONCURRENCY,
+        help=f'Number of topics researched at once in batch mode (default: {BATCH_DEFAULT_CONCURRENCY})'
+    )
+    parser.add_argument(
+        '--processes',
+        type=int,
+        default=None,
+        metavar='N',
+        help='Run the batch in N pre-warmed worker processes instead of threads of this process'
+    )
+    parser.add_argument(
+        '--results-file',
+        type=str,
+        default=None,
+        help='JSONL file receiving one result record per topic in batch mode '
+             '(default: <output-dir>/batch_<timestamp>.jsonl)'
+    )
     return parser.parse_args()
 
 
+def crew_options(args):
+    """Get the `ResearchCrew` keyword arguments set by the command line arguments."""
+    return {
+        'pipelined': args.pipelined,
+        'fact_check_fan_out': args.fact_check_fan_out,
+        'fact_check_concurrency': args.fact_check_concurrency,
+        'deadline_seconds': args.deadline,
+        'refresh': args.refresh,
+    }
+
+
+def create_crew(topic, args):
+    """Create a research crew configured from the command line arguments."""
+    return ResearchCrew(topic, **crew_options(args))
+
+
+def run_batch_mode(args):
+    """Run research for every topic in the topics file."""
+    results_file = args.results_file or (
+        Path(args.output_dir) / f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    )
+    
+    print(f"🚀 Starting batch research from: {args.topics_file}")
+    print(f"⚙️  Concurrency: {args.concurrency}")
+    print(f"📁 Results file: {results_file}")
+    
+    if not args.processes:
+        summary = run_batch(
+            iter_topics(args.topics_file),
+            results_file,
+            run_topic=lambda topic: create_crew(topic, args).run(),
+            concurrency=args.concurrency
+        )
+        print_summary(summary)
+        return
+    
+    from process_pool import CrewProcessPool
+    
+    options = crew_options(args)
+    with CrewProcessPool(workers=args.processes) as pool:
+        print(f"🏭 Started {pool.warm()} worker processes ({pool.start_method})")
+        summary = run_batch(
+            iter_topics(args.topics_file),
+            results_file,
+            run_topic=lambda topic: pool.run(topic, **options),
+            # Enough threads to keep every worker busy
+            concurrency=max(args.concurrency, args.processes)
+        )
+    print_summary(summary)
+
+
 def main():
     """Main function to run the research crew."""
     args = parse_arguments()
     
-    print(f"🚀 Starting research on: {args.topic}")
-    print(f"📁 Output directory: {args.output_dir}")
+    if args.topics_file:
+        try:
+            run_batch_mode(args)
+        except Exception as e:
+            print(f"\n❌ Batch run failed: {str(e)}")
+            if os.getenv('DEBUG', '').lower() == 'true':
+                import traceback
+                traceback.print_exc()
+        return
     
     try:
-        # Initialize and run the research crew
-        research_crew = ResearchCrew(args.topic)
-        result = research_crew.run()
+        if args.resume:
+            print(f"♻️  Resuming run: {args.resume}")
+            result = ResearchCrew.resume(args.resume, deadline_seconds=args.deadline)
+        else:
+            print(f"🚀 Starting research on: {args.topic}")
+            print(f"📁 Output directory: {args.output_dir}")
+            
+            # Initialize and run the research crew
+            research_crew = create_crew(args.topic, args)
+            result = research_crew.run()
         
         if result.get('success', False):
             print(f"\n✅ Research completed successfully!")
@@ -51,9 +179,12 @@ def main():
             print("\n" + "="*80)
             print(result['result'][:500] + "...")
             print("="*80 + "\n")
+            if result.get('refresh'):
+                print(f"♻️  Refreshed {result['refresh']['previous_report']}: {result['refresh']['summary']}")
             print("✨ Research complete! Check the output file for the full results.")
         else:
             print(f"\n❌ Research failed with error: {result.get('error')}")
+            print(f"♻️  Resume with: python main.py --resume {result['run_id']}")
             
     except Exception as e:
         print(f"\n❌ An unexpected error occurred: {str(e)}")
@@ -0,0 +1,177 @@
+"""Pipelined execution of the research stages, section by section."""
+import queue
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+
+from crewai import Crew, Task
+
+from config import DEFAULT_VERBOSE, PIPELINE_MAX_SECTIONS
+from tasks import ResearchTasks, task_output_text
+
+# Marks the end of a stage's input
+_DONE = object()
+
+# Outline lines look like "1. Title", "- Title", "## Title" or "**2. Title**"
+_OUTLINE_PREFIX = re.compile(r'^\s*[*_]*(?:\d+[.)]|[-*•]|#{1,6})\s+')
+
+
+def run_task(agent, task: Task) -> str:
+    """Execute a single task in a one-agent crew and return its output.
+
+    Args:
+        agent: The agent assigned to the task
+        task: The task to execute
+
+    Returns:
+        str: The task's raw output
+    """
+    crew = Crew(agents=[agent], tasks=[task], verbose=DEFAULT_VERBOSE, process='sequential')
+    result = crew.kickoff()
+    return task_output_text(task) or str(result)
+
+
+def parse_outline(text: str, max_sections: int) -> List[str]:
+    """Extract section titles from an outline.
+
+    Only numbered, bulleted and heading lines are titles, so a preamble such
+    as "Here is the outline:" or a closing note does not become a section.
+    An outline without any such line is read one title per line.
+
+    Args:
+        text: The outline produced by the researcher
+        max_sections: Maximum number of sections to return
+
+    Returns:
+        List[str]: Unique section titles in outline order
+    """
+    marked, plain = [], []
+    for line in text.splitlines():
+        match = _OUTLINE_PREFIX.match(line)
+        title = (line[match.end():] if match else line).strip().strip('*_').strip()
+        if title:
+            (marked if match else plain).append(title)
+    sections = list(dict.fromkeys(marked or plain))
+    return sections[:max_sections]
+
+
+class SectionPipeline:
+    """Run research, fact-checking and writing as a pipeline over sections.
+
+    The researcher first plans an outline, then researches its sections one
+    after another. Each stage runs on its own thread and starts on a section
+    as soon as the previous stage has finished it, so the fact-checker
+    verifies section N while the researcher works on section N+1 and the
+    writer drafts verified sections in the meantime. End-to-end latency
+    approaches the slowest stage rather than the sum of all three.
+    """
+
+    STAGES = ['research', 'fact_check', 'writing']
+
+    def __init__(
+        self,
+        tasks: ResearchTasks,
+        researcher,
+        fact_checker,
+        writer,
+        max_sections: int = PIPELINE_MAX_SECTIONS,
+        on_stage: Optional[Callable[..., None]] = None
+    ):
+        """Initialize the pipeline.
+
+        Args:
+            tasks: Task factory for the research topic
+            researcher: Agent researching the sections
+            fact_checker: Agent verifying the researched sections
+            writer: Agent writing the verified sections
+            max_sections: Maximum number of sections in the outline
+            on_stage: Optional callback `on_stage(stage, status, section=None, output=None)`
+                called with status 'start', 'section' and 'completed'
+        """
+        self.tasks = tasks
+        self.agents = {'research': researcher, 'fact_check': fact_checker, 'writing': writer}
+        self.max_sections = max_sections
+        self.on_stage = on_stage or (lambda *args, **kwargs: None)
+        self.stage_outputs: Dict[str, List[str]] = {stage: [] for stage in self.STAGES}
+
+    def _create_task(self, stage: str, section: str, index: int, total: int, upstream: Optional[Task]) -> Task:
+        """Create the task processing one section in a stage."""
+        agent = self.agents[stage]
+        if stage == 'research':
+            return self.tasks.section_research_task(agent, section)
+        if stage == 'fact_check':
+            return self.tasks.section_fact_check_task(agent, section, [upstream])
+        return self.tasks.section_writing_task(agent, section, index, total, [upstream])
+
+    def _stage_worker(self, stage: str, total: int, inbox: queue.Queue, outbox: queue.Queue, errors: list) -> None:
+        """Process sections from `inbox` in order and pass them downstream."""
+        started = stage == 'research'
+        try:
+            while True:
+                item = inbox.get()
+                if item is _DONE:
+                    break
+                if errors:
+                    # Another stage failed; drain the queue without doing more work
+                    continue
+
+                if not started:
+                    self.on_stage(stage, 'start')
+                    started = True
+
+                index, section, upstream = item
+                task = self._create_task(stage, section, index, total, upstream)
+                output = run_task(self.agents[stage], task)
+                self.stage_outputs[stage].append(output)
+                self.on_stage(stage, 'section', section=section, output=output)
+                outbox.put((index, section, task))
+
+            if not errors:
+                self.on_stage(stage, 'completed', output='\n\n'.join(self.stage_outputs[stage]))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            outbox.put(_DONE)
+
+    def run(self) -> str:
+        """Run the pipeline and return the assembled article."""
+        self.on_stage('research', 'start')
+        outline = run_task(
+            self.agents['research'],
+            self.tasks.outline_task(self.agents['research'], self.max_sections)
+        )
+        sections = parse_outline(outline, self.max_sections) or [self.tasks.topic]
+
+        # Queues connecting the stages; the research stage is fed the outline up front
+        queues = [queue.Queue() for _ in range(len(self.STAGES) + 1)]
+        for index, section in enumerate(sections):
+            queues[0].put((index, section, None))
+        queues[0].put(_DONE)
+
+        errors: list = []
+        workers = [
+            threading.Thread(
+                target=self._stage_worker,
+                args=(stage, len(sections), queues[i], queues[i + 1], errors),
+                name=f'pipeline-{stage}',
+                daemon=True
+            )
+            for i, stage in enumerate(self.STAGES)
+        ]
+        for worker in workers:
+            worker.start()
+
+        written = {}
+        while True:
+            item = queues[-1].get()
+            if item is _DONE:
+                break
+            index, _, task = item
+            written[index] = task_output_text(task) or ''
+
+        for worker in workers:
+            worker.join()
+        if errors:
+            raise errors[0]
+
+        return '\n\n'.join(written[index] for index in sorted(written))
@@ -0,0 +1,236 @@
+"""Run research crews in a pool of long-lived, pre-warmed worker processes.
+
+crewai, langchain and chromadb take seconds to import, and a run spends much
+of its CPU time parsing and building prompts under the GIL. The pool runs
+each `ResearchCrew` in a worker process instead of a thread:
+
+    - Workers are forked from a forkserver that imported `CREW_PROCESS_PRELOAD`
+      once, so a new worker starts with the research stack already loaded.
+      Where forkserver is unavailable, workers are spawned and import the
+      stack when they start.
+    - Workers are replaced after `CREW_PROCESS_MAX_RUNS` runs each, bounding
+      the memory they accumulate. The pool retires its executor after
+      `workers * CREW_PROCESS_MAX_RUNS` runs and forks a fresh set of workers;
+      the retired ones exit once their runs finished. (ProcessPoolExecutor's
+      own `max_tasks_per_child` can leave the pool without workers on
+      Python 3.11.)
+    - Results come back as compact JSON instead of pickled objects.
+
+Deadlines are enforced inside the workers; a run cannot be cancelled from the
+parent process once it started.
+"""
+import importlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Optional
+
+from config import (
+    BASE_DIR,
+    CREW_PROCESS_MAX_RUNS,
+    CREW_PROCESS_PRELOAD,
+    CREW_PROCESS_START_METHOD,
+    CREW_PROCESS_WORKERS,
+)
+
+
+_forkserver_lock = threading.Lock()
+
+
+def _start_forkserver() -> None:
+    """Start this process's forkserver (if not running) with the project importable.
+
+    The forkserver imports the preloaded modules before it adopts this
+    process's sys.path, so the project directory is put on its PYTHONPATH.
+    The variable is only changed while the server starts; other subprocesses
+    keep this process's environment.
+    """
+    from multiprocessing import forkserver
+
+    with _forkserver_lock:
+        python_path = os.environ.get('PYTHONPATH')
+        os.environ['PYTHONPATH'] = os.pathsep.join(filter(None, [str(BASE_DIR), python_path]))
+        try:
+            forkserver.ensure_running()
+        finally:
+            if python_path is None:
+                del os.environ['PYTHONPATH']
+            else:
+                os.environ['PYTHONPATH'] = python_path
+
+
+def _initialize_worker(modules: Iterable[str]) -> None:
+    """Import the research stack in a new worker (already done when forked from a preloaded forkserver)."""
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            print(f"⚠️ Warning: Worker {os.getpid()} could not preload {module}: {e}")
+
+
+def _ping() -> int:
+    """Trivial task that makes the pool start a worker."""
+    # Held briefly, so each of the concurrent pings starts a worker of its own
+    time.sleep(0.05)
+    return os.getpid()
+
+
+def _run_crew(topic: str, options: Dict[str, Any]) -> bytes:
+    """Run one crew in a worker and serialize its result."""
+    from crew import ResearchCrew
+
+    result = ResearchCrew(topic, **options).run()
+    result['worker_pid'] = os.getpid()
+    # Paths and other objects become strings; nothing needs unpickling in the parent
+    return json.dumps(result, default=str, separators=(',', ':')).encode('utf-8')
+
+
+class CrewProcessPool:
+    """Pool of worker processes, each running one research crew at a time."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = CREW_PROCESS_WORKERS,
+        max_runs_per_worker: Optional[int] = CREW_PROCESS_MAX_RUNS,
+        start_method: str = CREW_PROCESS_START_METHOD,
+        preload: Iterable[str] = CREW_PROCESS_PRELOAD
+    ):
+        """Set up the pool; worker processes are started by `warm()` or the first runs.
+
+        Args:
+            workers: Maximum number of crews run at once (briefly more while a
+                retired generation finishes its runs); None for one per CPU core
+            max_runs_per_worker: Runs per worker after which the workers are
+                replaced; None to keep them for the pool's lifetime
+            start_method: Multiprocessing start method; falls back to 'spawn'
+                where it is unavailable
+            preload: Modules imported once by the forkserver, or by every
+                worker when they are spawned
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_runs_per_worker = max_runs_per_worker
+        self.preload = list(preload)
+
+        if start_method not in multiprocessing.get_all_start_methods():
+            print(f"⚠️ Warning: Start method '{start_method}' is unavailable, spawning workers instead")
+            start_method = 'spawn'
+        if start_method == 'fork':
+            # Forking a process with running threads (LLM pool, event buses) can deadlock the child
+            raise ValueError("Crews cannot run in forked workers; use 'forkserver' or 'spawn'")
+        self.start_method = start_method
+
+        self._context = multiprocessing.get_context(start_method)
+        if start_method == 'forkserver':
+            # Only takes effect if this process has not started its forkserver yet
+            self._context.set_forkserver_preload(self.preload)
+
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_runs = 0
+        self.generations = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.result_bytes = 0
+
+    def _current_executor(self) -> ProcessPoolExecutor:
+        """Get the executor of the current worker generation, retiring it once its workers did their runs."""
+        exhausted = (self.max_runs_per_worker is not None
+                     and self._executor_runs >= self.workers * self.max_runs_per_worker)
+        if self._executor is None or exhausted:
+            if self._executor is not None:
+                # Its queued runs still finish; the workers exit afterwards
+                self._executor.shutdown(wait=False)
+            if self.start_method == 'forkserver':
+                _start_forkserver()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=self._context,
+                initializer=_initialize_worker,
+                initargs=(self.preload,)
+            )
+            self._executor_runs = 0
+            self.generations += 1
+        return self._executor
+
+    def warm(self) -> int:
+        """Start every worker process now rather than on the first runs.
+
+        Returns:
+            int: Number of distinct workers that answered
+        """
+        with self._lock:
+            executor = self._current_executor()
+            futures = [executor.submit(_ping) for _ in range(self.workers)]
+        return len({future.result() for future in futures})
+
+    def _decode(self, source: Future, target: Future) -> None:
+        """Deserialize a worker's result into the future handed to the caller."""
+        try:
+            payload = source.result()
+            result = json.loads(payload)
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            target.set_exception(e)
+            return
+        with self._lock:
+            self.completed += 1
+            self.result_bytes += len(payload)
+        target.set_result(result)
+
+    def submit(self, topic: str, **options: Any) -> Future:
+        """Queue a research run.
+
+        Args:
+            topic: The research topic
+            **options: Keyword arguments for `ResearchCrew`; they must be
+                picklable (e.g. no callbacks)
+
+        Returns:
+            Future: Resolves to the run's result dict, with paths as strings
+            and the `worker_pid` that ran it
+        """
+        result: Future = Future()
+        with self._lock:
+            future = self._current_executor().submit(_run_crew, topic, options)
+            self._executor_runs += 1
+            self.submitted += 1
+        future.add_done_callback(lambda done: self._decode(done, result))
+        return result
+
+    def run(self, topic: str, **options: Any) -> Dict[str, Any]:
+        """Run research in a worker and wait for its result dict."""
+        return self.submit(topic, **options).result()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the pool configuration and the number of runs submitted, completed and failed."""
+        with self._lock:
+            completed = self.completed
+            return {
+                'workers': self.workers,
+                'start_method': self.start_method,
+                'max_runs_per_worker': self.max_runs_per_worker,
+                'generations': self.generations,
+                'submitted': self.submitted,
+                'completed': completed,
+                'failed': self.failed,
+                'in_flight': self.submitted - completed - self.failed,
+                'mean_result_bytes': self.result_bytes / completed if completed else 0.0,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers; with `wait`, after the queued runs finished."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def __enter__(self) -> 'CrewProcessPool':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
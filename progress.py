@@ -0,0 +1,206 @@
+"""Event-driven progress reporting for research runs."""
+import asyncio
+import queue
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Union
+
+# Event types published on a ProgressBus
+TASK_STARTED = 'task_started'
+TASK_STEP = 'task_step'
+TASK_FINISHED = 'task_finished'
+TOKEN = 'token'
+RUN_FINISHED = 'run_finished'
+
+_BUS_CLOSED = None
+
+
+class _TokenRun:
+    """Consecutive token events of one task, kept in the history as their text only."""
+
+    __slots__ = ('task', 'timestamp', 'first_seq', 'chunks')
+
+    def __init__(self, event: Dict[str, Any]):
+        self.task = event['task']
+        self.timestamp = event['timestamp']
+        self.first_seq = event['seq']
+        self.chunks = [event.get('token', '')]
+
+    @property
+    def last_seq(self) -> int:
+        return self.first_seq + len(self.chunks) - 1
+
+    def extends(self, event: Dict[str, Any]) -> bool:
+        """Whether a new token event directly follows this run's tokens."""
+        return event['task'] == self.task and event['seq'] == self.last_seq + 1
+
+    def replay(self, after: int) -> Optional[Dict[str, Any]]:
+        """Get one token event with the text of the tokens after sequence number `after`."""
+        if self.last_seq <= after:
+            return None
+        chunks = self.chunks[max(0, after - self.first_seq + 1):]
+        return {
+            'type': TOKEN,
+            'task': self.task,
+            'timestamp': self.timestamp,
+            'seq': self.last_seq,
+            'token': ''.join(chunks),
+            'tokens': len(chunks),
+        }
+
+
+class ProgressBus:
+    """Thread-safe fan-out of progress events to any number of subscribers.
+
+    Events are plain dicts with at least `type`, `timestamp` and a `seq`
+    number increasing from 1. Every event is kept in a history that is
+    replayed to new subscribers, so a consumer attaching late still sees the
+    full run. Token events are coalesced in the history: a late subscriber
+    receives each run of consecutive tokens as one event carrying their text
+    and the `seq` of the last one, so the history grows with the streamed
+    text rather than by one event per token. Consumers block on a queue
+    (`events`) or await an async iterator (`aevents`) and therefore only wake
+    up when something actually changed.
+    """
+
+    def __init__(self):
+        """Initialize an open bus with no subscribers."""
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[Optional[Dict[str, Any]]], None]] = []
+        self._history: List[Union[Dict[str, Any], _TokenRun]] = []
+        self._seq = 0
+        self._closed = False
+
+    def publish(self, event_type: str, task: Optional[str] = None, **data: Any) -> Dict[str, Any]:
+        """Publish an event to every subscriber.
+
+        Args:
+            event_type: One of the event type constants of this module
+            task: Name of the task the event belongs to, if any
+            **data: Additional event fields
+
+        Returns:
+            Dict[str, Any]: The published event
+        """
+        event = {'type': event_type, 'task': task, 'timestamp': time.time(), **data}
+        with self._lock:
+            if self._closed:
+                return event
+            self._seq += 1
+            event['seq'] = self._seq
+            if event_type != TOKEN:
+                self._history.append(event)
+            elif self._history and isinstance(self._history[-1], _TokenRun) and self._history[-1].extends(event):
+                self._history[-1].chunks.append(event.get('token', ''))
+            else:
+                self._history.append(_TokenRun(event))
+            subscribers = list(self._subscribers)
+        for deliver in subscribers:
+            deliver(event)
+        return event
+
+    def close(self) -> None:
+        """Mark the end of the run; subscribers stop after the last event."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            subscribers = list(self._subscribers)
+            self._subscribers.clear()
+        for deliver in subscribers:
+            deliver(_BUS_CLOSED)
+
+    @property
+    def closed(self) -> bool:
+        """Whether the run has ended."""
+        return self._closed
+
+    def _replay(self, after: int = 0) -> List[Dict[str, Any]]:
+        """Get the history's events after sequence number `after`; the caller holds the lock."""
+        events = []
+        for entry in self._history:
+            event = entry.replay(after) if isinstance(entry, _TokenRun) else entry
+            if event is not None and event['seq'] > after:
+                events.append(event)
+        return events
+
+    def history(self, tokens: bool = True) -> List[Dict[str, Any]]:
+        """Get the events published so far, with consecutive token events coalesced.
+
+        Args:
+            tokens: Whether to include the token events
+        """
+        with self._lock:
+            events = self._replay()
+        return events if tokens else [event for event in events if event['type'] != TOKEN]
+
+    def _subscribe(self, deliver: Callable[[Optional[Dict[str, Any]]], None], after: int = 0) -> None:
+        """Register a delivery function after replaying the history past `after` to it."""
+        with self._lock:
+            for event in self._replay(after):
+                deliver(event)
+            if self._closed:
+                deliver(_BUS_CLOSED)
+            else:
+                self._subscribers.append(deliver)
+
+    def _unsubscribe(self, deliver: Callable[[Optional[Dict[str, Any]]], None]) -> None:
+        """Remove a delivery function if it is still registered."""
+        with self._lock:
+            if deliver in self._subscribers:
+                self._subscribers.remove(deliver)
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Call `callback(event)` for every event, starting with the history.
+
+        The callback runs on the publishing thread, so it must be quick and
+        must not block; use `events` or `aevents` to consume events elsewhere.
+        """
+        def deliver(event: Optional[Dict[str, Any]]) -> None:
+            if event is not _BUS_CLOSED:
+                callback(event)
+
+        self._subscribe(deliver)
+
+    def events(self, timeout: Optional[float] = None, after: int = 0) -> Iterator[Dict[str, Any]]:
+        """Iterate over the run's events, blocking until each one arrives.
+
+        Args:
+            timeout: Maximum seconds to wait for a single event before raising
+                `queue.Empty`; waits indefinitely by default
+            after: Sequence number of the last event already seen; only
+                later events (and tokens) are delivered
+
+        Yields:
+            Dict[str, Any]: Progress events, ending when the bus is closed
+        """
+        events: queue.Queue = queue.Queue()
+        self._subscribe(events.put, after)
+        try:
+            while True:
+                event = events.get(timeout=timeout)
+                if event is _BUS_CLOSED:
+                    return
+                if event['seq'] > after:
+                    yield event
+        finally:
+            self._unsubscribe(events.put)
+
+    async def aevents(self, after: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """Asynchronously iterate over the run's events (past `after`) without blocking a thread."""
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+
+        def deliver(event: Optional[Dict[str, Any]]) -> None:
+            loop.call_soon_threadsafe(events.put_nowait, event)
+
+        self._subscribe(deliver, after)
+        try:
+            while True:
+                event = await events.get()
+                if event is _BUS_CLOSED:
+                    return
+                if event['seq'] > after:
+                    yield event
+        finally:
+            self._unsubscribe(deliver)
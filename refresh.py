@@ -0,0 +1,328 @@
+"""Incremental refresh of a topic's previous report.
+
+Instead of researching a topic from scratch, a refresh starts from the latest
+report on the topic in `OUTPUT_DIR`:
+
+    1. The researcher sees the previous report and is asked only for what is
+       new or changed, attributed to an existing section (`UPDATE: <title>`)
+       or to a new one (`NEW: <title>`).
+    2. Only those changes are fact-checked, one call per affected section.
+    3. The writer patches the affected sections and writes the new ones; every
+       other section is carried over verbatim, without being checked again.
+
+The result records which sections were updated, added or left unchanged.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import FACT_CHECK_CONCURRENCY, REFRESH_FALLBACK_SECTION
+from pipeline import run_task
+from report_cache import REPORT_FILENAME_PATTERN, normalize_topic
+from tasks import ResearchTasks
+
+SECTION_HEADING = re.compile(r'^##(?!#)\s*(.+?)\s*#*\s*$', re.MULTILINE)
+CHANGE_MARKER = re.compile(r'^[\s>*#-]*(UPDATE|NEW)\s*:\s*\**\s*(.+?)\s*\**\s*$', re.IGNORECASE | re.MULTILINE)
+NO_CHANGES = re.compile(r'^\W*NO CHANGES\W*$', re.IGNORECASE)
+# Closing sections that new sections are inserted before
+CLOSING_SECTION = re.compile(r'\b(conclusion|summary|final thoughts|closing|takeaways?)\b', re.IGNORECASE)
+
+_NUMBERING = re.compile(r'^\s*\d+[.)]\s*')
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+def _key(title: str) -> str:
+    """Normalize a section title for matching (case, numbering and punctuation)."""
+    return ' '.join(_WORD.findall(_NUMBERING.sub('', title).lower()))
+
+
+def split_sections(text: str) -> Tuple[str, List[Dict[str, str]]]:
+    """Split a markdown report into its preamble and '##' sections.
+
+    Args:
+        text: The report
+
+    Returns:
+        Tuple[str, List[Dict[str, str]]]: The text before the first section
+        (title and introduction), and the sections with their `title` and
+        full `text` including the heading and any subsections
+    """
+    matches = list(SECTION_HEADING.finditer(text))
+    if not matches:
+        return text, []
+
+    sections = []
+    for index, match in enumerate(matches):
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(text)
+        sections.append({
+            'title': match.group(1).strip('*_ ').strip(),
+            'text': text[match.start():end],
+        })
+    return text[:matches[0].start()], sections
+
+
+def find_previous_report(topic: str, exclude: Optional[Path] = None) -> Optional[Path]:
+    """Find the most recent report on a topic.
+
+    Args:
+        topic: The research topic
+        exclude: Report file to skip, e.g. the one the current run writes
+
+    Returns:
+        Optional[Path]: The newest markdown report whose topic matches, if any
+    """
+    from report_index import get_report_index
+
+    wanted = normalize_topic(topic)
+    excluded = Path(exclude).resolve() if exclude is not None else None
+    for report in get_report_index().recent(limit=50, topic=topic):
+        path = Path(report['path'])
+        if (normalize_topic(report['topic']) == wanted and path.suffix == '.md'
+                and path.resolve() != excluded and path.exists()):
+            return path
+    return None
+
+
+def load_report(path: Path) -> Dict[str, Any]:
+    """Read a previous report and split it into sections.
+
+    Args:
+        path: The report file
+
+    Returns:
+        Dict[str, Any]: `path`, `text`, `since` (when it was written),
+        `preamble` and `sections`
+    """
+    path = Path(path)
+    text = path.read_text(encoding='utf-8')
+    match = REPORT_FILENAME_PATTERN.match(path.name)
+    if match:
+        written = datetime.strptime(match.group('timestamp'), '%Y%m%d_%H%M%S')
+    else:
+        written = datetime.fromtimestamp(path.stat().st_mtime)
+    preamble, sections = split_sections(text)
+    return {
+        'path': path,
+        'text': text,
+        'since': written.strftime('%Y-%m-%d %H:%M'),
+        'preamble': preamble,
+        'sections': sections,
+    }
+
+
+def parse_changes(text: str, titles: List[str],
+                  fallback: str = REFRESH_FALLBACK_SECTION) -> Dict[str, Dict[str, Any]]:
+    """Parse the researcher's changes into per-section blocks.
+
+    Findings outside any UPDATE/NEW block, and updates of a section the
+    previous report does not have, go to the `fallback` section.
+
+    Args:
+        text: The delta research output
+        titles: Section titles of the previous report
+        fallback: Section receiving findings not attributed to any section
+
+    Returns:
+        Dict[str, Dict[str, Any]]: By section title, in order of appearance:
+        the `changes` for the section and whether it is `new`
+    """
+    text = (text or '').strip()
+    if not text or NO_CHANGES.match(text):
+        return {}
+
+    existing = {_key(title): title for title in titles}
+    markers = list(CHANGE_MARKER.finditer(text))
+    blocks = [('UPDATE', fallback, text[:markers[0].start()] if markers else text)]
+    for index, marker in enumerate(markers):
+        end = markers[index + 1].start() if index + 1 < len(markers) else len(text)
+        blocks.append((marker.group(1).upper(), marker.group(2), text[marker.end():end]))
+
+    changes: Dict[str, Dict[str, Any]] = {}
+    for kind, title, block in blocks:
+        block = block.strip()
+        if not block or NO_CHANGES.match(block):
+            continue
+        # Titles are matched loosely; a misnamed UPDATE must not duplicate a section
+        key = _key(title)
+        if key in existing:
+            title = existing[key]
+        elif kind == 'UPDATE':
+            title = existing.get(_key(fallback), fallback)
+        else:
+            title = title.strip('*_ ').strip()
+        if title in changes:
+            changes[title]['changes'] += f"\n\n{block}"
+        else:
+            changes[title] = {'changes': block, 'new': _key(title) not in existing}
+    return changes
+
+
+def merge_sections(sections: Dict[str, str]) -> str:
+    """Merge per-section texts into one document with a heading per section."""
+    return '\n\n'.join(f"## {title}\n\n{text.strip()}" for title, text in sections.items())
+
+
+def _as_section(title: str, text: str) -> str:
+    """Make sure a written section starts with its heading."""
+    text = text.strip()
+    if not SECTION_HEADING.match(text):
+        text = f"## {title}\n\n{text}"
+    return text
+
+
+def assemble_report(preamble: str, sections: List[Dict[str, str]], patched: Dict[str, str]) -> str:
+    """Rebuild a report from its previous sections and the patched ones.
+
+    Updated sections replace the previous ones in place; new sections are
+    inserted before a closing section (e.g. 'Conclusion'), or appended.
+
+    Args:
+        preamble: Text before the first section of the previous report
+        sections: Sections of the previous report
+        patched: Updated and new section texts, by title
+
+    Returns:
+        str: The refreshed report
+    """
+    existing = {section['title'] for section in sections}
+    new_sections = [text for title, text in patched.items() if title not in existing]
+
+    insert_at = len(sections)
+    if sections and CLOSING_SECTION.search(sections[-1]['title']):
+        insert_at = len(sections) - 1
+
+    parts = [preamble]
+    for index, section in enumerate(sections):
+        if index == insert_at:
+            parts.extend(new_sections)
+        parts.append(patched.get(section['title'], section['text']))
+    if insert_at == len(sections):
+        parts.extend(new_sections)
+    return '\n\n'.join(part.strip('\n') for part in parts if part.strip()) + '\n'
+
+
+def summarize_changes(previous_sections: List[Dict[str, str]], report: str,
+                      changes: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Compare a refreshed report with the previous one, section by section.
+
+    Args:
+        previous_sections: Sections of the previous report
+        report: The refreshed report
+        changes: Parsed changes of the refresh, used to describe each change
+
+    Returns:
+        Dict[str, Any]: Section titles that were `updated`, `added`,
+        `unchanged` and `removed`, per-section entries with a short
+        description of the change, and a one-line `summary`
+    """
+    before = {_key(section['title']): section for section in previous_sections}
+    notes = {_key(title): change['changes'] for title, change in (changes or {}).items()}
+    _, after = split_sections(report)
+
+    result: Dict[str, Any] = {'updated': [], 'added': [], 'unchanged': [], 'removed': [], 'sections': []}
+    for section in after:
+        key = _key(section['title'])
+        previous = before.get(key)
+        if previous is None:
+            status = 'added'
+        elif previous['text'].strip() == section['text'].strip():
+            status = 'unchanged'
+        else:
+            status = 'updated'
+        result[status].append(section['title'])
+
+        note = notes.get(key, '') if status != 'unchanged' else ''
+        result['sections'].append({
+            'title': section['title'],
+            'status': status,
+            'changes': ' '.join(note.split())[:200],
+        })
+
+    after_keys = {_key(section['title']) for section in after}
+    result['removed'] = [section['title'] for key, section in before.items() if key not in after_keys]
+
+    counts = [f"{len(result[status])} {status}" for status in ('updated', 'added', 'removed', 'unchanged')
+              if result[status]]
+    result['summary'] = ', '.join(counts) if counts else 'no sections'
+    return result
+
+
+class ReportRefresher:
+    """Verifies and writes the changed sections of a refresh with concurrent agent calls."""
+
+    def __init__(
+        self,
+        tasks: ResearchTasks,
+        create_fact_checker: Callable[[], Any],
+        create_writer: Callable[[], Any],
+        concurrency: int = FACT_CHECK_CONCURRENCY,
+        on_section: Optional[Callable[..., None]] = None
+    ):
+        """Initialize the refresher.
+
+        Args:
+            tasks: Task factory for the research topic
+            create_fact_checker: Factory returning a fresh fact-checker agent
+            create_writer: Factory returning a fresh writer agent
+            concurrency: Maximum number of sections processed at the same time
+            on_section: Optional callback `(stage, 'section', section=, output=)`
+                receiving each section as it completes
+        """
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+
+        self.tasks = tasks
+        self.create_fact_checker = create_fact_checker
+        self.create_writer = create_writer
+        self.concurrency = concurrency
+        self.on_section = on_section or (lambda *args, **kwargs: None)
+
+    def _map(self, function: Callable, items: List[Any]) -> List[Any]:
+        """Apply a function to items on a bounded thread pool, keeping their order."""
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(items))) as executor:
+            return list(executor.map(function, items))
+
+    def _verify_section(self, item: Tuple[str, Dict[str, Any]]) -> Tuple[str, str]:
+        """Fact-check the changes of one section."""
+        title, change = item
+        agent = self.create_fact_checker()
+        output = run_task(agent, self.tasks.fact_check_task(agent, research=f"## {title}\n\n{change['changes']}"))
+        self.on_section('fact_check', 'section', section=title, output=output)
+        return title, output
+
+    def verify(self, changes: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+        """Fact-check the changes section by section.
+
+        Args:
+            changes: Parsed changes, by section title
+
+        Returns:
+            Dict[str, str]: Verified changes, by section title
+        """
+        return dict(self._map(self._verify_section, list(changes.items())))
+
+    def _patch_section(self, item: Tuple[str, str, Optional[str]]) -> Tuple[str, str]:
+        """Update one existing section, or write a new one."""
+        title, verified, current = item
+        agent = self.create_writer()
+        output = run_task(agent, self.tasks.section_update_task(agent, title, verified, current=current))
+        self.on_section('writing', 'section', section=title, output=output)
+        return title, _as_section(title, output)
+
+    def patch(self, sections: List[Dict[str, str]], verified: Dict[str, str]) -> Dict[str, str]:
+        """Write the updated and new sections.
+
+        Args:
+            sections: Sections of the previous report
+            verified: Verified changes, by section title
+
+        Returns:
+            Dict[str, str]: Section texts starting with their heading, by title
+        """
+        current = {section['title']: section['text'] for section in sections}
+        items = [(title, text, current.get(title)) for title, text in verified.items()]
+        return dict(self._map(self._patch_section, items))
@@ -0,0 +1,232 @@
+"""Semantic cache of finished research reports backed by ChromaDB."""
+import hashlib
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config import (
+    OUTPUT_DIR,
+    REPORT_CACHE_COLLECTION,
+    REPORT_CACHE_MAX_ENTRIES,
+    REPORT_CACHE_SIMILARITY_THRESHOLD,
+    REPORT_CACHE_TTL_SECONDS,
+)
+
+# Matches report files written by ResearchCrew, e.g. `quantum_computing_20250612_124028.md`
+REPORT_FILENAME_PATTERN = re.compile(r'^(?P<slug>.+)_(?P<timestamp>\d{8}_\d{6})\.(?:md|txt)$')
+
+
+def normalize_topic(topic: str) -> str:
+    """Normalize a topic so trivially different phrasings share an embedding.
+
+    Args:
+        topic: The raw research topic or chat prompt
+
+    Returns:
+        str: Lowercased topic with punctuation removed and whitespace collapsed
+    """
+    topic = re.sub(r'[^\w\s]', ' ', topic.lower())
+    return ' '.join(topic.split())
+
+
+class ReportCache:
+    """Look up previously generated reports for semantically similar topics."""
+
+    def __init__(
+        self,
+        client,
+        collection_name: str = REPORT_CACHE_COLLECTION,
+        similarity_threshold: float = REPORT_CACHE_SIMILARITY_THRESHOLD,
+        ttl_seconds: float = REPORT_CACHE_TTL_SECONDS,
+        max_entries: int = REPORT_CACHE_MAX_ENTRIES,
+        embedding_function=None,
+    ):
+        """Initialize the cache on top of an existing Chroma client.
+
+        Args:
+            client: A `chromadb` client (e.g. `chromadb.PersistentClient`)
+            collection_name: Name of the collection holding report entries
+            similarity_threshold: Minimum cosine similarity for a cache hit
+            ttl_seconds: Maximum age of a report that can still be served
+            max_entries: Maximum number of reports kept in the collection
+            embedding_function: Optional Chroma embedding function; defaults to
+                the shared embedding service
+        """
+        if embedding_function is None:
+            from embeddings import get_embedding_service
+            embedding_function = get_embedding_service().chroma_function()
+
+        self.collection = client.get_or_create_collection(
+            name=collection_name,
+            embedding_function=embedding_function,
+            metadata={'hnsw:space': 'cosine'}
+        )
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _entry_id(topic: str) -> str:
+        """Build a stable entry ID from the normalized topic."""
+        return hashlib.sha1(normalize_topic(topic).encode('utf-8')).hexdigest()
+
+    def _record(self, hit: bool) -> None:
+        """Update the hit/miss counters."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def lookup(self, topic: str) -> Optional[Dict[str, Any]]:
+        """Return a cached report for a similar topic, or None on a miss.
+
+        Args:
+            topic: The research topic being requested
+
+        Returns:
+            Optional[Dict[str, Any]]: A result dict shaped like `ResearchCrew.run()`
+            with `cached` set, or None if no fresh, similar report exists
+        """
+        normalized = normalize_topic(topic)
+        if not normalized or self.collection.count() == 0:
+            self._record(False)
+            return None
+
+        cutoff = time.time() - self.ttl_seconds
+        matches = self.collection.query(
+            query_texts=[normalized],
+            n_results=1,
+            where={'created_at': {'$gte': cutoff}},
+            include=['metadatas', 'distances']
+        )
+
+        ids = matches['ids'][0] if matches['ids'] else []
+        if not ids:
+            self._record(False)
+            return None
+
+        metadata = matches['metadatas'][0][0]
+        similarity = 1.0 - matches['distances'][0][0]
+        output_file = Path(metadata['output_file'])
+
+        if similarity < self.similarity_threshold:
+            self._record(False)
+            return None
+
+        if not output_file.exists():
+            # The report was deleted from disk, so the entry can never be served
+            self.collection.delete(ids=[ids[0]])
+            self._record(False)
+            return None
+
+        self._record(True)
+        return {
+            'topic': topic,
+            'result': output_file.read_text(encoding='utf-8'),
+            'output_file': str(output_file),
+            'success': True,
+            'cached': True,
+            'cached_topic': metadata.get('topic'),
+            'similarity': similarity,
+        }
+
+    def store(self, topic: str, output_file, created_at: Optional[float] = None) -> None:
+        """Add or replace the cached report for a topic.
+
+        Args:
+            topic: The research topic the report answers
+            output_file: Path to the report file in the output directory
+            created_at: Report creation time; defaults to now
+        """
+        output_file = Path(output_file)
+        if not output_file.exists():
+            return
+
+        normalized = normalize_topic(topic)
+        if not normalized:
+            return
+
+        self.collection.upsert(
+            ids=[self._entry_id(topic)],
+            documents=[normalized],
+            metadatas=[{
+                'topic': topic,
+                'output_file': str(output_file),
+                'created_at': created_at if created_at is not None else time.time(),
+                'size': output_file.stat().st_size,
+            }]
+        )
+        self.evict()
+
+    def backfill(self, output_dir: Path = OUTPUT_DIR) -> int:
+        """Index existing reports in the output directory that are not cached yet.
+
+        Args:
+            output_dir: Directory containing previously generated reports
+
+        Returns:
+            int: Number of reports added to the cache
+        """
+        known = set(
+            metadata['output_file']
+            for metadata in self.collection.get(include=['metadatas'])['metadatas']
+        )
+        cutoff = time.time() - self.ttl_seconds
+        added = 0
+
+        for path in sorted(Path(output_dir).glob('*')):
+            match = REPORT_FILENAME_PATTERN.match(path.name)
+            if not match or str(path) in known:
+                continue
+
+            created_at = datetime.strptime(match.group('timestamp'), '%Y%m%d_%H%M%S').timestamp()
+            if created_at < cutoff:
+                continue
+
+            self.store(match.group('slug').replace('_', ' '), path, created_at=created_at)
+            added += 1
+
+        return added
+
+    def evict(self) -> int:
+        """Evict entries older than the TTL and trim the collection to `max_entries`.
+
+        Returns:
+            int: Number of entries removed
+        """
+        cutoff = time.time() - self.ttl_seconds
+        expired = self.collection.get(where={'created_at': {'$lt': cutoff}})['ids']
+        if expired:
+            self.collection.delete(ids=expired)
+
+        overflow = self.collection.count() - self.max_entries
+        if overflow <= 0:
+            return len(expired)
+
+        entries = self.collection.get(include=['metadatas'])
+        oldest = sorted(
+            zip(entries['ids'], entries['metadatas']),
+            key=lambda entry: entry[1]['created_at']
+        )[:overflow]
+        self.collection.delete(ids=[entry_id for entry_id, _ in oldest])
+        return len(expired) + len(oldest)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the current number of cached reports."""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': (hits / total) if total else 0.0,
+            'entries': self.collection.count(),
+        }
@@ -0,0 +1,362 @@
+"""Full-text and metadata index of the reports in the output directory.
+
+Every report is indexed with its topic, creation time, size, run metrics and
+full text in a SQLite FTS5 table, so past reports can be searched without
+reading the output directory. Reports are added as they are written, and
+`refresh()` re-reads only the files whose size or modification time changed.
+
+Usage:
+    python report_index.py search "solar panels efficiency"
+    python report_index.py recent --limit 20
+    python report_index.py refresh
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import OUTPUT_DIR, REPORT_INDEX_PATH
+from report_cache import REPORT_FILENAME_PATTERN
+
+REPORT_SUFFIXES = ('.md', '.txt')
+
+
+def _parse_filename(path: Path, mtime: float) -> Dict[str, Any]:
+    """Derive the topic and creation time of a report from its file name."""
+    match = REPORT_FILENAME_PATTERN.match(path.name)
+    if not match:
+        return {'topic': path.stem.replace('_', ' '), 'created_at': mtime}
+    created_at = datetime.strptime(match.group('timestamp'), '%Y%m%d_%H%M%S').timestamp()
+    return {'topic': match.group('slug').replace('_', ' '), 'created_at': created_at}
+
+
+def _match_expression(query: str) -> str:
+    """Turn free text into an FTS5 query matching documents containing every word."""
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+class ReportIndex:
+    """SQLite FTS5 index of the research reports in an output directory."""
+
+    def __init__(self, path: Path = REPORT_INDEX_PATH, output_dir: Path = OUTPUT_DIR):
+        """Open (or create) the index database.
+
+        Args:
+            path: Location of the SQLite database file
+            output_dir: Directory containing the reports
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        self.output_dir = Path(output_dir)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS reports ('
+            ' id INTEGER PRIMARY KEY,'
+            ' path TEXT NOT NULL UNIQUE,'
+            ' topic TEXT NOT NULL,'
+            ' created_at REAL NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' mtime REAL NOT NULL,'
+            ' metrics TEXT,'
+            ' indexed_at REAL NOT NULL)'
+        )
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS reports_created_at ON reports (created_at)'
+        )
+        # The FTS rows share their rowid with the `reports` row they index
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5("
+            " topic, content, tokenize='porter unicode61')"
+        )
+        # Topic matches weigh double; a configured rank lets FTS5 stop after LIMIT rows
+        self._conn.execute(
+            "INSERT INTO reports_fts (reports_fts, rank) VALUES ('rank', 'bm25(2.0, 1.0)')"
+        )
+        self._conn.commit()
+
+    def _upsert(self, path: Path, stat: os.stat_result, topic: Optional[str],
+                metrics: Optional[Dict[str, Any]]) -> None:
+        """Index or re-index a report; the caller holds the lock and commits."""
+        content = path.read_text(encoding='utf-8', errors='replace')
+        row = self._conn.execute(
+            'SELECT id, topic, created_at, metrics FROM reports WHERE path = ?', (str(path),)
+        ).fetchone()
+
+        if row is None:
+            parsed = _parse_filename(path, stat.st_mtime)
+            cursor = self._conn.execute(
+                'INSERT INTO reports (path, topic, created_at, size, mtime, metrics, indexed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (
+                    str(path), topic or parsed['topic'], parsed['created_at'], stat.st_size,
+                    stat.st_mtime, json.dumps(metrics) if metrics is not None else None, time.time()
+                )
+            )
+            report_id = cursor.lastrowid
+        else:
+            # A rescan keeps the topic and metrics recorded when the report was written
+            report_id = row['id']
+            topic = topic or row['topic']
+            self._conn.execute(
+                'UPDATE reports SET topic = ?, size = ?, mtime = ?, metrics = ?, indexed_at = ? '
+                'WHERE id = ?',
+                (
+                    topic, stat.st_size, stat.st_mtime,
+                    json.dumps(metrics) if metrics is not None else row['metrics'],
+                    time.time(), report_id
+                )
+            )
+            self._conn.execute('DELETE FROM reports_fts WHERE rowid = ?', (report_id,))
+
+        self._conn.execute(
+            'INSERT INTO reports_fts (rowid, topic, content) VALUES (?, ?, ?)',
+            (report_id, topic or _parse_filename(path, stat.st_mtime)['topic'], content)
+        )
+
+    def add(self, output_file, topic: Optional[str] = None,
+            metrics: Optional[Dict[str, Any]] = None) -> bool:
+        """Index a newly written (or rewritten) report.
+
+        Args:
+            output_file: Path to the report file
+            topic: The research topic; defaults to the one in the file name
+            metrics: Run metrics to store with the report, e.g. a telemetry summary
+
+        Returns:
+            bool: True if the report was indexed, False if the file does not exist
+        """
+        path = Path(output_file).resolve()
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return False
+
+        with self._lock:
+            self._upsert(path, stat, topic, metrics)
+            self._conn.commit()
+        return True
+
+    def refresh(self) -> Dict[str, int]:
+        """Bring the index up to date with the output directory.
+
+        Only reports that are new or whose size or modification time changed
+        are read; reports deleted from disk are dropped from the index.
+
+        Returns:
+            Dict[str, int]: Number of reports added, updated and removed
+        """
+        output_dir = self.output_dir.resolve()
+        on_disk = {}
+        if output_dir.is_dir():
+            with os.scandir(output_dir) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith(REPORT_SUFFIXES):
+                        on_disk[str(output_dir / entry.name)] = entry.stat()
+
+        counts = {'added': 0, 'updated': 0, 'removed': 0}
+        with self._lock:
+            indexed = {
+                row['path']: (row['id'], row['size'], row['mtime'])
+                for row in self._conn.execute('SELECT id, path, size, mtime FROM reports')
+            }
+
+            for path, stat in on_disk.items():
+                known = indexed.get(path)
+                if known is not None and known[1] == stat.st_size and known[2] == stat.st_mtime:
+                    continue
+                try:
+                    self._upsert(Path(path), stat, None, None)
+                except OSError:
+                    # Deleted or unreadable since the scan; picked up by the next refresh
+                    continue
+                counts['updated' if known is not None else 'added'] += 1
+
+            removed = [(report_id,) for path, (report_id, _, _) in indexed.items() if path not in on_disk]
+            self._conn.executemany('DELETE FROM reports WHERE id = ?', removed)
+            self._conn.executemany('DELETE FROM reports_fts WHERE rowid = ?', removed)
+            counts['removed'] = len(removed)
+            self._conn.commit()
+        return counts
+
+    @staticmethod
+    def _report(row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a result row into a report dict."""
+        report = {
+            'path': row['path'],
+            'topic': row['topic'],
+            'created_at': row['created_at'],
+            'size': row['size'],
+            'metrics': json.loads(row['metrics']) if row['metrics'] else None,
+        }
+        if 'snippet' in row.keys():
+            report['snippet'] = row['snippet']
+            report['score'] = -row['rank']
+        return report
+
+    def search(self, query: str, limit: int = 10, raw: bool = False) -> List[Dict[str, Any]]:
+        """Find the reports best matching a full-text query.
+
+        Args:
+            query: Words that must all appear in the topic or text of a report
+            limit: Maximum number of reports to return
+            raw: Pass `query` to FTS5 unchanged, allowing its query syntax
+                (`OR`, `NEAR`, `topic:`, prefix `*`)
+
+        Returns:
+            List[Dict[str, Any]]: Matching reports, best match first, each with
+            a highlighted `snippet` and a relevance `score`
+
+        Raises:
+            ValueError: If a raw query is not valid FTS5 syntax
+        """
+        expression = query if raw else _match_expression(query)
+        if not expression.strip():
+            return []
+
+        with self._lock:
+            try:
+                rows = self._conn.execute(
+                    "SELECT r.*, m.rank, m.snippet FROM ("
+                    " SELECT rowid, rank, snippet(reports_fts, 1, '[', ']', '...', 16) AS snippet"
+                    ' FROM reports_fts WHERE reports_fts MATCH ? ORDER BY rank LIMIT ?'
+                    ') m JOIN reports r ON r.id = m.rowid ORDER BY m.rank',
+                    (expression, limit)
+                ).fetchall()
+            except sqlite3.OperationalError as e:
+                raise ValueError(f"Invalid search query {query!r}: {e}") from e
+        return [self._report(row) for row in rows]
+
+    def recent(self, limit: int = 10, topic: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List the most recently created reports.
+
+        Args:
+            limit: Maximum number of reports to return
+            topic: Only reports whose topic contains this text (case-insensitive)
+
+        Returns:
+            List[Dict[str, Any]]: Reports, newest first
+        """
+        with self._lock:
+            if topic:
+                rows = self._conn.execute(
+                    'SELECT * FROM reports WHERE topic LIKE ? ORDER BY created_at DESC LIMIT ?',
+                    (f"%{topic}%", limit)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    'SELECT * FROM reports ORDER BY created_at DESC LIMIT ?', (limit,)
+                ).fetchall()
+        return [self._report(row) for row in rows]
+
+    def get(self, output_file) -> Optional[Dict[str, Any]]:
+        """Get the indexed metadata of a report, or None if it is not indexed."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT * FROM reports WHERE path = ?', (str(Path(output_file).resolve()),)
+            ).fetchone()
+        return self._report(row) if row is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the number and total size of the indexed reports."""
+        with self._lock:
+            count, size = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM reports'
+            ).fetchone()
+        return {'reports': count, 'size_bytes': size}
+
+
+_report_index: Optional[ReportIndex] = None
+_report_index_lock = threading.Lock()
+
+
+def get_report_index() -> ReportIndex:
+    """Get the process-wide report index, refreshing it on first use."""
+    global _report_index
+    with _report_index_lock:
+        if _report_index is None:
+            index = ReportIndex()
+            index.refresh()
+            _report_index = index
+        return _report_index
+
+
+def index_report(output_file, topic: str, metrics: Optional[Dict[str, Any]] = None) -> None:
+    """Add a just-written report to the process-wide index.
+
+    Indexing failures are reported but never fail the run that wrote the report.
+    """
+    try:
+        get_report_index().add(output_file, topic=topic, metrics=metrics)
+    except Exception as e:
+        print(f"⚠️  Could not index report {output_file}: {e}")
+
+
+def _print_reports(reports: List[Dict[str, Any]]) -> None:
+    """Print reports one per line, with their search snippet if any."""
+    if not reports:
+        print("No reports found.")
+        return
+    for report in reports:
+        created = datetime.fromtimestamp(report['created_at']).strftime('%Y-%m-%d %H:%M')
+        print(f"📄 {created}  {report['topic']}  ({report['size']} bytes)")
+        print(f"   {report['path']}")
+        if report.get('snippet'):
+            print(f"   {' '.join(report['snippet'].split())}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search the research report archive')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    search_parser = subparsers.add_parser('search', parents=[common], help='Full-text search of the reports')
+    search_parser.add_argument('query', type=str, help='Words that must appear in the report')
+    search_parser.add_argument('--limit', type=int, default=10, help='Maximum results (default: 10)')
+    search_parser.add_argument('--raw', action='store_true', help='Use FTS5 query syntax')
+
+    recent_parser = subparsers.add_parser('recent', parents=[common], help='List the newest reports')
+    recent_parser.add_argument('--limit', type=int, default=10, help='Maximum results (default: 10)')
+    recent_parser.add_argument('--topic', type=str, help='Only topics containing this text')
+
+    subparsers.add_parser('refresh', parents=[common], help='Re-index changed reports and print the index size')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = ReportIndex()
+    changes = index.refresh()
+
+    if args.command == 'refresh':
+        result: Any = {**changes, **index.stats()}
+    elif args.command == 'search':
+        try:
+            result = index.search(args.query, limit=args.limit, raw=args.raw)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+    else:
+        result = index.recent(limit=args.limit, topic=args.topic)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    elif args.command == 'refresh':
+        print(f"✅ Indexed {result['reports']} reports ({result['size_bytes']} bytes): "
+              f"{changes['added']} added, {changes['updated']} updated, "
+              f"{changes['removed']} removed in {elapsed * 1000:.1f} ms")
+    else:
+        _print_reports(result)
+        print(f"\n⏱️  {len(result)} results in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
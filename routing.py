@@ -0,0 +1,262 @@
+"""Per-call model routing for the agents' LLM calls.
+
+Every agent has a configured model (`AGENT_MODELS`). Before each call the
+router checks that model against the size of the prompt and the per-call
+latency and cost budgets, and switches to another model when it does not fit:
+
+    - the prompt (plus the expected answer) must fit in the model's context window
+    - the estimated latency and cost must be within the budgets; otherwise the
+      cheapest model that fits the budgets is used
+
+When the fact-checker flags problems (incorrect or unverifiable claims), the
+writer is escalated to `ROUTING_ESCALATION_MODEL` for the rest of the run, so
+the stronger model is only paid for when the draft needs correcting.
+"""
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from config import (
+    MODEL_PROFILES,
+    ROUTING_COST_BUDGET_USD,
+    ROUTING_ENABLED,
+    ROUTING_ESCALATION_MIN_FLAGS,
+    ROUTING_ESCALATION_MODEL,
+    ROUTING_EXPECTED_COMPLETION_TOKENS,
+    ROUTING_LATENCY_BUDGET_SECONDS,
+)
+from telemetry import estimate_cost
+
+# Asked of free-form fact-checks, so their problems can be counted without reading the prose
+FLAGGED_SECTION_INSTRUCTIONS = (
+    "End with a 'FLAGGED:' section listing every problem found, one per line, as "
+    "'INCORRECT: <claim> - <correction>' or 'UNVERIFIABLE: <claim>'. "
+    "If there are none, write 'FLAGGED: NONE'."
+)
+
+# Lines reporting a problem: 'INCORRECT: ...' / 'UNVERIFIABLE: ...' in the FLAGGED
+# section, and 'Verdict: INCORRECT' in merged claim verdicts
+_FLAG_LINE = re.compile(
+    r'^[\s>*_-]*(?:\d+[.)]\s*)?[*_]*(?:INCORRECT|UNVERIFIABLE)[*_]*\s*:[*_]*\s*(?P<rest>.*)$',
+    re.IGNORECASE
+)
+_VERDICT_LINE = re.compile(r'^[\s>*_-]*verdict[*_]*\s*:[*_\s]*(?:INCORRECT|UNVERIFIABLE)\b', re.IGNORECASE)
+_FLAGGED_HEADER = re.compile(r'^[\s>#*_-]*FLAGGED[*_]*\s*:[*_]*\s*(?P<rest>.*)$', re.IGNORECASE)
+_LIST_ITEM = re.compile(r'^\s*(?:[-*•]|\d+[.)])\s+(?P<rest>.*)$')
+_HEADING = re.compile(r'^\s*#{1,6}\s')
+_NOTHING = re.compile(r'^[\W_]*(?:none|n/?a|nothing|no (?:issues|problems))?[\W_]*$', re.IGNORECASE)
+
+
+def count_fact_check_flags(text: str) -> int:
+    """Count the problems a fact-check output reports.
+
+    Only anchored findings count, so prose such as "no claims were
+    incorrect" does not: 'INCORRECT:' and 'UNVERIFIABLE:' lines, 'Verdict:
+    INCORRECT' (or UNVERIFIABLE) lines of claim verdicts, and the items of a
+    'FLAGGED:' section (see `FLAGGED_SECTION_INSTRUCTIONS`). Entries such as
+    'FLAGGED: NONE' count nothing.
+
+    Args:
+        text: Output of the fact-checker (or merged claim verdicts)
+
+    Returns:
+        int: Number of incorrect or unverifiable findings
+    """
+    flags = 0
+    in_flagged = False
+    for line in (text or '').splitlines():
+        header = _FLAGGED_HEADER.match(line)
+        if header:
+            in_flagged = True
+            flags += not _NOTHING.match(header.group('rest'))
+            continue
+        if _HEADING.match(line):
+            in_flagged = False
+
+        flag = _FLAG_LINE.match(line)
+        if flag:
+            flags += not _NOTHING.match(flag.group('rest'))
+        elif _VERDICT_LINE.match(line):
+            flags += 1
+        elif in_flagged:
+            item = _LIST_ITEM.match(line)
+            flags += bool(item) and not _NOTHING.match(item.group('rest'))
+    return flags
+
+
+def _profile(model: str) -> Optional[Dict[str, float]]:
+    """Get the profile of a model, matching the longest profile name prefix."""
+    matches = [name for name in MODEL_PROFILES if model.startswith(name)]
+    return MODEL_PROFILES[max(matches, key=len)] if matches else None
+
+
+class ModelRouter:
+    """Chooses the model of every LLM call of a run and records the decisions."""
+
+    def __init__(
+        self,
+        latency_budget_seconds: Optional[float] = ROUTING_LATENCY_BUDGET_SECONDS,
+        cost_budget_usd: Optional[float] = ROUTING_COST_BUDGET_USD,
+        escalation_model: Optional[str] = ROUTING_ESCALATION_MODEL,
+        expected_completion_tokens: int = ROUTING_EXPECTED_COMPLETION_TOKENS,
+        escalation_min_flags: int = ROUTING_ESCALATION_MIN_FLAGS,
+        enabled: bool = ROUTING_ENABLED
+    ):
+        """Initialize the router.
+
+        Args:
+            latency_budget_seconds: Maximum estimated seconds per call; None for no limit
+            cost_budget_usd: Maximum estimated cost per call; None for no limit
+            escalation_model: Model used by escalated stages; None disables escalation
+            expected_completion_tokens: Answer length assumed by the estimates
+            escalation_min_flags: Fact-check problems needed to escalate the writer
+            enabled: When False, every call uses its configured model
+        """
+        self.latency_budget_seconds = latency_budget_seconds
+        self.cost_budget_usd = cost_budget_usd
+        self.escalation_model = escalation_model
+        self.expected_completion_tokens = expected_completion_tokens
+        self.escalation_min_flags = escalation_min_flags
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self.escalations: Dict[str, Dict[str, Any]] = {}
+        self.decisions: List[Dict[str, Any]] = []
+
+    def estimate(self, model: str, prompt_tokens: int) -> Dict[str, Any]:
+        """Estimate whether a call fits a model, and its latency and cost.
+
+        Args:
+            model: Model name
+            prompt_tokens: Tokens of the prompt
+
+        Returns:
+            Dict[str, Any]: `fits` (context window), `latency_seconds` and
+            `cost_usd`; latency is None for models without a profile
+        """
+        profile = _profile(model)
+        completion_tokens = self.expected_completion_tokens
+        if profile is None:
+            return {
+                'fits': True,
+                'latency_seconds': None,
+                'cost_usd': estimate_cost(model, prompt_tokens, completion_tokens),
+            }
+        return {
+            'fits': prompt_tokens + completion_tokens <= profile['context_window'],
+            'latency_seconds': (
+                profile['first_token_seconds']
+                + prompt_tokens / profile['prompt_tokens_per_second']
+                + completion_tokens / profile['tokens_per_second']
+            ),
+            'cost_usd': estimate_cost(model, prompt_tokens, completion_tokens),
+        }
+
+    def _within_budget(self, estimate: Dict[str, Any]) -> bool:
+        """Whether an estimate is within the latency and cost budgets."""
+        if self.latency_budget_seconds is not None and estimate['latency_seconds'] is not None:
+            if estimate['latency_seconds'] > self.latency_budget_seconds:
+                return False
+        if self.cost_budget_usd is not None and estimate['cost_usd'] > self.cost_budget_usd:
+            return False
+        return True
+
+    def _cheapest(self, prompt_tokens: int, within_budget: bool) -> Optional[str]:
+        """Cheapest profiled model that fits the prompt (and the budgets, if asked)."""
+        candidates = []
+        for model in MODEL_PROFILES:
+            estimate = self.estimate(model, prompt_tokens)
+            if estimate['fits'] and (not within_budget or self._within_budget(estimate)):
+                candidates.append((estimate['cost_usd'], estimate['latency_seconds'], model))
+        return min(candidates)[2] if candidates else None
+
+    def route(self, stage: str, model: str, prompt_tokens: int) -> Dict[str, Any]:
+        """Choose the model of one call and record the decision.
+
+        Args:
+            stage: Task name of the calling agent
+            model: The agent's configured model
+            prompt_tokens: Tokens of the prompt about to be sent
+
+        Returns:
+            Dict[str, Any]: The decision: `model` to call, `requested_model`,
+            `reason` ('configured', 'escalated', 'context_window', 'budget' or
+            'over_budget' when no model is within budget) and the estimates
+        """
+        requested = model
+        reason = 'configured'
+        with self._lock:
+            escalation = self.escalations.get(stage) if self.enabled else None
+        if escalation is not None:
+            model, reason = self.escalation_model, 'escalated'
+
+        if self.enabled:
+            estimate = self.estimate(model, prompt_tokens)
+            if not estimate['fits']:
+                larger = self._cheapest(prompt_tokens, within_budget=False)
+                if larger is not None:
+                    model, reason = larger, 'context_window'
+            elif escalation is None and not self._within_budget(estimate):
+                # Escalations are worth their latency; drafts are kept within budget
+                cheaper = self._cheapest(prompt_tokens, within_budget=True)
+                if cheaper is not None:
+                    model, reason = cheaper, 'budget'
+                else:
+                    reason = 'over_budget'
+
+        estimate = self.estimate(model, prompt_tokens)
+        decision = {
+            'stage': stage,
+            'requested_model': requested,
+            'model': model,
+            'reason': reason,
+            'prompt_tokens': prompt_tokens,
+            'estimated_latency_seconds': (
+                round(estimate['latency_seconds'], 3) if estimate['latency_seconds'] is not None else None
+            ),
+            'estimated_cost_usd': round(estimate['cost_usd'], 6),
+            'time': time.time(),
+        }
+        with self._lock:
+            self.decisions.append(decision)
+        return decision
+
+    def escalate(self, stage: str, reason: str) -> None:
+        """Use the escalation model for the rest of the run's calls of a stage."""
+        if self.escalation_model is None or not self.enabled:
+            return
+        with self._lock:
+            if stage in self.escalations:
+                return
+            self.escalations[stage] = {'model': self.escalation_model, 'reason': reason, 'time': time.time()}
+        print(f"⬆️  Escalating {stage} to {self.escalation_model}: {reason}")
+
+    def review_fact_check(self, text: str) -> bool:
+        """Escalate the writer if a fact-check output flags enough problems.
+
+        Args:
+            text: Output of the fact-checker (or of one of its sections or claims)
+
+        Returns:
+            bool: Whether the writer is escalated
+        """
+        flags = count_fact_check_flags(text)
+        if flags >= self.escalation_min_flags:
+            self.escalate('writing', f"fact-checker flagged {flags} problem(s)")
+        with self._lock:
+            return 'writing' in self.escalations
+
+    def summary(self) -> Dict[str, Any]:
+        """Get the routing decisions of the run and how many calls went to each model."""
+        with self._lock:
+            decisions = [dict(decision) for decision in self.decisions]
+            escalations = {stage: dict(escalation) for stage, escalation in self.escalations.items()}
+        return {
+            'enabled': self.enabled,
+            'escalations': escalations,
+            'calls_by_model': dict(Counter(decision['model'] for decision in decisions)),
+            'rerouted_calls': sum(1 for d in decisions if d['model'] != d['requested_model']),
+            'decisions': decisions,
+        }
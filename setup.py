@@ -6,7 +6,7 @@ setup(
     packages=find_packages(),
     install_requires=[
         "crewai>=0.11.0",
-        "streamlit>=1.23.0",
+        "streamlit>=1.31.0",
         "python-dotenv>=1.0.0",
         "rich>=13.0.0",
         "matplotlib>=3.7.0",
@@ -14,7 +14,10 @@ setup(
         "sentence-transformers>=2.2.2",
         "pypdf>=3.0.0",
         "pydantic>=2.0.0",
+        "httpx>=0.24.0",
+        "fastapi>=0.100.0",
+        "uvicorn>=0.23.0",
         "pytest>=7.0.0"
     ],
-    python_requires=">=3.8",
+    python_requires=">=3.9",
 )
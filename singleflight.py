@@ -0,0 +1,80 @@
+"""Single-flight coalescing of identical concurrent calls.
+
+While a call for a key is in flight, further calls with the same key do not
+run the function again: they wait for the first call and share its result
+(or exception). Once the call returns, the key is free again.
+
+Batch runs (batch.py) key their topics with `research_key()`, on the
+normalized topic and the run settings, so duplicate topics in a batch never
+start two crews. Only batch runs use `SingleFlight`: the job queue coalesces
+identical requests in its database, and the HTTP API keeps its own table of
+runs in flight keyed by `research_key()`.
+"""
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from report_cache import normalize_topic
+
+
+def research_key(topic: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """Key identical research requests: the normalized topic and the run settings."""
+    return f"{normalize_topic(topic)}\n{json.dumps(options or {}, sort_keys=True, default=str)}"
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; duplicate callers share its outcome."""
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def call(self, key: Hashable, function: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run `function`, or join the call already in flight for `key`.
+
+        Args:
+            key: Identity of the call, e.g. `research_key(topic, options)`
+            function: The work to run when no call for `key` is in flight
+
+        Returns:
+            Tuple[Any, bool]: The result, and whether it came from another
+            caller's call
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is None:
+                future = self._calls[key] = Future()
+                self.started += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = function()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return result, False
+
+    def in_flight(self) -> int:
+        """Number of calls currently running."""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        """Get the number of calls started, coalesced and in flight."""
+        with self._lock:
+            return {'started': self.started, 'coalesced': self.coalesced, 'in_flight': len(self._calls)}
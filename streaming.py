@@ -0,0 +1,162 @@
+"""Token streaming from the crew's LLM calls to a consumer."""
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from progress import TOKEN, ProgressBus
+
+# crewai agents prefix their answer with a "Thought:" line; only the answer is streamed
+FINAL_ANSWER_MARKER = 'Final Answer:'
+
+_STREAM_END = object()
+
+
+class TokenStream:
+    """Thread-safe stream of tokens produced while the crew is running.
+
+    Tokens are pushed by `StreamingCallbackHandler` from the thread executing
+    the crew and consumed by iterating over the stream (or calling `get`).
+    Streamed tokens are also appended to `output_file` as they arrive, so a
+    crash still leaves a partial report on disk.
+    """
+
+    def __init__(self, stages: Iterable[str] = ('writing',), output_file=None, bus: Optional[ProgressBus] = None):
+        """Initialize the stream.
+
+        Args:
+            stages: Task names ('research', 'fact_check', 'writing') whose
+                output is streamed
+            output_file: Optional file the streamed tokens are appended to
+            bus: Optional progress bus that also receives a `token` event per token
+        """
+        self.stages = set(stages)
+        self.output_file = Path(output_file) if output_file else None
+        self.bus = bus
+
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._file = None
+        self._last_stage: Optional[str] = None
+        self._streamed_stages = set()
+        self._closed = False
+
+    def put(self, stage: str, token: str) -> None:
+        """Push a token produced by a stage."""
+        if stage not in self.stages or not token:
+            return
+
+        with self._lock:
+            if self._closed:
+                return
+            if self.output_file is not None:
+                self._append(stage, token)
+            self._last_stage = stage
+            self._streamed_stages.add(stage)
+            self._queue.put((stage, token))
+
+        if self.bus is not None:
+            self.bus.publish(TOKEN, task=stage, token=token)
+
+    def _append(self, stage: str, token: str) -> None:
+        """Append a token to the partial report file."""
+        if self._file is None:
+            self.output_file.parent.mkdir(exist_ok=True, parents=True)
+            self._file = open(self.output_file, 'w', encoding='utf-8')
+        elif stage != self._last_stage:
+            self._file.write('\n\n')
+        self._file.write(token)
+        self._file.flush()
+
+    def complete_stage(self, stage: str, text: str) -> None:
+        """Push a stage's full output if none of its tokens were streamed.
+
+        This covers responses served from the LLM cache and crewai versions
+        that do not stream through the LLM callbacks.
+        """
+        if stage not in self._streamed_stages:
+            self.put(stage, text)
+
+    def close(self) -> None:
+        """Signal consumers that no more tokens will arrive."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._queue.put(_STREAM_END)
+
+    @property
+    def closed(self) -> bool:
+        """Whether the producer has finished."""
+        return self._closed
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[str, str]]:
+        """Wait for the next `(stage, token)` pair.
+
+        Args:
+            timeout: Seconds to wait before raising `queue.Empty`
+
+        Returns:
+            Optional[Tuple[str, str]]: The next stage and token, or None once the
+            stream has been closed
+        """
+        item = self._queue.get(timeout=timeout)
+        if item is _STREAM_END:
+            # Leave the marker in place so every later call also sees the end
+            self._queue.put(_STREAM_END)
+            return None
+        return item
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the streamed tokens until the stream is closed."""
+        while True:
+            item = self.get()
+            if item is None:
+                return
+            yield item[1]
+
+
+class StreamingCallbackHandler(BaseCallbackHandler):
+    """LangChain callback handler forwarding an agent's answer tokens to a TokenStream."""
+
+    def __init__(self, stream: TokenStream, stage: str):
+        """Initialize the handler.
+
+        Args:
+            stream: The stream receiving the tokens
+            stage: Task name the agent's tokens belong to
+        """
+        self.stream = stream
+        self.stage = stage
+        self._buffer = ''
+        self._in_answer = False
+        self._answer_started = False
+
+    def on_llm_start(self, serialized: Any, prompts: Any, **kwargs: Any) -> None:
+        """Reset the answer detection for a new LLM call."""
+        self._buffer = ''
+        self._in_answer = False
+        self._answer_started = False
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        """Forward tokens that follow the final answer marker."""
+        if not self._in_answer:
+            self._buffer += token
+            index = self._buffer.find(FINAL_ANSWER_MARKER)
+            if index < 0:
+                return
+            self._in_answer = True
+            token = self._buffer[index + len(FINAL_ANSWER_MARKER):]
+            self._buffer = ''
+
+        if not self._answer_started:
+            # Drop the whitespace between the marker and the answer
+            token = token.lstrip()
+            self._answer_started = bool(token)
+        if token:
+            self.stream.put(self.stage, token)
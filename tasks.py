@@ -5,21 +5,40 @@ from typing import List, Optional
 from datetime import datetime
 from pathlib import Path
 from config import OUTPUT_DIR
+from routing import FLAGGED_SECTION_INSTRUCTIONS
+
+
+def task_output_text(task: Task) -> Optional[str]:
+    """Get the raw text output of an executed task, if any.
+    
+    Args:
+        task: A task that may have been executed by a crew
+        
+    Returns:
+        Optional[str]: The task's raw output, or None if it has not run
+    """
+    output = getattr(task, 'output', None)
+    # crewai renamed `raw_output` to `raw` in later releases
+    return getattr(output, 'raw_output', None) or getattr(output, 'raw', None)
 
 
 class ResearchTasks:
     """Class to manage all research tasks."""
     
-    def __init__(self, topic: str):
+    def __init__(self, topic: str, output_file: Optional[Path] = None):
         """Initialize with the research topic.
         
         Args:
             topic: The research topic
+            output_file: Report file written by the writing task; a new
+                timestamped file in `OUTPUT_DIR` when not given (e.g. when a
+                resumed run reuses the report file of its first attempt)
         """
         self.topic = topic
         self.timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{topic.lower().replace(' ', '_')}_{self.timestamp}.md"
-        self.output_file = OUTPUT_DIR / filename
+        if output_file is None:
+            output_file = OUTPUT_DIR / f"{topic.lower().replace(' ', '_')}_{self.timestamp}.md"
+        self.output_file = Path(output_file)
     
     def research_task(self, agent) -> Task:
         """Create a research task.
@@ -47,16 +66,22 @@ class ResearchTasks:
         return Task(
             description=description,
             expected_output=expected_output,
-            agent=agent,
-            output_file=str(self.output_file)
+            agent=agent
         )
     
-    def fact_check_task(self, agent, context: Optional[List[Task]] = None) -> Task:
+    def fact_check_task(
+        self,
+        agent,
+        context: Optional[List[Task]] = None,
+        research: Optional[str] = None
+    ) -> Task:
         """Create a fact-checking task.
         
         Args:
             agent: The agent assigned to this task
             context: List of tasks that this task depends on
+            research: Research to verify when it was not produced by a context
+                task (e.g. loaded from a checkpoint)
             
         Returns:
             Task: Configured fact-checking task
@@ -68,26 +93,35 @@ class ResearchTasks:
             Provide sources for your verifications when possible.
         """)
         
+        if research:
+            description += f"\nResearch findings:\n{research}"
+        
         expected_output = dedent("""
             A verified version of the research document with fact-checked 
             information and notes on verification status.
             Include any corrections or additional context needed.
-        """)
+        """) + FLAGGED_SECTION_INSTRUCTIONS
         
         return Task(
             description=description,
             expected_output=expected_output,
             agent=agent,
-            context=context or [],
-            output_file=str(self.output_file)
+            context=context or []
         )
     
-    def writing_task(self, agent, context: Optional[List[Task]] = None) -> Task:
+    def writing_task(
+        self,
+        agent,
+        context: Optional[List[Task]] = None,
+        verified_research: Optional[str] = None
+    ) -> Task:
         """Create a writing task.
         
         Args:
             agent: The agent assigned to this task
             context: List of tasks that this task depends on
+            verified_research: Verified research to write from when it was not
+                produced by a context task (e.g. merged claim verdicts)
             
         Returns:
             Task: Configured writing task
@@ -100,6 +134,12 @@ class ResearchTasks:
             "Include an introduction, main content with subsections, and a conclusion."
         ).format(topic=self.topic)
         
+        if verified_research:
+            description += (
+                " Only use claims marked VERIFIED as facts; correct or leave out the others."
+                f"\n\nVerified research:\n{verified_research}"
+            )
+        
         expected_output = (
             "A well-written article about {topic}, formatted in markdown, "
             "with proper sections, headings, and clear explanations. "
@@ -113,3 +153,238 @@ class ResearchTasks:
             context=context or [],
             output_file=str(self.output_file)
         )
+    
+    def claim_fact_check_task(self, agent, claim: str) -> Task:
+        """Create a fact-checking task for a single claim.
+        
+        Args:
+            agent: The agent assigned to this task
+            claim: The claim to verify
+            
+        Returns:
+            Task: Configured claim fact-checking task
+        """
+        description = (
+            f"Verify the accuracy of this claim from research about {self.topic}:\n\n"
+            f"{claim}\n\n"
+            "Check it against reliable sources and your knowledge of up-to-date information."
+        )
+        
+        expected_output = (
+            "Exactly two lines: 'VERDICT: VERIFIED', 'VERDICT: INCORRECT' or "
+            "'VERDICT: UNVERIFIABLE', followed by 'NOTES: ' with a one-sentence "
+            "explanation, correction or source."
+        )
+        
+        return Task(
+            description=description,
+            expected_output=expected_output,
+            agent=agent
+        )
+    
+    def outline_task(self, agent, max_sections: int) -> Task:
+        """Create a task planning the sections of the research.
+        
+        Args:
+            agent: The agent assigned to this task
+            max_sections: Maximum number of sections to plan
+            
+        Returns:
+            Task: Configured outline task
+        """
+        description = (
+            f"Plan the research on {self.topic}. "
+            f"Split the topic into at most {max_sections} distinct, non-overlapping sections "
+            "that together cover its most interesting and important aspects."
+        )
+        
+        expected_output = (
+            "A numbered list of section titles, one per line, "
+            "with no other text."
+        )
+        
+        return Task(
+            description=description,
+            expected_output=expected_output,
+            agent=agent
+        )
+    
+    def section_research_task(self, agent, section: str) -> Task:
+        """Create a research task for a single section.
+        
+        Args:
+            agent: The agent assigned to this task
+            section: Title of the section to research
+            
+        Returns:
+            Task: Configured section research task
+        """
+        description = (
+            f"Research and gather detailed information about {self.topic}, "
+            f"focusing only on the section: {section}. "
+            "Focus on finding unique, interesting, and lesser-known facts. "
+            "Include specific examples, statistics, and sources where possible."
+        )
+        
+        expected_output = (
+            f"Detailed research findings for the section '{section}', "
+            "including sources and references."
+        )
+        
+        return Task(
+            description=description,
+            expected_output=expected_output,
+            agent=agent
+        )
+    
+    def section_fact_check_task(self, agent, section: str, context: Optional[List[Task]] = None) -> Task:
+        """Create a fact-checking task for a single section.
+        
+        Args:
+            agent: The agent assigned to this task
+            section: Title of the section being verified
+            context: The section research task this task depends on
+            
+        Returns:
+            Task: Configured section fact-checking task
+        """
+        description = (
+            f"Review the research findings for the section '{section}' and verify their accuracy. "
+            "Check facts against reliable sources and ensure all information is up-to-date. "
+            "Flag any information that cannot be verified."
+        )
+        
+        expected_output = (
+            f"A verified version of the '{section}' findings with notes on verification "
+            "status and any corrections needed. " + FLAGGED_SECTION_INSTRUCTIONS
+        )
+        
+        return Task(
+            description=description,
+            expected_output=expected_output,
+            agent=agent,
+            context=context or []
+        )
+    
+    def section_writing_task(
+        self,
+        agent,
+        section: str,
+        index: int,
+        total: int,
+        context: Optional[List[Task]] = None
+    ) -> Task:
+        """Create a writing task for a single section of the article.
+        
+        Args:
+            agent: The agent assigned to this task
+            section: Title of the section to write
+            index: Zero-based position of the section in the article
+            total: Number of sections in the article
+            context: The section fact-checking task this task depends on
+            
+        Returns:
+            Task: Configured section writing task
+        """
+        placement = []
+        if index == 0:
+            placement.append("Start with a short introduction to the article.")
+        if index == total - 1:
+            placement.append("End with a conclusion for the whole article.")
+        
+        description = (
+            f"Transform the verified research into section {index + 1} of {total} "
+            f"of an engaging article about {self.topic}, titled '{section}'. "
+            "Use markdown formatting with a '##' heading and subsections where useful. "
+            "Ensure the content is accessible to a general audience. "
+            + " ".join(placement)
+        ).strip()
+        
+        expected_output = (
+            f"The '{section}' section of the article, formatted in markdown, "
+            "informative, engaging, and well-structured."
+        )
+        
+        return Task(
+            description=description,
+            expected_output=expected_output,
+            agent=agent,
+            context=context or []
+        )
+    
+    def refresh_research_task(self, agent, sections: List[str], since: str, previous_report: str) -> Task:
+        """Create a research task asking only for what changed since a previous report.
+        
+        Args:
+            agent: The agent assigned to this task
+            sections: Section titles of the previous report
+            since: When the previous report was written
+            previous_report: The previous report (possibly compacted)
+            
+        Returns:
+            Task: Configured delta research task
+        """
+        outline = "\n".join(f"- {section}" for section in sections)
+        description = (
+            f"An article about {self.topic} was written on {since}. "
+            f"Its sections are:\n{outline}\n\n"
+            f"Research only information about {self.topic} that is new since then, "
+            "or that changes, corrects or outdates what the article says. "
+            "Do not repeat what the article already covers correctly. "
+            "Include specific examples, statistics, and sources where possible."
+            f"\n\nThe article:\n{previous_report}"
+        )
+        
+        expected_output = (
+            "One block per affected section. Start each block with a line "
+            "'UPDATE: <exact title of the existing section>' or 'NEW: <title of a new section>', "
+            "followed by the new or changed findings and their sources. "
+            "If nothing relevant has changed, answer exactly 'NO CHANGES'."
+        )
+        
+        return Task(
+            description=description,
+            expected_output=expected_output,
+            agent=agent
+        )
+    
+    def section_update_task(self, agent, section: str, changes: str, current: Optional[str] = None) -> Task:
+        """Create a task patching one section of an existing article.
+        
+        Args:
+            agent: The agent assigned to this task
+            section: Title of the section to update or add
+            changes: Verified new or changed findings for the section
+            current: The section as it is in the article; None for a new section
+            
+        Returns:
+            Task: Configured section update task
+        """
+        if current:
+            description = (
+                f"This is the '{section}' section of an existing article about {self.topic}:\n\n"
+                f"{current}\n\n"
+                "Update it with the verified findings below. Keep its heading, structure and "
+                "every statement that is still accurate; change only what the findings require."
+            )
+        else:
+            description = (
+                f"Write a new section titled '{section}' for an existing article about {self.topic} "
+                "from the verified findings below. "
+                "Use markdown formatting and keep it accessible to a general audience."
+            )
+        description += (
+            " Only use claims marked VERIFIED as facts; correct or leave out the others."
+            f"\n\nVerified findings:\n{changes}"
+        )
+        
+        expected_output = (
+            f"The complete '{section}' section in markdown, starting with the heading "
+            f"'## {section}', with no other text."
+        )
+        
+        return Task(
+            description=description,
+            expected_output=expected_output,
+            agent=agent
+        )
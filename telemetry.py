@@ -0,0 +1,438 @@
+"""Per-run and per-task performance telemetry: latency, tokens, cost and cache hits.
+
+Each research run gets a `RunTelemetry` that follows the run's progress bus
+for task boundaries and receives LLM call details from a
+`TelemetryCallbackHandler` attached to every agent's LLM. Finished tasks,
+LLM calls and runs are appended to a JSONL event log, and cumulative
+per-stage metrics are written as a Prometheus text-format file.
+"""
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from config import MODEL_PRICES, TELEMETRY_ENABLED, TELEMETRY_EVENTS_PATH, TELEMETRY_PROMETHEUS_PATH
+from progress import RUN_FINISHED, TASK_FINISHED, TASK_STARTED, ProgressBus
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimate the USD cost of an LLM call from `MODEL_PRICES`.
+
+    Args:
+        model: Model name as reported by the API, e.g. 'gpt-4-0613'
+        prompt_tokens: Number of prompt tokens
+        completion_tokens: Number of completion tokens
+
+    Returns:
+        float: Estimated cost, or 0.0 for models without a known price
+    """
+    prefix = max((p for p in MODEL_PRICES if (model or '').startswith(p)), key=len, default=None)
+    if prefix is None:
+        return 0.0
+    prompt_price, completion_price = MODEL_PRICES[prefix]
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+
+@functools.lru_cache(maxsize=None)
+def encoding_for_model(model: str) -> Any:
+    """Get the tiktoken encoding of a model, or None if tiktoken cannot provide one."""
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding('cl100k_base')
+    except Exception:
+        # tiktoken is missing, or its encoding files cannot be downloaded
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Count the tokens of a text, falling back to ~4 characters per token."""
+    encoding = encoding_for_model(model)
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _empty_task_metrics() -> Dict[str, Any]:
+    """Metrics of a task that has not started."""
+    return {
+        'status': 'pending',
+        'start_time': None,
+        'end_time': None,
+        'wall_time_seconds': None,
+        'ttft_seconds': None,
+        'llm_calls': 0,
+        'prompt_tokens': 0,
+        'completion_tokens': 0,
+        'estimated_cost_usd': 0.0,
+        'retries': 0,
+        'errors': 0,
+        'cache_hits': 0,
+        'tokens_estimated': False,
+    }
+
+
+class TelemetrySink:
+    """Destination of telemetry: a JSONL event log and a Prometheus text file.
+
+    Counters in the Prometheus file are cumulative over every run finished in
+    this process, so the file can be scraped by the node exporter's textfile
+    collector or served as is by a metrics endpoint.
+    """
+
+    def __init__(
+        self,
+        events_path: Optional[Path] = TELEMETRY_EVENTS_PATH,
+        prometheus_path: Optional[Path] = TELEMETRY_PROMETHEUS_PATH
+    ):
+        """Initialize the sink.
+
+        Args:
+            events_path: JSONL file the events are appended to, or None to skip
+            prometheus_path: Prometheus text file rewritten after each run, or None to skip
+        """
+        self.events_path = Path(events_path) if events_path else None
+        self.prometheus_path = Path(prometheus_path) if prometheus_path else None
+        self._lock = threading.Lock()
+        self._runs: Dict[str, int] = {}
+        self._run_seconds = {'sum': 0.0, 'count': 0}
+        self._stages: Dict[str, Dict[str, float]] = {}
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        """Append an event to the JSONL log."""
+        if self.events_path is None:
+            return
+        line = json.dumps(event, default=str)
+        with self._lock:
+            self.events_path.parent.mkdir(exist_ok=True, parents=True)
+            with open(self.events_path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+    def record_run(self, summary: Dict[str, Any]) -> None:
+        """Add a finished run to the cumulative metrics and rewrite the Prometheus file."""
+        with self._lock:
+            self._runs[summary['status']] = self._runs.get(summary['status'], 0) + 1
+            self._run_seconds['sum'] += summary['wall_time_seconds']
+            self._run_seconds['count'] += 1
+
+            for stage, metrics in summary['tasks'].items():
+                if metrics['status'] == 'pending':
+                    continue
+                totals = self._stages.setdefault(stage, {
+                    'runs': 0, 'wall_seconds': 0.0, 'ttft_seconds': 0.0, 'ttft_count': 0,
+                    'llm_calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0,
+                    'cost_usd': 0.0, 'retries': 0, 'errors': 0, 'cache_hits': 0,
+                })
+                totals['runs'] += 1
+                totals['wall_seconds'] += metrics['wall_time_seconds'] or 0.0
+                if metrics['ttft_seconds'] is not None:
+                    totals['ttft_seconds'] += metrics['ttft_seconds']
+                    totals['ttft_count'] += 1
+                for key, total_key in (
+                    ('llm_calls', 'llm_calls'), ('prompt_tokens', 'prompt_tokens'),
+                    ('completion_tokens', 'completion_tokens'), ('estimated_cost_usd', 'cost_usd'),
+                    ('retries', 'retries'), ('errors', 'errors'), ('cache_hits', 'cache_hits'),
+                ):
+                    totals[total_key] += metrics[key]
+
+            if self.prometheus_path is not None:
+                self.prometheus_path.parent.mkdir(exist_ok=True, parents=True)
+                # Write then rename, so a scraper never reads a half-written file
+                temp_path = self.prometheus_path.with_suffix(f'.{os.getpid()}.tmp')
+                temp_path.write_text(self._render(), encoding='utf-8')
+                os.replace(temp_path, self.prometheus_path)
+
+    def render_prometheus(self) -> str:
+        """Render the cumulative metrics in the Prometheus text format."""
+        with self._lock:
+            return self._render()
+
+    def _render(self) -> str:
+        """Render the metrics; the caller holds the lock."""
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[tuple]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        stages = sorted(self._stages.items())
+        metric('research_runs_total', 'counter', 'Finished research runs by status.',
+               [({'status': status}, count) for status, count in sorted(self._runs.items())])
+        metric('research_run_duration_seconds', 'summary', 'Wall time of research runs.', [])
+        lines.append(f"research_run_duration_seconds_sum {self._run_seconds['sum']:.6f}")
+        lines.append(f"research_run_duration_seconds_count {self._run_seconds['count']}")
+
+        metric('research_task_duration_seconds', 'summary', 'Wall time of research tasks.', [])
+        for stage, totals in stages:
+            lines.append(f'research_task_duration_seconds_sum{{stage="{stage}"}} {totals["wall_seconds"]:.6f}')
+            lines.append(f'research_task_duration_seconds_count{{stage="{stage}"}} {totals["runs"]}')
+        metric('research_task_ttft_seconds', 'summary', 'Time from task start to its first token.', [])
+        for stage, totals in stages:
+            lines.append(f'research_task_ttft_seconds_sum{{stage="{stage}"}} {totals["ttft_seconds"]:.6f}')
+            lines.append(f'research_task_ttft_seconds_count{{stage="{stage}"}} {totals["ttft_count"]}')
+
+        metric('research_llm_calls_total', 'counter', 'LLM calls per stage.',
+               [({'stage': stage}, totals['llm_calls']) for stage, totals in stages])
+        metric('research_llm_tokens_total', 'counter', 'LLM tokens per stage and kind.',
+               [({'stage': stage, 'kind': kind}, totals[f'{kind}_tokens'])
+                for stage, totals in stages for kind in ('prompt', 'completion')])
+        metric('research_llm_cost_usd_total', 'counter', 'Estimated LLM cost per stage in USD.',
+               [({'stage': stage}, f"{totals['cost_usd']:.6f}") for stage, totals in stages])
+        metric('research_llm_retries_total', 'counter', 'Retried LLM calls per stage.',
+               [({'stage': stage}, totals['retries']) for stage, totals in stages])
+        metric('research_llm_errors_total', 'counter', 'Failed LLM calls per stage.',
+               [({'stage': stage}, totals['errors']) for stage, totals in stages])
+        metric('research_llm_cache_hits_total', 'counter', 'LLM calls served from the response cache per stage.',
+               [({'stage': stage}, totals['cache_hits']) for stage, totals in stages])
+        return '\n'.join(lines) + '\n'
+
+
+class RunTelemetry:
+    """Collect the metrics of one research run, per task."""
+
+    def __init__(
+        self,
+        topic: str,
+        stages: List[str],
+        run_id: Optional[str] = None,
+        sink: Optional[TelemetrySink] = None
+    ):
+        """Initialize the run's metrics.
+
+        Args:
+            topic: The research topic
+            stages: Task names of the run ('research', 'fact_check', 'writing')
+            run_id: ID of the run; generated when not given
+            sink: Where events and finished runs are recorded; defaults to the
+                process-wide sink
+        """
+        self.topic = topic
+        self.run_id = run_id or uuid.uuid4().hex
+        self.sink = sink or get_telemetry_sink()
+        self.start_time = time.time()
+        self.end_time: Optional[float] = None
+        self.status = 'pending'
+        self.tasks: Dict[str, Dict[str, Any]] = {stage: _empty_task_metrics() for stage in stages}
+        self._lock = threading.Lock()
+
+    def attach(self, bus: ProgressBus) -> None:
+        """Follow task boundaries and the end of the run on a progress bus."""
+        bus.subscribe(self._on_event)
+
+    def _emit(self, event_type: str, **data: Any) -> None:
+        """Record an event tagged with the run."""
+        self.sink.emit({
+            'type': event_type,
+            'run_id': self.run_id,
+            'topic': self.topic,
+            'timestamp': time.time(),
+            **data
+        })
+
+    def _on_event(self, event: Dict[str, Any]) -> None:
+        """Progress bus callback."""
+        if event['type'] == TASK_STARTED:
+            self.task_started(event['task'], event['timestamp'])
+        elif event['type'] == TASK_FINISHED:
+            self.task_finished(event['task'], event['status'], event['timestamp'])
+        elif event['type'] == RUN_FINISHED:
+            self.finish(event.get('status', 'completed'))
+
+    def task_started(self, stage: str, timestamp: Optional[float] = None) -> None:
+        """Mark a task as started."""
+        with self._lock:
+            metrics = self.tasks.setdefault(stage, _empty_task_metrics())
+            metrics['status'] = 'in_progress'
+            metrics['start_time'] = timestamp or time.time()
+
+    def task_finished(self, stage: str, status: str, timestamp: Optional[float] = None) -> None:
+        """Mark a task as finished and record its metrics."""
+        with self._lock:
+            metrics = self.tasks.setdefault(stage, _empty_task_metrics())
+            metrics['status'] = status
+            metrics['end_time'] = timestamp or time.time()
+            if metrics['start_time'] is not None:
+                metrics['wall_time_seconds'] = round(metrics['end_time'] - metrics['start_time'], 3)
+            snapshot = dict(metrics)
+        self._emit('task_finished', task=stage, **snapshot)
+
+    def first_token(self, stage: str) -> None:
+        """Record the first token (or first response) of a task, if it is the first one."""
+        with self._lock:
+            metrics = self.tasks.get(stage)
+            if metrics is None or metrics['ttft_seconds'] is not None or metrics['start_time'] is None:
+                return
+            metrics['ttft_seconds'] = round(time.time() - metrics['start_time'], 3)
+
+    def record_llm_call(self, stage: str, call: Dict[str, Any]) -> None:
+        """Add a finished (or failed) LLM call to its task."""
+        with self._lock:
+            metrics = self.tasks.setdefault(stage, _empty_task_metrics())
+            metrics['llm_calls'] += 1
+            metrics['prompt_tokens'] += call['prompt_tokens']
+            metrics['completion_tokens'] += call['completion_tokens']
+            metrics['estimated_cost_usd'] = round(metrics['estimated_cost_usd'] + call['estimated_cost_usd'], 6)
+            metrics['cache_hits'] += int(call['cached'])
+            metrics['errors'] += int(bool(call['error']))
+            metrics['tokens_estimated'] = metrics['tokens_estimated'] or call['tokens_estimated']
+        self._emit('llm_call', task=stage, **call)
+
+    def record_retry(self, stage: str) -> None:
+        """Count a retried LLM call."""
+        with self._lock:
+            self.tasks.setdefault(stage, _empty_task_metrics())['retries'] += 1
+
+    def finish(self, status: str) -> None:
+        """Mark the run as finished and record it with the sink."""
+        with self._lock:
+            if self.end_time is not None:
+                return
+            self.end_time = time.time()
+            self.status = status
+        summary = self.summary()
+        self._emit('run_finished', **{k: v for k, v in summary.items() if k not in ('run_id', 'topic')})
+        self.sink.record_run(summary)
+
+    def summary(self) -> Dict[str, Any]:
+        """Get the run's metrics with run-level totals."""
+        with self._lock:
+            tasks = {stage: dict(metrics) for stage, metrics in self.tasks.items()}
+            end_time = self.end_time or time.time()
+            status = self.status if self.end_time else 'in_progress'
+
+        return {
+            'run_id': self.run_id,
+            'topic': self.topic,
+            'status': status,
+            'wall_time_seconds': round(end_time - self.start_time, 3),
+            'llm_calls': sum(t['llm_calls'] for t in tasks.values()),
+            'prompt_tokens': sum(t['prompt_tokens'] for t in tasks.values()),
+            'completion_tokens': sum(t['completion_tokens'] for t in tasks.values()),
+            'estimated_cost_usd': round(sum(t['estimated_cost_usd'] for t in tasks.values()), 6),
+            'retries': sum(t['retries'] for t in tasks.values()),
+            'cache_hits': sum(t['cache_hits'] for t in tasks.values()),
+            'tasks': tasks,
+        }
+
+
+class TelemetryCallbackHandler(BaseCallbackHandler):
+    """LangChain callback handler recording an agent's LLM calls in a RunTelemetry.
+
+    Token counts come from the API's usage report. Streaming responses do not
+    include one, so their tokens are counted locally with tiktoken and the
+    task is flagged `tokens_estimated`. Responses served from the response
+    cache count as cache hits and cost nothing.
+    """
+
+    def __init__(self, telemetry: RunTelemetry, stage: str, model: str, cache: Any = None):
+        """Initialize the handler.
+
+        Args:
+            telemetry: The run's telemetry
+            stage: Task name the agent's calls belong to
+            model: Model the LLM is configured with
+            cache: The LLM's response cache, if any; must provide `thread_hits()`
+        """
+        self.telemetry = telemetry
+        self.stage = stage
+        self.model = model
+        self.cache = cache
+        self._calls: Dict[Any, Dict[str, Any]] = {}
+
+    def on_llm_start(self, serialized: Any, prompts: List[str], *, run_id: Any = None, **kwargs: Any) -> None:
+        """Start timing an LLM call."""
+        # A routed call names its model in the invocation parameters
+        invocation_params = kwargs.get('invocation_params') or {}
+        self._calls[run_id] = {
+            'model': invocation_params.get('model') or invocation_params.get('model_name'),
+            'start': time.time(),
+            'first_token': None,
+            'prompt_text': '\n'.join(prompts),
+            'cache_hits': self.cache.thread_hits() if self.cache is not None else 0,
+        }
+
+    def on_llm_new_token(self, token: str, *, run_id: Any = None, **kwargs: Any) -> None:
+        """Record the call's and the task's first token."""
+        call = self._calls.get(run_id)
+        if call is not None and call['first_token'] is None:
+            call['first_token'] = time.time()
+            self.telemetry.first_token(self.stage)
+
+    def _finish_call(self, run_id: Any, response: Any = None, error: Optional[BaseException] = None) -> None:
+        """Record a finished call."""
+        call = self._calls.pop(run_id, None)
+        if call is None:
+            return
+        now = time.time()
+        cached = self.cache is not None and self.cache.thread_hits() > call['cache_hits']
+
+        llm_output = (getattr(response, 'llm_output', None) or {}) if response is not None else {}
+        model = call['model'] or llm_output.get('model_name') or self.model
+        usage = llm_output.get('token_usage') or {}
+        prompt_tokens = usage.get('prompt_tokens', 0)
+        completion_tokens = usage.get('completion_tokens', 0)
+        estimated = False
+        if response is not None and not usage and not cached:
+            text = ''.join(
+                generation.text for generations in response.generations for generation in generations
+            )
+            prompt_tokens = count_tokens(call['prompt_text'], model)
+            completion_tokens = count_tokens(text, model)
+            estimated = True
+
+        if response is not None:
+            # Without streaming, the whole response is the first token
+            self.telemetry.first_token(self.stage)
+
+        self.telemetry.record_llm_call(self.stage, {
+            'model': model,
+            'latency_seconds': round(now - call['start'], 3),
+            'ttft_seconds': round(call['first_token'] - call['start'], 3) if call['first_token'] else None,
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'tokens_estimated': estimated,
+            'estimated_cost_usd': 0.0 if cached else round(estimate_cost(model, prompt_tokens, completion_tokens), 6),
+            'cached': cached,
+            'error': str(error) if error is not None else None,
+        })
+
+    def on_llm_end(self, response: Any, *, run_id: Any = None, **kwargs: Any) -> None:
+        """Record a completed call."""
+        self._finish_call(run_id, response=response)
+
+    def on_llm_error(self, error: BaseException, *, run_id: Any = None, **kwargs: Any) -> None:
+        """Record a failed call as an error; whether it is retried is reported by `on_retry`."""
+        self._finish_call(run_id, error=error)
+
+    def on_retry(self, retry_state: Any, *, run_id: Any = None, **kwargs: Any) -> None:
+        """Count retries made by LangChain's retry wrappers."""
+        self.telemetry.record_retry(self.stage)
+
+
+_telemetry_sink: Optional[TelemetrySink] = None
+_telemetry_sink_lock = threading.Lock()
+
+
+def get_telemetry_sink() -> TelemetrySink:
+    """Get the process-wide telemetry sink, creating it on first use.
+
+    With `TELEMETRY_ENABLED` off, runs still collect their metrics but
+    nothing is written to disk.
+    """
+    global _telemetry_sink
+    with _telemetry_sink_lock:
+        if _telemetry_sink is None:
+            _telemetry_sink = TelemetrySink() if TELEMETRY_ENABLED else TelemetrySink(None, None)
+        return _telemetry_sink
@@ -0,0 +1,38 @@
+"""Shared pytest setup: make the root modules importable without an API key."""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# config.py refuses to import without a key; no test calls the API
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+os.environ.setdefault('OTEL_SDK_DISABLED', 'true')
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+# The stub LLM server of the benchmarks
+sys.path.insert(1, str(ROOT / 'benchmarks'))
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    """Keep crews run by the tests from writing telemetry or LLM responses into the project."""
+    import llm_cache
+    import telemetry
+
+    monkeypatch.setattr(telemetry, '_telemetry_sink', telemetry.TelemetrySink(None, None))
+    monkeypatch.setattr(llm_cache, '_response_cache',
+                        llm_cache.SQLiteResponseCache(path=tmp_path / 'llm_cache' / 'responses.sqlite3'))
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    """Point the agents' LLMs at the benchmarks' local stub server, answering instantly."""
+    from stub_llm import StubLLMServer
+
+    server = StubLLMServer(latency=0, tokens_per_second=0, response_tokens=40).start()
+    monkeypatch.setenv('OPENAI_API_BASE', server.url)
+    monkeypatch.setenv('NO_PROXY', '127.0.0.1,localhost')
+    yield server
+    server.stop()
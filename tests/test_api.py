@@ -0,0 +1,174 @@
+"""Tests for the HTTP API service with a fake crew."""
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import ResearchService, create_app
+from config import API_RETRY_AFTER_SECONDS
+from progress import RUN_FINISHED, TASK_FINISHED, TASK_STARTED, TOKEN, ProgressBus
+
+
+class FakeCrew:
+    """Publishes a short writing run instead of calling an LLM."""
+
+    def __init__(self, topic, **options):
+        self.topic = topic
+        self.events = ProgressBus()
+
+    def get_progress(self):
+        return {'writing': 'completed' if self.events.closed else 'pending'}
+
+    def cancel(self, reason):
+        pass
+
+    async def run_async(self):
+        self.events.publish(TASK_STARTED, task='writing', status='in_progress')
+        for token in ('a', 'b', 'c'):
+            self.events.publish(TOKEN, task='writing', token=token)
+        self.events.publish(TASK_FINISHED, task='writing', status='completed')
+        self.events.publish(RUN_FINISHED, status='completed')
+        self.events.close()
+        return {'success': True, 'result': 'abc'}
+
+
+class BlockingCrew(FakeCrew):
+    """Runs until the test releases it or the run is cancelled."""
+
+    release = threading.Event()
+
+    def __init__(self, topic, **options):
+        super().__init__(topic, **options)
+        self.cancelled = threading.Event()
+        self.started = False
+
+    def cancel(self, reason):
+        self.cancelled.set()
+
+    async def run_async(self):
+        if not self.cancelled.is_set():
+            self.started = True
+            self.events.publish(TASK_STARTED, task='writing', status='in_progress')
+            while not (self.release.is_set() or self.cancelled.is_set()):
+                await asyncio.sleep(0.01)
+        if self.cancelled.is_set():
+            self.events.publish(RUN_FINISHED, status='cancelled')
+            self.events.close()
+            return {'success': False, 'cancelled': True, 'error': 'Cancelled by client'}
+        return await super().run_async()
+
+
+@pytest.fixture
+def client():
+    """Client of a service with one worker and one queue slot, running blocking crews."""
+    BlockingCrew.release = threading.Event()
+    service = ResearchService(crew_factory=BlockingCrew, workers=1, max_queued=1)
+    with TestClient(create_app(service)) as client:
+        yield client
+        BlockingCrew.release.set()
+
+
+def wait_for_status(client, run_id, status, timeout=10.0):
+    deadline = time.time() + timeout
+    while client.get(f'/research/{run_id}').json()['status'] != status:
+        assert time.time() < deadline, f"run {run_id} did not become {status}"
+        time.sleep(0.02)
+
+
+def read_events(response):
+    events = []
+    for message in response.text.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in message.splitlines())
+        events.append((fields.get('id'), fields['event'], json.loads(fields['data'])))
+    return events
+
+
+def test_finished_run_releases_its_crew_and_replays_progress():
+    service = ResearchService(crew_factory=FakeCrew, workers=1, max_queued=1)
+    with TestClient(create_app(service)) as client:
+        run_id = client.post('/research', json={'topic': 'fake topic'}).json()['id']
+        streamed = read_events(client.get(f'/research/{run_id}/events'))
+        run = service.get(run_id)
+
+        assert [event for _, event, _ in streamed][-1] == 'end'
+        assert run.crew is None
+        assert run.progress == {'writing': 'completed'}
+        assert all(event['type'] != TOKEN for event in run.history)
+
+        replayed = read_events(client.get(f'/research/{run_id}/events', headers={'Last-Event-ID': '5'}))
+        assert [(event_id, event) for event_id, event, _ in replayed] == [('6', RUN_FINISHED), (None, 'end')]
+        assert client.get(f'/research/{run_id}').json()['result']['result'] == 'abc'
+
+
+def test_identical_request_joins_the_run_in_flight(client):
+    first = client.post('/research', json={'topic': 'fake topic'})
+    joined = client.post('/research', json={'topic': '  FAKE topic!'})
+    other_options = client.post('/research', json={'topic': 'fake topic', 'pipelined': True})
+
+    assert first.status_code == 202
+    assert joined.status_code == 200
+    assert joined.json()['id'] == first.json()['id']
+    assert joined.json()['coalesced']
+    assert other_options.status_code == 202
+    assert other_options.json()['id'] != first.json()['id']
+    assert client.get(f"/research/{first.json()['id']}").json()['coalesced'] == 1
+
+
+def test_saturated_service_rejects_with_retry_after(client):
+    running = client.post('/research', json={'topic': 'first topic'}).json()['id']
+    queued = client.post('/research', json={'topic': 'second topic'}).json()['id']
+    wait_for_status(client, running, 'running')
+
+    rejected = client.post('/research', json={'topic': 'third topic'})
+
+    assert rejected.status_code == 429
+    assert rejected.headers['retry-after'] == str(API_RETRY_AFTER_SECONDS)
+    assert client.get(f'/research/{queued}').json()['status'] == 'queued'
+    assert client.get('/health').json()['status'] == 'saturated'
+    assert 'research_api_requests_total{outcome="rejected"} 1' in client.get('/metrics').text
+
+
+def test_deleting_a_queued_run_cancels_it_before_it_starts(client):
+    running = client.post('/research', json={'topic': 'first topic'}).json()['id']
+    queued = client.post('/research', json={'topic': 'second topic'}).json()['id']
+    wait_for_status(client, running, 'running')
+
+    response = client.delete(f'/research/{queued}')
+    wait_for_status(client, queued, 'cancelled')
+
+    assert response.status_code == 200
+    assert response.json()['cancelled']
+    assert client.get(f'/research/{queued}').json()['started_at'] is None
+    assert client.get(f'/research/{running}').json()['status'] == 'running'
+    # The freed queue slot accepts a new run
+    assert client.post('/research', json={'topic': 'third topic'}).status_code == 202
+
+
+def test_last_request_to_leave_cancels_the_run(client):
+    run_id = client.post('/research', json={'topic': 'fake topic'}).json()['id']
+    client.post('/research', json={'topic': 'fake topic'})
+    wait_for_status(client, run_id, 'running')
+
+    assert not client.delete(f'/research/{run_id}').json()['cancelled']
+    assert client.get(f'/research/{run_id}').json()['status'] == 'running'
+
+    assert client.delete(f'/research/{run_id}').json()['cancelled']
+    wait_for_status(client, run_id, 'cancelled')
+    assert not client.delete(f'/research/{run_id}').json()['cancelled']
+    # An identical request after the cancellation starts a new run
+    assert client.post('/research', json={'topic': 'fake topic'}).json()['id'] != run_id
+
+
+def test_unknown_stage_is_a_bad_request(client):
+    response = client.post('/research', json={'topic': 'fake topic', 'stream_stages': ['editing']})
+
+    assert response.status_code == 400
+
+
+def test_missing_run_is_404(client):
+    assert client.get('/research/missing').status_code == 404
+    assert client.get('/research/missing/events').status_code == 404
+    assert client.delete('/research/missing').status_code == 404
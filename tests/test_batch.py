@@ -0,0 +1,37 @@
+"""Tests for reading batch topic files."""
+from batch import iter_topics
+
+
+def test_iter_topics_reads_every_line_format(tmp_path):
+    path = tmp_path / 'topics.jsonl'
+    path.write_text('\n'.join([
+        '# comment',
+        'plain topic',
+        '',
+        '{"topic": "json topic"}',
+        '{"title": "  json title  "}',
+        '"json string"',
+    ]), encoding='utf-8')
+
+    assert list(iter_topics(path)) == ['plain topic', 'json topic', 'json title', 'json string']
+
+
+def test_iter_topics_reads_malformed_json_as_plain_text(tmp_path):
+    path = tmp_path / 'topics.txt'
+    path.write_text('"Quantum" computing\n{unbalanced\n', encoding='utf-8')
+
+    assert list(iter_topics(path)) == ['"Quantum" computing', '{unbalanced']
+
+
+def test_iter_topics_skips_records_without_a_topic(tmp_path, capsys):
+    path = tmp_path / 'topics.jsonl'
+    path.write_text('\n'.join([
+        '{"topic": 42}',
+        '{"name": "no topic"}',
+        '{"topic": ""}',
+        '{"title": ["list"]}',
+        'kept',
+    ]), encoding='utf-8')
+
+    assert list(iter_topics(path)) == ['kept']
+    assert capsys.readouterr().out.count('Skipping line') == 4
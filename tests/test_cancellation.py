@@ -0,0 +1,184 @@
+"""Tests for run deadlines and the cancellation of in-flight requests."""
+import threading
+import time
+
+import pytest
+
+from cancellation import CancellationCallbackHandler, CancellationToken, DeadlineExceeded, RunCancelled
+from llm_pool import LLMClientPool
+
+
+def _wait_for(condition, timeout=5.0):
+    """Wait until `condition()` holds."""
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def test_run_deadline_cancels_the_token():
+    token = CancellationToken(deadline_seconds=0.1, task_deadlines={}).start()
+
+    _wait_for(lambda: token.cancelled)
+    assert token.deadline_exceeded
+    assert token.reason == "Deadline exceeded: the run took longer than 0.1s"
+    with pytest.raises(DeadlineExceeded):
+        token.check()
+
+
+def test_deadline_starts_with_the_run():
+    token = CancellationToken(deadline_seconds=0.05, task_deadlines={})
+    time.sleep(0.1)
+
+    assert not token.cancelled
+    assert token.remaining() is None
+    token.start()
+    assert 0 < token.remaining() <= 0.05
+    token.close()
+
+
+def test_task_deadline_only_applies_to_its_task():
+    token = CancellationToken(deadline_seconds=None, task_deadlines={'research': 0.1}).start()
+    token.start_task('writing')
+    time.sleep(0.2)
+    assert not token.cancelled
+
+    token.start_task('research')
+    _wait_for(lambda: token.cancelled)
+    assert token.deadline_exceeded
+    assert token.reason == "Deadline exceeded: research took longer than 0.1s"
+
+
+def test_finished_task_stops_its_deadline():
+    token = CancellationToken(deadline_seconds=None, task_deadlines={'research': 0.1}).start()
+    token.start_task('research')
+    token.finish_task('research')
+    time.sleep(0.2)
+
+    assert not token.cancelled
+    assert token.remaining() is None
+    token.close()
+
+
+def test_cancel_records_the_first_reason():
+    token = CancellationToken(deadline_seconds=None, task_deadlines={})
+
+    assert token.cancel("Stopped from the UI")
+    assert not token.cancel("Stopped again")
+    assert token.reason == "Stopped from the UI"
+    assert not token.deadline_exceeded
+    with pytest.raises(RunCancelled, match="Stopped from the UI") as raised:
+        token.check()
+    assert not isinstance(raised.value, DeadlineExceeded)
+
+
+def test_close_stops_the_watchdog():
+    token = CancellationToken(deadline_seconds=60, task_deadlines={}).start()
+    token.close()
+
+    token._watchdog.join(timeout=5)
+    assert not token._watchdog.is_alive()
+    assert not token.cancelled
+
+
+def test_callbacks_run_on_cancellation_until_removed():
+    token = CancellationToken(deadline_seconds=None, task_deadlines={})
+    called = []
+    token.add_callback(lambda: called.append('kept'))
+    remove = token.add_callback(lambda: called.append('removed'))
+    remove()
+
+    token.cancel()
+    assert called == ['kept']
+
+    # Callbacks added once the run is cancelled are called right away
+    token.add_callback(lambda: called.append('late'))
+    assert called == ['kept', 'late']
+
+
+def test_failing_callback_does_not_stop_the_others():
+    token = CancellationToken(deadline_seconds=None, task_deadlines={})
+    called = []
+    token.add_callback(lambda: 1 / 0)
+    token.add_callback(lambda: called.append('aborted'))
+
+    assert token.cancel()
+    assert called == ['aborted']
+
+
+def test_callback_handler_stops_the_agent_once_cancelled():
+    token = CancellationToken(deadline_seconds=None, task_deadlines={})
+    handler = CancellationCallbackHandler(token)
+    handler.on_llm_new_token('token')
+
+    token.cancel()
+    with pytest.raises(RunCancelled):
+        handler.on_llm_new_token('token')
+    with pytest.raises(RunCancelled):
+        handler.on_tool_start({}, 'query')
+
+
+@pytest.fixture
+def slow_llm_pool(stub_llm):
+    """Pool whose requests wait seconds for the stub's first token."""
+    stub_llm.latency = 3.0
+    pool = LLMClientPool()
+    yield pool
+    pool.close()
+
+
+def _caused_by_cancellation(error):
+    """Whether an exception is, or was raised because of, `RunCancelled`."""
+    while error is not None:
+        if isinstance(error, RunCancelled):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def test_cancel_aborts_an_in_flight_request(slow_llm_pool):
+    token = CancellationToken(deadline_seconds=None, task_deadlines={})
+    llm = slow_llm_pool.create_llm(model_name='gpt-4o-mini', cancellation=token, max_retries=0)
+    threading.Timer(0.2, token.cancel).start()
+
+    started = time.perf_counter()
+    with pytest.raises(Exception) as raised:
+        llm.invoke('Research bees')
+
+    assert time.perf_counter() - started < 2.0
+    assert _caused_by_cancellation(raised.value)
+
+
+def test_deadline_aborts_an_in_flight_request(slow_llm_pool):
+    token = CancellationToken(deadline_seconds=0.2, task_deadlines={}).start()
+    llm = slow_llm_pool.create_llm(model_name='gpt-4o-mini', cancellation=token, max_retries=0)
+
+    started = time.perf_counter()
+    with pytest.raises(Exception) as raised:
+        llm.invoke('Research bees')
+
+    assert time.perf_counter() - started < 2.0
+    assert _caused_by_cancellation(raised.value)
+    assert token.deadline_exceeded
+
+
+def test_cancelled_run_makes_no_request(stub_llm):
+    token = CancellationToken(deadline_seconds=None, task_deadlines={})
+    token.cancel()
+    llm = LLMClientPool().create_llm(model_name='gpt-4o-mini', cancellation=token, max_retries=0)
+
+    with pytest.raises(RunCancelled):
+        llm.invoke('Research bees')
+    assert stub_llm.stats()['requests'] == 0
+
+
+def test_pool_serves_other_runs_after_an_abort(slow_llm_pool, stub_llm):
+    token = CancellationToken(deadline_seconds=None, task_deadlines={})
+    cancelled = slow_llm_pool.create_llm(model_name='gpt-4o-mini', cancellation=token, max_retries=0)
+    threading.Timer(0.2, token.cancel).start()
+    with pytest.raises(Exception):
+        cancelled.invoke('Research bees')
+
+    stub_llm.latency = 0
+    other = slow_llm_pool.create_llm(model_name='gpt-4o-mini', max_retries=0)
+    assert 'Final Answer:' in other.invoke('Research wasps').content
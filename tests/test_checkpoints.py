@@ -0,0 +1,102 @@
+"""Tests for stage checkpoints and resuming runs from them."""
+import json
+import os
+import time
+
+import pytest
+
+import crew as crew_module
+from checkpoints import CheckpointStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(root=tmp_path / 'checkpoints')
+
+
+def test_completed_stages_stop_at_the_first_missing_stage(store):
+    run_id = store.create('topic')
+    store.save(run_id, 'research', 'research output')
+    store.save(run_id, 'writing', 'report built on a fact-check that is gone')
+
+    assert store.completed_stages(run_id) == {'research': 'research output'}
+
+
+def test_missing_stage_file_is_not_complete(store):
+    run_id = store.create('topic')
+    store.save(run_id, 'research', 'research output')
+    store.save(run_id, 'fact_check', 'verified output')
+    (store.root / run_id / 'fact_check.md').unlink()
+
+    assert list(store.completed_stages(run_id)) == ['research']
+
+
+def test_corrupt_stage_file_is_not_complete(store):
+    run_id = store.create('topic')
+    store.save(run_id, 'research', 'research output')
+    store.save(run_id, 'fact_check', 'verified output')
+    (store.root / run_id / 'research.md').write_bytes(b'\xff\xfe truncated')
+
+    assert store.completed_stages(run_id) == {}
+
+
+def test_truncated_stage_file_is_not_complete(store):
+    run_id = store.create('topic')
+    store.save(run_id, 'research', 'research output')
+    (store.root / run_id / 'research.md').write_text('research', encoding='utf-8')
+
+    assert store.completed_stages(run_id) == {}
+
+
+def test_corrupt_manifest_has_no_completed_stages(store):
+    run_id = store.create('topic')
+    store.save(run_id, 'research', 'research output')
+    (store.root / run_id / 'manifest.json').write_text('{"stages": ', encoding='utf-8')
+
+    assert store.load(run_id) is None
+    assert store.completed_stages(run_id) == {}
+
+
+def test_prune_respects_the_ttl(store):
+    old_run = store.create('old topic')
+    manifest_path = store.root / old_run / 'manifest.json'
+    manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+    manifest['updated_at'] = time.time() - 3600
+    manifest_path.write_text(json.dumps(manifest), encoding='utf-8')
+    fresh_run = store.create('fresh topic')
+    stray = store.root / 'stray'
+    stray.mkdir()
+    os.utime(stray, (time.time() - 3600, time.time() - 3600))
+
+    assert store.prune(ttl_seconds=None) == 0
+    assert store.prune(ttl_seconds=600) == 2
+    assert store.load(old_run) is None
+    assert store.load(fresh_run) is not None
+    assert not stray.exists()
+
+
+def test_resume_runs_only_the_stages_after_the_checkpoints(store, tmp_path, monkeypatch):
+    run_id = store.create(
+        'resumed topic',
+        options={'fact_check_fan_out': True},
+        output_file=str(tmp_path / 'report.md')
+    )
+    store.save(run_id, 'research', 'Checkpointed research.')
+    store.save(run_id, 'fact_check', 'Checkpointed verified research.', data={'document': 'verified'})
+
+    roles = []
+
+    def fake_run_task(agent, task):
+        roles.append(agent.role)
+        return 'Resumed report.'
+
+    monkeypatch.setattr(crew_module, 'get_checkpoint_store', lambda: store)
+    monkeypatch.setattr(crew_module, 'run_task', fake_run_task)
+    monkeypatch.setattr(crew_module, 'index_report', lambda *args, **kwargs: None)
+    result = crew_module.ResearchCrew.resume(run_id)
+
+    assert result['success'], result.get('error')
+    assert roles == ['Content Writer']
+    assert result['resumed_stages'] == ['research', 'fact_check']
+    assert result['result'] == 'Resumed report.'
+    assert store.completed_stages(run_id)['writing'] == 'Resumed report.'
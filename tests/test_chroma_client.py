@@ -0,0 +1,38 @@
+"""Tests for the shared ChromaDB client."""
+import pytest
+
+import chroma_client
+import claim_cache
+
+
+@pytest.fixture
+def chroma_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(chroma_client, 'CHROMA_CACHE_DIR', tmp_path / 'chroma')
+    monkeypatch.setattr(chroma_client, '_chroma_client', None)
+    return tmp_path / 'chroma'
+
+
+def test_one_client_per_process(chroma_dir):
+    client = chroma_client.get_chroma_client()
+
+    assert chroma_client.get_chroma_client() is client
+    assert chroma_dir.exists()
+
+
+def test_claim_cache_uses_the_shared_client(chroma_dir, monkeypatch):
+    monkeypatch.setattr(claim_cache, '_claim_cache', None)
+    monkeypatch.setattr(claim_cache, '_claim_cache_error', None)
+    clients = []
+    monkeypatch.setattr(claim_cache, 'ClaimCache', lambda client: clients.append(client) or client)
+
+    assert claim_cache.get_claim_cache() is chroma_client.get_chroma_client()
+    assert clients == [chroma_client.get_chroma_client()]
+
+
+def test_corpus_index_uses_the_shared_client(chroma_dir):
+    import ingest
+
+    index = ingest._create_index(embed=lambda texts: [[1.0, 0.0] for _ in texts])
+
+    assert index.collection.count() == 0
+    assert chroma_client.get_chroma_client().get_collection(index.collection.name).id == index.collection.id
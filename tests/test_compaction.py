@@ -0,0 +1,97 @@
+"""Tests for token-budgeted context compaction."""
+import random
+
+import pytest
+
+import compaction
+import telemetry
+from compaction import ContextCompactor, _split_units, compact_text
+from config import COMPACTION_BUDGETS
+
+SUBJECTS = ['Qubit coherence', 'Error correction', 'Cryogenic cooling', 'Photonic chips', 'Trapped ions',
+            'Quantum annealing', 'Gate fidelity', 'Topological qubits', 'Readout circuits', 'Control software']
+FINDINGS = ['improved by {n} percent in {year}', 'was verified by {n} independent labs',
+            'remains disputed after {n} trials', 'costs about {n} million dollars since {year}',
+            'was reported in {n} peer-reviewed papers by {year}']
+
+
+def research_document(sections: int = 12, sentences: int = 12, seed: int = 7) -> str:
+    """A long research output with headings and varied, numbered sentences."""
+    rng = random.Random(seed)
+    lines = ['# Quantum computing research']
+    for section in range(sections):
+        lines.append(f'## Section {section + 1}')
+        for _ in range(sentences):
+            finding = rng.choice(FINDINGS).format(n=rng.randint(2, 999), year=rng.randint(1990, 2026))
+            lines.append(f'{rng.choice(SUBJECTS)} {finding} according to {rng.choice(SUBJECTS).lower()} experts.')
+    return '\n'.join(lines)
+
+
+@pytest.fixture(params=['fallback', 'tiktoken'])
+def tokenizer(request, monkeypatch):
+    """Run each test with the ~4 characters per token fallback, and with tiktoken where it is available."""
+    if request.param == 'fallback':
+        monkeypatch.setattr(telemetry, 'encoding_for_model', lambda model: None)
+        monkeypatch.setattr(compaction, 'encoding_for_model', lambda model: None)
+    elif telemetry.encoding_for_model('gpt-4') is None:
+        pytest.skip('tiktoken or its encoding files are unavailable')
+    return request.param
+
+
+@pytest.mark.parametrize('stage', sorted(COMPACTION_BUDGETS))
+def test_compacted_context_stays_within_the_stage_budget(tokenizer, stage):
+    compactor = ContextCompactor(topic='quantum computing')
+    text = research_document(sections=40)
+    assert telemetry.count_tokens(text, compactor.model) > COMPACTION_BUDGETS[stage]
+
+    compacted = compactor.compact(stage, text)
+
+    assert telemetry.count_tokens(compacted, compactor.model) <= COMPACTION_BUDGETS[stage]
+    stats = compactor.summary()['stages'][stage]
+    assert stats['budget'] == COMPACTION_BUDGETS[stage]
+    assert stats['tokens_saved'] > 0
+
+
+def test_text_within_budget_is_unchanged(tokenizer):
+    text = research_document(sections=1, sentences=3)
+
+    result = compact_text(text, budget=10_000)
+
+    assert result['text'] == text
+    assert result['tokens_saved'] == 0
+
+
+def test_kept_sentences_stay_in_document_order(tokenizer):
+    text = research_document()
+    original = [unit['text'] for unit in _split_units(text)]
+
+    result = compact_text(text, budget=300)
+    kept = [unit['text'] for unit in _split_units(result['text'])]
+
+    assert result['sentences_dropped'] > 0
+    assert kept[0] == '# Quantum computing research'
+    positions = [original.index(sentence) for sentence in kept]
+    assert positions == sorted(positions)
+
+
+def test_near_duplicate_sentences_are_dropped(tokenizer):
+    sentence = 'Superconducting qubit coherence times improved by 40 percent in laboratory tests at {lab}.'
+    text = '\n'.join([
+        '## Coherence',
+        sentence.format(lab='MIT'),
+        sentence.format(lab='MIT'),
+        sentence.format(lab='Delft'),
+        'Trapped ion systems reached 99.9 percent two-qubit gate fidelity.',
+    ] * 20)
+
+    result = compact_text(text, budget=60)
+
+    kept = [unit['text'] for unit in _split_units(result['text']) if not unit['heading']]
+    assert result['duplicates_dropped'] >= 60
+    assert kept == [sentence.format(lab='MIT'), 'Trapped ion systems reached 99.9 percent two-qubit gate fidelity.']
+
+
+def test_disabled_compactor_passes_text_through(tokenizer):
+    text = research_document()
+
+    assert ContextCompactor(enabled=False).compact('research', text) is text
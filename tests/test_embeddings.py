@@ -0,0 +1,161 @@
+"""Tests for the content-hash embedding cache and its batching service."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from embeddings import EmbeddingService, EmbeddingStore, content_hash
+
+DIM = 8
+
+
+class FakeEncoder:
+    """Deterministic encoder recording the batches it was asked to encode."""
+
+    def __init__(self):
+        self.batches = []
+        self.error = None
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        if self.error is not None:
+            raise self.error
+        return np.stack([vector_for(text) for text in texts])
+
+
+def vector_for(text):
+    """A float32 vector with more precision than float16 keeps."""
+    return np.random.default_rng(list(content_hash(text))).standard_normal(DIM).astype(np.float32)
+
+
+@pytest.fixture
+def encoder():
+    return FakeEncoder()
+
+
+@pytest.fixture
+def service(tmp_path, encoder):
+    return EmbeddingService(
+        model_name='fake-model',
+        store=EmbeddingStore(tmp_path / 'store', initial_capacity=4),
+        batch_size=16,
+        batch_wait_seconds=0.2,
+        encoder=encoder
+    )
+
+
+def test_duplicates_within_a_request_are_encoded_once(service, encoder):
+    vectors = service.embed(['bees', 'wasps', 'bees'])
+
+    assert encoder.batches == [['bees', 'wasps']]
+    assert vectors.shape == (3, DIM)
+    assert vectors.dtype == np.float32
+    np.testing.assert_array_equal(vectors[0], vectors[2])
+
+
+def test_concurrent_callers_share_one_encode_batch(service, encoder):
+    requests = [['bees', 'wasps'], ['wasps', 'ants'], ['ants', 'bees', 'moths']]
+    barrier = threading.Barrier(len(requests))
+
+    def embed(texts):
+        barrier.wait()
+        return service.embed(texts)
+
+    with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+        results = list(executor.map(embed, requests))
+
+    assert len(encoder.batches) == 1
+    assert sorted(encoder.batches[0]) == ['ants', 'bees', 'moths', 'wasps']
+    np.testing.assert_array_equal(results[0][0], results[2][1])
+    assert service.stats()['encoded'] == 4
+
+
+def test_cached_vectors_equal_fresh_ones(service, encoder):
+    fresh = service.embed(['bees', 'wasps'])
+    cached = service.embed(['wasps', 'bees'])
+
+    assert len(encoder.batches) == 1
+    np.testing.assert_array_equal(cached, fresh[::-1])
+    # Fresh vectors are rounded to the stored float16 precision too
+    np.testing.assert_array_equal(fresh[0], vector_for('bees').astype(np.float16).astype(np.float32))
+    assert service.stats()['hits'] == 2
+    assert service.stats()['hit_rate'] == 0.5
+
+
+def test_vectors_survive_a_new_service(tmp_path, service, encoder):
+    fresh = service.embed(['bees'])
+    reopened = EmbeddingService(
+        model_name='fake-model',
+        store=EmbeddingStore(tmp_path / 'store'),
+        encoder=encoder
+    )
+
+    np.testing.assert_array_equal(reopened.embed(['bees']), fresh)
+    assert len(encoder.batches) == 1
+
+
+def test_empty_request_has_no_rows(service):
+    assert service.embed([]).shape == (0, 0)
+    service.embed(['bees'])
+    assert service.embed([]).shape == (0, DIM)
+
+
+def test_second_store_remaps_after_the_file_grew(tmp_path):
+    writer = EmbeddingStore(tmp_path / 'store', initial_capacity=2)
+    reader = EmbeddingStore(tmp_path / 'store', initial_capacity=2)
+    first = {content_hash('bees'): vector_for('bees')}
+    writer.put_many(first)
+    assert set(reader.get_many(list(first))) == set(first)
+
+    texts = [f"text {index}" for index in range(10)]
+    writer.put_many({content_hash(text): vector_for(text) for text in texts})
+    found = reader.get_many([content_hash(text) for text in texts])
+
+    assert len(found) == len(texts)
+    for text in texts:
+        np.testing.assert_array_equal(
+            found[content_hash(text)], vector_for(text).astype(np.float16).astype(np.float32)
+        )
+    assert reader.stats()['vectors'] == 11
+    assert reader.stats()['mapped_bytes'] >= 11 * DIM * 2
+
+
+def test_stored_vectors_are_not_added_again(tmp_path):
+    store = EmbeddingStore(tmp_path / 'store')
+    item = {content_hash('bees'): vector_for('bees')}
+
+    assert store.put_many(item) == 1
+    assert store.put_many(item) == 0
+    assert store.stats()['vectors'] == 1
+
+
+def test_dimension_mismatch_is_rejected(tmp_path):
+    store = EmbeddingStore(tmp_path / 'store')
+    store.put_many({content_hash('bees'): vector_for('bees')})
+
+    with pytest.raises(ValueError, match='8-dimensional'):
+        store.put_many({content_hash('wasps'): np.ones(4, dtype=np.float32)})
+    assert store.stats()['vectors'] == 1
+    assert store.get_many([content_hash('wasps')]) == {}
+
+
+def test_encoder_error_reaches_every_waiting_caller(service, encoder):
+    encoder.error = RuntimeError('model failed to load')
+    requests = [['bees'], ['wasps'], ['bees', 'ants']]
+    barrier = threading.Barrier(len(requests))
+
+    def embed(texts):
+        barrier.wait()
+        return service.embed(texts)
+
+    with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+        futures = [executor.submit(embed, texts) for texts in requests]
+        for future in futures:
+            with pytest.raises(RuntimeError, match='model failed to load'):
+                future.result(timeout=10)
+
+    # Nothing was stored, and the service recovers once the encoder works
+    assert service.store.stats()['vectors'] == 0
+    encoder.error = None
+    assert service.embed(['bees']).shape == (1, DIM)
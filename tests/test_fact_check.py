@@ -0,0 +1,83 @@
+"""Tests for claim-level fact-checking."""
+import hashlib
+import uuid
+
+import chromadb
+import pytest
+
+import fact_check
+from cancellation import RunCancelled
+from claim_cache import ClaimCache
+from fact_check import ClaimFactChecker
+
+CLAIMS = [
+    'The first claim has enough words to be checked.',
+    'The second claim has enough words to be checked.',
+    'The third claim has enough words to be checked.',
+]
+
+
+class FakeTasks:
+    topic = 'fake topic'
+
+    def claim_fact_check_task(self, agent, claim):
+        return claim
+
+
+class HashEmbedding:
+    """Deterministic embeddings, so the tests need no embedding model."""
+
+    def __call__(self, input):
+        return [[byte / 255 for byte in hashlib.sha256(text.encode('utf-8')).digest()[:16]] for text in input]
+
+
+def fake_run_task(agent, claim):
+    if claim.startswith('The second'):
+        raise RuntimeError('connection reset')
+    return 'VERDICT: VERIFIED\nNOTES: Matches the sources.'
+
+
+@pytest.fixture
+def claim_cache():
+    client = chromadb.EphemeralClient(settings=chromadb.Settings(anonymized_telemetry=False))
+    return ClaimCache(client, collection_name=f'claims-{uuid.uuid4().hex}', embedding_function=HashEmbedding())
+
+
+def test_failed_claim_is_unverifiable_and_others_are_merged(monkeypatch):
+    monkeypatch.setattr(fact_check, 'run_task', fake_run_task)
+    checker = ClaimFactChecker(FakeTasks(), lambda: None, concurrency=3)
+
+    report = checker.verify('\n'.join(CLAIMS))
+
+    verdicts = {verdict['claim']: verdict for verdict in report['claims']}
+    assert [verdict['claim'] for verdict in report['claims']] == CLAIMS
+    assert verdicts[CLAIMS[0]]['verdict'] == 'VERIFIED'
+    assert verdicts[CLAIMS[1]]['verdict'] == 'UNVERIFIABLE'
+    assert 'connection reset' in verdicts[CLAIMS[1]]['notes']
+    assert verdicts[CLAIMS[1]]['error'] == 'connection reset'
+    assert verdicts[CLAIMS[2]]['verdict'] == 'VERIFIED'
+    assert report['failed'] == 1
+    assert 'connection reset' in report['document']
+
+
+def test_failed_claim_is_not_cached(monkeypatch, claim_cache):
+    monkeypatch.setattr(fact_check, 'run_task', fake_run_task)
+    checker = ClaimFactChecker(FakeTasks(), lambda: None, cache=claim_cache)
+
+    checker.verify('\n'.join(CLAIMS))
+
+    assert claim_cache.stats()['entries'] == 2
+    cached = claim_cache.lookup_many(CLAIMS)
+    assert cached[1] is None
+    assert cached[0]['verdict'] == cached[2]['verdict'] == 'VERIFIED'
+
+
+def test_cancellation_is_not_swallowed(monkeypatch):
+    def cancelled(agent, claim):
+        raise RunCancelled('Cancelled by user')
+
+    monkeypatch.setattr(fact_check, 'run_task', cancelled)
+    checker = ClaimFactChecker(FakeTasks(), lambda: None)
+
+    with pytest.raises(RunCancelled):
+        checker.verify('\n'.join(CLAIMS))
@@ -0,0 +1,177 @@
+"""Tests for chunking local documents and keeping their index in sync."""
+import re
+import uuid
+
+import chromadb
+import pytest
+
+from ingest import CorpusIndex, chunk_text, format_passages
+
+
+def words(count, prefix='w'):
+    return ' '.join(f"{prefix}{index}" for index in range(count))
+
+
+def test_short_text_is_one_chunk():
+    assert chunk_text("A short paragraph.\n\nAnd another.", chunk_words=50, overlap_words=10) == [
+        "A short paragraph. And another."
+    ]
+
+
+def test_empty_text_has_no_chunks():
+    assert chunk_text("\n\n  \n", chunk_words=50, overlap_words=10) == []
+
+
+def test_consecutive_chunks_overlap():
+    chunks = chunk_text(words(250), chunk_words=100, overlap_words=20)
+
+    assert [len(chunk.split()) for chunk in chunks] == [100, 100, 90]
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.split()[:20] == previous.split()[-20:]
+
+
+def test_paragraph_that_fits_a_chunk_is_not_split():
+    first, second = words(60, 'a'), words(60, 'b')
+
+    chunks = chunk_text(f"{first}\n\n{second}", chunk_words=100, overlap_words=10)
+
+    assert chunks[0] == first
+    assert chunks[1] == ' '.join(first.split()[-10:] + second.split())
+
+
+def test_paragraph_longer_than_a_chunk_is_split():
+    paragraph = words(250)
+
+    chunks = chunk_text(f"Intro.\n\n{paragraph}", chunk_words=100, overlap_words=0)
+
+    assert all(len(chunk.split()) <= 100 for chunk in chunks)
+    assert ' '.join(chunks) == f"Intro. {paragraph}"
+
+
+@pytest.mark.parametrize('overlap', [100, 150, -1])
+def test_overlap_must_be_smaller_than_the_chunk(overlap):
+    with pytest.raises(ValueError):
+        chunk_text(words(10), chunk_words=100, overlap_words=overlap)
+
+
+class WordEmbedding:
+    """Bag-of-words embeddings over a fixed vocabulary, recording what it embedded."""
+
+    VOCABULARY = ['bees', 'hive', 'honey', 'battery', 'lithium', 'recycling', 'solar', 'panel']
+
+    def __init__(self):
+        self.embedded = []
+
+    def __call__(self, texts):
+        self.embedded.extend(texts)
+        vectors = []
+        for text in texts:
+            tokens = re.findall(r'\w+', text.lower())
+            vector = [float(tokens.count(word)) for word in self.VOCABULARY]
+            vectors.append(vector if any(vector) else [1.0] * len(self.VOCABULARY))
+        return vectors
+
+
+@pytest.fixture
+def embed():
+    return WordEmbedding()
+
+
+@pytest.fixture
+def index(tmp_path, embed):
+    client = chromadb.PersistentClient(path=str(tmp_path / 'chroma'),
+                                       settings=chromadb.Settings(anonymized_telemetry=False))
+    return CorpusIndex(client, collection_name=f'corpus-{uuid.uuid4().hex}',
+                       manifest_path=tmp_path / 'manifest.json', embed=embed)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    corpus = tmp_path / 'corpus'
+    corpus.mkdir()
+    (corpus / 'bees.md').write_text("# Bees\n\nA hive makes honey.\n\n## Decline\n\nBees are in decline.\n")
+    (corpus / 'batteries.md').write_text("# Batteries\n\nLithium battery recycling is growing.\n")
+    (corpus / 'notes.txt').write_text("Not a document type that is ingested.")
+    return corpus
+
+
+def sources(index):
+    return sorted({metadata['source'].rsplit('/', 1)[-1] for metadata in index.collection.get()['metadatas']})
+
+
+def test_ingest_chunks_every_document(index, corpus):
+    stats = index.ingest([corpus], workers=1)
+
+    assert (stats['added'], stats['updated'], stats['unchanged'], stats['failed']) == (2, 0, 0, 0)
+    assert stats['chunks'] == 3
+    assert sources(index) == ['batteries.md', 'bees.md']
+    headings = {metadata['heading'] for metadata in index.collection.get()['metadatas']}
+    assert headings == {'Bees', 'Decline', 'Batteries'}
+    assert index.stats() == {'files': 2, 'chunks': 3}
+
+
+def test_unchanged_documents_are_skipped(index, corpus, embed):
+    index.ingest([corpus], workers=1)
+    embedded = len(embed.embedded)
+
+    stats = index.ingest([corpus], workers=1)
+
+    assert (stats['added'], stats['updated'], stats['unchanged']) == (0, 0, 2)
+    assert stats['chunks'] == 0
+    assert len(embed.embedded) == embedded
+    assert index.collection.count() == 3
+
+
+def test_changed_document_has_its_chunks_replaced(index, corpus, embed):
+    index.ingest([corpus], workers=1)
+    (corpus / 'bees.md').write_text("# Bees\n\nSolar panels now power the hive.\n")
+
+    stats = index.ingest([corpus], workers=1)
+
+    assert (stats['updated'], stats['unchanged']) == (1, 1)
+    documents = index.collection.get(where={'source': str((corpus / 'bees.md').resolve())})['documents']
+    assert documents == ["Solar panels now power the hive."]
+    assert index.collection.count() == 2
+
+
+def test_deleted_document_is_removed(index, corpus):
+    index.ingest([corpus], workers=1)
+    (corpus / 'batteries.md').unlink()
+
+    stats = index.ingest([corpus], workers=1)
+
+    assert stats['removed'] == 1
+    assert sources(index) == ['bees.md']
+    assert index.stats()['files'] == 1
+
+
+def test_documents_outside_the_ingested_paths_are_kept(index, corpus, tmp_path):
+    other = tmp_path / 'other'
+    other.mkdir()
+    (other / 'solar.md').write_text("Solar panel recycling.\n")
+    index.ingest([other], workers=1)
+
+    index.ingest([corpus], workers=1)
+
+    assert sources(index) == ['batteries.md', 'bees.md', 'solar.md']
+
+
+def test_unreadable_document_is_reported_and_retried(index, corpus):
+    (corpus / 'broken.pdf').write_bytes(b'not a pdf')
+
+    stats = index.ingest([corpus], workers=1)
+
+    assert stats['failed'] == 1
+    assert str((corpus / 'broken.pdf').resolve()) in stats['errors']
+    assert index.ingest([corpus], workers=1)['failed'] == 1
+
+
+def test_search_finds_the_matching_chunk(index, corpus):
+    index.ingest([corpus], workers=1)
+
+    results = index.search('lithium battery recycling', k=1)
+
+    assert [result['text'] for result in results] == ["Lithium battery recycling is growing."]
+    assert results[0]['heading'] == 'Batteries'
+    assert "batteries.md, section 'Batteries'" in format_passages(results)
+    assert index.search('   ') == []
@@ -0,0 +1,347 @@
+"""Tests for the durable job queue and its worker."""
+import threading
+import time
+from functools import partial
+from types import SimpleNamespace
+
+import pytest
+
+import job_queue
+from job_queue import CANCELLED, COMPLETED, FAILED, QUEUED, RUNNING, JobQueue, JobWorker, run_research_job
+from progress import RUN_FINISHED, TASK_FINISHED, TASK_STARTED, ProgressBus
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(path=tmp_path / 'jobs.sqlite3')
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the queue's clock with one the test advances by hand."""
+    now = SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(job_queue, 'time', SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+class FakeCrew:
+    """Runs one task once the test lets it, publishing its progress."""
+
+    release = threading.Event()
+
+    def __init__(self, topic, **options):
+        self.topic = topic
+        self.run_id = None
+        self.output_file = 'unused.md'
+        self.task_progress = {'writing': {'status': 'pending'}}
+        self.events = ProgressBus()
+
+    def cancel(self, reason):
+        return False
+
+    def run(self):
+        self.events.publish(TASK_STARTED, task='writing', status='in_progress')
+        self.release.wait(timeout=10)
+        self.events.publish(TASK_FINISHED, task='writing', status='completed')
+        self.events.publish(RUN_FINISHED, status='completed')
+        self.events.close()
+        return {'success': True, 'result': 'report'}
+
+
+def test_watcher_follows_a_local_job_on_its_event_bus(tmp_path):
+    queue = JobQueue(path=tmp_path / 'jobs.sqlite3')
+    worker = JobWorker(queue, run_job=partial(run_research_job, crew_factory=FakeCrew), poll_interval=0.05)
+    FakeCrew.release.clear()
+    job_id = queue.submit('fake topic')
+    worker.start()
+    try:
+        events = worker.events(job_id, timeout=10)
+        assert events is not None
+
+        received = events.events(timeout=10)
+        assert next(received)['type'] == TASK_STARTED
+        FakeCrew.release.set()
+        assert [event['type'] for event in received] == [TASK_FINISHED, RUN_FINISHED]
+
+        assert worker.wait(job_id, timeout=10)
+        assert queue.get(job_id)['status'] == COMPLETED
+    finally:
+        FakeCrew.release.set()
+        worker.stop()
+
+
+def test_job_of_another_process_has_no_event_bus(tmp_path):
+    queue = JobQueue(path=tmp_path / 'jobs.sqlite3')
+    worker = JobWorker(queue)
+    job_id = queue.submit('fake topic')
+
+    assert worker.events(job_id, timeout=0.05) is None
+    assert worker.wait(job_id, timeout=0)
+
+
+def test_identical_requests_join_the_queued_job(queue):
+    job_id = queue.submit('Quantum computing', {'pipelined': True})
+
+    assert queue.submit('  quantum computing!', {'pipelined': True}) == job_id
+    assert queue.submit('quantum computing', {'pipelined': True}) == job_id
+    assert queue.get(job_id)['requests'] == 3
+    assert queue.get(job_id)['coalesced'] == 2
+    assert queue.stats()['coalesced'] == 2
+
+
+def test_leave_detaches_a_joined_request(queue):
+    job_id = queue.submit('bees')
+    queue.submit('bees')
+
+    assert not queue.leave(job_id)
+    job = queue.get(job_id)
+    assert job['status'] == QUEUED
+    assert job['requests'] == 1
+
+
+def test_last_request_to_leave_cancels_the_job(queue):
+    job_id = queue.submit('bees')
+    queue.submit('bees')
+    queue.leave(job_id)
+
+    assert queue.leave(job_id)
+    assert queue.get(job_id)['status'] == CANCELLED
+
+
+def test_last_request_to_leave_a_running_job_requests_its_cancellation(queue):
+    job_id = queue.submit('bees')
+    queue.submit('bees')
+    queue.claim('worker-1')
+
+    assert not queue.leave(job_id)
+    assert queue.cancel_requests([job_id]) == []
+    assert queue.leave(job_id)
+    assert queue.get(job_id)['status'] == RUNNING
+    assert queue.cancel_requests([job_id]) == [job_id]
+
+
+def test_submit_rejects_an_empty_topic(queue):
+    with pytest.raises(ValueError):
+        queue.submit('   ')
+
+
+def test_submit_without_dedupe_queues_the_work_again(queue):
+    job_id = queue.submit('bees')
+
+    assert queue.submit('bees', dedupe=False) != job_id
+    assert queue.submit('bees', {'pipelined': True}) != job_id
+    assert queue.stats()[QUEUED] == 3
+
+
+def test_finished_and_cancelling_jobs_are_not_joined(queue):
+    finished = queue.submit('bees')
+    queue.claim('worker-1')
+    queue.complete(finished, {'success': True})
+    cancelling = queue.submit('bees')
+    queue.claim('worker-1')
+    queue.cancel(cancelling)
+
+    assert queue.submit('bees') not in (finished, cancelling)
+
+
+def test_claim_takes_the_oldest_queued_job(queue, clock):
+    first = queue.submit('bees')
+    clock.value += 1
+    second = queue.submit('wasps')
+
+    job = queue.claim('worker-1')
+    assert job['id'] == first
+    assert job['status'] == RUNNING
+    assert job['worker_id'] == 'worker-1'
+    assert job['attempts'] == 1
+    assert queue.claim('worker-2')['id'] == second
+    assert queue.claim('worker-3') is None
+
+
+def test_heartbeat_keeps_a_running_job_claimed(queue, clock):
+    job_id = queue.submit('bees')
+    queue.claim('worker-1')
+    clock.value += 50
+    queue.heartbeat([job_id])
+    clock.value += 50
+
+    assert queue.requeue_stale(timeout=60) == 0
+    assert queue.get(job_id)['status'] == RUNNING
+
+
+def test_progress_updates_count_as_heartbeats(queue, clock):
+    job_id = queue.submit('bees')
+    queue.claim('worker-1')
+    clock.value += 50
+    queue.update_progress(job_id, {'current_task': 'research'})
+    clock.value += 50
+
+    assert queue.requeue_stale(timeout=60) == 0
+    assert queue.get(job_id)['progress'] == {'current_task': 'research'}
+
+
+def test_stale_job_is_requeued(queue, clock):
+    job_id = queue.submit('bees')
+    queue.claim('worker-1')
+    clock.value += 61
+
+    assert queue.requeue_stale(timeout=60) == 1
+    job = queue.get(job_id)
+    assert job['status'] == QUEUED
+    assert job['worker_id'] is None
+    assert queue.claim('worker-2')['attempts'] == 2
+
+
+def test_stale_job_out_of_attempts_fails(tmp_path, clock):
+    queue = JobQueue(path=tmp_path / 'jobs.sqlite3', max_attempts=1)
+    job_id = queue.submit('bees')
+    queue.claim('worker-1')
+    clock.value += 61
+
+    assert queue.requeue_stale(timeout=60) == 1
+    job = queue.get(job_id)
+    assert job['status'] == FAILED
+    assert job['error'] == 'Worker stopped responding'
+
+
+def test_stale_job_with_a_cancel_request_is_cancelled(queue, clock):
+    job_id = queue.submit('bees')
+    queue.claim('worker-1')
+    queue.cancel(job_id)
+    clock.value += 61
+
+    assert queue.requeue_stale(timeout=60) == 1
+    assert queue.get(job_id)['status'] == CANCELLED
+
+
+def test_cancel_a_queued_job(queue):
+    job_id = queue.submit('bees')
+
+    assert queue.cancel(job_id)
+    assert queue.get(job_id)['status'] == CANCELLED
+    assert queue.claim('worker-1') is None
+    assert not queue.cancel(job_id)
+
+
+def test_cancel_a_running_job_records_a_request(queue):
+    job_id = queue.submit('bees')
+    queue.claim('worker-1')
+
+    assert queue.cancel(job_id)
+    assert not queue.cancel(job_id)
+    assert queue.get(job_id)['status'] == RUNNING
+    assert queue.cancel_requests([job_id]) == [job_id]
+
+    queue.mark_cancelled(job_id, {'success': False, 'cancelled': True, 'error': 'Cancelled by user'})
+    job = queue.get(job_id)
+    assert job['status'] == CANCELLED
+    assert job['error'] == 'Cancelled by user'
+
+
+def test_finished_jobs_keep_their_outcome(queue):
+    job_id = queue.submit('bees')
+    queue.claim('worker-1')
+    queue.complete(job_id, {'success': True, 'result': 'report'})
+    queue.fail(job_id, 'too late')
+
+    job = queue.get(job_id)
+    assert job['status'] == COMPLETED
+    assert job['result'] == {'success': True, 'result': 'report'}
+    assert job['error'] is None
+    assert not queue.cancel(job_id)
+
+
+def _wait_for(condition, timeout=10.0):
+    """Wait until `condition()` holds."""
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "condition not reached"
+        time.sleep(0.02)
+
+
+def _scripted_job(job, on_progress):
+    """Run a job whose outcome is named by its topic."""
+    on_progress({'current_task': 'research'})
+    outcome = job['topic']
+    if outcome == 'raises':
+        raise RuntimeError('crew crashed')
+    return {
+        'succeeds': {'success': True, 'result': 'report'},
+        'fails': {'success': False, 'error': 'LLM unavailable'},
+        'is cancelled': {'success': False, 'cancelled': True, 'error': 'Run deadline exceeded'},
+    }[outcome]
+
+
+def test_worker_records_the_outcome_of_each_job(queue):
+    worker = JobWorker(queue, run_job=_scripted_job, concurrency=2, poll_interval=0.05)
+    job_ids = {topic: queue.submit(topic) for topic in ('succeeds', 'fails', 'raises', 'is cancelled')}
+    worker.start()
+    try:
+        _wait_for(lambda: queue.stats()[QUEUED] + queue.stats()[RUNNING] == 0)
+    finally:
+        worker.stop()
+
+    jobs = {topic: queue.get(job_id) for topic, job_id in job_ids.items()}
+    assert jobs['succeeds']['status'] == COMPLETED
+    assert jobs['succeeds']['progress'] == {'current_task': 'research'}
+    assert (jobs['fails']['status'], jobs['fails']['error']) == (FAILED, 'LLM unavailable')
+    assert (jobs['raises']['status'], jobs['raises']['error']) == (FAILED, 'crew crashed')
+    assert (jobs['is cancelled']['status'], jobs['is cancelled']['error']) == (CANCELLED, 'Run deadline exceeded')
+
+
+def test_worker_runs_at_most_its_concurrency(queue):
+    release = threading.Event()
+
+    def run_job(job, on_progress):
+        release.wait(timeout=10)
+        return {'success': True}
+
+    worker = JobWorker(queue, run_job=run_job, concurrency=2, poll_interval=0.05)
+    job_ids = [queue.submit(topic) for topic in ('bees', 'wasps', 'ants')]
+    worker.start()
+    try:
+        _wait_for(lambda: len(worker.active_jobs) == 2)
+        worker.wake()
+        time.sleep(0.2)
+        assert len(worker.active_jobs) == 2
+        assert queue.stats()[RUNNING] == 2
+        assert queue.stats()[QUEUED] == 1
+    finally:
+        release.set()
+        _wait_for(lambda: queue.stats()[COMPLETED] == len(job_ids))
+        worker.stop()
+
+
+class CancellableCrew(FakeCrew):
+    """Runs until it is cancelled."""
+
+    def __init__(self, topic, **options):
+        super().__init__(topic, **options)
+        self.cancelled = threading.Event()
+
+    def cancel(self, reason):
+        self.reason = reason
+        self.cancelled.set()
+        return True
+
+    def run(self):
+        self.cancelled.wait(timeout=10)
+        self.events.close()
+        return {'success': False, 'cancelled': True, 'error': self.reason}
+
+
+def test_worker_stops_a_job_whose_cancellation_was_requested(queue):
+    worker = JobWorker(queue, run_job=partial(run_research_job, crew_factory=CancellableCrew), poll_interval=0.05)
+    job_id = queue.submit('bees')
+    worker.start()
+    try:
+        assert worker.events(job_id, timeout=10) is not None
+        assert queue.cancel(job_id)
+
+        assert worker.wait(job_id, timeout=10)
+    finally:
+        worker.stop()
+
+    job = queue.get(job_id)
+    assert job['status'] == CANCELLED
+    assert job['error'] == 'Cancelled by user'
@@ -0,0 +1,138 @@
+"""Tests for the SQLite LLM response cache."""
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.outputs import Generation
+
+import agents
+import crew as crew_module
+import llm_cache
+from cancellation import CancellationToken
+from checkpoints import CheckpointStore
+from llm_cache import SQLiteResponseCache
+from routing import ModelRouter
+
+LLM_STRING = 'model=gpt-test temperature=0.7'
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the cache's clock with one the test advances by hand."""
+    now = SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(llm_cache, 'time', SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return SQLiteResponseCache(path=tmp_path / 'responses.sqlite3', ttl_seconds=60, max_bytes=10_000)
+
+
+def test_miss_then_hit(cache):
+    assert cache.lookup('prompt', LLM_STRING) is None
+
+    cache.update('prompt', LLM_STRING, [Generation(text='answer')])
+    cached = cache.lookup('prompt', LLM_STRING)
+
+    assert [generation.text for generation in cached] == ['answer']
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+    assert cache.thread_hits() == 1
+
+
+def test_key_includes_llm_configuration(cache):
+    cache.update('prompt', LLM_STRING, [Generation(text='answer')])
+
+    assert cache.lookup('prompt', 'model=gpt-other temperature=0.7') is None
+    assert cache.lookup('other prompt', LLM_STRING) is None
+
+
+def test_expired_entry_is_a_miss_and_removed(cache, clock):
+    cache.update('prompt', LLM_STRING, [Generation(text='answer')])
+    clock.value += 61
+
+    assert cache.lookup('prompt', LLM_STRING) is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_eviction_keeps_recently_used_entries_within_max_bytes(tmp_path, clock):
+    cache = SQLiteResponseCache(path=tmp_path / 'responses.sqlite3', ttl_seconds=60, max_bytes=10_000)
+    for prompt in ('first', 'second'):
+        cache.update(prompt, LLM_STRING, [Generation(text=prompt * 100)])
+        clock.value += 1
+    entry_size = cache.stats()['size_bytes'] // 2
+    cache.max_bytes = 2 * entry_size + entry_size // 2
+
+    # Touching 'first' makes 'second' the least recently used entry
+    assert cache.lookup('first', LLM_STRING) is not None
+    clock.value += 1
+    cache.update('third', LLM_STRING, [Generation(text='third' * 100)])
+
+    assert cache.stats()['size_bytes'] <= cache.max_bytes
+    assert cache.lookup('second', LLM_STRING) is None
+    assert cache.lookup('first', LLM_STRING) is not None
+    assert cache.lookup('third', LLM_STRING) is not None
+
+
+def test_clear_removes_everything(cache):
+    cache.update('prompt', LLM_STRING, [Generation(text='answer')])
+    cache.clear()
+
+    assert cache.stats()['entries'] == 0
+
+
+def test_disabled_agents_bypass_the_cache(cache, monkeypatch):
+    monkeypatch.setattr(agents, 'get_response_cache', lambda: cache)
+    research_agents = agents.ResearchAgents(use_cache=True, uncached_agents={'writer'})
+
+    assert research_agents._llm_for('researcher').cache is cache
+    assert research_agents._llm_for('writer').cache is False
+
+
+def test_cache_disabled_for_every_agent(monkeypatch):
+    monkeypatch.setattr(agents, 'get_response_cache', pytest.fail)
+    research_agents = agents.ResearchAgents(use_cache=False)
+
+    assert research_agents.cache is None
+    assert research_agents._llm_for('researcher').cache is False
+
+
+def test_cancellation_token_is_not_part_of_the_cache_key():
+    llm_strings = {
+        agents.ResearchAgents(cancellation=CancellationToken())._llm_for('researcher')._get_llm_string()
+        for _ in range(2)
+    }
+
+    assert len(llm_strings) == 1
+
+
+def test_crews_on_the_same_topic_share_cache_entries(stub_llm, tmp_path, monkeypatch):
+    store = CheckpointStore(root=tmp_path / 'checkpoints')
+    monkeypatch.setattr(crew_module, 'get_checkpoint_store', lambda: store)
+    monkeypatch.setattr(crew_module, 'index_report', lambda *args, **kwargs: None)
+    cache = llm_cache.get_response_cache()
+
+    first = crew_module.ResearchCrew('bees', output_file=tmp_path / 'first.md').run()
+    calls = stub_llm.stats()['requests']
+    second = crew_module.ResearchCrew('bees', output_file=tmp_path / 'second.md').run()
+
+    # The second crew's agents are served from the first crew's responses
+    assert first['success'] and second['success']
+    assert stub_llm.stats()['requests'] == calls
+    assert cache.stats()['entries'] == calls
+    assert cache.stats()['hits'] == calls
+
+
+def test_agent_llm_calls_hit_the_cache(stub_llm):
+    # Each call comes from new agents, with their own router and cancellation token, as in a new crew
+    answers = []
+    for _ in range(2):
+        research_agents = agents.ResearchAgents(router=ModelRouter(), cancellation=CancellationToken())
+        llm = research_agents.create_researcher().llm
+        # crewai's agent executor calls stream(), not invoke()
+        answers.append(''.join(chunk.content for chunk in llm.stream('Research the history of bees')))
+
+    assert answers[0] == answers[1]
+    assert 'Final Answer:' in answers[0]
+    assert stub_llm.stats()['requests'] == 1
+    assert llm_cache.get_response_cache().stats()['hits'] == 1
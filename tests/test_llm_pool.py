@@ -0,0 +1,77 @@
+"""Tests for the pooled HTTP clients shared by the LLM instances."""
+import asyncio
+
+import pytest
+
+from llm_pool import LLMClientPool
+
+
+@pytest.fixture
+def pool():
+    pool = LLMClientPool()
+    yield pool
+    pool.close()
+
+
+def test_sync_client_is_shared_per_endpoint(pool):
+    first = pool.get_client('http://127.0.0.1:1/v1')
+
+    assert pool.get_client('http://127.0.0.1:1/v1') is first
+    assert pool.get_client('http://127.0.0.1:2/v1') is not first
+    assert pool.stats()['clients'] == 2
+
+
+def test_default_endpoint_follows_the_environment(pool, monkeypatch):
+    monkeypatch.setenv('OPENAI_API_BASE', 'http://127.0.0.1:1/v1')
+
+    assert pool.get_client() is pool.get_client('http://127.0.0.1:1/v1')
+
+
+def test_async_client_is_shared_per_event_loop(pool):
+    async def get_clients():
+        return pool.get_async_client('http://127.0.0.1:1/v1'), pool.get_async_client('http://127.0.0.1:1/v1')
+
+    first, same_loop = asyncio.run(get_clients())
+    other_loop, _ = asyncio.run(get_clients())
+
+    assert first is same_loop
+    assert other_loop is not first
+    assert pool.get_async_client('http://127.0.0.1:1/v1') is None
+
+
+def test_llms_share_the_pooled_client(pool):
+    llms = [pool.create_llm(base_url='http://127.0.0.1:1/v1', model_name='gpt-4o-mini') for _ in range(2)]
+
+    assert llms[0].http_client is llms[1].http_client is pool.get_client('http://127.0.0.1:1/v1')
+
+
+def test_stats_count_reused_connections(pool, stub_llm):
+    llms = [pool.create_llm(model_name='gpt-4o-mini') for _ in range(3)]
+    for llm in llms:
+        llm.invoke('Research bees')
+
+    stats = pool.stats()
+    assert stats['requests'] == 3
+    assert stats['new_connections'] == 1
+    assert stats['reused_connections'] == 2
+    assert stats['reuse_rate'] == pytest.approx(2 / 3)
+
+
+def test_close_drops_the_clients(pool):
+    client = pool.get_client('http://127.0.0.1:1/v1')
+    pool.close()
+
+    assert client.is_closed
+    assert pool.stats()['clients'] == 0
+    assert pool.get_client('http://127.0.0.1:1/v1') is not client
+
+
+def test_pooled_clients_are_not_part_of_the_cache_key():
+    # Another process has other clients; the persistent response cache must still match
+    pools = [LLMClientPool(), LLMClientPool()]
+    llm_strings = {
+        pool.create_llm(base_url='http://127.0.0.1:1/v1', model_name='gpt-4o-mini')._get_llm_string()
+        for pool in pools
+    }
+
+    assert len(llm_strings) == 1
@@ -0,0 +1,77 @@
+"""Tests for parsing the outline of a pipelined run."""
+from types import SimpleNamespace
+
+import pytest
+
+import pipeline
+from pipeline import SectionPipeline, parse_outline
+
+
+@pytest.mark.parametrize('outline', [
+    "1. History\n2. Biology\n3) Threats",
+    "- History\n* Biology\n• Threats",
+    "## History\n### Biology\n# Threats",
+    "**1. History**\n**2. Biology**\n**3. Threats**",
+])
+def test_marked_lines_are_sections(outline):
+    assert parse_outline(outline, 10) == ['History', 'Biology', 'Threats']
+
+
+def test_preamble_and_notes_are_not_sections():
+    outline = (
+        "Here is the outline:\n"
+        "\n"
+        "1. History of beekeeping\n"
+        "2. Colony collapse\n"
+        "\n"
+        "Let me know if you need more sections."
+    )
+
+    assert parse_outline(outline, 10) == ['History of beekeeping', 'Colony collapse']
+
+
+def test_numbers_in_titles_are_not_markers():
+    assert parse_outline("1.5 million hives were lost\n- Causes", 10) == ['Causes']
+
+
+def test_plain_lines_are_sections_when_no_line_is_marked():
+    assert parse_outline("History\n\nBiology\nThreats\n", 10) == ['History', 'Biology', 'Threats']
+
+
+def test_duplicates_are_dropped_and_the_count_is_capped():
+    outline = "1. History\n2. Biology\n3. History\n4. Threats\n5. Economics"
+
+    assert parse_outline(outline, 3) == ['History', 'Biology', 'Threats']
+
+
+def test_empty_outline_has_no_sections():
+    assert parse_outline("\n  \n", 5) == []
+
+
+def test_pipeline_only_researches_the_outline_sections(monkeypatch):
+    researched = []
+
+    def run_task(agent, task):
+        if task.stage == 'outline':
+            return "Here is the outline:\n1. History\n2. Threats\nThat covers the topic."
+        if task.stage == 'research':
+            researched.append(task.section)
+        task.output = SimpleNamespace(raw=f"{task.stage}: {task.section}")
+        return task.output.raw
+
+    def create(stage):
+        return lambda agent, section, *args: SimpleNamespace(stage=stage, section=section, output=None)
+
+    tasks = SimpleNamespace(
+        topic='bees',
+        outline_task=lambda agent, max_sections: SimpleNamespace(stage='outline'),
+        section_research_task=create('research'),
+        section_fact_check_task=create('fact_check'),
+        section_writing_task=create('writing'),
+    )
+    monkeypatch.setattr(pipeline, 'run_task', run_task)
+
+    article = SectionPipeline(tasks, 'researcher', 'fact checker', 'writer').run()
+
+    assert researched == ['History', 'Threats']
+    assert article == "writing: History\n\nwriting: Threats"
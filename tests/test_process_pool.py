@@ -0,0 +1,112 @@
+"""Tests for running crews in a pool of worker processes."""
+import os
+import textwrap
+from concurrent.futures import Future
+
+import pytest
+
+import process_pool
+from process_pool import CrewProcessPool
+
+# Stands in for crew.py in the workers, which get the test's sys.path when spawned
+FAKE_CREW = textwrap.dedent('''
+    from pathlib import Path
+
+
+    class ResearchCrew:
+        def __init__(self, topic, fail=False):
+            self.topic = topic
+            self.fail = fail
+
+        def run(self):
+            if self.fail:
+                raise RuntimeError(f"crew failed on {self.topic}")
+            return {'topic': self.topic, 'output_file': Path('output') / f"{self.topic}.md"}
+''')
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    (tmp_path / 'crew.py').write_text(FAKE_CREW)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    pool = CrewProcessPool(workers=1, max_runs_per_worker=2, start_method='spawn', preload=[])
+    yield pool
+    pool.shutdown()
+
+
+def test_results_are_decoded_from_the_workers(pool):
+    result = pool.run('bees')
+
+    assert result['topic'] == 'bees'
+    assert result['output_file'] == os.path.join('output', 'bees.md')
+    assert result['worker_pid'] != os.getpid()
+    stats = pool.stats()
+    assert (stats['submitted'], stats['completed'], stats['failed'], stats['in_flight']) == (1, 1, 0, 0)
+    assert stats['mean_result_bytes'] > 0
+
+
+def test_workers_are_replaced_after_their_runs(pool):
+    pids = [pool.run(topic)['worker_pid'] for topic in ['bees', 'wasps', 'ants', 'moths', 'flies']]
+
+    assert pool.stats()['generations'] == 3
+    assert pids[0] == pids[1]
+    assert pids[2] == pids[3]
+    assert len({pids[0], pids[2], pids[4]}) == 3
+
+
+def test_failed_runs_are_counted(pool):
+    with pytest.raises(RuntimeError, match='crew failed on bees'):
+        pool.run('bees', fail=True)
+    assert pool.run('wasps')['topic'] == 'wasps'
+
+    stats = pool.stats()
+    assert (stats['submitted'], stats['completed'], stats['failed']) == (2, 1, 1)
+
+
+def test_undecodable_result_is_a_failure():
+    pool = CrewProcessPool(workers=1, start_method='spawn', preload=[])
+    source, target = Future(), Future()
+    source.set_result(b'not json')
+
+    pool._decode(source, target)
+
+    with pytest.raises(ValueError):
+        target.result()
+    assert pool.stats()['failed'] == 1
+
+
+def test_fork_is_refused():
+    with pytest.raises(ValueError, match='forkserver'):
+        CrewProcessPool(start_method='fork', preload=[])
+
+
+@pytest.mark.parametrize('python_path', [None, '/opt/lib'])
+def test_forkserver_start_restores_pythonpath(monkeypatch, python_path):
+    from multiprocessing import forkserver
+
+    seen = []
+    monkeypatch.setattr(forkserver, 'ensure_running', lambda: seen.append(os.environ['PYTHONPATH']))
+    if python_path is None:
+        monkeypatch.delenv('PYTHONPATH', raising=False)
+    else:
+        monkeypatch.setenv('PYTHONPATH', python_path)
+
+    process_pool._start_forkserver()
+
+    expected = [str(process_pool.BASE_DIR)] + ([python_path] if python_path else [])
+    assert seen == [os.pathsep.join(expected)]
+    assert os.environ.get('PYTHONPATH') == python_path
+
+
+def test_pythonpath_is_restored_when_the_forkserver_fails(monkeypatch):
+    from multiprocessing import forkserver
+
+    def fail():
+        raise OSError('no forkserver')
+
+    monkeypatch.setattr(forkserver, 'ensure_running', fail)
+    monkeypatch.setenv('PYTHONPATH', '/opt/lib')
+
+    with pytest.raises(OSError):
+        process_pool._start_forkserver()
+    assert os.environ['PYTHONPATH'] == '/opt/lib'
@@ -0,0 +1,73 @@
+"""Tests for the progress event bus."""
+import asyncio
+
+from progress import RUN_FINISHED, TASK_FINISHED, TASK_STARTED, TOKEN, ProgressBus
+
+
+def publish_run(bus: ProgressBus) -> None:
+    bus.publish(TASK_STARTED, task='writing', status='in_progress')
+    for token in ('Hello', ', ', 'world'):
+        bus.publish(TOKEN, task='writing', token=token)
+    bus.publish(TASK_FINISHED, task='writing', status='completed')
+    bus.publish(RUN_FINISHED, status='completed')
+    bus.close()
+
+
+def test_history_coalesces_consecutive_tokens():
+    bus = ProgressBus()
+    publish_run(bus)
+
+    history = bus.history()
+
+    assert [event['type'] for event in history] == [TASK_STARTED, TOKEN, TASK_FINISHED, RUN_FINISHED]
+    assert history[1]['token'] == 'Hello, world'
+    assert history[1]['tokens'] == 3
+    assert [event['seq'] for event in history] == [1, 4, 5, 6]
+    assert len(bus._history) == 4
+
+
+def test_history_without_tokens():
+    bus = ProgressBus()
+    publish_run(bus)
+
+    assert [event['type'] for event in bus.history(tokens=False)] == [TASK_STARTED, TASK_FINISHED, RUN_FINISHED]
+
+
+def test_live_subscribers_receive_every_token():
+    bus = ProgressBus()
+    received = []
+    bus.subscribe(received.append)
+    publish_run(bus)
+
+    assert [event['token'] for event in received if event['type'] == TOKEN] == ['Hello', ', ', 'world']
+    assert [event['seq'] for event in received] == [1, 2, 3, 4, 5, 6]
+
+
+def test_replay_resumes_inside_a_token_run():
+    bus = ProgressBus()
+    publish_run(bus)
+
+    replayed = list(bus.events(after=2))
+
+    assert replayed[0]['token'] == ', world'
+    assert replayed[0]['seq'] == 4
+    assert [event['seq'] for event in replayed] == [4, 5, 6]
+
+
+def test_tokens_of_different_tasks_are_not_merged():
+    bus = ProgressBus()
+    bus.publish(TOKEN, task='research', token='a')
+    bus.publish(TOKEN, task='writing', token='b')
+    bus.close()
+
+    assert [(event['task'], event['token']) for event in bus.history()] == [('research', 'a'), ('writing', 'b')]
+
+
+def test_async_iterator_replays_after_sequence_number():
+    bus = ProgressBus()
+    publish_run(bus)
+
+    async def collect():
+        return [event async for event in bus.aevents(after=4)]
+
+    assert [event['type'] for event in asyncio.run(collect())] == [TASK_FINISHED, RUN_FINISHED]
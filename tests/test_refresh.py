@@ -0,0 +1,106 @@
+"""Tests for parsing refresh research and patching the previous report."""
+from config import REFRESH_FALLBACK_SECTION
+from refresh import assemble_report, parse_changes, split_sections, summarize_changes
+
+REPORT = """# Quantum Computing
+
+An introduction.
+
+## 1. Hardware
+
+Superconducting qubits.
+
+### Error rates
+
+Still high.
+
+## Applications
+
+Chemistry simulation.
+
+## Conclusion
+
+Early days.
+"""
+
+TITLES = ['1. Hardware', 'Applications', 'Conclusion']
+
+
+def test_split_sections_keeps_subsections_with_their_section():
+    preamble, sections = split_sections(REPORT)
+
+    assert preamble == '# Quantum Computing\n\nAn introduction.\n\n'
+    assert [section['title'] for section in sections] == TITLES
+    assert '### Error rates' in sections[0]['text']
+    assert ''.join(section['text'] for section in sections) == REPORT[len(preamble):]
+
+
+def test_parse_changes_reads_update_and_new_markers():
+    changes = parse_changes(
+        "UPDATE: Hardware\nA 1,000-qubit chip was announced.\n\n"
+        "**NEW: Funding**\nGovernments doubled their budgets.\n\n"
+        "update: applications\nNO CHANGES",
+        TITLES
+    )
+
+    assert list(changes) == ['1. Hardware', 'Funding']
+    assert changes['1. Hardware'] == {'changes': 'A 1,000-qubit chip was announced.', 'new': False}
+    assert changes['Funding'] == {'changes': 'Governments doubled their budgets.', 'new': True}
+
+
+def test_updates_of_unknown_sections_fall_into_the_fallback_section():
+    changes = parse_changes(
+        "A finding before any marker.\n\n"
+        "UPDATE: Hardwear Progress\nA misnamed section.\n\n"
+        "NEW: Funding\nA new section.",
+        TITLES
+    )
+
+    assert list(changes) == [REFRESH_FALLBACK_SECTION, 'Funding']
+    assert changes[REFRESH_FALLBACK_SECTION]['new']
+    assert changes[REFRESH_FALLBACK_SECTION]['changes'] == "A finding before any marker.\n\nA misnamed section."
+
+
+def test_unmarked_research_goes_to_an_existing_fallback_section():
+    changes = parse_changes("Something changed.", TITLES + [REFRESH_FALLBACK_SECTION.upper()])
+
+    assert changes == {REFRESH_FALLBACK_SECTION.upper(): {'changes': 'Something changed.', 'new': False}}
+
+
+def test_no_changes():
+    assert parse_changes("NO CHANGES.", TITLES) == {}
+    assert parse_changes("", TITLES) == {}
+
+
+def test_assemble_report_patches_in_place_and_inserts_before_the_conclusion():
+    preamble, sections = split_sections(REPORT)
+    report = assemble_report(preamble, sections, {
+        '1. Hardware': '## 1. Hardware\n\nA 1,000-qubit chip.',
+        'Funding': '## Funding\n\nBudgets doubled.',
+    })
+
+    _, patched = split_sections(report)
+    assert [section['title'] for section in patched] == ['1. Hardware', 'Applications', 'Funding', 'Conclusion']
+    assert 'A 1,000-qubit chip.' in patched[0]['text']
+    assert 'Superconducting' not in report
+
+    summary = summarize_changes(sections, report)
+    assert summary['updated'] == ['1. Hardware']
+    assert summary['added'] == ['Funding']
+    assert summary['unchanged'] == ['Applications', 'Conclusion']
+
+
+def test_report_without_headings():
+    text = "# Notes\n\nJust a paragraph without sections.\n"
+    preamble, sections = split_sections(text)
+
+    assert preamble == text
+    assert sections == []
+
+    changes = parse_changes("UPDATE: Background\nA new finding.", [section['title'] for section in sections])
+    assert list(changes) == [REFRESH_FALLBACK_SECTION]
+
+    patched = {REFRESH_FALLBACK_SECTION: f"## {REFRESH_FALLBACK_SECTION}\n\nA new finding."}
+    report = assemble_report(preamble, sections, patched)
+    assert report.startswith(text.rstrip('\n'))
+    assert [section['title'] for section in split_sections(report)[1]] == [REFRESH_FALLBACK_SECTION]
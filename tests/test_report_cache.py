@@ -0,0 +1,110 @@
+"""Tests for the semantic cache of finished reports."""
+import hashlib
+import time
+import uuid
+
+import chromadb
+import pytest
+
+from report_cache import ReportCache, normalize_topic
+
+
+class HashEmbedding:
+    """Deterministic embeddings: equal topics match exactly, different ones do not."""
+
+    def __call__(self, input):
+        return [[byte / 255 for byte in hashlib.sha256(text.encode('utf-8')).digest()[:16]] for text in input]
+
+
+@pytest.fixture
+def cache():
+    client = chromadb.EphemeralClient(settings=chromadb.Settings(anonymized_telemetry=False))
+    return ReportCache(client, collection_name=f'reports-{uuid.uuid4().hex}', similarity_threshold=0.99,
+                       ttl_seconds=3600, max_entries=3, embedding_function=HashEmbedding())
+
+
+@pytest.fixture
+def report(tmp_path):
+    def write(name, text='# Report'):
+        path = tmp_path / name
+        path.write_text(text, encoding='utf-8')
+        return path
+    return write
+
+
+def test_normalize_topic():
+    assert normalize_topic('  Quantum   Computing?! ') == 'quantum computing'
+    assert normalize_topic("The bees' decline") == 'the bees decline'
+    assert normalize_topic('!!!') == ''
+
+
+def test_lookup_serves_a_stored_report(cache, report):
+    path = report('bees.md', '# Bees\n\nThey pollinate.')
+    cache.store('The Decline of Bees', path)
+
+    result = cache.lookup('the decline of bees?')
+
+    assert result['cached']
+    assert result['result'] == '# Bees\n\nThey pollinate.'
+    assert result['output_file'] == str(path)
+    assert result['cached_topic'] == 'The Decline of Bees'
+    assert result['similarity'] == pytest.approx(1.0)
+    assert cache.stats() == {'hits': 1, 'misses': 0, 'hit_rate': 1.0, 'entries': 1}
+
+
+def test_lookup_misses_other_topics(cache, report):
+    assert cache.lookup('bees') is None
+    cache.store('bees', report('bees.md'))
+
+    assert cache.lookup('quantum computing') is None
+    assert cache.lookup('???') is None
+    assert cache.stats()['misses'] == 3
+
+
+def test_storing_a_topic_again_replaces_its_entry(cache, report):
+    cache.store('Bees', report('old.md', 'old'))
+    cache.store('bees!', report('new.md', 'new'))
+
+    assert cache.stats()['entries'] == 1
+    assert cache.lookup('bees')['result'] == 'new'
+
+
+def test_missing_reports_are_not_stored_or_served(cache, report):
+    path = report('bees.md')
+    cache.store('wasps', path.with_name('missing.md'))
+    assert cache.stats()['entries'] == 0
+
+    cache.store('bees', path)
+    path.unlink()
+
+    assert cache.lookup('bees') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_expired_reports_are_evicted(cache, report):
+    cache.store('bees', report('bees.md'), created_at=time.time() - 7200)
+    cache.store('wasps', report('wasps.md'))
+
+    assert cache.lookup('bees') is None
+    assert cache.stats()['entries'] == 1
+
+
+def test_oldest_reports_are_evicted_over_the_limit(cache, report):
+    now = time.time()
+    for age, topic in enumerate(['ants', 'bees', 'moths', 'wasps']):
+        cache.store(topic, report(f'{topic}.md'), created_at=now - 100 + age)
+
+    assert cache.stats()['entries'] == 3
+    assert cache.lookup('ants') is None
+    assert cache.lookup('wasps') is not None
+
+
+def test_backfill_indexes_recent_reports(cache, tmp_path):
+    stamp = time.strftime('%Y%m%d_%H%M%S')
+    (tmp_path / f'quantum_computing_{stamp}.md').write_text('# Quantum', encoding='utf-8')
+    (tmp_path / 'bees_20000101_000000.md').write_text('# Too old', encoding='utf-8')
+    (tmp_path / 'notes.md').write_text('# Not a report', encoding='utf-8')
+
+    assert cache.backfill(tmp_path) == 1
+    assert cache.backfill(tmp_path) == 0
+    assert cache.lookup('Quantum computing')['result'] == '# Quantum'
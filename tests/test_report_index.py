@@ -0,0 +1,93 @@
+"""Tests for the full-text index of the reports in the output directory."""
+import os
+from datetime import datetime
+
+import pytest
+
+from report_index import ReportIndex
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    output_dir = tmp_path / 'output'
+    output_dir.mkdir()
+    (output_dir / 'solar_panels_20250101_120000.md').write_text(
+        '# Solar panels\n\nPerovskite cells raise the efficiency of solar panels.', encoding='utf-8')
+    (output_dir / 'honey_bees_20250201_120000.md').write_text(
+        '# Honey bees\n\nPesticides harm pollinating bees.', encoding='utf-8')
+    (output_dir / 'notes.json').write_text('{}', encoding='utf-8')
+    return output_dir
+
+
+@pytest.fixture
+def index(tmp_path, output_dir):
+    index = ReportIndex(path=tmp_path / 'index' / 'reports.sqlite3', output_dir=output_dir)
+    index.refresh()
+    return index
+
+
+def test_refresh_indexes_the_reports(index, output_dir):
+    assert index.stats()['reports'] == 2
+
+    report = index.get(output_dir / 'solar_panels_20250101_120000.md')
+    assert report['topic'] == 'solar panels'
+    assert report['created_at'] == datetime(2025, 1, 1, 12).timestamp()
+    assert [report['topic'] for report in index.recent()] == ['honey bees', 'solar panels']
+
+
+def test_search_matches_every_word_with_stemming(index):
+    results = index.search('pollinate bee')
+
+    assert [result['topic'] for result in results] == ['honey bees']
+    assert '[bees]' in results[0]['snippet']
+    assert results[0]['score'] > 0
+    assert index.search('bees solar') == []
+    assert index.search('   ') == []
+
+
+def test_raw_queries_use_fts5_syntax(index):
+    assert len(index.search('bees OR perovskite', raw=True)) == 2
+    assert [result['topic'] for result in index.search('topic:solar', raw=True)] == ['solar panels']
+    with pytest.raises(ValueError, match='Invalid search query'):
+        index.search('bees AND', raw=True)
+
+
+def test_unchanged_reports_are_not_read_again(index):
+    assert index.refresh() == {'added': 0, 'updated': 0, 'removed': 0}
+
+
+def test_refresh_picks_up_changed_added_and_deleted_reports(index, output_dir):
+    solar = output_dir / 'solar_panels_20250101_120000.md'
+    solar.write_text('# Solar panels\n\nTandem cells.', encoding='utf-8')
+    os.utime(solar, (0, 1))
+    (output_dir / 'honey_bees_20250201_120000.md').unlink()
+    (output_dir / 'wind_farms_20250301_120000.md').write_text('# Wind farms', encoding='utf-8')
+
+    assert index.refresh() == {'added': 1, 'updated': 1, 'removed': 1}
+    assert [result['topic'] for result in index.search('tandem')] == ['solar panels']
+    assert index.search('perovskite') == []
+    assert index.search('pesticides') == []
+    assert index.stats()['reports'] == 2
+
+
+def test_added_reports_keep_their_topic_and_metrics(index, output_dir):
+    path = output_dir / 'quantum_20250401_120000.md'
+    path.write_text('# Quantum computing\n\nQubits.', encoding='utf-8')
+
+    assert index.add(path, topic='Quantum Computing', metrics={'llm_calls': 3})
+    assert not index.add(output_dir / 'missing.md')
+
+    # A rescan of the rewritten file keeps what the run recorded
+    path.write_text('# Quantum computing\n\nQubits and gates.', encoding='utf-8')
+    assert index.refresh()['updated'] == 1
+    report = index.search('gates')[0]
+    assert report['topic'] == 'Quantum Computing'
+    assert report['metrics'] == {'llm_calls': 3}
+    assert index.recent(topic='quantum')[0]['path'] == str(path.resolve())
+
+
+def test_index_persists_across_instances(tmp_path, index, output_dir):
+    reopened = ReportIndex(path=tmp_path / 'index' / 'reports.sqlite3', output_dir=output_dir)
+
+    assert reopened.refresh() == {'added': 0, 'updated': 0, 'removed': 0}
+    assert [result['topic'] for result in reopened.search('perovskite')] == ['solar panels']
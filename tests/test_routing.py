@@ -0,0 +1,64 @@
+"""Tests for counting fact-check flags and escalating the writer."""
+import pytest
+
+from fact_check import merge_verdicts
+from routing import ModelRouter, count_fact_check_flags
+
+CLEAN_REPORTS = [
+    "All claims were checked. None of the findings are incorrect or misleading.\n\nFLAGGED: NONE",
+    "The dates are accurate; nothing could not be verified.\nNo statements were found to be outdated.",
+    "## Verification\n\nEvery figure was verified against two sources.\n\n**FLAGGED:**\n- None",
+    "Incorrect claims: none were found.\nFLAGGED:\nn/a",
+    merge_verdicts([{'claim': 'Water boils at 100 C at sea level.', 'verdict': 'VERIFIED',
+                     'notes': 'Not incorrect; widely documented.'}]),
+]
+
+
+@pytest.mark.parametrize('report', CLEAN_REPORTS)
+def test_clean_reports_have_no_flags(report):
+    assert count_fact_check_flags(report) == 0
+
+
+@pytest.mark.parametrize('report', CLEAN_REPORTS)
+def test_clean_reports_do_not_escalate(report):
+    router = ModelRouter(escalation_model='gpt-4o', escalation_min_flags=1)
+
+    assert not router.review_fact_check(report)
+    assert router.summary()['escalations'] == {}
+
+
+def test_flagged_section_lines_are_counted():
+    report = (
+        "The research is mostly accurate.\n\n"
+        "FLAGGED:\n"
+        "- INCORRECT: The first qubit was built in 1975 - it was 1995.\n"
+        "- UNVERIFIABLE: A lab reached 10,000 qubits.\n"
+        "- The cost figure is from a retracted paper.\n\n"
+        "## Sources\n"
+        "- https://example.org/qubits\n"
+    )
+
+    assert count_fact_check_flags(report) == 3
+
+
+def test_anchored_lines_outside_a_flagged_section_are_counted():
+    assert count_fact_check_flags("**INCORRECT:** the launch year.\nUNVERIFIABLE: the budget.") == 2
+    assert count_fact_check_flags("INCORRECT: none") == 0
+
+
+def test_claim_verdicts_are_counted():
+    document = merge_verdicts([
+        {'claim': 'Claim one is long enough to check.', 'verdict': 'INCORRECT', 'notes': 'Wrong year.'},
+        {'claim': 'Claim two is long enough to check.', 'verdict': 'VERIFIED', 'notes': ''},
+        {'claim': 'Claim three is long enough to check.', 'verdict': 'UNVERIFIABLE', 'notes': ''},
+    ])
+
+    assert count_fact_check_flags(document) == 2
+    assert count_fact_check_flags("VERDICT: **INCORRECT**\nNOTES: Wrong year.") == 1
+
+
+def test_flagged_report_escalates_the_writer():
+    router = ModelRouter(escalation_model='gpt-4o', escalation_min_flags=1)
+
+    assert router.review_fact_check("FLAGGED:\n- UNVERIFIABLE: the budget figure.")
+    assert router.summary()['escalations']['writing']['model'] == 'gpt-4o'
@@ -0,0 +1,96 @@
+"""Tests for single-flight coalescing of identical concurrent calls."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from singleflight import SingleFlight, research_key
+
+CALLERS = 4
+
+
+def _wait_for(condition, timeout=5.0):
+    """Wait until `condition()` holds."""
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def test_concurrent_callers_share_one_result():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        release.wait(timeout=10)
+        return 'report'
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as executor:
+        futures = [executor.submit(flights.call, 'bees', work) for _ in range(CALLERS)]
+        _wait_for(lambda: flights.coalesced == CALLERS - 1)
+        assert flights.in_flight() == 1
+        release.set()
+        outcomes = [future.result(timeout=10) for future in futures]
+
+    assert len(calls) == 1
+    assert [result for result, _ in outcomes] == ['report'] * CALLERS
+    assert sorted(coalesced for _, coalesced in outcomes) == [False] + [True] * (CALLERS - 1)
+    assert flights.stats() == {'started': 1, 'coalesced': CALLERS - 1, 'in_flight': 0}
+
+
+def test_concurrent_callers_share_one_exception():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def work():
+        release.wait(timeout=10)
+        raise RuntimeError('crew failed')
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as executor:
+        futures = [executor.submit(flights.call, 'bees', work) for _ in range(CALLERS)]
+        _wait_for(lambda: flights.coalesced == CALLERS - 1)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError, match='crew failed'):
+                future.result(timeout=10)
+
+    assert flights.in_flight() == 0
+
+
+def test_key_is_free_once_the_call_returned():
+    flights = SingleFlight()
+
+    assert flights.call('bees', lambda: 1) == (1, False)
+    assert flights.call('bees', lambda: 2) == (2, False)
+    with pytest.raises(ValueError):
+        flights.call('bees', lambda: int('not a number'))
+    assert flights.call('bees', lambda: 3) == (3, False)
+    assert flights.stats() == {'started': 4, 'coalesced': 0, 'in_flight': 0}
+
+
+def test_different_keys_run_separately():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def work(result):
+        release.wait(timeout=10)
+        return result
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(flights.call, 'bees', lambda: work('bees'))
+        second = executor.submit(flights.call, 'wasps', lambda: work('wasps'))
+        _wait_for(lambda: flights.in_flight() == 2)
+        release.set()
+
+        assert first.result(timeout=10) == ('bees', False)
+        assert second.result(timeout=10) == ('wasps', False)
+
+
+def test_research_key_matches_equivalent_requests():
+    assert research_key('  Quantum Computing!') == research_key('quantum computing')
+    assert research_key('bees', {'pipelined': True, 'refresh': False}) == \
+        research_key('Bees', {'refresh': False, 'pipelined': True})
+    assert research_key('bees', {'pipelined': True}) != research_key('bees')
@@ -0,0 +1,113 @@
+"""Tests for streaming the crew's answer tokens to a consumer."""
+import queue
+import threading
+
+import pytest
+
+from progress import TOKEN, ProgressBus
+from streaming import StreamingCallbackHandler, TokenStream
+
+
+def feed(handler, tokens):
+    """Run one streamed LLM call through the handler."""
+    handler.on_llm_start({}, ['prompt'])
+    for token in tokens:
+        handler.on_llm_new_token(token)
+
+
+def streamed(stream):
+    stream.close()
+    return list(stream)
+
+
+def test_only_tokens_after_the_final_answer_marker_are_forwarded():
+    stream = TokenStream(stages=['writing'])
+    handler = StreamingCallbackHandler(stream, 'writing')
+
+    feed(handler, ['Thought: I know', ' the answer\n', 'Final Answer:', '  ', ' Bees', ' pollinate', '.'])
+
+    assert streamed(stream) == ['Bees', ' pollinate', '.']
+
+
+def test_marker_split_across_tokens_is_found():
+    stream = TokenStream(stages=['writing'])
+    handler = StreamingCallbackHandler(stream, 'writing')
+
+    feed(handler, ['Thought: done\nFin', 'al Ans', 'wer: Bees', ' pollinate'])
+
+    assert streamed(stream) == ['Bees', ' pollinate']
+
+
+def test_calls_without_a_final_answer_are_not_forwarded():
+    stream = TokenStream(stages=['writing'])
+    handler = StreamingCallbackHandler(stream, 'writing')
+
+    feed(handler, ['Final Answer: first call'])
+    feed(handler, ['Thought: I should search', '\nAction: Search'])
+    feed(handler, ['Thought: done\n', 'Final Answer:', ' second call'])
+
+    assert ''.join(streamed(stream)) == 'first callsecond call'
+
+
+def test_tokens_of_other_stages_are_dropped():
+    stream = TokenStream(stages=['writing'])
+    feed(StreamingCallbackHandler(stream, 'research'), ['Final Answer: notes'])
+    feed(StreamingCallbackHandler(stream, 'writing'), ['Final Answer: report'])
+
+    assert streamed(stream) == ['report']
+
+
+def test_tokens_are_written_to_the_partial_report(tmp_path):
+    path = tmp_path / 'output' / 'report.md'
+    stream = TokenStream(stages=['fact_check', 'writing'], output_file=path)
+
+    stream.put('fact_check', 'Verified.')
+    stream.put('writing', '# Bees')
+    stream.put('writing', '\nThey pollinate.')
+    assert path.read_text(encoding='utf-8') == 'Verified.\n\n# Bees\nThey pollinate.'
+
+    stream.close()
+    stream.put('writing', ' Ignored.')
+    assert path.read_text(encoding='utf-8') == 'Verified.\n\n# Bees\nThey pollinate.'
+
+
+def test_complete_stage_only_fills_in_unstreamed_stages():
+    stream = TokenStream(stages=['fact_check', 'writing'])
+    stream.put('writing', 'Streamed')
+
+    stream.complete_stage('writing', 'Streamed in full')
+    stream.complete_stage('fact_check', 'From the cache')
+
+    assert streamed(stream) == ['Streamed', 'From the cache']
+
+
+def test_tokens_are_published_on_the_bus():
+    bus = ProgressBus()
+    events = []
+    bus.subscribe(events.append)
+    stream = TokenStream(stages=['writing'], bus=bus)
+
+    stream.put('writing', 'Bees')
+
+    assert [(event['type'], event['task'], event['token']) for event in events] == [(TOKEN, 'writing', 'Bees')]
+
+
+def test_consumer_on_another_thread_sees_every_token_and_the_end():
+    stream = TokenStream(stages=['writing'])
+    received = []
+    consumer = threading.Thread(target=lambda: received.extend(stream))
+    consumer.start()
+
+    for token in ['Bees', ' pollinate', '.']:
+        stream.put('writing', token)
+    stream.close()
+    consumer.join(timeout=5)
+
+    assert received == ['Bees', ' pollinate', '.']
+    assert stream.closed
+    assert stream.get(timeout=1) is None
+
+
+def test_get_times_out_while_the_stream_is_open():
+    with pytest.raises(queue.Empty):
+        TokenStream().get(timeout=0.05)
@@ -0,0 +1,159 @@
+"""Tests for per-task run telemetry and its Prometheus metrics."""
+import json
+import uuid
+
+import pytest
+from langchain_core.outputs import Generation, LLMResult
+
+from progress import RUN_FINISHED, TASK_FINISHED, TASK_STARTED, ProgressBus
+from telemetry import RunTelemetry, TelemetryCallbackHandler, TelemetrySink, estimate_cost
+
+STAGES = ['research', 'fact_check', 'writing']
+
+
+class FakeCache:
+    """Response cache whose hits are set by the test."""
+
+    def __init__(self):
+        self.hits = 0
+
+    def thread_hits(self):
+        return self.hits
+
+
+@pytest.fixture
+def sink(tmp_path):
+    return TelemetrySink(tmp_path / 'events.jsonl', tmp_path / 'metrics.prom')
+
+
+@pytest.fixture
+def telemetry(sink):
+    return RunTelemetry('bees', STAGES, sink=sink)
+
+
+def call(handler, prompt='Research bees', response=None, error=None):
+    """Run one LLM call through the handler."""
+    run_id = uuid.uuid4()
+    handler.on_llm_start({}, [prompt], run_id=run_id, invocation_params={'model': handler.model})
+    if error is not None:
+        handler.on_llm_error(error, run_id=run_id)
+    else:
+        handler.on_llm_end(response, run_id=run_id)
+
+
+def response(text='Bees pollinate crops.', prompt_tokens=None, completion_tokens=None):
+    llm_output = {}
+    if prompt_tokens is not None:
+        llm_output['token_usage'] = {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens}
+    return LLMResult(generations=[[Generation(text=text)]], llm_output=llm_output)
+
+
+def test_cost_uses_the_longest_matching_price():
+    assert estimate_cost('gpt-4o-mini-2024-07-18', 1000, 1000) == pytest.approx(0.00075)
+    assert estimate_cost('gpt-4-0613', 1000, 0) == pytest.approx(0.03)
+    assert estimate_cost('local-model', 1000, 1000) == 0.0
+
+
+def test_calls_are_aggregated_per_task(telemetry):
+    research = TelemetryCallbackHandler(telemetry, 'research', 'gpt-4o')
+    writing = TelemetryCallbackHandler(telemetry, 'writing', 'gpt-4o-mini')
+    telemetry.task_started('research')
+    telemetry.task_started('writing')
+
+    call(research, response=response(prompt_tokens=1000, completion_tokens=200))
+    call(research, response=response(prompt_tokens=500, completion_tokens=100))
+    call(writing, response=response(prompt_tokens=2000, completion_tokens=1000))
+
+    summary = telemetry.summary()
+    assert summary['tasks']['research']['llm_calls'] == 2
+    assert summary['tasks']['research']['prompt_tokens'] == 1500
+    assert summary['tasks']['research']['estimated_cost_usd'] == pytest.approx(0.012)
+    assert summary['tasks']['research']['ttft_seconds'] is not None
+    assert summary['tasks']['fact_check']['status'] == 'pending'
+    assert (summary['llm_calls'], summary['prompt_tokens'], summary['completion_tokens']) == (3, 3500, 1300)
+    assert summary['estimated_cost_usd'] == pytest.approx(0.0129)
+    assert summary['status'] == 'in_progress'
+
+
+def test_responses_without_usage_have_estimated_tokens(telemetry):
+    handler = TelemetryCallbackHandler(telemetry, 'research', 'gpt-4o-mini')
+
+    call(handler, response=response(text='Bees pollinate crops. ' * 10))
+
+    metrics = telemetry.summary()['tasks']['research']
+    assert metrics['tokens_estimated']
+    assert metrics['prompt_tokens'] > 0
+    assert metrics['completion_tokens'] > metrics['prompt_tokens']
+
+
+def test_cached_responses_are_hits_and_cost_nothing(telemetry):
+    cache = FakeCache()
+    handler = TelemetryCallbackHandler(telemetry, 'research', 'gpt-4o', cache=cache)
+    run_id = uuid.uuid4()
+
+    handler.on_llm_start({}, ['Research bees'], run_id=run_id)
+    cache.hits += 1
+    handler.on_llm_end(response(prompt_tokens=1000, completion_tokens=200), run_id=run_id)
+
+    summary = telemetry.summary()
+    assert summary['cache_hits'] == 1
+    assert summary['estimated_cost_usd'] == 0.0
+
+
+def test_failed_calls_are_errors_not_retries(telemetry):
+    handler = TelemetryCallbackHandler(telemetry, 'research', 'gpt-4o')
+
+    call(handler, error=RuntimeError('Run cancelled'))
+    call(handler, error=RuntimeError('Rate limited'))
+    handler.on_retry(None, run_id=uuid.uuid4())
+
+    metrics = telemetry.summary()['tasks']['research']
+    assert (metrics['llm_calls'], metrics['errors'], metrics['retries']) == (2, 2, 1)
+    assert telemetry.summary()['retries'] == 1
+
+
+def test_run_follows_the_progress_bus(telemetry, sink):
+    bus = ProgressBus()
+    telemetry.attach(bus)
+
+    bus.publish(TASK_STARTED, task='research')
+    bus.publish(TASK_FINISHED, task='research', status='completed')
+    bus.publish(RUN_FINISHED, status='completed')
+    bus.publish(RUN_FINISHED, status='failed')
+
+    summary = telemetry.summary()
+    assert summary['status'] == 'completed'
+    assert summary['tasks']['research']['status'] == 'completed'
+    assert summary['tasks']['research']['wall_time_seconds'] is not None
+    events = [json.loads(line) for line in sink.events_path.read_text().splitlines()]
+    assert [event['type'] for event in events] == ['task_finished', 'run_finished']
+    assert {event['run_id'] for event in events} == {telemetry.run_id}
+    assert 'research_runs_total{status="completed"} 1' in sink.render_prometheus()
+
+
+def test_prometheus_metrics_add_up_over_runs(sink):
+    for status in ['completed', 'completed', 'failed']:
+        telemetry = RunTelemetry('bees', STAGES, sink=sink)
+        handler = TelemetryCallbackHandler(telemetry, 'research', 'gpt-4o')
+        telemetry.task_started('research')
+        call(handler, response=response(prompt_tokens=100, completion_tokens=10))
+        call(handler, error=RuntimeError('Rate limited'))
+        handler.on_retry(None)
+        telemetry.task_finished('research', 'completed')
+        telemetry.finish(status)
+
+    text = sink.render_prometheus()
+    lines = text.splitlines()
+    assert 'research_runs_total{status="completed"} 2' in lines
+    assert 'research_runs_total{status="failed"} 1' in lines
+    assert 'research_run_duration_seconds_count 3' in lines
+    assert 'research_task_duration_seconds_count{stage="research"} 3' in lines
+    assert 'research_llm_calls_total{stage="research"} 6' in lines
+    assert 'research_llm_tokens_total{stage="research",kind="prompt"} 300' in lines
+    assert 'research_llm_tokens_total{stage="research",kind="completion"} 30' in lines
+    assert 'research_llm_retries_total{stage="research"} 3' in lines
+    assert 'research_llm_errors_total{stage="research"} 3' in lines
+    assert '# TYPE research_llm_cost_usd_total counter' in lines
+    # Stages that never started are left out
+    assert 'stage="writing"' not in text
+    assert sink.prometheus_path.read_text() == text